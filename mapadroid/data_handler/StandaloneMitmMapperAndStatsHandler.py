@@ -7,6 +7,7 @@ from mapadroid.data_handler.mitm_data.AbstractMitmMapper import \
 from mapadroid.data_handler.mitm_data.holder.latest_mitm_data.LatestMitmDataEntry import \
     LatestMitmDataEntry
 from mapadroid.data_handler.mitm_data.MitmDataHandler import MitmDataHandler
+from mapadroid.data_handler.mitm_data.MitmDataNotifier import MitmDataNotifier
 from mapadroid.data_handler.stats.AbstractStatsHandler import \
     AbstractStatsHandler
 from mapadroid.data_handler.stats.StatsHandler import StatsHandler
@@ -28,6 +29,7 @@ class StandaloneMitmMapperAndStatsHandler(AbstractMitmMapper, AbstractStatsHandl
         else:
             self.__stats_handler: Optional[StatsHandler] = None
         self.__mitm_data_handler: MitmDataHandler = MitmDataHandler()
+        self.__data_notifier: MitmDataNotifier = MitmDataNotifier()
 
     async def start(self):
         if self.__stats_handler:
@@ -84,8 +86,10 @@ class StandaloneMitmMapperAndStatsHandler(AbstractMitmMapper, AbstractStatsHandl
     async def update_latest(self, worker: str, key: str, value: Union[list, dict], timestamp_received_raw: float = None,
                             timestamp_received_receiver: float = None, location: Location = None) -> None:
         loop = asyncio.get_running_loop()
-        loop.run_in_executor(None, self.__mitm_data_handler.update_latest, worker, key, value, timestamp_received_raw,
-                             timestamp_received_receiver, location)
+        stored = loop.run_in_executor(None, self.__mitm_data_handler.update_latest, worker, key, value,
+                                      timestamp_received_raw, timestamp_received_receiver, location)
+        # Waiting workers are woken up once the data can be requested
+        stored.add_done_callback(lambda _: self.__data_notifier.notify(worker, key))
 
     async def request_latest(self, worker: str, key: str,
                              timestamp_earliest: Optional[int] = None) -> Optional[LatestMitmDataEntry]:
@@ -94,6 +98,10 @@ class StandaloneMitmMapperAndStatsHandler(AbstractMitmMapper, AbstractStatsHandl
     async def get_full_latest_data(self, worker: str) -> Dict[str, LatestMitmDataEntry]:
         return self.__mitm_data_handler.get_full_latest_data(worker)
 
+    async def wait_for_data(self, worker: str, key: str, since: float, timeout: float) -> bool:
+        await self.__data_notifier.wait(worker, key, since, timeout)
+        return True
+
     async def get_poke_stop_visits(self, worker: str) -> int:
         return await self.__mitm_data_handler.get_poke_stop_visits(worker)
 
@@ -1,32 +1,47 @@
 import asyncio
+from asyncio import Task
 from typing import Dict, List, Optional, Union
 
+import grpc
 from aiocache import cached
 from google.protobuf import json_format
 from grpc.aio import AioRpcError
 from loguru import logger
+from orjson import orjson
 
 from mapadroid.data_handler.mitm_data.AbstractMitmMapper import \
     AbstractMitmMapper
 from mapadroid.data_handler.mitm_data.holder.latest_mitm_data.LatestMitmDataEntry import \
     LatestMitmDataEntry
+from mapadroid.data_handler.mitm_data.MitmDataNotifier import MitmDataNotifier
 from mapadroid.grpc.compiled.mitm_mapper import mitm_mapper_pb2
 from mapadroid.grpc.compiled.mitm_mapper.mitm_mapper_pb2 import (
     GetQuestsHeldResponse, InjectedRequest, InjectionStatus,
     LastKnownLocationResponse, LastMoved, LatestMitmDataEntryRequest,
     LatestMitmDataEntryResponse, LevelResponse, PokestopVisitsResponse,
-    SetLevelRequest, SetPokestopVisitsRequest, SetQuestsHeldRequest)
+    SetLevelRequest, SetPokestopVisitsRequest, SetQuestsHeldRequest,
+    SubscribeLatestRequest)
 from mapadroid.grpc.compiled.shared.Worker_pb2 import Worker
 from mapadroid.grpc.stubs.mitm_mapper.mitm_mapper_pb2_grpc import \
     MitmMapperStub
 from mapadroid.utils.collections import Location
+from mapadroid.utils.SingleFlight import single_flight
 
 
 class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
+    _RESUBSCRIBE_DELAY: int = 5
+
     def __init__(self, channel):
         super().__init__(channel)
         self._level_cache: Dict[str, int] = {}
         self._pokestop_visits_cache: Dict[str, int] = {}
+        # Data is transported as serialized JSON unless the server turns out to not support it (older MAD)
+        self._serialized_transport: bool = True
+        self._data_notifier: MitmDataNotifier = MitmDataNotifier()
+        # Only subscribed to once workers wait for data
+        self._subscription_task: Optional[Task] = None
+        self._subscribed: bool = False
+        self._notifications_supported: bool = True
 
     # Cache the update parameters to not spam it...
     @cached(ttl=30)
@@ -59,6 +74,7 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
         except AioRpcError as e:
             logger.warning("Failed submitting pokestop visits {}", e)
 
+    @single_flight()
     async def get_last_possibly_moved(self, worker: str) -> int:
         try:
             response: LastMoved = await self.GetLastPossiblyMoved(name=worker)
@@ -82,12 +98,21 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
             request.data.timestamp_received = int(timestamp_received_raw)
         if timestamp_received_receiver:
             request.data.timestamp_of_data_retrieval = int(timestamp_received_receiver)
+        if not isinstance(value, (list, dict)):
+            raise ValueError("Cannot handle data")
+        if self._serialized_transport:
+            request.data.serialized_data = orjson.dumps(value)
+            try:
+                await self.UpdateLatestSerialized(request)
+                return
+            except AioRpcError as e:
+                if not self.__fall_back_to_struct_transport(e):
+                    logger.warning("Failed submitting latest data {}", e)
+                    return
         if isinstance(value, list):
             request.data.some_list.extend(value)
-        elif isinstance(value, dict):
-            request.data.some_dictionary.update(value)
         else:
-            raise ValueError("Cannot handle data")
+            request.data.some_dictionary.update(value)
         try:
             await self.UpdateLatest(request)
         except AioRpcError as e:
@@ -100,14 +125,26 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
         request.key = str(key)
         if timestamp_earliest:
             request.timestamp_earliest = timestamp_earliest
-        try:
-            response: LatestMitmDataEntryResponse = await self.RequestLatest(request)
-        except AioRpcError as e:
-            logger.warning("Failed requesting latest data {}", e)
-            # TODO: Throw custom exception?
-            return None
+        response: Optional[LatestMitmDataEntryResponse] = None
+        if self._serialized_transport:
+            try:
+                response = await self.RequestLatestSerialized(request)
+            except AioRpcError as e:
+                if not self.__fall_back_to_struct_transport(e):
+                    logger.warning("Failed requesting latest data {}", e)
+                    return None
+        if response is None:
+            try:
+                response = await self.RequestLatest(request)
+            except AioRpcError as e:
+                logger.warning("Failed requesting latest data {}", e)
+                # TODO: Throw custom exception?
+                return None
         if not response.HasField("entry"):
             return None
+        if response.entry.HasField("serialized_data"):
+            # Parsing JSON is fast enough to not bother the executor
+            return self.__transform_proto_data_entry(response.entry)
         loop = asyncio.get_running_loop()
         latest: LatestMitmDataEntry = await loop.run_in_executor(
             None, self.__transform_proto_data_entry, response.entry)
@@ -126,7 +163,9 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
             data = entry.some_list
         else:
             data = None
-        if data:
+        if entry.HasField("serialized_data"):
+            formatted = orjson.loads(entry.serialized_data)
+        elif data:
             formatted = json_format.MessageToDict(data)
         else:
             formatted = None
@@ -136,7 +175,53 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
                                                          data=formatted)
         return entry
 
-    @cached(ttl=30)
+    async def wait_for_data(self, worker: str, key: str, since: float, timeout: float) -> bool:
+        if not self._notifications_supported:
+            return False
+        if self._subscription_task is None:
+            self._subscription_task = asyncio.get_running_loop().create_task(self.__subscribe_to_latest_data())
+        if not self._subscribed:
+            return False
+        await self._data_notifier.wait(worker, key, since, timeout)
+        return True
+
+    async def __subscribe_to_latest_data(self) -> None:
+        while True:
+            try:
+                call = self.SubscribeLatest(SubscribeLatestRequest())
+                await call.wait_for_connection()
+                self._subscribed = True
+                logger.info("Subscribed to notifications of latest data")
+                async for notification in call:
+                    self._data_notifier.notify(notification.worker.name, notification.key)
+                logger.info("Subscription to notifications of latest data ended, subscribing again")
+                continue
+            except AioRpcError as e:
+                if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                    logger.warning("MitmMapper server does not support notifications of latest data, polling it "
+                                   "instead. Consider updating the MitmMapper.")
+                    self._notifications_supported = False
+                    return
+                logger.warning("Lost subscription to notifications of latest data, polling meanwhile: {}", e)
+            except grpc.aio.UsageError:
+                # Channel has been closed
+                return
+            finally:
+                self._subscribed = False
+            await asyncio.sleep(self._RESUBSCRIBE_DELAY)
+
+    def __fall_back_to_struct_transport(self, error: AioRpcError) -> bool:
+        """
+        Returns: Whether the server does not support the serialized transport and the Struct based RPC is to be used
+        """
+        if error.code() != grpc.StatusCode.UNIMPLEMENTED:
+            return False
+        logger.warning("MitmMapper server does not support serialized data, falling back to the slower transport. "
+                       "Consider updating the MitmMapper.")
+        self._serialized_transport = False
+        return True
+
+    @single_flight(ttl=30)
     async def get_poke_stop_visits(self, worker: str) -> int:
         request: Worker = Worker()
         request.name = worker
@@ -148,7 +233,7 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
             # TODO: Custom Exception
             return self._pokestop_visits_cache.get(worker, 0)
 
-    @cached(ttl=60)
+    @single_flight(ttl=60)
     async def get_level(self, worker: str) -> int:
         request: Worker = Worker()
         request.name = worker
@@ -160,6 +245,7 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
             # TODO: Custom Exception
             return self._level_cache.get(worker, 0)
 
+    @single_flight()
     async def get_injection_status(self, worker: str) -> bool:
         request: Worker = Worker()
         request.name = worker
@@ -182,6 +268,7 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
             # TODO: Custom exception?
             return
 
+    @single_flight()
     async def get_last_known_location(self, worker: str) -> Optional[Location]:
         request: Worker = Worker()
         request.name = worker
@@ -206,7 +293,7 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
         except AioRpcError as e:
             logger.warning("Failed requesting setting quests held of {}: {}", worker, e)
 
-    @cached(ttl=1)
+    @single_flight(ttl=1)
     async def get_quests_held(self, worker: str) -> Optional[List[int]]:
         request: Worker = Worker()
         request.name = worker
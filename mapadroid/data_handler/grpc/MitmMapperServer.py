@@ -1,9 +1,10 @@
 import asyncio
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
 import grpc
 from google.protobuf import json_format
 from grpc._cython.cygrpc import CompressionAlgorithm, CompressionLevel
+from orjson import orjson
 
 from mapadroid.data_handler.mitm_data.holder.latest_mitm_data.LatestMitmDataEntry import \
     LatestMitmDataEntry
@@ -13,8 +14,9 @@ from mapadroid.grpc.compiled.mitm_mapper.mitm_mapper_pb2 import (
     GetQuestsHeldResponse, InjectedRequest, InjectionStatus,
     LastKnownLocationResponse, LastMoved, LatestMitmDataEntryRequest,
     LatestMitmDataEntryResponse, LatestMitmDataEntryUpdateRequest,
-    LevelResponse, PokestopVisitsResponse, SetLevelRequest,
-    SetPokestopVisitsRequest, SetQuestsHeldRequest)
+    LatestMitmDataNotification, LevelResponse, PokestopVisitsResponse,
+    SetLevelRequest, SetPokestopVisitsRequest, SetQuestsHeldRequest,
+    SubscribeLatestRequest)
 from mapadroid.grpc.compiled.shared.Ack_pb2 import Ack
 from mapadroid.grpc.compiled.shared.Worker_pb2 import Worker
 from mapadroid.grpc.stubs.mitm_mapper.mitm_mapper_pb2_grpc import (
@@ -94,6 +96,52 @@ class MitmMapperServer(MitmMapperServicer, MitmMapper):
         )
         return Ack()
 
+    async def UpdateLatestSerialized(self, request: LatestMitmDataEntryUpdateRequest,
+                                     context: grpc.aio.ServicerContext) -> Ack:
+        logger.debug("UpdateLatestSerialized called")
+        await self.update_latest(
+            worker=request.worker.name, key=request.key,
+            timestamp_received_raw=request.data.timestamp_received,
+            timestamp_received_receiver=request.data.timestamp_of_data_retrieval,
+            location=Location(request.data.location.latitude,
+                              request.data.location.longitude),
+            value=orjson.loads(request.data.serialized_data)
+        )
+        return Ack()
+
+    async def RequestLatestSerialized(self, request: LatestMitmDataEntryRequest,
+                                      context: grpc.aio.ServicerContext) -> LatestMitmDataEntryResponse:
+        logger.debug("RequestLatestSerialized called")
+        timestamp_earliest: Optional[int] = None
+        if request.HasField("timestamp_earliest"):
+            timestamp_earliest = request.timestamp_earliest
+        latest: Optional[LatestMitmDataEntry] = await self.request_latest(
+            request.worker.name, request.key, timestamp_earliest)
+        response: LatestMitmDataEntryResponse = LatestMitmDataEntryResponse()
+        if not latest:
+            return response
+        self.__transform_latest_mitm_data_entry(response.entry, latest, serialized=True)
+        return response
+
+    async def SubscribeLatest(self, request: SubscribeLatestRequest,
+                              context: grpc.aio.ServicerContext) -> AsyncIterator[LatestMitmDataNotification]:
+        logger.debug("SubscribeLatest called")
+        subscriber: asyncio.Queue = self._data_notifier.subscribe()
+        # Lets the client know it is subscribed before the first notification is sent
+        await context.send_initial_metadata(())
+        try:
+            while True:
+                if subscriber.empty() and not self._data_notifier.is_subscribed(subscriber):
+                    # Dropped for not keeping up, the client is expected to subscribe again
+                    return
+                worker, key = await subscriber.get()
+                notification: LatestMitmDataNotification = LatestMitmDataNotification()
+                notification.worker.name = worker
+                notification.key = key
+                yield notification
+        finally:
+            self._data_notifier.unsubscribe(subscriber)
+
     async def RequestLatest(self, request: LatestMitmDataEntryRequest,
                             context: grpc.aio.ServicerContext) -> LatestMitmDataEntryResponse:
         logger.debug("RequestLatest called")
@@ -116,7 +164,7 @@ class MitmMapperServer(MitmMapperServicer, MitmMapper):
         return response
 
     def __transform_latest_mitm_data_entry(self, entry_message: mitm_mapper_pb2.LatestMitmDataEntry,
-                                           latest) -> mitm_mapper_pb2.LatestMitmDataEntry:
+                                           latest, serialized: bool = False) -> mitm_mapper_pb2.LatestMitmDataEntry:
         if latest.location:
             entry_message.location.latitude = latest.location.lat
             entry_message.location.longitude = latest.location.lng
@@ -124,7 +172,9 @@ class MitmMapperServer(MitmMapperServicer, MitmMapper):
             entry_message.timestamp_of_data_retrieval = latest.timestamp_of_data_retrieval
         if latest.timestamp_received:
             entry_message.timestamp_received = latest.timestamp_received
-        if isinstance(latest.data, list):
+        if serialized and isinstance(latest.data, (list, dict)):
+            entry_message.serialized_data = orjson.dumps(latest.data)
+        elif isinstance(latest.data, list):
             entry_message.some_list.extend(latest.data)
         elif isinstance(latest.data, dict):
             logger.debug("Placing dict data")
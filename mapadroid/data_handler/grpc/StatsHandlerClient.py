@@ -1,72 +1,90 @@
+import asyncio
+import itertools
+from asyncio import Task
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Hashable, List, Optional
 
+import grpc
 from grpc.aio import AioRpcError
 from loguru import logger
 
 from mapadroid.data_handler.stats.AbstractStatsHandler import \
     AbstractStatsHandler
-from mapadroid.grpc.compiled.stats_handler.stats_handler_pb2 import Stats
+from mapadroid.grpc.compiled.stats_handler.stats_handler_pb2 import (
+    Stats, StatsBatch)
 from mapadroid.grpc.stubs.stats_handler.stats_handler_pb2_grpc import \
     StatsHandlerStub
 from mapadroid.utils.collections import Location
+from mapadroid.utils.madConstants import (STATS_CLIENT_FLUSH_INTERVAL,
+                                          STATS_CLIENT_FLUSH_SIZE,
+                                          STATS_CLIENT_MAX_BUFFERED)
 from mapadroid.utils.madGlobals import (MonSeenTypes, PositionType,
                                         TransportType)
 from mapadroid.worker.WorkerType import WorkerType
 
 
 class StatsHandlerClient(StatsHandlerStub, AbstractStatsHandler):
+    """
+    Buffers stats and sends them to the StatsHandler in batches rather than calling the StatsHandler per stat.
+     Wild mons, raids and seen types of the same worker (detection type respectively) and second are merged.
+     The stats are sent once start() has been called.
+    """
+
     def __init__(self, channel):
         super().__init__(channel)
+        self._batch: StatsBatch = StatsBatch()
+        # Stats of the batch by key to merge stats into
+        self._buffered: Dict[Hashable, Stats] = {}
+        # Keys of stats not to be merged
+        self._unique_keys = itertools.count()
+        self._amount_dropped: int = 0
+        self._flush_requested: asyncio.Event = asyncio.Event()
+        self._flush_task: Optional[Task] = None
+        # Stats are sent in batches unless the server turns out to not support it (older MAD)
+        self._batches_supported: bool = True
+
+    async def start(self) -> None:
+        if not self._flush_task:
+            self._flush_task = asyncio.get_running_loop().create_task(self.__flush_loop())
+
+    async def shutdown(self) -> None:
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
 
     async def stats_collect_wild_mon(self, worker: str, encounter_ids: List[int], time_scanned: datetime) -> None:
-        request: Stats = Stats()
-        request.worker.name = worker
-        request.timestamp = int(time_scanned.timestamp())
-        request.wild_mons.encounter_ids.extend(encounter_ids)
-        try:
-            await self.StatsCollect(request)
-        except AioRpcError as e:
-            logger.warning("Failed submitting wild mon stats {}", e)
+        timestamp: int = int(time_scanned.timestamp())
+        request: Optional[Stats] = self.__get_buffered(("wild_mons", worker, timestamp), worker, timestamp)
+        if request is not None:
+            request.wild_mons.encounter_ids.extend(encounter_ids)
 
     async def stats_collect_mon_iv(self, worker: str, encounter_id: int, time_scanned: datetime,
                                    is_shiny: bool) -> None:
-        request: Stats = Stats()
-        request.worker.name = worker
-        request.timestamp = int(time_scanned.timestamp())
-        request.mon_iv.encounter_id = encounter_id
-        request.mon_iv.is_shiny = is_shiny
-        try:
-            await self.StatsCollect(request)
-        except AioRpcError as e:
-            logger.warning("Failed submitting mon IV stats {}", e)
+        request: Optional[Stats] = self.__get_buffered(next(self._unique_keys), worker,
+                                                       int(time_scanned.timestamp()))
+        if request is not None:
+            request.mon_iv.encounter_id = encounter_id
+            request.mon_iv.is_shiny = is_shiny
 
     async def stats_collect_quest(self, worker: str, time_scanned: datetime) -> None:
-        request: Stats = Stats()
-        request.worker.name = worker
-        request.timestamp = int(time_scanned.timestamp())
-        request.quest.SetInParent()
-        try:
-            await self.StatsCollect(request)
-        except AioRpcError as e:
-            logger.warning("Failed submitting quest stats {}", e)
+        request: Optional[Stats] = self.__get_buffered(next(self._unique_keys), worker,
+                                                       int(time_scanned.timestamp()))
+        if request is not None:
+            request.quest.SetInParent()
 
     async def stats_collect_raid(self, worker: str, time_scanned: datetime, amount: int = 1) -> None:
-        request: Stats = Stats()
-        request.worker.name = worker
-        request.timestamp = int(time_scanned.timestamp())
-        request.raid.amount = amount
-        try:
-            await self.StatsCollect(request)
-        except AioRpcError as e:
-            logger.warning("Failed submitting raid stats {}", e)
+        timestamp: int = int(time_scanned.timestamp())
+        request: Optional[Stats] = self.__get_buffered(("raid", worker, timestamp), worker, timestamp)
+        if request is not None:
+            request.raid.amount += amount
 
     async def stats_collect_location_data(self, worker: str, location: Optional[Location], success: bool, fix_timestamp: int,
                                           position_type: PositionType, data_timestamp: int, walker: WorkerType,
                                           transport_type: TransportType, timestamp_of_record: int) -> None:
-        request: Stats = Stats()
-        request.worker.name = worker
-        request.timestamp = timestamp_of_record
+        request: Optional[Stats] = self.__get_buffered(next(self._unique_keys), worker, timestamp_of_record)
+        if request is None:
+            return
         if location is not None:
             request.location_data.location.latitude = location.lat
             request.location_data.location.longitude = location.lng
@@ -77,19 +95,74 @@ class StatsHandlerClient(StatsHandlerStub, AbstractStatsHandler):
         # TODO: Probably gotta set it some other way...
         request.location_data.position_type = position_type.value
         request.location_data.transport_type = transport_type.value
-        try:
-            await self.StatsCollect(request)
-        except AioRpcError as e:
-            logger.warning("Failed submitting location data {}", e)
 
     async def stats_collect_seen_type(self, encounter_ids: List[int], type_of_detection: MonSeenTypes,
                                       time_of_scan: datetime) -> None:
-        request: Stats = Stats()
-        request.timestamp = int(time_of_scan.timestamp())
-        request.seen_type.encounter_ids.extend(encounter_ids)
-        # TODO: Probably gotta set it some other way...
-        request.seen_type.type_of_detection = type_of_detection.value
-        try:
-            await self.StatsCollect(request)
-        except AioRpcError as e:
-            logger.warning("Failed submitting seen type stats {}", e)
+        timestamp: int = int(time_of_scan.timestamp())
+        request: Optional[Stats] = self.__get_buffered(("seen_type", type_of_detection, timestamp), None, timestamp)
+        if request is not None:
+            request.seen_type.encounter_ids.extend(encounter_ids)
+            # TODO: Probably gotta set it some other way...
+            request.seen_type.type_of_detection = type_of_detection.value
+
+    def __get_buffered(self, key: Hashable, worker: Optional[str], timestamp: int) -> Optional[Stats]:
+        """
+        Returns: The stats to merge the stat into, None if the stat is to be dropped
+        """
+        request: Optional[Stats] = self._buffered.get(key, None)
+        if request is not None:
+            return request
+        elif len(self._buffered) >= STATS_CLIENT_MAX_BUFFERED:
+            self._amount_dropped += 1
+            return None
+        request = self._batch.stats.add()
+        if worker is not None:
+            request.worker.name = worker
+        request.timestamp = timestamp
+        self._buffered[key] = request
+        if len(self._buffered) >= STATS_CLIENT_FLUSH_SIZE:
+            self._flush_requested.set()
+        return request
+
+    async def __flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), STATS_CLIENT_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(e)
+
+    async def flush(self) -> None:
+        """
+        Sends the stats buffered. Stats failing to be sent are dropped.
+        """
+        if self._amount_dropped:
+            logger.warning("Dropped {} stats as the StatsHandler is not keeping up", self._amount_dropped)
+            self._amount_dropped = 0
+        if not self._buffered:
+            return
+        batch: StatsBatch = self._batch
+        self._batch = StatsBatch()
+        self._buffered = {}
+        if self._batches_supported:
+            try:
+                await self.StatsCollectBatch(batch)
+                return
+            except AioRpcError as e:
+                if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                    logger.warning("Failed submitting {} stats {}", len(batch.stats), e)
+                    return
+                logger.warning("StatsHandler does not support batches of stats, sending them one by one")
+                self._batches_supported = False
+        for request in batch.stats:
+            try:
+                await self.StatsCollect(request)
+            except AioRpcError as e:
+                logger.warning("Failed submitting {} stats {}", len(batch.stats), e)
+                return
@@ -25,6 +25,20 @@ class AbstractMitmMapper(ABC):
                              timestamp_earliest: Optional[int] = None) -> Optional[LatestMitmDataEntry]:
         pass
 
+    async def wait_for_data(self, worker: str, key: str, since: float, timeout: float) -> bool:
+        """
+        Waits for latest data of the key to be received for the worker
+        Args:
+            worker:
+            key:
+            since: Local time after which data is of interest (i.e. time.time() prior to the last request_latest)
+            timeout: Seconds to wait at most
+
+        Returns: False if the mapper is not able to notify about data received and the caller is to poll instead,
+         True once data has been received or the timeout passed
+        """
+        return False
+
     @abstractmethod
     async def get_poke_stop_visits(self, worker: str) -> int:
         pass
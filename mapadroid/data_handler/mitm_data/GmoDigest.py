@@ -0,0 +1,52 @@
+from typing import Dict, FrozenSet, List, Optional
+
+
+class GmoDigest:
+    """
+    Reduces GMOs to the values the worker strategies evaluate before the GMO is stored as latest data of a worker.
+     The digest keeps the structure of the GMO (cells containing forts and mons) with the keys listed below only, the
+     full GMO is processed by the data processors regardless.
+    """
+    CELL_KEYS: FrozenSet[str] = frozenset(("id",))
+    FORT_KEYS: FrozenSet[str] = frozenset(("id", "latitude", "longitude", "type", "visited", "enabled", "closed",
+                                           "cooldown_complete_ms"))
+    WILD_MON_KEYS: FrozenSet[str] = frozenset(("encounter_id", "spawnpoint_id", "latitude", "longitude"))
+    NEARBY_MON_KEYS: FrozenSet[str] = frozenset(("encounter_id",))
+
+    @staticmethod
+    def digest(gmo: dict) -> dict:
+        """
+        Args:
+            gmo: Payload of a GMO as received, not modified
+
+        Returns: Digest of the GMO containing "cells" only
+        """
+        cells: List[dict] = []
+        for cell in gmo.get("cells", None) or []:
+            cell_digest: dict = GmoDigest.__pick(cell, GmoDigest.CELL_KEYS)
+            if "forts" in cell:
+                cell_digest["forts"] = [GmoDigest.__pick(fort, GmoDigest.FORT_KEYS) for fort in cell["forts"]]
+            if "wild_pokemon" in cell:
+                cell_digest["wild_pokemon"] = [GmoDigest.__digest_wild_mon(wild_mon)
+                                               for wild_mon in cell["wild_pokemon"]]
+            if "nearby_pokemon" in cell:
+                cell_digest["nearby_pokemon"] = [GmoDigest.__pick(nearby_mon, GmoDigest.NEARBY_MON_KEYS)
+                                                 for nearby_mon in cell["nearby_pokemon"]]
+            cells.append(cell_digest)
+        return {"cells": cells}
+
+    @staticmethod
+    def __digest_wild_mon(wild_mon: dict) -> dict:
+        wild_mon_digest: dict = GmoDigest.__pick(wild_mon, GmoDigest.WILD_MON_KEYS)
+        pokemon_data: Optional[dict] = wild_mon.get("pokemon_data", None)
+        if pokemon_data is not None:
+            # Encounters are identified by the mon ID and weather boost besides the encounter ID
+            display: Dict = pokemon_data.get("display", {})
+            wild_mon_digest["pokemon_data"] = {"id": pokemon_data.get("id"),
+                                               "display": {"weather_boosted_value":
+                                                           display.get("weather_boosted_value", None)}}
+        return wild_mon_digest
+
+    @staticmethod
+    def __pick(entry: dict, keys: FrozenSet[str]) -> dict:
+        return {key: value for key, value in entry.items() if key in keys}
@@ -0,0 +1,73 @@
+import asyncio
+import time
+from typing import Dict, List, Set, Tuple
+
+from loguru import logger
+
+
+class MitmDataNotifier:
+    """
+    Wakes up tasks waiting for latest data of a worker to be received rather than having them poll the MitmMapper.
+     Notifications are forwarded to subscribed queues as well (e.g. to be streamed to MitmMapper clients).
+    """
+    _MAX_QUEUED_NOTIFICATIONS: int = 10000
+
+    def __init__(self):
+        # Local time the latest data of (worker, key) was last notified at
+        self._last_notified: Dict[Tuple[str, str], float] = {}
+        self._events: Dict[Tuple[str, str], asyncio.Event] = {}
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    def notify(self, worker: str, key: str) -> None:
+        entry_key: Tuple[str, str] = (worker, str(key))
+        self._last_notified[entry_key] = time.time()
+        event = self._events.pop(entry_key, None)
+        if event:
+            event.set()
+        dropped: List[asyncio.Queue] = []
+        for subscriber in self._subscribers:
+            try:
+                subscriber.put_nowait(entry_key)
+            except asyncio.QueueFull:
+                dropped.append(subscriber)
+        for subscriber in dropped:
+            # Subscribers not keeping up are dropped, waiting tasks of those fall back to their timeouts
+            logger.warning("Dropping subscriber of MITM data notifications not keeping up")
+            self._subscribers.discard(subscriber)
+
+    async def wait(self, worker: str, key: str, since: float, timeout: float) -> bool:
+        """
+        Args:
+            worker:
+            key:
+            since: Local time after which data is of interest
+            timeout: Seconds to wait at most
+
+        Returns: Whether data has been notified after since
+        """
+        entry_key: Tuple[str, str] = (worker, str(key))
+        if self._last_notified.get(entry_key, 0) >= since:
+            return True
+        event = self._events.get(entry_key, None)
+        if event is None:
+            event = asyncio.Event()
+            self._events[entry_key] = event
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Returns: Queue of (worker, key) tuples of data notified from now on until unsubscribe() is called
+        """
+        subscriber: asyncio.Queue = asyncio.Queue(maxsize=self._MAX_QUEUED_NOTIFICATIONS)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: asyncio.Queue) -> None:
+        self._subscribers.discard(subscriber)
+
+    def is_subscribed(self, subscriber: asyncio.Queue) -> bool:
+        return subscriber in self._subscribers
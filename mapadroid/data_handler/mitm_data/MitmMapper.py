@@ -4,6 +4,7 @@ from typing import Dict, List, Optional, Union
 from mapadroid.data_handler.mitm_data.AbstractMitmMapper import \
     AbstractMitmMapper
 from mapadroid.data_handler.mitm_data.MitmDataHandler import MitmDataHandler
+from mapadroid.data_handler.mitm_data.MitmDataNotifier import MitmDataNotifier
 from mapadroid.data_handler.mitm_data.holder.latest_mitm_data.LatestMitmDataEntry import \
     LatestMitmDataEntry
 from mapadroid.utils.collections import Location
@@ -12,6 +13,7 @@ from mapadroid.utils.collections import Location
 class MitmMapper(AbstractMitmMapper):
     def __init__(self):
         self._mitm_data_handler: MitmDataHandler = MitmDataHandler()
+        self._data_notifier: MitmDataNotifier = MitmDataNotifier()
 
     # ##
     # Data related methods
@@ -23,13 +25,19 @@ class MitmMapper(AbstractMitmMapper):
                             timestamp_received_raw: float = None,
                             timestamp_received_receiver: float = None, location: Location = None) -> None:
         loop = asyncio.get_running_loop()
-        loop.run_in_executor(None, self._mitm_data_handler.update_latest, worker, key, value, timestamp_received_raw,
-                             timestamp_received_receiver, location)
+        stored = loop.run_in_executor(None, self._mitm_data_handler.update_latest, worker, key, value,
+                                      timestamp_received_raw, timestamp_received_receiver, location)
+        # Waiting workers are woken up once the data can be requested
+        stored.add_done_callback(lambda _: self._data_notifier.notify(worker, key))
 
     async def request_latest(self, worker: str, key: str,
                              timestamp_earliest: Optional[int] = None) -> Optional[LatestMitmDataEntry]:
         return self._mitm_data_handler.request_latest(worker, key, timestamp_earliest)
 
+    async def wait_for_data(self, worker: str, key: str, since: float, timeout: float) -> bool:
+        await self._data_notifier.wait(worker, key, since, timeout)
+        return True
+
     async def get_poke_stop_visits(self, worker: str) -> int:
         return await self._mitm_data_handler.get_poke_stop_visits(worker)
 
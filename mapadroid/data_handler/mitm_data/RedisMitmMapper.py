@@ -1,24 +1,40 @@
+import asyncio
 import time
-from typing import Dict, List, Optional, Union
+from asyncio import Task
+from typing import Dict, List, Optional, Set, Union
+from urllib.parse import urlparse
 
 import ujson
 from aiocache import cached
 from redis import Redis
+from redis import asyncio as aioredis
+from redis.commands.core import AsyncScript
 from loguru import logger
 
 from mapadroid.data_handler.mitm_data.AbstractMitmMapper import \
     AbstractMitmMapper
 from mapadroid.data_handler.mitm_data.holder.latest_mitm_data.LatestMitmDataEntry import \
     LatestMitmDataEntry
+from mapadroid.data_handler.mitm_data.MitmDataNotifier import MitmDataNotifier
 from mapadroid.db.DbWrapper import DbWrapper
+from mapadroid.utils.ConsistentHashRing import ConsistentHashRing
 from mapadroid.utils.ProtoIdentifier import ProtoIdentifier
+from mapadroid.utils.SingleFlight import single_flight
 from mapadroid.utils.collections import Location
+from mapadroid.utils.madGlobals import MadGlobals
 
 
 class RedisMitmMapper(AbstractMitmMapper):
+    """
+    Stores the data of workers in Redis. The workers may be spread across multiple Redis instances (shards) by
+     consistent hashing of the origin, every shard having a pool of connections of its own. Without shards, the cache
+     of the DbWrapper is used. The cache of the DbWrapper (e.g., keys deduplicating protos) is never sharded.
+    """
     LAST_POSSIBLY_MOVED_KEY = "last_possibly_moved:{}"
     # latest_data:{worker}:{data_key}
     LATEST_DATA_KEY = "latest_data:{}:{}"
+    # latest_data_timestamp:{worker}:{data_key} - timestamp_of_data_retrieval of the entry in LATEST_DATA_KEY
+    LATEST_DATA_TIMESTAMP_KEY = "latest_data_timestamp:{}:{}"
     # latest_data:{worker}
     LAST_KNOWN_LOCATION_KEY = "last_known_location:{}"
     # injected:{worker}
@@ -31,19 +47,106 @@ class RedisMitmMapper(AbstractMitmMapper):
     LEVEL_KEY = "level:{}"
     # quests_held:{worker}
     QUESTS_HELD_KEY = "quests_held:{}"
+    # Channel [worker, data_key] of latest data stored is published to
+    LATEST_DATA_CHANNEL = "latest_data_updated"
+    _RESUBSCRIBE_DELAY: int = 5
+    # Stores the latest data unless newer data is known already and updates the state of the worker derived of GMOs
+    #  in a single round trip.
+    #  KEYS: latest data, latest data timestamp, last cell IDs, last possibly moved, last known location, is injected
+    #  ARGV: latest data entry, timestamp of data retrieval, notification channel, notification, is GMO,
+    #   sorted cell IDs of the GMO (empty if none), timestamp received, location (empty if none)
+    _UPDATE_LATEST_SCRIPT: str = """
+        local stored_timestamp = redis.call('GET', KEYS[2])
+        local stored = 0
+        if not stored_timestamp or tonumber(stored_timestamp) <= tonumber(ARGV[2]) then
+            redis.call('SET', KEYS[1], ARGV[1])
+            redis.call('SET', KEYS[2], ARGV[2])
+            redis.call('PUBLISH', ARGV[3], ARGV[4])
+            stored = 1
+        end
+        if ARGV[5] == '1' then
+            if ARGV[6] ~= '' then
+                if redis.call('GET', KEYS[3]) ~= ARGV[6] then
+                    redis.call('SET', KEYS[3], ARGV[6])
+                    redis.call('SET', KEYS[4], ARGV[7])
+                end
+                if ARGV[8] ~= '' then
+                    redis.call('SET', KEYS[5], ARGV[8])
+                end
+            end
+            redis.call('SET', KEYS[6], 1)
+        end
+        return stored
+    """
 
-    def __init__(self, db_wrapper: DbWrapper):
+    def __init__(self, db_wrapper: DbWrapper, shard_urls: Optional[List[str]] = None):
+        """
+        Args:
+            db_wrapper: Provides the cache used if no shards are configured
+            shard_urls: URLs of the Redis instances to spread the workers across, mitmmapper_redis_shards by default
+        """
         self.__db_wrapper: DbWrapper = db_wrapper
-        self.__cache: Optional[Redis] = None
+        if shard_urls is None and MadGlobals.application_args is not None \
+                and MadGlobals.application_args.mitmmapper_redis_shards:
+            shard_urls = MadGlobals.application_args.mitmmapper_redis_shards.split(",")
+        self.__shard_urls: List[str] = [url.strip() for url in shard_urls or [] if url.strip()]
+        # Redis instances by name of the shard
+        self.__shards: Dict[str, Redis] = {}
+        self.__ring: Optional[ConsistentHashRing[Redis]] = None
+        # Name of the shard of workers looked up already
+        self.__shard_of_worker: Dict[str, str] = {}
+        self.__data_notifier: MitmDataNotifier = MitmDataNotifier()
+        # Only subscribed to once workers wait for data, processes only storing data do not need notifications
+        self.__subscription_tasks: List[Task] = []
+        # Names of the shards currently subscribed to
+        self.__subscribed: Set[str] = set()
+        # Script registered per shard
+        self.__update_latest_scripts: Dict[str, AsyncScript] = {}
 
     async def start(self):
-        self.__cache: Redis = await self.__db_wrapper.get_cache()
+        if not self.__shard_urls:
+            self.__shards["default"] = await self.__db_wrapper.get_cache()
+        for url in self.__shard_urls:
+            # Credentials are not part of the name to keep the workers on their shard if the credentials change
+            parsed_url = urlparse(url)
+            name: str = "{}{}".format(parsed_url.netloc.rpartition("@")[2], parsed_url.path) or url
+            if name in self.__shards:
+                raise ValueError("Redis shard {} configured multiple times".format(name))
+            # Every client has a connection pool of its own
+            shard: Redis = aioredis.Redis.from_url(url)
+            await shard.ping()
+            self.__shards[name] = shard
+        self.__ring = ConsistentHashRing(self.__shards)
+        for name, shard in self.__shards.items():
+            self.__update_latest_scripts[name] = shard.register_script(RedisMitmMapper._UPDATE_LATEST_SCRIPT)
+        if self.__shard_urls:
+            logger.info("Spreading data of workers across {} Redis shards", len(self.__shards))
+
+    async def shutdown(self) -> None:
+        for task in self.__subscription_tasks:
+            task.cancel()
+        self.__subscription_tasks = []
+        if self.__shard_urls:
+            for shard in self.__shards.values():
+                await shard.close()
+
+    def __shard_of(self, worker: str) -> str:
+        name: Optional[str] = self.__shard_of_worker.get(worker, None)
+        if name is None:
+            name = self.__ring.get_name(worker)
+            self.__shard_of_worker[worker] = name
+        return name
+
+    def __cache_of(self, worker: str) -> Redis:
+        return self.__shards[self.__shard_of(worker)]
 
     # ##
     # Data related methods
     # ##
+    @single_flight()
     async def get_last_possibly_moved(self, worker: str) -> int:
-        last_moved: Optional[int] = await self.__cache.get(RedisMitmMapper.LAST_POSSIBLY_MOVED_KEY.format(worker))
+        last_moved: Optional[int] = await self.__cache_of(worker).get(
+            RedisMitmMapper.LAST_POSSIBLY_MOVED_KEY.format(worker))
         return int(last_moved) if last_moved else 0
 
     async def update_latest(self, worker: str, key: str, value: Union[List, Dict],
@@ -53,43 +156,36 @@ class RedisMitmMapper(AbstractMitmMapper):
             timestamp_received_raw = int(time.time())
         if timestamp_received_receiver is None:
             timestamp_received_receiver = int(time.time())
-        latest_entry: Optional[LatestMitmDataEntry] = await self.request_latest(worker, key)
-        if (latest_entry and latest_entry.timestamp_received
-                and (not timestamp_received_receiver
-                     or latest_entry.timestamp_of_data_retrieval > timestamp_received_receiver)):
-            # Ignore update as it yields an older timestamp than the one known to us
-            return
-        else:
-            mitm_data_entry: LatestMitmDataEntry = LatestMitmDataEntry(location, timestamp_received_raw,
-                                                                       timestamp_received_receiver, value)
-            json_data: bytes = await mitm_data_entry.to_json()
-            try:
-                await self.__cache.set(RedisMitmMapper.LATEST_DATA_KEY.format(worker, key), json_data)
-            except Exception as e:
-                logger.exception(e)
-        if key == str(ProtoIdentifier.GMO.value):
-            await self.__parse_gmo_for_location(worker, value, timestamp_received_raw, location)
-            await self.__cache.set(RedisMitmMapper.IS_INJECTED_KEY.format(worker), 1)
-
-    async def __parse_gmo_for_location(self, worker: str, gmo_payload: Dict, timestamp: int,
-                                       location: Optional[Location]):
-        cells = gmo_payload.get("cells", None)
-        if not cells:
-            return
-        cell_ids: List[int] = [cell['id'] for cell in cells]
-        last_cell_ids_raw: Optional[str] = await self.__cache.get(RedisMitmMapper.LAST_CELL_IDS_KEY.format(worker))
-        last_cell_ids: List[int] = []
-        if last_cell_ids_raw:
-            last_cell_ids: List[int] = ujson.loads(last_cell_ids_raw)
-        if set(cell_ids) != set(last_cell_ids):
-            await self.__cache.set(RedisMitmMapper.LAST_CELL_IDS_KEY.format(worker), ujson.dumps(cell_ids))
-            await self.__cache.set(RedisMitmMapper.LAST_POSSIBLY_MOVED_KEY.format(worker), timestamp)
-        if location:
-            await self.__cache.set(RedisMitmMapper.LAST_KNOWN_LOCATION_KEY.format(worker), location.to_json())
+        key = str(key)
+        mitm_data_entry: LatestMitmDataEntry = LatestMitmDataEntry(location, timestamp_received_raw,
+                                                                   timestamp_received_receiver, value)
+        json_data: bytes = await mitm_data_entry.to_json()
+        is_gmo: bool = key == str(ProtoIdentifier.GMO.value)
+        cell_ids: str = ""
+        location_json: bytes = b""
+        if is_gmo and isinstance(value, dict) and value.get("cells", None):
+            # Sorted as the cells are compared as a set
+            cell_ids = ujson.dumps(sorted({cell["id"] for cell in value["cells"]}))
+            if location:
+                location_json = location.to_json()
+        try:
+            await self.__update_latest_scripts[self.__shard_of(worker)](
+                keys=[RedisMitmMapper.LATEST_DATA_KEY.format(worker, key),
+                      RedisMitmMapper.LATEST_DATA_TIMESTAMP_KEY.format(worker, key),
+                      RedisMitmMapper.LAST_CELL_IDS_KEY.format(worker),
+                      RedisMitmMapper.LAST_POSSIBLY_MOVED_KEY.format(worker),
+                      RedisMitmMapper.LAST_KNOWN_LOCATION_KEY.format(worker),
+                      RedisMitmMapper.IS_INJECTED_KEY.format(worker)],
+                args=[json_data, int(timestamp_received_receiver), RedisMitmMapper.LATEST_DATA_CHANNEL,
+                      ujson.dumps([worker, key]), 1 if is_gmo else 0, cell_ids, int(timestamp_received_raw),
+                      location_json])
+        except Exception as e:
+            logger.exception(e)
 
     async def request_latest(self, worker: str, key: str,
                              timestamp_earliest: Optional[int] = None) -> Optional[LatestMitmDataEntry]:
-        latest_data: Optional[str] = await self.__cache.get(RedisMitmMapper.LATEST_DATA_KEY.format(worker, key))
+        latest_data: Optional[str] = await self.__cache_of(worker).get(
+            RedisMitmMapper.LATEST_DATA_KEY.format(worker, key))
         if not latest_data:
             return None
         latest_entry: Optional[LatestMitmDataEntry] = await LatestMitmDataEntry.from_json(latest_data)
@@ -99,24 +195,62 @@ class RedisMitmMapper(AbstractMitmMapper):
         else:
             return latest_entry
 
+    async def wait_for_data(self, worker: str, key: str, since: float, timeout: float) -> bool:
+        if not self.__subscription_tasks:
+            # Data is published on the shard of the worker
+            loop = asyncio.get_running_loop()
+            self.__subscription_tasks = [loop.create_task(self.__subscribe_to_latest_data(name))
+                                         for name in self.__shards]
+        if self.__shard_of(worker) not in self.__subscribed:
+            return False
+        await self.__data_notifier.wait(worker, key, since, timeout)
+        return True
+
+    async def __subscribe_to_latest_data(self, name: str) -> None:
+        while True:
+            pubsub = self.__shards[name].pubsub()
+            try:
+                await pubsub.subscribe(RedisMitmMapper.LATEST_DATA_CHANNEL)
+                self.__subscribed.add(name)
+                logger.info("Subscribed to notifications of latest data of shard {}", name)
+                async for message in pubsub.listen():
+                    if message.get("type", None) != "message":
+                        continue
+                    worker, key = ujson.loads(message["data"])
+                    self.__data_notifier.notify(worker, key)
+            except asyncio.CancelledError as e:
+                raise e
+            except Exception as e:
+                logger.warning("Lost subscription to notifications of latest data of shard {}, polling meanwhile: {}",
+                               name, e)
+            finally:
+                self.__subscribed.discard(name)
+                await pubsub.close()
+            await asyncio.sleep(RedisMitmMapper._RESUBSCRIBE_DELAY)
+
+    @single_flight()
     async def get_poke_stop_visits(self, worker: str) -> int:
-        pokestops_visited: Optional[int] = await self.__cache.get(RedisMitmMapper.POKESTOPS_VISITED_KEY.format(worker))
+        pokestops_visited: Optional[int] = await self.__cache_of(worker).get(
+            RedisMitmMapper.POKESTOPS_VISITED_KEY.format(worker))
         return int(pokestops_visited) if pokestops_visited else 0
 
-    @cached(ttl=30)
+    @single_flight(ttl=30)
     async def get_level(self, worker: str) -> int:
-        level: Optional[int] = await self.__cache.get(RedisMitmMapper.LEVEL_KEY.format(worker))
+        level: Optional[int] = await self.__cache_of(worker).get(RedisMitmMapper.LEVEL_KEY.format(worker))
         return int(level) if level else 0
 
+    @single_flight()
     async def get_injection_status(self, worker: str) -> bool:
-        is_injected: Optional[bytes] = await self.__cache.get(RedisMitmMapper.IS_INJECTED_KEY.format(worker))
+        is_injected: Optional[bytes] = await self.__cache_of(worker).get(
+            RedisMitmMapper.IS_INJECTED_KEY.format(worker))
         return is_injected and int(is_injected) == 1
 
     async def set_injection_status(self, worker: str, status: bool) -> None:
-        await self.__cache.set(RedisMitmMapper.IS_INJECTED_KEY.format(worker), 1 if status else 0)
+        await self.__cache_of(worker).set(RedisMitmMapper.IS_INJECTED_KEY.format(worker), 1 if status else 0)
 
+    @single_flight()
     async def get_last_known_location(self, worker: str) -> Optional[Location]:
-        last_known_location_raw: Optional[str] = await self.__cache.get(
+        last_known_location_raw: Optional[str] = await self.__cache_of(worker).get(
             RedisMitmMapper.LAST_KNOWN_LOCATION_KEY.format(worker))
         if not last_known_location_raw:
             return None
@@ -128,17 +262,18 @@ class RedisMitmMapper(AbstractMitmMapper):
 
     @cached(ttl=30)
     async def set_level(self, worker: str, level: int) -> None:
-        await self.__cache.set(RedisMitmMapper.LEVEL_KEY.format(worker), level)
+        await self.__cache_of(worker).set(RedisMitmMapper.LEVEL_KEY.format(worker), level)
 
     async def set_pokestop_visits(self, worker: str, pokestop_visits: int) -> None:
-        await self.__cache.set(RedisMitmMapper.POKESTOPS_VISITED_KEY.format(worker), pokestop_visits)
+        await self.__cache_of(worker).set(RedisMitmMapper.POKESTOPS_VISITED_KEY.format(worker), pokestop_visits)
 
     async def set_quests_held(self, worker: str, quests_held: Optional[List[int]]) -> None:
-        await self.__cache.set(RedisMitmMapper.QUESTS_HELD_KEY.format(worker), ujson.dumps(quests_held))
+        await self.__cache_of(worker).set(RedisMitmMapper.QUESTS_HELD_KEY.format(worker),
+                                          ujson.dumps(quests_held))
 
-    @cached(ttl=1)
+    @single_flight(ttl=1)
     async def get_quests_held(self, worker: str) -> Optional[List[int]]:
-        value = await self.__cache.get(RedisMitmMapper.QUESTS_HELD_KEY.format(worker))
+        value = await self.__cache_of(worker).get(RedisMitmMapper.QUESTS_HELD_KEY.format(worker))
         if not value:
             return None
         else:
@@ -1,8 +1,9 @@
+import itertools
 import json
 import math
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 import sqlalchemy
 from bitstring import BitArray
@@ -30,6 +31,9 @@ from mapadroid.db.model import (Gym, GymDetail, Pokemon, Pokestop,
                                 TrsQuest, TrsSpawn, TrsStatsDetectSeenType,
                                 Weather)
 from mapadroid.db.PooledQueryExecutor import PooledQueryExecutor
+from mapadroid.db.ProtoCacheDedup import ProtoCacheDedup
+from mapadroid.db.SpawnpointCache import SpawnpointCache
+from mapadroid.db.WeatherCache import WeatherCache
 from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
 from mapadroid.utils.gamemechanicutil import (gen_despawn_timestamp,
                                               is_mon_ditto)
@@ -61,98 +65,269 @@ class DbPogoProtoSubmit:
         self._db_exec: PooledQueryExecutor = db_exec
         self._args = args
         self._cache: Redis = None
+        self._spawnpoint_cache: SpawnpointCache = SpawnpointCache()
+        self._weather_cache: WeatherCache = WeatherCache()
 
     async def setup(self):
         self._cache: Redis = await self._db_exec.get_cache()
 
+    async def get_gmo_cache_dedup(self, *map_protos: dict) -> ProtoCacheDedup:
+        """
+        Checks all cache keys needed to process the GMO(s) in a single roundtrip. The returned dedup is to be passed to
+        the GMO related methods and flushed once the GMO(s) have been committed.
+        """
+        dedup: ProtoCacheDedup = ProtoCacheDedup(self._cache)
+        keys: List[str] = []
+        for map_proto in map_protos:
+            cells: List[Dict] = map_proto.get("cells", None) or []
+            keys.extend(itertools.chain(self._wild_mon_cache_keys(cells),
+                                        self._nearby_mon_cache_keys(cells),
+                                        self._lure_mon_cache_keys(cells),
+                                        self._cell_cache_keys(cells),
+                                        self._stop_cache_keys(cells),
+                                        self._raid_cache_keys(cells),
+                                        self._weather_cache_keys(map_proto)))
+        await dedup.prefetch(keys)
+        return dedup
+
+    async def _get_dedup(self, dedup: Optional[ProtoCacheDedup], keys: Iterable[str]) -> ProtoCacheDedup:
+        """
+        Returns the dedup passed or creates a new one with the keys given prefetched
+        """
+        if dedup is not None:
+            return dedup
+        dedup = ProtoCacheDedup(self._cache)
+        await dedup.prefetch(keys)
+        return dedup
+
+    @staticmethod
+    def _unsigned_id(value: int) -> int:
+        return value + 2 ** 64 if value < 0 else value
+
+    @staticmethod
+    def _wild_mon_cache_keys(cells: List[Dict]) -> List[str]:
+        return ["mon{}-{}".format(DbPogoProtoSubmit._unsigned_id(wild_mon["encounter_id"]),
+                                  wild_mon["pokemon_data"]["id"])
+                for cell in cells for wild_mon in cell.get("wild_pokemon", [])]
+
+    @staticmethod
+    def _nearby_mon_cache_keys(cells: List[Dict]) -> List[str]:
+        keys: List[str] = []
+        for cell in cells:
+            for nearby_mon in cell.get("nearby_pokemon", []):
+                encounter_id = DbPogoProtoSubmit._unsigned_id(nearby_mon["encounter_id"])
+                mon_id = nearby_mon["id"]
+                keys.append("mon{}-{}".format(encounter_id, mon_id))
+                keys.append("moniv{}-{}-{}".format(encounter_id, nearby_mon["display"]["weather_boosted_value"],
+                                                   mon_id))
+                keys.append("monnear{}-{}".format(encounter_id, mon_id))
+        return keys
+
+    @staticmethod
+    def _lure_mon_cache_keys(cells: List[Dict]) -> List[str]:
+        return ["monlurenoiv{}".format(DbPogoProtoSubmit._unsigned_id(fort["active_pokemon"]["encounter_id"]))
+                for cell in cells for fort in cell.get("forts", [])
+                if fort["type"] == 1 and fort.get("active_pokemon", {}).get("id", 0) > 0]
+
+    @staticmethod
+    def _cell_cache_keys(cells: List[Dict]) -> List[str]:
+        keys: List[str] = []
+        for cell in cells:
+            keys.append(f"stops_{cell['id']}")
+            keys.append(f"gyms_{cell['id']}")
+            keys.append("s2cell{}".format(DbPogoProtoSubmit._unsigned_id(cell["id"])))
+        return keys
+
+    @staticmethod
+    def _stop_cache_keys(cells: List[Dict]) -> List[str]:
+        # Stops without last_modified_timestamp_ms use a key based on the current time and are thus not prefetched
+        return ["stop{}{}".format(fort["id"], fort["last_modified_timestamp_ms"])
+                for cell in cells for fort in cell.get("forts", [])
+                if fort["type"] == 1 and fort.get("last_modified_timestamp_ms")]
+
+    @staticmethod
+    def _weather_cache_key(client_weather_data: Dict) -> Optional[str]:
+        display_weather_data = client_weather_data.get("display_weather", None)
+        if display_weather_data is None:
+            return None
+        return "weather{}{}{}{}{}{}{}".format(client_weather_data["cell_id"],
+                                              display_weather_data.get("rain_level", 0),
+                                              display_weather_data.get("wind_level", 0),
+                                              display_weather_data.get("snow_level", 0),
+                                              display_weather_data.get("fog_level", 0),
+                                              display_weather_data.get("wind_direction", 0),
+                                              client_weather_data["gameplay_weather"]["gameplay_condition"])
+
+    @staticmethod
+    def _weather_cache_keys(map_proto: Dict) -> List[str]:
+        keys: List[Optional[str]] = [DbPogoProtoSubmit._weather_cache_key(client_weather)
+                                     for client_weather in map_proto.get("client_weather", [])]
+        return [key for key in keys if key is not None]
+
+    @staticmethod
+    def _raid_cache_keys(cells: List[Dict]) -> List[str]:
+        keys: List[str] = []
+        for cell in cells:
+            for gym in cell.get("forts", []):
+                if gym["type"] != 0 or not gym["gym_details"]["has_raid"]:
+                    continue
+                raid_info = gym["gym_details"]["raid_info"]
+                pokemon_id = raid_info["raid_pokemon"]["id"] if raid_info["has_pokemon"] else None
+                keys.append("raid{}{}{}".format(gym["id"], pokemon_id, int(raid_info["raid_end"] / 1000)))
+        return keys
+
+    @staticmethod
+    def seen_of_cells(cells: List[Dict]) -> Tuple[List[int], List[int], int]:
+        """
+        Collects what mons() (wild), mon_lure_noiv() and raids() report as seen for cells not submitted
+
+        Returns: Tuple of wild encounter IDs, lure encounter IDs and the amount of raids
+        """
+        wild: List[int] = []
+        lure: List[int] = []
+        amount_raids: int = 0
+        for cell in cells:
+            for wild_mon in cell.get("wild_pokemon", []):
+                wild.append(DbPogoProtoSubmit._unsigned_id(wild_mon["encounter_id"]))
+            for fort in cell.get("forts", []):
+                if fort["type"] == 1 and fort.get("active_pokemon", {}).get("id", 0) > 0:
+                    lure.append(DbPogoProtoSubmit._unsigned_id(fort["active_pokemon"]["encounter_id"]))
+                elif (fort["type"] == 0 and fort["gym_details"]["has_raid"]
+                      and fort["gym_details"]["raid_info"]["has_pokemon"]):
+                    amount_raids += 1
+        return wild, lure, amount_raids
+
     async def mons(self, session: AsyncSession, timestamp: float,
-                   map_proto: dict) -> List[int]:
+                   map_proto: dict, dedup: Optional[ProtoCacheDedup] = None) -> List[int]:
         """
         Update/Insert mons from a map_proto dict
 
         Returns: List of encounterIDs of wild mons in GMO
         """
         logger.debug3("DbPogoProtoSubmit::mons called with data received")
-        cells = map_proto.get("cells", None)
-        encounter_ids_in_gmo = []
-        now = DatetimeWrapper.fromtimestamp(timestamp)
-        if not cells:
-            return encounter_ids_in_gmo
-        for cell in cells:
-            for wild_mon in cell["wild_pokemon"]:
-                spawnid = int(str(wild_mon["spawnpoint_id"]), 16)
-                lat = wild_mon["latitude"]
-                lon = wild_mon["longitude"]
-                mon_id = wild_mon["pokemon_data"]["id"]
-                encounter_id = wild_mon["encounter_id"]
+        encounter_ids_per_gmo: List[List[int]] = await self.mons_of_gmos(session, [(timestamp, map_proto)], dedup)
+        return encounter_ids_per_gmo[0]
 
-                if encounter_id < 0:
-                    encounter_id = encounter_id + 2 ** 64
-                encounter_ids_in_gmo.append(encounter_id)
+    async def mons_of_gmos(self, session: AsyncSession,
+                           gmos: List[Tuple[float, dict]],
+                           dedup: Optional[ProtoCacheDedup] = None) -> List[List[int]]:
+        """
+        Update/Insert the wild mons of one or more GMOs using a single multi-row upsert
 
-                cache_key = "mon{}-{}".format(encounter_id, mon_id)
-                if await self._cache.exists(cache_key):
-                    continue
+        Args:
+            session:
+            gmos: List of tuples of the timestamp the GMO was received at and the GMO itself
+            dedup: Cache dedup of the GMO(s). If not passed, the cache is checked and written by this method.
 
-                # get known spawn end time and feed into despawn time calculation
-                # getdetspawntime = self._get_detected_endtime(str(spawnid))
-                spawnpoint: Optional[TrsSpawn] = await TrsSpawnHelper.get(session, spawnid)
-                despawn_time_unix = gen_despawn_timestamp(spawnpoint.calc_endminsec if spawnpoint else None, timestamp,
-                                                          self._args.default_unknown_timeleft)
-                despawn_time = DatetimeWrapper.fromtimestamp(despawn_time_unix)
+        Returns: List of encounterIDs of wild mons per GMO passed (same order as gmos)
+        """
+        flush_dedup: bool = dedup is None
+        dedup = await self._get_dedup(dedup, itertools.chain.from_iterable(
+            self._wild_mon_cache_keys(map_proto.get("cells", None) or []) for _, map_proto in gmos))
+        encounter_ids_per_gmo: List[List[int]] = []
+        # Wild mons not present in the cache yet: (timestamp, wild_mon, encounter_id, spawnid, cache_key)
+        mons_to_process: List[Tuple[float, dict, int, int, str]] = []
+        for timestamp, map_proto in gmos:
+            encounter_ids_in_gmo: List[int] = []
+            encounter_ids_per_gmo.append(encounter_ids_in_gmo)
+            cells = map_proto.get("cells", None)
+            if not cells:
+                continue
+            for cell in cells:
+                for wild_mon in cell["wild_pokemon"]:
+                    encounter_id = wild_mon["encounter_id"]
+                    if encounter_id < 0:
+                        encounter_id = encounter_id + 2 ** 64
+                    encounter_ids_in_gmo.append(encounter_id)
 
-                if spawnpoint is None:
-                    logger.debug3("adding mon (#{}) at {}, {}. Despawns at {} (init) ({})", mon_id, lat, lon,
-                                  despawn_time.strftime("%Y-%m-%d %H:%M:%S"), spawnid)
-                else:
-                    logger.debug3("adding mon (#{}) at {}, {}. Despawns at {} (non-init) ({})", mon_id, lat, lon,
-                                  despawn_time.strftime("%Y-%m-%d %H:%M:%S"), spawnid)
+                    cache_key = "mon{}-{}".format(encounter_id, wild_mon["pokemon_data"]["id"])
+                    if await dedup.exists(cache_key):
+                        continue
+                    spawnid = int(str(wild_mon["spawnpoint_id"]), 16)
+                    mons_to_process.append((timestamp, wild_mon, encounter_id, spawnid, cache_key))
+        if not mons_to_process:
+            return encounter_ids_per_gmo
+
+        # get known spawn end times of all mons at once and feed into despawn time calculation
+        calc_endminsecs: Dict[int, Optional[str]] = await self._spawnpoint_cache.get_calc_endminsecs(
+            session, [spawnid for _, _, _, spawnid, _ in mons_to_process])
+        # Keyed by encounter ID to only submit the latest state of a mon seen in several GMOs
+        mons_to_submit: Dict[int, Tuple] = {}
+        # Cache keys and despawn times per encounter ID, only marked once the mon has been submitted
+        cache_entries: Dict[int, Dict[str, int]] = {}
+        for timestamp, wild_mon, encounter_id, spawnid, cache_key in mons_to_process:
+            lat = wild_mon["latitude"]
+            lon = wild_mon["longitude"]
+            mon_id = wild_mon["pokemon_data"]["id"]
+            display = wild_mon["pokemon_data"]["display"]
+            calc_endminsec: Optional[str] = calc_endminsecs.get(spawnid, None)
+            despawn_time_unix = gen_despawn_timestamp(calc_endminsec, timestamp,
+                                                      self._args.default_unknown_timeleft)
+            despawn_time = DatetimeWrapper.fromtimestamp(despawn_time_unix)
+
+            if calc_endminsec is None:
+                logger.debug3("adding mon (#{}) at {}, {}. Despawns at {} (init) ({})", mon_id, lat, lon,
+                              despawn_time.strftime("%Y-%m-%d %H:%M:%S"), spawnid)
+            else:
+                logger.debug3("adding mon (#{}) at {}, {}. Despawns at {} (non-init) ({})", mon_id, lat, lon,
+                              despawn_time.strftime("%Y-%m-%d %H:%M:%S"), spawnid)
 
-                async with session.begin_nested() as nested_transaction:
-                    mon: Optional[Pokemon] = await PokemonHelper.get(session, encounter_id)
-                    if not mon:
-                        mon: Pokemon = Pokemon()
-                        mon.encounter_id = encounter_id
-                        mon.spawnpoint_id = spawnid
-                        mon.latitude = lat
-                        mon.longitude = lon
-                    mon.pokemon_id = mon_id
-                    if mon.seen_type not in [MonSeenTypes.encounter.name, MonSeenTypes.lure_encounter.name]:
-                        # TODO: Any other types not to overwrite?
-                        mon.seen_type = MonSeenTypes.wild.name
-                    if mon_id == 132:
-                        # handle ditto
-                        mon.pokemon_id = 132
-                        mon.gender = 3
-                        mon.costume = 0
-                        mon.form = 0
-                    else:
-                        mon.pokemon_id = mon_id
-                        mon.gender = wild_mon["pokemon_data"]["display"]["gender_value"]
-                        mon.costume = wild_mon["pokemon_data"]["display"]["costume_value"]
-                        mon.form = wild_mon["pokemon_data"]["display"]["form_value"]
+            if mon_id == 132:
+                # handle ditto
+                gender, costume, form = 3, 0, 0
+            else:
+                gender = display["gender_value"]
+                costume = display["costume_value"]
+                form = display["form_value"]
 
-                    # TODO handle weather boost condition changes for redoing IV+ditto (set ivs to null again)
-                    #  Further we should probably reset IVs if pokemon_id changes as well
+            # TODO handle weather boost condition changes for redoing IV+ditto (set ivs to null again)
+            #  Further we should probably reset IVs if pokemon_id changes as well
+            mons_to_submit[encounter_id] = (encounter_id, spawnid, mon_id, lat, lon, despawn_time, gender, costume,
+                                            form, display["weather_boosted_value"],
+                                            DatetimeWrapper.fromtimestamp(timestamp))
+            cache_entries.setdefault(encounter_id, {})[cache_key] = despawn_time_unix
+
+        now = int(DatetimeWrapper.now().timestamp())
+        for encounter_id in await self._upsert_wild_mons(session, mons_to_submit):
+            for cache_key, despawn_time_unix in cache_entries[encounter_id].items():
+                dedup.mark(cache_key, int(despawn_time_unix - now))
+        if flush_dedup:
+            await session.commit()
+            await dedup.flush()
+        return encounter_ids_per_gmo
+
+    @staticmethod
+    async def _upsert_wild_mons(session: AsyncSession, mons_to_submit: Dict[int, Tuple]) -> List[int]:
+        """
+        Submits the wild mons using a single multi-row upsert. If that fails, every mon is submitted on its own to
+        not drop all mons for a single one failing.
 
-                    mon.disappear_time = despawn_time
-                    mon.weather_boosted_condition = wild_mon["pokemon_data"]["display"]["weather_boosted_value"]
-                    mon.last_modified = now
-                    try:
-                        session.add(mon)
-                        await nested_transaction.commit()
-                        cache_time = int(despawn_time_unix - int(DatetimeWrapper.now().timestamp()))
-                        if cache_time > 0:
-                            await self._cache.set(cache_key, 1, ex=cache_time)
-                    except sqlalchemy.exc.IntegrityError as e:
-                        logger.debug("Failed committing mon {} ({}). Safe to ignore.", encounter_id, str(e))
-                        await nested_transaction.rollback()
-                        continue
-                await session.commit()
-        return encounter_ids_in_gmo
+        Returns: Encounter IDs of the mons submitted
+        """
+        async with session.begin_nested() as nested_transaction:
+            try:
+                await PokemonHelper.upsert_wild_mons(session, list(mons_to_submit.values()))
+                await nested_transaction.commit()
+                return list(mons_to_submit.keys())
+            except sqlalchemy.exc.IntegrityError as e:
+                logger.debug("Failed committing {} wild mons ({}). Safe to ignore.", len(mons_to_submit), str(e))
+                await nested_transaction.rollback()
+        if len(mons_to_submit) == 1:
+            return []
+        submitted: List[int] = []
+        for encounter_id in sorted(mons_to_submit):
+            async with session.begin_nested() as nested_transaction:
+                try:
+                    await PokemonHelper.upsert_wild_mons(session, [mons_to_submit[encounter_id]])
+                    await nested_transaction.commit()
+                    submitted.append(encounter_id)
+                except sqlalchemy.exc.IntegrityError as e:
+                    logger.debug("Failed committing wild mon {} ({}). Safe to ignore.", encounter_id, str(e))
+                    await nested_transaction.rollback()
+        return submitted
 
     async def mons_nearby(self, session: AsyncSession, timestamp: float,
-                          map_proto: dict) -> Tuple[List[int], List[int]]:
+                          map_proto: dict, dedup: Optional[ProtoCacheDedup] = None) -> Tuple[List[int], List[int]]:
         """
         Insert nearby mons
         """
@@ -162,6 +337,8 @@ class DbPogoProtoSubmit:
         cells = map_proto.get("cells", [])
         if not cells:
             return cell_encounters, stop_encounters
+        flush_dedup: bool = dedup is None
+        dedup = await self._get_dedup(dedup, self._nearby_mon_cache_keys(cells))
 
         for cell in cells:
             cell_id = cell.get("id")
@@ -177,8 +354,8 @@ class DbPogoProtoSubmit:
                 cache_key = "monnear{}-{}".format(encounter_id, mon_id)
                 encounter_key = "moniv{}-{}-{}".format(encounter_id, weather_boosted, mon_id)
                 wild_key = "mon{}-{}".format(encounter_id, mon_id)
-                if (await self._cache.exists(wild_key) or await self._cache.exists(encounter_key)
-                        or await self._cache.exists(cache_key)):
+                if (await dedup.exists(wild_key) or await dedup.exists(encounter_key)
+                        or await dedup.exists(cache_key)):
                     continue
                 stop_id = nearby_mon["fort_id"]
                 form = display["form_value"]
@@ -239,11 +416,13 @@ class DbPogoProtoSubmit:
                         mon.last_modified = now
                         session.add(mon)
                         await nested_transaction.commit()
-                        await self._cache.set(cache_key, 1, ex=self._args.default_nearby_timeleft * 60)
+                        dedup.mark(cache_key, self._args.default_nearby_timeleft * 60)
                 except sqlalchemy.exc.IntegrityError as e:
                     logger.debug("Failed committing nearby mon {} ({}). Safe to ignore.", encounter_id, str(e))
                     # await nested_transaction.rollback()
                     continue
+        if flush_dedup:
+            await dedup.flush()
         return cell_encounters, stop_encounters
 
     async def mon_iv(self, session: AsyncSession, timestamp: float,
@@ -270,8 +449,8 @@ class DbPogoProtoSubmit:
         logger.debug3("Updating IV sent for encounter at {}", timestamp)
 
         spawnid = int(str(wild_pokemon["spawnpoint_id"]), 16)
-        spawnpoint: Optional[TrsSpawn] = await TrsSpawnHelper.get(session, spawnid)
-        despawn_time_unix = gen_despawn_timestamp(spawnpoint.calc_endminsec if spawnpoint else None, timestamp,
+        calc_endminsec: Optional[str] = await self._spawnpoint_cache.get_calc_endminsec(session, spawnid)
+        despawn_time_unix = gen_despawn_timestamp(calc_endminsec, timestamp,
                                                   self._args.default_unknown_timeleft)
         despawn_time = DatetimeWrapper.fromtimestamp(despawn_time_unix)
 
@@ -279,7 +458,7 @@ class DbPogoProtoSubmit:
         longitude = wild_pokemon.get("longitude")
         shiny = wild_pokemon["pokemon_data"]["display"].get("is_shiny", 0)
         is_shiny: bool = True if shiny == 1 else False
-        if spawnpoint is None:
+        if calc_endminsec is None:
             logger.debug3("updating IV mon #{} at {}, {}. Despawning at {} (init)", pokemon_data["id"], latitude,
                           longitude, despawn_time)
         else:
@@ -425,7 +604,8 @@ class DbPogoProtoSubmit:
             logger.debug("Done updating mon lure IV in DB in {} seconds", time_done)
         return encounter_id, now
 
-    async def mon_lure_noiv(self, session: AsyncSession, timestamp: float, gmo: dict) -> List[int]:
+    async def mon_lure_noiv(self, session: AsyncSession, timestamp: float, gmo: dict,
+                            dedup: Optional[ProtoCacheDedup] = None) -> List[int]:
         """
         Update/Insert Lure mons from a map_proto dict
         """
@@ -434,6 +614,8 @@ class DbPogoProtoSubmit:
         encounter_ids: List[int] = []
         if cells is None:
             return encounter_ids
+        flush_dedup: bool = dedup is None
+        dedup = await self._get_dedup(dedup, self._lure_mon_cache_keys(cells))
 
         for cell in cells:
             for fort in cell["forts"]:
@@ -446,7 +628,7 @@ class DbPogoProtoSubmit:
                         encounter_id = encounter_id + 2 ** 64
                     encounter_ids.append(encounter_id)
                     cache_key = "monlurenoiv{}".format(encounter_id)
-                    if await self._cache.exists(cache_key):
+                    if await dedup.exists(cache_key):
                         continue
 
                     lat = fort["latitude"]
@@ -484,11 +666,13 @@ class DbPogoProtoSubmit:
                             logger.debug("Submitting lured non-IV mon {}", encounter_id)
                             session.add(mon)
                             await nested_transaction.commit()
-                            await self._cache.set(cache_key, 1, ex=REDIS_CACHETIME_MON_LURE_IV)
+                            dedup.mark(cache_key, REDIS_CACHETIME_MON_LURE_IV)
                         except sqlalchemy.exc.IntegrityError as e:
                             logger.debug("Failed committing lured non-IV mon {} ({}). Safe to ignore.", encounter_id,
                                          str(e))
                             await nested_transaction.rollback()
+        if flush_dedup:
+            await dedup.flush()
         return encounter_ids
 
     async def update_seen_type_stats(self, session: AsyncSession, **kwargs):
@@ -537,11 +721,18 @@ class DbPogoProtoSubmit:
                     await nested_transaction.rollback()
                     logger.debug("Failed submitting stat...")
 
-    async def spawnpoints(self, session: AsyncSession, map_proto: dict, received_timestamp: int):
+    async def spawnpoints(self, session: AsyncSession, map_proto: dict,
+                          received_timestamp: int) -> Dict[int, Optional[str]]:
+        """
+        Update/Insert the spawnpoints of the wild mons of a map_proto dict
+
+        Returns: The despawn times (calc_endminsec) written by spawnpoint ID, to be passed to
+         update_spawnpoint_cache once committed
+        """
         logger.debug3("DbPogoProtoSubmit::spawnpoints called with data received")
         cells = map_proto.get("cells", None)
         if cells is None:
-            return False
+            return {}
         spawn_ids: List[int] = []
         for cell in cells:
             for wild_mon in cell["wild_pokemon"]:
@@ -549,6 +740,7 @@ class DbPogoProtoSubmit:
 
         spawndef: Dict[int, TrsSpawn] = await self._get_spawndef(session, spawn_ids)
         current_event: Optional[TrsEvent] = await TrsEventHelper.get_current_event(session, True)
+        self._spawnpoint_cache.check_event(current_event)
         spawns_do_add: List[TrsSpawn] = []
         received_time: datetime = DatetimeWrapper.fromtimestamp(received_timestamp)
         for cell in cells:
@@ -607,8 +799,17 @@ class DbPogoProtoSubmit:
                     spawn.last_non_scanned = DatetimeWrapper.now()
                 spawns_do_add.append(spawn)
         session.add_all(spawns_do_add)
+        # Read before committing as the spawns are expired on commit
+        return {int(spawn.spawnpoint): spawn.calc_endminsec for spawn in spawns_do_add}
+
+    def update_spawnpoint_cache(self, calc_endminsecs: Dict[int, Optional[str]]) -> None:
+        """
+        Sets the despawn times returned by spawnpoints once they have been committed. Despawn times of spawnpoints
+         rolled back are never used to calculate the despawn time of mons.
+        """
+        self._spawnpoint_cache.update(calc_endminsecs)
 
-    async def stops(self, session: AsyncSession, map_proto: dict):
+    async def stops(self, session: AsyncSession, map_proto: dict, dedup: Optional[ProtoCacheDedup] = None):
         """
         Update/Insert pokestops from a map_proto dict
         """
@@ -616,16 +817,21 @@ class DbPogoProtoSubmit:
         cells = map_proto.get("cells", None)
         if cells is None:
             return False
+        flush_dedup: bool = dedup is None
+        dedup = await self._get_dedup(dedup, itertools.chain(self._cell_cache_keys(cells),
+                                                             self._stop_cache_keys(cells)))
 
         for cell in cells:
             cell_id = cell["id"]
             cell_cache_key: str = f"stops_{cell_id}"
-            if await self._cache.exists(cell_cache_key):
+            if await dedup.exists(cell_cache_key):
                 continue
             for fort in cell["forts"]:
                 if fort["type"] == 1:
-                    await self._handle_pokestop_data(session, fort)
-            await self._cache.set(cell_cache_key, 1, ex=REDIS_CACHETIME_CELLS)
+                    await self._handle_pokestop_data(session, fort, dedup)
+            dedup.mark(cell_cache_key, REDIS_CACHETIME_CELLS)
+        if flush_dedup:
+            await dedup.flush()
         return True
 
     async def stop_details(self, session: AsyncSession, stop_proto: dict):
@@ -746,7 +952,8 @@ class DbPogoProtoSubmit:
                 await nested_transaction.rollback()
         return True
 
-    async def gyms(self, session: AsyncSession, map_proto: dict, received_timestamp: int):
+    async def gyms(self, session: AsyncSession, map_proto: dict, received_timestamp: int,
+                   dedup: Optional[ProtoCacheDedup] = None):
         """
         Update/Insert gyms from a map_proto dict
         """
@@ -754,73 +961,91 @@ class DbPogoProtoSubmit:
         cells = map_proto.get("cells", None)
         if cells is None:
             return False
+        flush_dedup: bool = dedup is None
+        dedup = await self._get_dedup(dedup, self._cell_cache_keys(cells))
         time_receiver: datetime = DatetimeWrapper.fromtimestamp(received_timestamp)
+        # The cache keys of gyms depend on the weather of the (level 10) cell they are located in, collect the
+        #  cells first to get the weather of all of them at once
+        cells_of_gyms: List[Tuple[str, List[Tuple[Dict, int]]]] = []
         for cell in cells:
             cell_id = cell["id"]
             cell_cache_key: str = f"gyms_{cell_id}"
-            if await self._cache.exists(cell_cache_key):
+            if await dedup.exists(cell_cache_key):
                 continue
-            for gym in cell["forts"]:
-                if gym["type"] == 0:
-                    gymid = gym["id"]
-                    last_modified_ts = gym["last_modified_timestamp_ms"] / 1000
-                    last_modified = DatetimeWrapper.fromtimestamp(
-                        last_modified_ts)
-                    latitude = gym["latitude"]
-                    longitude = gym["longitude"]
-                    s2_cell_id = S2Helper.lat_lng_to_cell_id(latitude, longitude)
-                    weather: Optional[Weather] = await WeatherHelper.get(session, str(s2_cell_id))
-                    gameplay_weather: int = weather.gameplay_weather if weather is not None else 0
-                    cache_key = "gym{}{}{}".format(gymid, last_modified_ts, gameplay_weather)
-                    if await self._cache.exists(cache_key):
-                        continue
-                    guard_pokemon_id = gym["gym_details"]["guard_pokemon"]
-                    team_id = gym["gym_details"]["owned_by_team"]
-                    slots_available = gym["gym_details"]["slots_available"]
-                    is_ex_raid_eligible = gym["gym_details"]["is_ex_raid_eligible"]
-                    is_ar_scan_eligible = gym["is_ar_scan_eligible"]
-                    is_in_battle = gym['gym_details']['is_in_battle']
-                    is_enabled = gym.get('enabled', 1)
-
-                    gym_obj: Optional[Gym] = await GymHelper.get(session, gymid)
-                    if not gym_obj:
-                        gym_obj: Gym = Gym()
-                        gym_obj.gym_id = gymid
-                    gym_obj.team_id = team_id
-                    gym_obj.guard_pokemon_id = guard_pokemon_id
-                    gym_obj.slots_available = slots_available
-                    gym_obj.enabled = is_enabled
-                    gym_obj.latitude = latitude
-                    gym_obj.longitude = longitude
-                    gym_obj.total_cp = gym.get("gym_display", {}).get("total_gym_cp", 0)
-                    gym_obj.is_in_battle = is_in_battle
-                    gym_obj.last_modified = last_modified
-                    gym_obj.last_scanned = time_receiver
-                    gym_obj.is_ex_raid_eligible = is_ex_raid_eligible
-                    gym_obj.is_ar_scan_eligible = is_ar_scan_eligible
-                    gym_obj.weather_boosted_condition = gameplay_weather
-
-                    gym_detail: Optional[GymDetail] = await GymDetailHelper.get(session, gymid)
-                    if not gym_detail:
-                        gym_detail: GymDetail = GymDetail()
-                        gym_detail.gym_id = gymid
-                        gym_detail.name = "unknown"
-                        gym_detail.url = ""
-                    gym_url = gym.get("image_url", "")
-                    if gym_url and gym_url.strip():
-                        gym_detail.url = gym_url.strip()
-                    gym_detail.last_scanned = time_receiver
-                    async with session.begin_nested() as nested_transaction:
-                        try:
-                            session.add(gym_obj)
-                            session.add(gym_detail)
-                            await nested_transaction.commit()
-                            await self._cache.set(cache_key, 1, ex=REDIS_CACHETIME_GYMS)
-                        except sqlalchemy.exc.IntegrityError as e:
-                            logger.warning("Failed committing gym data of {} ({})", gymid, str(e))
-                            await nested_transaction.rollback()
+            cells_of_gyms.append((cell_cache_key, [(gym, S2Helper.lat_lng_to_cell_id(gym["latitude"], gym["longitude"]))
+                                                   for gym in cell["forts"] if gym["type"] == 0]))
+        gameplay_weathers: Dict[int, int] = await self._weather_cache.get_gameplay_weathers(
+            session, [s2_cell_id for _, gyms_in_cell in cells_of_gyms for _, s2_cell_id in gyms_in_cell])
+        gyms_of_cells: List[Tuple[str, List[Tuple[Dict, int, str]]]] = []
+        for cell_cache_key, gyms_in_cell in cells_of_gyms:
+            gyms_with_weather: List[Tuple[Dict, int, str]] = []
+            for gym, s2_cell_id in gyms_in_cell:
+                gameplay_weather: int = gameplay_weathers.get(s2_cell_id, 0)
+                cache_key = "gym{}{}{}".format(gym["id"], gym["last_modified_timestamp_ms"] / 1000,
+                                               gameplay_weather)
+                gyms_with_weather.append((gym, gameplay_weather, cache_key))
+            gyms_of_cells.append((cell_cache_key, gyms_with_weather))
+        await dedup.prefetch(cache_key for _, gyms_in_cell in gyms_of_cells for _, _, cache_key in gyms_in_cell)
+
+        for cell_cache_key, gyms_in_cell in gyms_of_cells:
+            for gym, gameplay_weather, cache_key in gyms_in_cell:
+                if await dedup.exists(cache_key):
+                    continue
+                gymid = gym["id"]
+                last_modified_ts = gym["last_modified_timestamp_ms"] / 1000
+                last_modified = DatetimeWrapper.fromtimestamp(
+                    last_modified_ts)
+                latitude = gym["latitude"]
+                longitude = gym["longitude"]
+                guard_pokemon_id = gym["gym_details"]["guard_pokemon"]
+                team_id = gym["gym_details"]["owned_by_team"]
+                slots_available = gym["gym_details"]["slots_available"]
+                is_ex_raid_eligible = gym["gym_details"]["is_ex_raid_eligible"]
+                is_ar_scan_eligible = gym["is_ar_scan_eligible"]
+                is_in_battle = gym['gym_details']['is_in_battle']
+                is_enabled = gym.get('enabled', 1)
+
+                gym_obj: Optional[Gym] = await GymHelper.get(session, gymid)
+                if not gym_obj:
+                    gym_obj: Gym = Gym()
+                    gym_obj.gym_id = gymid
+                gym_obj.team_id = team_id
+                gym_obj.guard_pokemon_id = guard_pokemon_id
+                gym_obj.slots_available = slots_available
+                gym_obj.enabled = is_enabled
+                gym_obj.latitude = latitude
+                gym_obj.longitude = longitude
+                gym_obj.total_cp = gym.get("gym_display", {}).get("total_gym_cp", 0)
+                gym_obj.is_in_battle = is_in_battle
+                gym_obj.last_modified = last_modified
+                gym_obj.last_scanned = time_receiver
+                gym_obj.is_ex_raid_eligible = is_ex_raid_eligible
+                gym_obj.is_ar_scan_eligible = is_ar_scan_eligible
+                gym_obj.weather_boosted_condition = gameplay_weather
+
+                gym_detail: Optional[GymDetail] = await GymDetailHelper.get(session, gymid)
+                if not gym_detail:
+                    gym_detail: GymDetail = GymDetail()
+                    gym_detail.gym_id = gymid
+                    gym_detail.name = "unknown"
+                    gym_detail.url = ""
+                gym_url = gym.get("image_url", "")
+                if gym_url and gym_url.strip():
+                    gym_detail.url = gym_url.strip()
+                gym_detail.last_scanned = time_receiver
+                async with session.begin_nested() as nested_transaction:
+                    try:
+                        session.add(gym_obj)
+                        session.add(gym_detail)
+                        await nested_transaction.commit()
+                        dedup.mark(cache_key, REDIS_CACHETIME_GYMS)
+                    except sqlalchemy.exc.IntegrityError as e:
+                        logger.warning("Failed committing gym data of {} ({})", gymid, str(e))
+                        await nested_transaction.rollback()
             # done processing cell
-            await self._cache.set(cell_cache_key, 1, ex=REDIS_CACHETIME_CELLS)
+            dedup.mark(cell_cache_key, REDIS_CACHETIME_CELLS)
+        if flush_dedup:
+            await dedup.flush()
         return True
 
     async def gym(self, session: AsyncSession, map_proto: dict):
@@ -864,7 +1089,8 @@ class DbPogoProtoSubmit:
                     await nested_transaction.rollback()
         return True
 
-    async def raids(self, session: AsyncSession, map_proto: dict, timestamp: int) -> int:
+    async def raids(self, session: AsyncSession, map_proto: dict, timestamp: int,
+                    dedup: Optional[ProtoCacheDedup] = None) -> int:
         """
         Update/Insert raids from a map_proto dict
 
@@ -874,6 +1100,8 @@ class DbPogoProtoSubmit:
         cells = map_proto.get("cells", None)
         if cells is None:
             return False
+        flush_dedup: bool = dedup is None
+        dedup = await self._get_dedup(dedup, self._raid_cache_keys(cells))
         raids_seen: int = 0
         received_at: datetime = DatetimeWrapper.fromtimestamp(timestamp)
         for cell in cells:
@@ -919,7 +1147,7 @@ class DbPogoProtoSubmit:
                                   raidend_date.strftime("%Y-%m-%d %H:%M:%S"))
 
                     cache_key = "raid{}{}{}".format(gymid, pokemon_id, raid_end_sec)
-                    if await self._cache.exists(cache_key):
+                    if await dedup.exists(cache_key):
                         continue
 
                     raid: Optional[Raid] = await RaidHelper.get(session, gymid)
@@ -946,10 +1174,12 @@ class DbPogoProtoSubmit:
                         try:
                             session.add(raid)
                             await nested_transaction.commit()
-                            await self._cache.set(cache_key, 1, ex=REDIS_CACHETIME_RAIDS)
+                            dedup.mark(cache_key, REDIS_CACHETIME_RAIDS)
                         except sqlalchemy.exc.IntegrityError as e:
                             logger.warning("Failed committing raid for gym {} ({})", gymid, str(e))
                             await nested_transaction.rollback()
+        if flush_dedup:
+            await dedup.flush()
         logger.debug3("DbPogoProtoSubmit::raids: Done submitting raids with data received")
         return raids_seen
 
@@ -1044,7 +1274,8 @@ class DbPogoProtoSubmit:
                 logger.warning("Failed committing route {} of cell {} ({})", route_id, s2_cell_id, str(e))
                 await nested_transaction.rollback()
 
-    async def weather(self, session: AsyncSession, map_proto, received_timestamp) -> bool:
+    async def weather(self, session: AsyncSession, map_proto, received_timestamp,
+                      dedup: Optional[ProtoCacheDedup] = None) -> bool:
         """
         Update/Insert weather from a map_proto dict
         """
@@ -1052,14 +1283,20 @@ class DbPogoProtoSubmit:
         cells = map_proto.get("cells", None)
         if cells is None:
             return False
+        flush_dedup: bool = dedup is None
+        dedup = await self._get_dedup(dedup, self._weather_cache_keys(map_proto))
 
         for client_weather in map_proto["client_weather"]:
             time_of_day = map_proto.get("time_of_day_value", 0)
-            await self._handle_weather_data(session, client_weather, time_of_day, received_timestamp)
+            await self._handle_weather_data(session, client_weather, time_of_day, received_timestamp, dedup)
+        if flush_dedup:
+            await dedup.flush()
         return True
 
-    async def cells(self, session: AsyncSession, map_proto: dict):
+    async def cells(self, session: AsyncSession, map_proto: dict, dedup: Optional[ProtoCacheDedup] = None):
         protocells = map_proto.get("cells", [])
+        flush_dedup: bool = dedup is None
+        dedup = await self._get_dedup(dedup, self._cell_cache_keys(protocells))
 
         for cell in protocells:
             cell_id = cell["id"]
@@ -1067,15 +1304,17 @@ class DbPogoProtoSubmit:
             if cell_id < 0:
                 cell_id = cell_id + 2 ** 64
             cell_cache_key = "s2cell{}".format(cell_id)
-            if await self._cache.exists(cell_cache_key):
+            if await dedup.exists(cell_cache_key):
                 continue
-            await self._cache.set(cell_cache_key, 1, ex=REDIS_CACHETIME_CELLS)
+            dedup.mark(cell_cache_key, REDIS_CACHETIME_CELLS)
             logger.debug3("Updating s2cell {}", cell_id)
             try:
                 await TrsS2CellHelper.insert_update_cell(session, cell)
             except sqlalchemy.exc.IntegrityError as e:
                 logger.debug("Failed committing cell {} ({})", cell_id, str(e))
-                await self._cache.set(cell_cache_key, 1, ex=1)
+                dedup.mark(cell_cache_key, 1)
+        if flush_dedup:
+            await dedup.flush()
 
     async def _handle_single_incident(self, session: AsyncSession,
                                       stop_id: str,
@@ -1132,7 +1371,7 @@ class DbPogoProtoSubmit:
                 await self._handle_single_incident(session, stop_id, incident)
 
     async def _handle_pokestop_data(self, session: AsyncSession,
-                                    stop_data: Dict) -> Optional[Pokestop]:
+                                    stop_data: Dict, dedup: ProtoCacheDedup) -> Optional[Pokestop]:
         if stop_data["type"] != 1:
             logger.info("{} is not a pokestop", stop_data)
             return
@@ -1143,7 +1382,7 @@ class DbPogoProtoSubmit:
         if not last_modified_timestamp:
             last_modified_timestamp = int(math.ceil(DatetimeWrapper.now().timestamp() / 1000)) * 1000
         cache_key = "stop{}{}".format(stop_id, last_modified_timestamp)
-        if await self._cache.exists(cache_key):
+        if await dedup.exists(cache_key):
             return
 
         now = DatetimeWrapper.fromtimestamp(time.time())
@@ -1184,10 +1423,10 @@ class DbPogoProtoSubmit:
             try:
                 session.add(pokestop)
                 await nested_transaction.commit()
-                await self._cache.set(cache_key, 1, ex=REDIS_CACHETIME_POKESTOP_DATA)
+                dedup.mark(cache_key, REDIS_CACHETIME_POKESTOP_DATA)
             except sqlalchemy.exc.IntegrityError as e:
                 logger.warning("Failed committing stop {} ({})", stop_id, str(e))
-                await session.rollback()
+                await nested_transaction.rollback()
         await self._handle_pokestop_incident_data(session, stop_id, stop_data)
 
     async def _extract_args_single_stop_details(self, session: AsyncSession, stop_data) -> Optional[Pokestop]:
@@ -1215,7 +1454,7 @@ class DbPogoProtoSubmit:
         return pokestop
 
     async def _handle_weather_data(self, session: AsyncSession, client_weather_data, time_of_day,
-                                   received_timestamp) -> None:
+                                   received_timestamp, dedup: ProtoCacheDedup) -> None:
         cell_id = client_weather_data["cell_id"]
         real_lat, real_lng = S2Helper.middle_of_cell(cell_id)
 
@@ -1224,13 +1463,8 @@ class DbPogoProtoSubmit:
             return
         else:
             gameplay_weather = client_weather_data["gameplay_weather"]["gameplay_condition"]
-        cache_key = "weather{}{}{}{}{}{}{}".format(cell_id, display_weather_data.get("rain_level", 0),
-                                                   display_weather_data.get("wind_level", 0),
-                                                   display_weather_data.get("snow_level", 0),
-                                                   display_weather_data.get("fog_level", 0),
-                                                   display_weather_data.get("wind_direction", 0),
-                                                   gameplay_weather)
-        if await self._cache.exists(cache_key):
+        cache_key = self._weather_cache_key(client_weather_data)
+        if await dedup.exists(cache_key):
             return
         date_received = DatetimeWrapper.fromtimestamp(received_timestamp)
         async with session.begin_nested() as nested_transaction:
@@ -1258,8 +1492,9 @@ class DbPogoProtoSubmit:
                     return
 
                 session.add(weather)
-                await self._cache.set(cache_key, 1, ex=REDIS_CACHETIME_WEATHER)
                 await nested_transaction.commit()
+                dedup.mark(cache_key, REDIS_CACHETIME_WEATHER)
+                self._weather_cache.update(cell_id, gameplay_weather)
             except sqlalchemy.exc.IntegrityError as e:
                 logger.warning("Failed committing weather of cell {} ({})", cell_id, str(e))
                 await nested_transaction.rollback()
@@ -0,0 +1,75 @@
+from typing import Dict, Iterable, List, Optional
+
+from redis.asyncio import Redis
+
+from mapadroid.utils.logging import LoggerEnums, get_logger
+
+logger = get_logger(LoggerEnums.database)
+
+
+class ProtoCacheDedup:
+    """
+    Batches the lookups and writes of the redis keys used to skip data that has already been submitted to the DB.
+    All keys a proto needs are checked with a single MGET (prefetch) and all markers set while processing are written
+    in a single pipeline (flush) rather than doing a roundtrip for every single key.
+    """
+
+    def __init__(self, cache: Redis):
+        self._cache: Redis = cache
+        self._known: Dict[str, bool] = {}
+        # Markers to be written on flush mapped to their TTL in seconds
+        self._pending: Dict[str, int] = {}
+
+    def scope(self) -> "ProtoCacheDedup":
+        """
+        Returns a dedup sharing the keys checked with this one but queueing its own markers. Used by parts of a proto
+        committed separately to write their markers as soon as they have been committed.
+        """
+        scoped: ProtoCacheDedup = ProtoCacheDedup(self._cache)
+        scoped._known = self._known
+        return scoped
+
+    async def prefetch(self, keys: Iterable[str]) -> None:
+        """
+        Checks all keys not known yet with a single MGET
+        """
+        keys_to_check: List[str] = list(dict.fromkeys(key for key in keys if key not in self._known))
+        if not keys_to_check:
+            return
+        values: List[Optional[bytes]] = await self._cache.mget(keys_to_check)
+        for key, value in zip(keys_to_check, values):
+            self._known[key] = value is not None
+        logger.debug3("Prefetched {} cache keys", len(keys_to_check))
+
+    async def exists(self, key: str) -> bool:
+        """
+        Returns whether the key is present in the cache or has been marked to be set. Keys that have not been
+        prefetched are looked up individually.
+        """
+        if key in self._pending:
+            return True
+        if key not in self._known:
+            self._known[key] = await self._cache.exists(key) > 0
+        return self._known[key]
+
+    def mark(self, key: str, ttl: int) -> None:
+        """
+        Queues the key to be written with the given TTL (seconds) on the next flush
+        """
+        if ttl <= 0:
+            return
+        self._pending[key] = ttl
+
+    async def flush(self) -> None:
+        """
+        Writes all markers queued using a single pipeline
+        """
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        async with self._cache.pipeline(transaction=False) as pipe:
+            for key, ttl in pending.items():
+                pipe.set(key, 1, ex=ttl)
+            await pipe.execute()
+        for key in pending:
+            self._known[key] = True
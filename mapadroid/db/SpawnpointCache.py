@@ -0,0 +1,73 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cachetools import TTLCache
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mapadroid.db.helper.TrsSpawnHelper import TrsSpawnHelper
+from mapadroid.db.model import TrsEvent, TrsSpawn
+from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import (SPAWNPOINT_CACHE_SIZE,
+                                          SPAWNPOINT_CACHE_TIME)
+
+logger = get_logger(LoggerEnums.database)
+
+
+class SpawnpointCache:
+    """
+    Bounded (LRU) in-memory index of the despawn times known (calc_endminsec) by spawnpoint ID used to calculate the
+     despawn time of mons without querying the DB. Entries expire after SPAWNPOINT_CACHE_TIME in order to pick up
+     changes made by other processes. Spawnpoints not known to the DB are cached as well (None) as they are written by
+     spawnpoints() along with the mons anyway.
+     The cache is cleared once the current event changes as spawnpoints are converted or deleted along with events.
+    """
+    _MISSING = object()
+
+    def __init__(self, maxsize: int = SPAWNPOINT_CACHE_SIZE, ttl: int = SPAWNPOINT_CACHE_TIME):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._event = self._MISSING
+
+    async def get_calc_endminsecs(self, session: AsyncSession, spawn_ids: Iterable[int]) -> Dict[int, Optional[str]]:
+        """
+        Returns: calc_endminsec of the spawnpoints by ID, None for spawnpoints without a known despawn time. Only
+        spawnpoints not cached yet are fetched from the DB (in a single query).
+        """
+        calc_endminsecs: Dict[int, Optional[str]] = {}
+        missing: List[int] = []
+        for spawn_id in set(spawn_ids):
+            calc_endminsec = self._cache.get(spawn_id, self._MISSING)
+            if calc_endminsec is self._MISSING:
+                missing.append(spawn_id)
+            else:
+                calc_endminsecs[spawn_id] = calc_endminsec
+        if not missing:
+            return calc_endminsecs
+        logger.debug3("Fetching {} spawnpoints not cached", len(missing))
+        spawns: List[TrsSpawn] = await TrsSpawnHelper.get_all(session, missing)
+        fetched: Dict[int, Optional[str]] = {int(spawn.spawnpoint): spawn.calc_endminsec for spawn in spawns}
+        for spawn_id in missing:
+            calc_endminsec = fetched.get(spawn_id, None)
+            self._cache[spawn_id] = calc_endminsec
+            calc_endminsecs[spawn_id] = calc_endminsec
+        return calc_endminsecs
+
+    async def get_calc_endminsec(self, session: AsyncSession, spawn_id: int) -> Optional[str]:
+        return (await self.get_calc_endminsecs(session, [spawn_id])).get(spawn_id, None)
+
+    def update(self, calc_endminsecs: Dict[int, Optional[str]]) -> None:
+        """
+        Sets the despawn times of the spawnpoints written once they have been committed
+        """
+        for spawn_id, calc_endminsec in calc_endminsecs.items():
+            self._cache[spawn_id] = calc_endminsec
+
+    def check_event(self, current_event: Optional[TrsEvent]) -> None:
+        """
+        Clears the cache if the current event changed since the last check
+        """
+        event: Optional[Tuple] = None
+        if current_event is not None:
+            event = (current_event.id, current_event.event_start, current_event.event_end)
+        if self._event is not self._MISSING and event != self._event:
+            logger.info("Current event changed, clearing {} cached spawnpoints", len(self._cache))
+            self._cache.clear()
+        self._event = event
@@ -0,0 +1,55 @@
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cachetools import TTLCache
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mapadroid.db.helper.WeatherHelper import WeatherHelper
+from mapadroid.db.model import Weather
+from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import WEATHER_CACHE_SIZE, WEATHER_CACHE_TIME
+
+logger = get_logger(LoggerEnums.database)
+
+
+class WeatherCache:
+    """
+    In-memory state of the gameplay weather by (level 10) S2 cell ID. Updated with the weather written and read when
+     processing gyms rather than querying the weather of every gym. Cells without weather known are cached as 0.
+     Entries expire after WEATHER_CACHE_TIME in order to pick up weather written by other processes and at the top of
+     the hour at which the weather changes.
+    """
+
+    def __init__(self, maxsize: int = WEATHER_CACHE_SIZE, ttl: int = WEATHER_CACHE_TIME):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get_gameplay_weathers(self, session: AsyncSession, cell_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        Returns: Gameplay weather by cell ID. Cells not cached are fetched from the DB in a single query.
+        """
+        gameplay_weathers: Dict[int, int] = {}
+        missing: List[int] = []
+        hour: int = self.__get_hour()
+        for cell_id in set(cell_ids):
+            entry: Optional[Tuple[int, int]] = self._cache.get(cell_id, None)
+            if entry is None or entry[1] != hour:
+                missing.append(cell_id)
+            else:
+                gameplay_weathers[cell_id] = entry[0]
+        if not missing:
+            return gameplay_weathers
+        logger.debug3("Fetching weather of {} cells not cached", len(missing))
+        weathers: List[Weather] = await WeatherHelper.get_by_cell_ids(session, [str(cell_id) for cell_id in missing])
+        fetched: Dict[int, int] = {int(weather.s2_cell_id): weather.gameplay_weather for weather in weathers}
+        for cell_id in missing:
+            gameplay_weather: int = fetched.get(cell_id, None) or 0
+            self._cache[cell_id] = (gameplay_weather, hour)
+            gameplay_weathers[cell_id] = gameplay_weather
+        return gameplay_weathers
+
+    def update(self, cell_id: int, gameplay_weather: int) -> None:
+        self._cache[int(cell_id)] = (gameplay_weather or 0, self.__get_hour())
+
+    @staticmethod
+    def __get_hour() -> int:
+        return int(time.time() // 3600)
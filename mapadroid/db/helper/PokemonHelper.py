@@ -3,7 +3,8 @@ import time
 from functools import reduce
 from typing import Dict, List, Optional, Set, Tuple
 
-from sqlalchemy import and_, delete, desc, func
+from sqlalchemy import and_, case, delete, desc, func
+from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -17,6 +18,11 @@ from mapadroid.utils.madGlobals import MonSeenTypes
 
 logger = get_logger(LoggerEnums.database)
 
+# Order of the values in the tuples passed to PokemonHelper.upsert_wild_mons
+WILD_MON_COLUMNS: Tuple[str, ...] = ("encounter_id", "spawnpoint_id", "pokemon_id", "latitude", "longitude",
+                                     "disappear_time", "gender", "costume", "form", "weather_boosted_condition",
+                                     "last_modified")
+
 
 # noinspection PyComparisonWithNone
 class PokemonHelper:
@@ -26,6 +32,39 @@ class PokemonHelper:
         result = await session.execute(stmt)
         return result.scalars().first()
 
+    @staticmethod
+    async def upsert_wild_mons(session: AsyncSession, mons: List[Tuple]) -> None:
+        """
+        Inserts or updates all wild mons passed using a single multi-row INSERT ... ON DUPLICATE KEY UPDATE.
+        Location and spawnpoint of known mons are kept, IV related columns are never touched and the seen_type of
+        mons that have already been encountered is retained. Rows are locked in the order of their encounter IDs to
+        avoid deadlocks between concurrent upserts.
+        Args:
+            session:
+            mons: Tuples with values in the order of WILD_MON_COLUMNS
+
+        """
+        if not mons:
+            return
+        values: List[Dict] = sorted((dict(zip(WILD_MON_COLUMNS, mon)) for mon in mons),
+                                    key=lambda value: value["encounter_id"])
+        for value in values:
+            value["seen_type"] = MonSeenTypes.wild.name
+        insert_stmt = insert(Pokemon).values(values)
+        on_duplicate_key_stmt = insert_stmt.on_duplicate_key_update(
+            pokemon_id=insert_stmt.inserted.pokemon_id,
+            gender=insert_stmt.inserted.gender,
+            costume=insert_stmt.inserted.costume,
+            form=insert_stmt.inserted.form,
+            disappear_time=insert_stmt.inserted.disappear_time,
+            weather_boosted_condition=insert_stmt.inserted.weather_boosted_condition,
+            last_modified=insert_stmt.inserted.last_modified,
+            seen_type=case((Pokemon.seen_type.in_([MonSeenTypes.encounter.name,
+                                                   MonSeenTypes.lure_encounter.name]), Pokemon.seen_type),
+                           else_=insert_stmt.inserted.seen_type)
+        )
+        await session.execute(on_duplicate_key_stmt)
+
     @staticmethod
     async def get_encountered(session: AsyncSession, geofence_helper: GeofenceHelper, latest: int = 0) \
             -> Tuple[int, Dict[int, int]]:
@@ -14,6 +14,12 @@ class WeatherHelper:
         result = await session.execute(stmt)
         return result.scalars().first()
 
+    @staticmethod
+    async def get_by_cell_ids(session: AsyncSession, s2_cell_ids: List[str]) -> List[Weather]:
+        stmt = select(Weather).where(Weather.s2_cell_id.in_(s2_cell_ids))
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
     @staticmethod
     async def get_changed_since(session: AsyncSession, _timestamp: int) -> List[Weather]:
         stmt = select(Weather).where(Weather.last_updated > DatetimeWrapper.fromtimestamp(_timestamp))
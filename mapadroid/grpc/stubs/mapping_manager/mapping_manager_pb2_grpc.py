@@ -2,8 +2,7 @@
 """Client and server classes corresponding to protobuf-defined services."""
 import grpc
 
-from mapadroid.grpc.compiled.mapping_manager import \
-    mapping_manager_pb2 as mapping__manager_dot_mapping__manager__pb2
+from mapadroid.grpc.compiled.mapping_manager import mapping_manager_pb2 as mapping__manager_dot_mapping__manager__pb2
 
 
 class MappingManagerStub(object):
@@ -45,6 +44,11 @@ class MappingManagerStub(object):
                 request_serializer=mapping__manager_dot_mapping__manager__pb2.IncrementLoginTrackingByOriginRequest.SerializeToString,
                 response_deserializer=mapping__manager_dot_mapping__manager__pb2.IncrementLoginTrackingByOriginResponse.FromString,
                 )
+        self.SubscribeMappingsUpdates = channel.unary_stream(
+                '/mapadroid.mapping_manager.MappingManager/SubscribeMappingsUpdates',
+                request_serializer=mapping__manager_dot_mapping__manager__pb2.SubscribeMappingsUpdatesRequest.SerializeToString,
+                response_deserializer=mapping__manager_dot_mapping__manager__pb2.MappingsUpdate.FromString,
+                )
 
 
 class MappingManagerServicer(object):
@@ -86,6 +90,13 @@ class MappingManagerServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SubscribeMappingsUpdates(self, request, context):
+        """Streams the current version of the mappings and every version the mappings are updated to afterwards
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_MappingManagerServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -119,6 +130,11 @@ def add_MappingManagerServicer_to_server(servicer, server):
                     request_deserializer=mapping__manager_dot_mapping__manager__pb2.IncrementLoginTrackingByOriginRequest.FromString,
                     response_serializer=mapping__manager_dot_mapping__manager__pb2.IncrementLoginTrackingByOriginResponse.SerializeToString,
             ),
+            'SubscribeMappingsUpdates': grpc.unary_stream_rpc_method_handler(
+                    servicer.SubscribeMappingsUpdates,
+                    request_deserializer=mapping__manager_dot_mapping__manager__pb2.SubscribeMappingsUpdatesRequest.FromString,
+                    response_serializer=mapping__manager_dot_mapping__manager__pb2.MappingsUpdate.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'mapadroid.mapping_manager.MappingManager', rpc_method_handlers)
@@ -230,3 +246,20 @@ class MappingManager(object):
             mapping__manager_dot_mapping__manager__pb2.IncrementLoginTrackingByOriginResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SubscribeMappingsUpdates(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/mapadroid.mapping_manager.MappingManager/SubscribeMappingsUpdates',
+            mapping__manager_dot_mapping__manager__pb2.SubscribeMappingsUpdatesRequest.SerializeToString,
+            mapping__manager_dot_mapping__manager__pb2.MappingsUpdate.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
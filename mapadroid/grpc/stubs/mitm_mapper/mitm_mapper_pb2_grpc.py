@@ -31,6 +31,21 @@ class MitmMapperStub(object):
                 request_serializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryRequest.SerializeToString,
                 response_deserializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryResponse.FromString,
                 )
+        self.UpdateLatestSerialized = channel.unary_unary(
+                '/mapadroid.mitm_mapper.MitmMapper/UpdateLatestSerialized',
+                request_serializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryUpdateRequest.SerializeToString,
+                response_deserializer=shared_dot_Ack__pb2.Ack.FromString,
+                )
+        self.RequestLatestSerialized = channel.unary_unary(
+                '/mapadroid.mitm_mapper.MitmMapper/RequestLatestSerialized',
+                request_serializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryRequest.SerializeToString,
+                response_deserializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryResponse.FromString,
+                )
+        self.SubscribeLatest = channel.unary_stream(
+                '/mapadroid.mitm_mapper.MitmMapper/SubscribeLatest',
+                request_serializer=mitm__mapper_dot_mitm__mapper__pb2.SubscribeLatestRequest.SerializeToString,
+                response_deserializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataNotification.FromString,
+                )
         self.SetLevel = channel.unary_unary(
                 '/mapadroid.mitm_mapper.MitmMapper/SetLevel',
                 request_serializer=mitm__mapper_dot_mitm__mapper__pb2.SetLevelRequest.SerializeToString,
@@ -99,6 +114,26 @@ class MitmMapperServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def UpdateLatestSerialized(self, request, context):
+        """Variants of UpdateLatest/RequestLatest transporting the data as serialized_data rather than a Struct/ListValue
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RequestLatestSerialized(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubscribeLatest(self, request, context):
+        """Streams the worker and key of every latest data entry stored from now on
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def SetLevel(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -171,6 +206,21 @@ def add_MitmMapperServicer_to_server(servicer, server):
                     request_deserializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryRequest.FromString,
                     response_serializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryResponse.SerializeToString,
             ),
+            'UpdateLatestSerialized': grpc.unary_unary_rpc_method_handler(
+                    servicer.UpdateLatestSerialized,
+                    request_deserializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryUpdateRequest.FromString,
+                    response_serializer=shared_dot_Ack__pb2.Ack.SerializeToString,
+            ),
+            'RequestLatestSerialized': grpc.unary_unary_rpc_method_handler(
+                    servicer.RequestLatestSerialized,
+                    request_deserializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryRequest.FromString,
+                    response_serializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryResponse.SerializeToString,
+            ),
+            'SubscribeLatest': grpc.unary_stream_rpc_method_handler(
+                    servicer.SubscribeLatest,
+                    request_deserializer=mitm__mapper_dot_mitm__mapper__pb2.SubscribeLatestRequest.FromString,
+                    response_serializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataNotification.SerializeToString,
+            ),
             'SetLevel': grpc.unary_unary_rpc_method_handler(
                     servicer.SetLevel,
                     request_deserializer=mitm__mapper_dot_mitm__mapper__pb2.SetLevelRequest.FromString,
@@ -277,6 +327,57 @@ class MitmMapper(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def UpdateLatestSerialized(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/mapadroid.mitm_mapper.MitmMapper/UpdateLatestSerialized',
+            mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryUpdateRequest.SerializeToString,
+            shared_dot_Ack__pb2.Ack.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def RequestLatestSerialized(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/mapadroid.mitm_mapper.MitmMapper/RequestLatestSerialized',
+            mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryRequest.SerializeToString,
+            mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SubscribeLatest(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/mapadroid.mitm_mapper.MitmMapper/SubscribeLatest',
+            mitm__mapper_dot_mitm__mapper__pb2.SubscribeLatestRequest.SerializeToString,
+            mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataNotification.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def SetLevel(request,
             target,
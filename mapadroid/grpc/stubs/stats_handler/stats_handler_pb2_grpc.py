@@ -20,6 +20,11 @@ class StatsHandlerStub(object):
                 request_serializer=stats__handler_dot_stats__handler__pb2.Stats.SerializeToString,
                 response_deserializer=shared_dot_Ack__pb2.Ack.FromString,
                 )
+        self.StatsCollectBatch = channel.unary_unary(
+                '/mapadroid.stats_handler.StatsHandler/StatsCollectBatch',
+                request_serializer=stats__handler_dot_stats__handler__pb2.StatsBatch.SerializeToString,
+                response_deserializer=shared_dot_Ack__pb2.Ack.FromString,
+                )
 
 
 class StatsHandlerServicer(object):
@@ -31,6 +36,13 @@ class StatsHandlerServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StatsCollectBatch(self, request, context):
+        """Stats buffered by clients, sent at once
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_StatsHandlerServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -39,6 +51,11 @@ def add_StatsHandlerServicer_to_server(servicer, server):
                     request_deserializer=stats__handler_dot_stats__handler__pb2.Stats.FromString,
                     response_serializer=shared_dot_Ack__pb2.Ack.SerializeToString,
             ),
+            'StatsCollectBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.StatsCollectBatch,
+                    request_deserializer=stats__handler_dot_stats__handler__pb2.StatsBatch.FromString,
+                    response_serializer=shared_dot_Ack__pb2.Ack.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'mapadroid.stats_handler.StatsHandler', rpc_method_handlers)
@@ -65,3 +82,20 @@ class StatsHandler(object):
             shared_dot_Ack__pb2.Ack.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StatsCollectBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/mapadroid.stats_handler.StatsHandler/StatsCollectBatch',
+            stats__handler_dot_stats__handler__pb2.StatsBatch.SerializeToString,
+            shared_dot_Ack__pb2.Ack.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -26,3 +26,13 @@ class AbstractMappingManager(ABC):
     @abstractmethod
     async def increment_login_tracking_by_origin(self, origin: str) -> bool:
         pass
+
+    @abstractmethod
+    async def wait_for_mappings_update(self, version: Optional[int]) -> int:
+        """
+        Args:
+            version: Version of the mappings known already, None if none is known
+
+        Returns: The version of the mappings as soon as it differs from the version passed
+        """
+        pass
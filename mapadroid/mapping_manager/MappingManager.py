@@ -40,10 +40,12 @@ from mapadroid.route.prioq.strategy.AbstractRoutePriorityQueueStrategy import \
 from mapadroid.route.RouteManagerBase import RouteManagerBase
 from mapadroid.route.RouteManagerFactory import RouteManagerFactory
 from mapadroid.route.RouteManagerIV import RouteManagerIV
+from mapadroid.route.routecalc.RoutecalcWorkerPool import RoutecalcWorkerPool
 from mapadroid.utils.collections import Location
 from mapadroid.utils.language import get_mon_ids
 from mapadroid.utils.logging import LoggerEnums, get_logger
 from mapadroid.utils.madGlobals import (MadGlobals, PositionType,
+                                        RoutecalcJobPriority,
                                         RoutemanagerShuttingDown,
                                         ScreenshotType)
 from mapadroid.worker.WorkerType import WorkerType
@@ -122,6 +124,9 @@ class MappingManager(AbstractMappingManager):
         self.__areamons: Optional[Dict[int, List[int]]] = {}
         self._monlists: Optional[Dict[int, List[int]]] = None
         self.__shutdown_event: Event = Event()
+        # Incremented whenever the mappings are updated, lets MappingManager clients invalidate their caches
+        self.__mappings_version: int = 0
+        self.__mappings_updated: asyncio.Event = asyncio.Event()
 
         # TODO: Move to init or call __init__ differently...
         self.__paused_devices: List[int] = []
@@ -155,6 +160,7 @@ class MappingManager(AbstractMappingManager):
 
     def shutdown(self):
         logger.info("MappingManager exiting")
+        RoutecalcWorkerPool.shutdown_shared()
 
     async def get_auths(self) -> Optional[Dict[str, SettingsAuth]]:
         return self._auths
@@ -605,6 +611,7 @@ class MappingManager(AbstractMappingManager):
                 return False
             args = (False, True)
             kwargs = {
+                "priority": RoutecalcJobPriority.INTERACTIVE
             }
             loop = asyncio.get_running_loop()
             loop.create_task(coro=routemanager.calculate_route(*args, **kwargs))
@@ -878,6 +885,15 @@ class MappingManager(AbstractMappingManager):
                     self._geofence_helpers = await self.__get_latest_geofence_helpers(session)
 
         logger.info("Mappings have been updated")
+        self.__mappings_version += 1
+        mappings_updated: asyncio.Event = self.__mappings_updated
+        self.__mappings_updated = asyncio.Event()
+        mappings_updated.set()
+
+    async def wait_for_mappings_update(self, version: Optional[int]) -> int:
+        while version == self.__mappings_version:
+            await self.__mappings_updated.wait()
+        return self.__mappings_version
 
     async def get_all_devicenames(self) -> List[str]:
         async with self.__db_wrapper as session, session:
@@ -1,6 +1,12 @@
-from typing import Dict, List, Optional, Set
+import asyncio
+import time
+from asyncio import Task
+from typing import (Any, Awaitable, Callable, Dict, Hashable, List, Optional,
+                    Set, Tuple)
 
-from aiocache import cached
+import grpc
+from grpc.aio import AioRpcError
+from loguru import logger
 
 from mapadroid.db.model import SettingsAuth
 from mapadroid.grpc.compiled.mapping_manager.mapping_manager_pb2 import (
@@ -11,24 +17,52 @@ from mapadroid.grpc.compiled.mapping_manager.mapping_manager_pb2 import (
     GetSafeItemsNotToDeleteRequest, GetSafeItemsNotToDeleteResponse,
     IsRoutemanagerOfOriginLevelmodeRequest,
     IsRoutemanagerOfOriginLevelmodeResponse,
-    IncrementLoginTrackingByOriginRequest, IncrementLoginTrackingByOriginResponse)
+    IncrementLoginTrackingByOriginRequest, IncrementLoginTrackingByOriginResponse,
+    MappingsUpdate, SubscribeMappingsUpdatesRequest)
 from mapadroid.grpc.stubs.mapping_manager.mapping_manager_pb2_grpc import \
     MappingManagerStub
 from mapadroid.mapping_manager.AbstractMappingManager import \
     AbstractMappingManager
+from mapadroid.utils.SingleFlight import SingleFlight, single_flight
 
 
 class MappingManagerClient(MappingManagerStub, AbstractMappingManager):
-    @cached(ttl=360)
+    """
+    Values derived of the mappings are cached until the server notifies about the mappings being updated.
+     While not subscribed to the updates (e.g. the server being unreachable or not supporting it), the values are
+     cached for _FALLBACK_CACHE_TTL seconds.
+    """
+    _FALLBACK_CACHE_TTL: int = 360
+    _RESUBSCRIBE_DELAY: int = 5
+
+    def __init__(self, channel):
+        super().__init__(channel)
+        # Cache key -> (time cached, value)
+        self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+        # Incremented whenever the cache is cleared to not cache values requested prior to an update
+        self._cache_generation: int = 0
+        # Concurrent requests of values not cached are merged
+        self._requests: SingleFlight = SingleFlight("MappingManagerClient.mappings")
+        self._mappings_version: Optional[int] = None
+        self._mappings_updated: asyncio.Event = asyncio.Event()
+        self._subscription_task: Optional[Task] = None
+        self._subscribed: bool = False
+        self._updates_supported: bool = True
+
     async def get_all_loaded_origins(self) -> Set[str]:
+        return await self.__cached(("loaded_origins",), self.__get_all_loaded_origins)
+
+    async def __get_all_loaded_origins(self) -> Set[str]:
         request: GetAllLoadedOriginsRequest = GetAllLoadedOriginsRequest()
         response: GetAllLoadedOriginsResponse = await self.GetAllLoadedOrigins(request)
         loaded_origins: Set[str] = set()
         loaded_origins.update(response.loaded_origins)
         return loaded_origins
 
-    @cached(ttl=360)
     async def get_safe_items(self, origin: str) -> List[int]:
+        return await self.__cached(("safe_items", origin), lambda: self.__get_safe_items(origin))
+
+    async def __get_safe_items(self, origin: str) -> List[int]:
         request = GetSafeItemsNotToDeleteRequest()
         request.worker.name = origin
         response: GetSafeItemsNotToDeleteResponse = await self.GetSafeItemsNotToDelete(request)
@@ -36,8 +70,10 @@ class MappingManagerClient(MappingManagerStub, AbstractMappingManager):
         item_ids.extend(response.item_ids)
         return item_ids
 
-    @cached(ttl=360)
     async def get_auths(self) -> Dict[str, SettingsAuth]:
+        return await self.__cached(("auths",), self.__get_auths)
+
+    async def __get_auths(self) -> Dict[str, SettingsAuth]:
         request = GetAllowedAuthenticationCredentialsRequest()
         response: GetAllowedAuthenticationCredentialsResponse = await self.GetAllowedAuthenticationCredentials(request)
 
@@ -51,13 +87,15 @@ class MappingManagerClient(MappingManagerStub, AbstractMappingManager):
             auths[username] = local_auth_entry
         return auths
 
-    @cached(ttl=10)
+    # Depends on the routemanager the origin is registered to at the moment rather than the mappings only
+    @single_flight(ttl=10)
     async def routemanager_of_origin_is_levelmode(self, origin: str) -> bool:
         request = IsRoutemanagerOfOriginLevelmodeRequest()
         request.worker.name = origin
         response: IsRoutemanagerOfOriginLevelmodeResponse = await self.IsRoutemanagerOfOriginLevelmode(request)
         return response.is_levelmode
 
+    @single_flight()
     async def routemanager_get_quest_layer_to_scan_of_origin(self, origin: str) -> Optional[int]:
         request = GetQuestLayerToScanOfOriginRequest()
         request.worker.name = origin
@@ -67,9 +105,70 @@ class MappingManagerClient(MappingManagerStub, AbstractMappingManager):
         else:
             return None
 
-    @cached(ttl=60)
+    @single_flight(ttl=60)
     async def increment_login_tracking_by_origin(self, origin: str) -> bool:
         request = IncrementLoginTrackingByOriginRequest()
         request.worker.name = origin
         response: IncrementLoginTrackingByOriginResponse = await self.IncrementLoginTrackingByOrigin(request)
         return response.incremented
+
+    async def wait_for_mappings_update(self, version: Optional[int]) -> int:
+        self.__ensure_subscription()
+        while version == self._mappings_version or self._mappings_version is None:
+            await self._mappings_updated.wait()
+        return self._mappings_version
+
+    async def __cached(self, key: Hashable, request_value: Callable[[], Awaitable[Any]]) -> Any:
+        self.__ensure_subscription()
+        cached_entry: Optional[Tuple[float, Any]] = self._cache.get(key, None)
+        if cached_entry is not None and (self._subscribed
+                                         or cached_entry[0] > time.time() - self._FALLBACK_CACHE_TTL):
+            return cached_entry[1]
+        cache_generation: int = self._cache_generation
+        # Requests started prior to an update are not joined
+        value = await self._requests.get((key, cache_generation), request_value)
+        if cache_generation == self._cache_generation:
+            self._cache[key] = (time.time(), value)
+        return value
+
+    def __clear_cache(self) -> None:
+        self._cache.clear()
+        self._cache_generation += 1
+
+    def __ensure_subscription(self) -> None:
+        if self._subscription_task is None and self._updates_supported:
+            self._subscription_task = asyncio.get_running_loop().create_task(self.__subscribe_to_mappings_updates())
+
+    async def __subscribe_to_mappings_updates(self) -> None:
+        while True:
+            try:
+                update: MappingsUpdate
+                async for update in self.SubscribeMappingsUpdates(SubscribeMappingsUpdatesRequest()):
+                    # The current version is sent first. Updates may have been missed while not subscribed.
+                    if not self._subscribed or update.version != self._mappings_version:
+                        logger.debug("Mappings updated to version {}", update.version)
+                        self.__clear_cache()
+                        self._mappings_version = update.version
+                        mappings_updated: asyncio.Event = self._mappings_updated
+                        self._mappings_updated = asyncio.Event()
+                        mappings_updated.set()
+                    if not self._subscribed:
+                        logger.info("Subscribed to updates of the mappings")
+                        self._subscribed = True
+                logger.info("Subscription to updates of the mappings ended, subscribing again")
+                continue
+            except AioRpcError as e:
+                if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                    logger.warning("MappingManager server does not support notifications of updates of the "
+                                   "mappings, caching values for {} seconds instead. Consider updating the core.",
+                                   self._FALLBACK_CACHE_TTL)
+                    self._updates_supported = False
+                    return
+                logger.warning("Lost subscription to updates of the mappings, caching values for {} seconds "
+                               "meanwhile: {}", self._FALLBACK_CACHE_TTL, e)
+            except grpc.aio.UsageError:
+                # Channel has been closed
+                return
+            finally:
+                self._subscribed = False
+            await asyncio.sleep(self._RESUBSCRIBE_DELAY)
@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Set
+from typing import AsyncIterator, Dict, List, Optional, Set
 
 import grpc
 from grpc._cython.cygrpc import CompressionAlgorithm, CompressionLevel
@@ -13,7 +13,8 @@ from mapadroid.grpc.compiled.mapping_manager.mapping_manager_pb2 import (
     IncrementLoginTrackingByOriginRequest,
     IncrementLoginTrackingByOriginResponse,
     IsRoutemanagerOfOriginLevelmodeRequest,
-    IsRoutemanagerOfOriginLevelmodeResponse)
+    IsRoutemanagerOfOriginLevelmodeResponse, MappingsUpdate,
+    SubscribeMappingsUpdatesRequest)
 from mapadroid.grpc.stubs.mapping_manager.mapping_manager_pb2_grpc import (
     MappingManagerServicer, add_MappingManagerServicer_to_server)
 from mapadroid.mapping_manager.AbstractMappingManager import \
@@ -72,11 +73,11 @@ class MappingManagerServer(MappingManagerServicer):
         auths_allowed: Optional[Dict[str, SettingsAuth]] = await self.__mapping_manager_impl.get_auths()
         if auths_allowed:
             for username, auth_entry in auths_allowed.items():
-                auth_entry_message: AuthCredentialEntry = AuthCredentialEntry()
+                # Message values of maps cannot be assigned, the entry is created on access
+                auth_entry_message: AuthCredentialEntry = response.allowed_credentials[username]
                 auth_entry_message.username = username
                 auth_entry_message.password = auth_entry.password
                 auth_entry_message.auth_level = auth_entry.auth_level
-                response.allowed_credentials[username] = auth_entry_message
         return response
 
     async def GetAllLoadedOrigins(self, request: GetAllLoadedOriginsRequest,
@@ -117,3 +118,13 @@ class MappingManagerServer(MappingManagerServicer):
         response: IncrementLoginTrackingByOriginResponse = IncrementLoginTrackingByOriginResponse()
         response.incremented = await self.__mapping_manager_impl.increment_login_tracking_by_origin(request.worker.name)
         return response
+
+    async def SubscribeMappingsUpdates(self, request: SubscribeMappingsUpdatesRequest,
+                                       context: grpc.aio.ServicerContext) -> AsyncIterator[MappingsUpdate]:
+        logger.debug("SubscribeMappingsUpdates called")
+        version: Optional[int] = None
+        while True:
+            version = await self.__mapping_manager_impl.wait_for_mappings_update(version)
+            update: MappingsUpdate = MappingsUpdate()
+            update.version = version
+            yield update
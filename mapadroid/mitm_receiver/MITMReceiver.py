@@ -19,6 +19,8 @@ from mapadroid.mitm_receiver.endpoints.autoconfig import \
     register_autoconfig_endpoints
 from mapadroid.mitm_receiver.endpoints.mad_apk import \
     register_mad_apk_endpoints
+from mapadroid.mitm_receiver.MitmDataAdmissionControl import \
+    MitmDataAdmissionControl
 from mapadroid.utils.aiohttp.XPathForwardedFor import XPathForwarded
 from mapadroid.utils.madGlobals import MadGlobals
 
@@ -58,6 +60,11 @@ class MITMReceiver:
         self._app["mitm_mapper"] = self.__mitm_mapper
         self._app["mitmreceiver_startup_time"] = self.__mitmreceiver_startup_time
         self._app["data_queue"] = self._data_queue
+        self._app["admission_control"] = MitmDataAdmissionControl(
+            self._data_queue,
+            max_queue_size=MadGlobals.application_args.mitmreceiver_max_queue_size,
+            max_queue_age=MadGlobals.application_args.mitmreceiver_max_queue_age,
+            retry_after=MadGlobals.application_args.mitmreceiver_retry_after)
         self._app["storage_obj"] = self._storage_obj  # TODO
         if MadGlobals.application_args.enable_x_forwarded_path_mitm_receiver:
             reverse_proxied = XPathForwarded()
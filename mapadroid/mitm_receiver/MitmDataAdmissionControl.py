@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List
+
+from mapadroid.mitm_receiver.data_queue.MitmDataQueue import MitmDataQueue
+from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.ProtoIdentifier import ProtoIdentifier
+
+logger = get_logger(LoggerEnums.mitm_receiver)
+
+
+class MitmDataAdmissionControl:
+    """
+    Decides whether data received is to be queued for processing based on the backlog of the data queue.
+     Once the depth of the queue or the age of its oldest item exceed the limits configured (load of 1), GMOs of cells
+     queued recently already and GMOs only containing nearby mons are shed. Starting at twice the limits, any data but
+     encounters and fort searches is shed and devices are asked to retry later.
+    """
+    PRIORITY_PROTOS = (ProtoIdentifier.ENCOUNTER.value, ProtoIdentifier.FORT_SEARCH.value)
+    _MAX_RECENT_GMOS: int = 10000
+    _SHED_LOG_INTERVAL: int = 60
+
+    def __init__(self, data_queue: MitmDataQueue, max_queue_size: int = 0, max_queue_age: int = 0,
+                 retry_after: int = 5, recent_gmo_time: int = 30):
+        self._data_queue: MitmDataQueue = data_queue
+        self._max_queue_size: int = max_queue_size
+        self._max_queue_age: int = max_queue_age
+        self.retry_after: int = retry_after
+        self._recent_gmo_time: int = recent_gmo_time
+        # Cells of the GMOs queued recently mapped to the time they have been queued at
+        self._recent_gmos: OrderedDict[FrozenSet[int], float] = OrderedDict()
+        self._shed: Dict[int, int] = {}
+        self._last_shed_log: float = time.time()
+
+    def is_enabled(self) -> bool:
+        return self._max_queue_size > 0 or self._max_queue_age > 0
+
+    def get_load(self) -> float:
+        """
+        Returns: The backlog relative to the limits configured, 1.0 meaning a limit has been reached
+        """
+        load: float = 0.0
+        if self._max_queue_size > 0:
+            load = self._data_queue.qsize() / self._max_queue_size
+        if self._max_queue_age > 0:
+            load = max(load, self._data_queue.get_oldest_item_age() / self._max_queue_age)
+        return load
+
+    def admit(self, proto_type: int, payload: dict) -> bool:
+        """
+        Args:
+            proto_type: Method ID of the proto received
+            payload: Payload of the proto
+
+        Returns: Whether the proto is to be queued for processing
+        """
+        if not self.is_enabled() or proto_type in self.PRIORITY_PROTOS:
+            return True
+        load: float = self.get_load()
+        admitted: bool = True
+        if load >= 2:
+            admitted = False
+        elif proto_type == ProtoIdentifier.GMO.value:
+            cells: List[dict] = payload.get("cells", [])
+            if load >= 1 and (self.__is_recent_gmo(cells) or self.__is_nearby_only(cells)):
+                admitted = False
+            else:
+                self.__add_recent_gmo(cells)
+        if not admitted:
+            self._shed[proto_type] = self._shed.get(proto_type, 0) + 1
+            self.__log_shed(load)
+        return admitted
+
+    def is_overloaded(self) -> bool:
+        """
+        Returns: Whether devices are to be asked to retry later
+        """
+        return self.is_enabled() and self.get_load() >= 2
+
+    def __is_recent_gmo(self, cells: List[dict]) -> bool:
+        cell_ids: FrozenSet[int] = frozenset(cell.get("id") for cell in cells)
+        queued_at = self._recent_gmos.get(cell_ids)
+        return queued_at is not None and queued_at > time.time() - self._recent_gmo_time
+
+    @staticmethod
+    def __is_nearby_only(cells: List[dict]) -> bool:
+        return not any(cell.get("wild_pokemon") or cell.get("forts") for cell in cells)
+
+    def __add_recent_gmo(self, cells: List[dict]) -> None:
+        now: float = time.time()
+        cell_ids: FrozenSet[int] = frozenset(cell.get("id") for cell in cells)
+        self._recent_gmos[cell_ids] = now
+        self._recent_gmos.move_to_end(cell_ids)
+        while self._recent_gmos and (len(self._recent_gmos) > self._MAX_RECENT_GMOS
+                                     or next(iter(self._recent_gmos.values())) < now - self._recent_gmo_time):
+            self._recent_gmos.popitem(last=False)
+
+    def __log_shed(self, load: float) -> None:
+        now: float = time.time()
+        if now - self._last_shed_log < self._SHED_LOG_INTERVAL:
+            return
+        logger.warning("Shed protos (method: amount) in the last {}s due to the backlog of {} items (oldest {}s, "
+                       "load {:.2f}): {}", int(now - self._last_shed_log), self._data_queue.qsize(),
+                       int(self._data_queue.get_oldest_item_age()), load, self._shed)
+        self._shed = {}
+        self._last_shed_log = now
@@ -0,0 +1,37 @@
+from typing import FrozenSet, List, Tuple
+
+from orjson import orjson
+
+
+class MitmProtoParser:
+    """
+    Parses the body of data sent by devices straight from the bytes received (no intermediate str of the body).
+     Protos of methods not processed are dropped within the parsing already in order to release their payloads before
+     the protos accepted are handled.
+    """
+    ACCEPTED_PROTOS: FrozenSet[int] = frozenset((106, 102, 101, 104, 4, 156, 145, 1405))
+
+    @staticmethod
+    def parse(raw_data: bytes) -> Tuple[List[dict], int]:
+        """
+        Args:
+            raw_data: Body received containing either a list of protos or a single proto
+
+        Returns: Tuple of the protos accepted (in the order received) and the amount of protos lacking a method ID
+        """
+        data = orjson.loads(raw_data)
+        if isinstance(data, dict):
+            data = [data]
+        elif not isinstance(data, list):
+            return [], 0
+        accepted: List[dict] = []
+        missing_method: int = 0
+        for proto in data:
+            if not isinstance(proto, dict):
+                continue
+            proto_type = proto.get("type", None)
+            if not proto_type:
+                missing_method += 1
+            elif proto_type in MitmProtoParser.ACCEPTED_PROTOS:
+                accepted.append(proto)
+        return accepted, missing_method
@@ -1,13 +1,28 @@
-import asyncio
-from abc import ABC
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from mapadroid.mitm_receiver.data_queue.MitmDataQueue import MitmDataQueue
+from mapadroid.mitm_receiver.data_queue.MitmDataQueueFactory import \
+    MitmDataQueueFactory
+from mapadroid.utils.madGlobals import MadGlobals
 
 
 class AbstractMitmDataProcessingManager(ABC):
-    _mitm_data_queue: asyncio.Queue
+    _mitm_data_queue: MitmDataQueue
 
-    def __init__(self):
+    def __init__(self, data_queue: Optional[MitmDataQueue] = None):
         super(AbstractMitmDataProcessingManager, self).__init__()
-        self._mitm_data_queue = asyncio.Queue()
+        if data_queue is None:
+            data_queue = MitmDataQueueFactory.get_queue(MadGlobals.application_args)
+        self._mitm_data_queue = data_queue
 
-    def get_queue(self) -> asyncio.Queue:
+    def get_queue(self) -> MitmDataQueue:
         return self._mitm_data_queue
+
+    @abstractmethod
+    async def launch_processors(self):
+        pass
+
+    @abstractmethod
+    async def shutdown(self):
+        pass
@@ -0,0 +1,95 @@
+import hashlib
+from typing import Dict, List, Tuple
+
+from cachetools import TTLCache
+from orjson import orjson
+
+from mapadroid.utils.madConstants import GMO_CELL_FINGERPRINT_CACHE_SIZE
+
+# Fields changing with every GMO without the data stored changing
+_VOLATILE_WILD_MON_FIELDS = ("time_till_hidden", "last_modified_timestamp_ms")
+_VOLATILE_NEARBY_MON_FIELDS = ("distance_in_meters",)
+# Time till hidden (ms) from which on despawn times of spawnpoints are learned
+_MAX_VALID_TIME_TILL_HIDDEN = 90000
+
+
+class GmoCellFingerprints:
+    """
+    Keeps a fingerprint of the content of the cells (forts, wild and nearby mons) and the weather of GMOs processed.
+     Cells and weather entries of a GMO whose fingerprint matches the last version accepted are stripped off the GMO
+     in order to not pass them to the submission once more.
+     Fingerprints expire after the time configured to still refresh the timestamps of cells and spawnpoints.
+    """
+
+    def __init__(self, ttl: int, maxsize: int = GMO_CELL_FINGERPRINT_CACHE_SIZE):
+        self._fingerprints: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def reduce(self, gmo: dict) -> Tuple[dict, List[dict], Dict[str, bytes]]:
+        """
+        Args:
+            gmo: Payload of the GMO
+
+        Returns: Tuple of the GMO only containing cells and weather changed, the cells skipped and the fingerprints
+         of the data left in the GMO which are to be passed to accept() once the GMO has been processed
+        """
+        cells: List[dict] = gmo.get("cells", None) or []
+        changed_cells: List[dict] = []
+        skipped_cells: List[dict] = []
+        pending: Dict[str, bytes] = {}
+        for cell in cells:
+            key: str = "cell{}".format(cell["id"])
+            fingerprint: bytes = self._fingerprint_cell(cell)
+            if self._fingerprints.get(key, None) == fingerprint:
+                skipped_cells.append(cell)
+                continue
+            changed_cells.append(cell)
+            pending[key] = fingerprint
+
+        changed_weather: List[dict] = []
+        for client_weather in gmo.get("client_weather", []):
+            key: str = "weather{}".format(client_weather.get("cell_id"))
+            fingerprint: bytes = self._hash(client_weather)
+            if self._fingerprints.get(key, None) == fingerprint:
+                continue
+            changed_weather.append(client_weather)
+            pending[key] = fingerprint
+
+        if not skipped_cells and len(changed_weather) == len(gmo.get("client_weather", [])):
+            return gmo, skipped_cells, pending
+        reduced_gmo: dict = dict(gmo)
+        reduced_gmo["cells"] = changed_cells
+        reduced_gmo["client_weather"] = changed_weather
+        return reduced_gmo, skipped_cells, pending
+
+    def accept(self, pending: Dict[str, bytes]) -> None:
+        """
+        Stores the fingerprints returned by reduce() once the corresponding data has been submitted
+        """
+        for key, fingerprint in pending.items():
+            self._fingerprints[key] = fingerprint
+
+    @staticmethod
+    def _fingerprint_cell(cell: dict) -> bytes:
+        return GmoCellFingerprints._hash({
+            "forts": cell.get("forts", []),
+            "wild_pokemon": [GmoCellFingerprints._fingerprint_wild_mon(wild_mon)
+                             for wild_mon in cell.get("wild_pokemon", [])],
+            "nearby_pokemon": [GmoCellFingerprints._without(nearby_mon, _VOLATILE_NEARBY_MON_FIELDS)
+                               for nearby_mon in cell.get("nearby_pokemon", [])]
+        })
+
+    @staticmethod
+    def _fingerprint_wild_mon(wild_mon: dict) -> dict:
+        content: dict = GmoCellFingerprints._without(wild_mon, _VOLATILE_WILD_MON_FIELDS)
+        # The despawn time of the spawnpoint is learned once the time till hidden becomes valid
+        time_till_hidden: int = int(wild_mon.get("time_till_hidden", -1))
+        content["time_till_hidden_valid"] = 0 <= time_till_hidden <= _MAX_VALID_TIME_TILL_HIDDEN
+        return content
+
+    @staticmethod
+    def _without(entry: dict, fields: Tuple[str, ...]) -> dict:
+        return {key: value for key, value in entry.items() if key not in fields}
+
+    @staticmethod
+    def _hash(content) -> bytes:
+        return hashlib.blake2b(orjson.dumps(content, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
@@ -15,8 +15,11 @@ from mapadroid.db.DbFactory import DbFactory
 from mapadroid.db.DbWrapper import DbWrapper
 from mapadroid.mitm_receiver.data_processing.AbstractMitmDataProcessingManager import \
     AbstractMitmDataProcessingManager
+from mapadroid.mitm_receiver.data_processing.GmoCellFingerprints import \
+    GmoCellFingerprints
 from mapadroid.mitm_receiver.data_processing.SerializedMitmDataProcessor import \
     SerializedMitmDataProcessor
+from mapadroid.mitm_receiver.data_queue.MitmDataQueue import MitmDataQueue
 from mapadroid.utils.madGlobals import MadGlobals
 from mapadroid.utils.questGen import QuestGen
 
@@ -33,8 +36,9 @@ class InProcessMitmDataProcessorManager(AbstractMitmDataProcessingManager, Proce
      a shared queue.
     """
     def __init__(self, mitm_mapper: AbstractMitmMapper, stats_handler: AbstractStatsHandler, db_wrapper: DbWrapper,
-                 quest_gen: QuestGen, account_handler: AbstractAccountHandler):
-        super(InProcessMitmDataProcessorManager, self).__init__()
+                 quest_gen: QuestGen, account_handler: AbstractAccountHandler,
+                 data_queue: Optional[MitmDataQueue] = None):
+        super(InProcessMitmDataProcessorManager, self).__init__(data_queue)
         super(Process, self).__init__()
         self._worker_threads: List[Task] = []
         self._mitm_mapper: AbstractMitmMapper = mitm_mapper
@@ -59,6 +63,10 @@ class InProcessMitmDataProcessorManager(AbstractMitmDataProcessingManager, Proce
                                                               MadGlobals.application_args.mitmreceiver_data_workers * 2)
             self._db_wrapper = db_wrapper
         loop = asyncio.get_running_loop()
+        # Shared by all data processors of this loop in order to skip cells processed by any of them
+        cell_fingerprints: Optional[GmoCellFingerprints] = None
+        if MadGlobals.application_args.mitmreceiver_cell_fingerprint_time > 0:
+            cell_fingerprints = GmoCellFingerprints(MadGlobals.application_args.mitmreceiver_cell_fingerprint_time)
         for i in range(MadGlobals.application_args.mitmreceiver_data_workers):
             data_processor: SerializedMitmDataProcessor = SerializedMitmDataProcessor(
                 self._mitm_data_queue,
@@ -67,7 +75,8 @@ class InProcessMitmDataProcessorManager(AbstractMitmDataProcessingManager, Proce
                 self._db_wrapper,
                 self._quest_gen,
                 account_handler=self._account_handler,
-                name="DataProc-%s" % str(i))
+                name="DataProc-%s" % str(i),
+                cell_fingerprints=cell_fingerprints)
             # TODO: Own thread/loop?
             self._worker_threads.append(loop.create_task(data_processor.run()))
         if db_exec:
@@ -75,7 +84,8 @@ class InProcessMitmDataProcessorManager(AbstractMitmDataProcessingManager, Proce
 
     async def shutdown(self):
         # TODO: Stop accepting data in the queue...
-        if self._mitm_data_queue is not None:
+        # Data left in a durable queue is kept for the next start rather than being worked off
+        if self._mitm_data_queue is not None and not self._mitm_data_queue.durable:
             await self._mitm_data_queue.join()
 
         logger.info("Stopping {} MITM data processors", len(self._worker_threads))
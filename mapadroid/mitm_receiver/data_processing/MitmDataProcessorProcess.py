@@ -0,0 +1,102 @@
+import asyncio
+import multiprocessing
+import signal
+from multiprocessing.context import SpawnProcess
+from typing import Optional
+
+from loguru import logger
+
+from mapadroid.account_handler import setup_account_handler
+from mapadroid.account_handler.AbstractAccountHandler import \
+    AbstractAccountHandler
+from mapadroid.data_handler.grpc.MitmMapperClientConnector import \
+    MitmMapperClientConnector
+from mapadroid.data_handler.grpc.StatsHandlerClient import StatsHandlerClient
+from mapadroid.data_handler.grpc.StatsHandlerClientConnector import \
+    StatsHandlerClientConnector
+from mapadroid.data_handler.mitm_data.AbstractMitmMapper import \
+    AbstractMitmMapper
+from mapadroid.data_handler.mitm_data.MitmMapperType import MitmMapperType
+from mapadroid.data_handler.mitm_data.RedisMitmMapper import RedisMitmMapper
+from mapadroid.db.DbFactory import DbFactory
+from mapadroid.mitm_receiver.data_processing.InProcessMitmDataProcessorManager import \
+    InProcessMitmDataProcessorManager
+from mapadroid.mitm_receiver.data_queue.MitmDataQueue import MitmDataQueue
+from mapadroid.utils.logging import init_logging
+from mapadroid.utils.madGlobals import MadGlobals
+from mapadroid.utils.questGen import QuestGen
+
+
+class MitmDataProcessorProcess(SpawnProcess):
+    """
+    Child process of ProcessMitmDataProcessingManager. Runs an asyncio loop of its own with a DB pool, MitmMapper and
+     StatsHandler clients and an InProcessMitmDataProcessorManager working off the data routed to the process.
+     The process stops once None is read from the queue.
+    """
+
+    def __init__(self, data_queue: multiprocessing.Queue, application_args, index: int):
+        super().__init__(name="MitmDataProcessorProcess-%s" % str(index), daemon=True)
+        self._data_queue: multiprocessing.Queue = data_queue
+        self._application_args = application_args
+
+    def run(self) -> None:
+        # Shutdown is triggered by the parent process putting None into the queue
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        MadGlobals.application_args = self._application_args
+        init_logging(self._application_args, print_info=False)
+        try:
+            asyncio.run(self.__process_data())
+        except Exception as e:
+            logger.opt(exception=True).critical("{} stopped unexpectedly: {}", self.name, e)
+            raise e
+
+    async def __process_data(self) -> None:
+        args = MadGlobals.application_args
+        db_wrapper, db_exec = await DbFactory.get_wrapper(args, args.mitmreceiver_data_workers * 2)
+
+        mitm_mapper_connector: Optional[MitmMapperClientConnector] = None
+        if args.mitmmapper_type == MitmMapperType.grpc:
+            mitm_mapper_connector = MitmMapperClientConnector()
+            await mitm_mapper_connector.start()
+            mitm_mapper: AbstractMitmMapper = await mitm_mapper_connector.get_client()
+        else:
+            mitm_mapper: AbstractMitmMapper = RedisMitmMapper(db_wrapper)
+            await mitm_mapper.start()
+
+        stats_handler_connector = StatsHandlerClientConnector()
+        await stats_handler_connector.start()
+        stats_handler: StatsHandlerClient = await stats_handler_connector.get_client()
+        await stats_handler.start()
+
+        quest_gen: QuestGen = QuestGen()
+        await quest_gen.setup()
+        account_handler: AbstractAccountHandler = await setup_account_handler(db_wrapper)
+
+        # Only take as much data as the workers are able to handle right away, the backlog is kept by the parent
+        local_queue: MitmDataQueue = MitmDataQueue(maxsize=args.mitmreceiver_data_workers
+                                                   * max(1, args.mitmreceiver_batch_size) * 2)
+        data_processor_manager = InProcessMitmDataProcessorManager(mitm_mapper, stats_handler, db_wrapper, quest_gen,
+                                                                   account_handler=account_handler,
+                                                                   data_queue=local_queue)
+        await data_processor_manager.launch_processors()
+        logger.info("{} started", self.name)
+
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                item = await loop.run_in_executor(None, self._data_queue.get)
+                if item is None:
+                    break
+                await local_queue.put(item)
+        finally:
+            logger.info("Stopping {}", self.name)
+            await data_processor_manager.shutdown()
+            # Sends the stats still buffered
+            await stats_handler.shutdown()
+            if mitm_mapper_connector:
+                await mitm_mapper_connector.close()
+            if isinstance(mitm_mapper, RedisMitmMapper):
+                # Closes the connections to the shards of the workers
+                await mitm_mapper.shutdown()
+            await stats_handler_connector.close()
+            await db_exec.shutdown()
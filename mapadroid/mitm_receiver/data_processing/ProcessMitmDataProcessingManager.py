@@ -1,48 +1,141 @@
 import asyncio
 import multiprocessing
+import queue
+import zlib
 from asyncio import Task
 from typing import List, Optional
 
-from mapadroid.data_handler.mitm_data import AbstractMitmMapper
-from mapadroid.data_handler.stats import AbstractStatsHandler
-from mapadroid.db import DbWrapper
+from loguru import logger
+
 from mapadroid.mitm_receiver.data_processing.AbstractMitmDataProcessingManager import \
     AbstractMitmDataProcessingManager
-from mapadroid.mitm_receiver.data_processing.InProcessMitmDataProcessorManager import \
-    InProcessMitmDataProcessorManager
+from mapadroid.mitm_receiver.data_processing.MitmDataProcessorProcess import \
+    MitmDataProcessorProcess
 from mapadroid.utils.madGlobals import MadGlobals
-from mapadroid.utils.questGen import QuestGen
 
 
 class ProcessMitmDataProcessingManager(AbstractMitmDataProcessingManager):
     """
-    In order to utilize as many cores as possible properly, a mitm data processing asyncio loop needs to be started for
-     each core available.
-     This class handles the creation of processes accordingly.
+    In order to utilize as many cores as possible properly, a mitm data processing asyncio loop is started in a
+     process of its own (MitmDataProcessorProcess) for every process configured (mitmreceiver_data_processes).
+     Data put into the queue of this manager is routed to the processes by origin to keep the data of a device in
+     order. Processes that died are restarted by the manager.
     """
-    _data_queue: multiprocessing.Queue
-    _db_wrapper: Optional[DbWrapper]
-    _worker_threads: List[Task]
-    _mitm_mapper: AbstractMitmMapper
-    _stats_handler: AbstractStatsHandler
-    _quest_gen: QuestGen
-    _all_queues_of_processors: List[asyncio.Queue]
-
-    def __init__(self):
+    _process_queues: List[multiprocessing.Queue]
+    _processes: List[MitmDataProcessorProcess]
+    _router_task: Optional[Task]
+    _supervisor_task: Optional[Task]
+
+    def __init__(self, supervision_interval: int = 5, shutdown_timeout: int = 30, process_queue_size: int = 100):
         super().__init__()
-        self._all_queues_of_processors = []
+        # Bounded in order to keep the backlog in the queue of this manager which may be durable
+        self._process_queue_size: int = process_queue_size
+        self._process_queues = []
+        self._processes = []
+        self._router_task = None
+        self._supervisor_task = None
+        self._supervision_interval: int = supervision_interval
+        self._shutdown_timeout: int = shutdown_timeout
+        self._stopping: bool = False
+        # Processes are spawned rather than forked as the parent runs an asyncio loop and a gRPC server
+        self._context = multiprocessing.get_context("spawn")
 
     async def launch_processors(self):
-        for i in range(MadGlobals.application_args.mitmreceiver_data_workers):
+        for i in range(MadGlobals.application_args.mitmreceiver_data_processes):
             # As this loop starts processes, shared asyncio queues are not possible and need to be created and filled
             #  by this manager.
+            self._process_queues.append(self._context.Queue(maxsize=self._process_queue_size))
+            self._processes.append(self.__start_process(i))
+        loop = asyncio.get_running_loop()
+        self._router_task = loop.create_task(self.__route_data())
+        self._supervisor_task = loop.create_task(self.__supervise_processes())
+
+    def __start_process(self, index: int) -> MitmDataProcessorProcess:
+        process: MitmDataProcessorProcess = MitmDataProcessorProcess(self._process_queues[index],
+                                                                     MadGlobals.application_args, index)
+        process.start()
+        logger.info("Started {} (PID {})", process.name, process.pid)
+        return process
+
+    def _get_process_index(self, origin: str) -> int:
+        return zlib.crc32(str(origin).encode("utf-8")) % len(self._process_queues)
+
+    async def __route_data(self) -> None:
+        while True:
+            item = await self._mitm_data_queue.get()
+            try:
+                # None is used to stop in-process data workers, the processes are stopped by shutdown()
+                if item is None:
+                    continue
+                await self.__put_to_process_queue(self._get_process_index(item[2]), item)
+            except asyncio.CancelledError as e:
+                # Keep the item routed while shutting down in order for it to be persisted by a durable queue
+                self._mitm_data_queue.put_nowait(item)
+                raise e
+            except Exception as e:
+                logger.warning("Failed routing MITM data to a processor process: {}", e)
+            finally:
+                # Handed over to the process, items still queued for a process that dies are lost
+                self._mitm_data_queue.ack(item)
+
+    async def __put_to_process_queue(self, index: int, item) -> None:
+        while True:
+            try:
+                # Looked up on every attempt as the queue is replaced if the process is restarted
+                self._process_queues[index].put_nowait(item)
+                return
+            except queue.Full:
+                await asyncio.sleep(0.05)
+
+    async def __supervise_processes(self) -> None:
+        while not self._stopping:
+            await asyncio.sleep(self._supervision_interval)
+            for index, process in enumerate(self._processes):
+                if self._stopping or process.is_alive():
+                    continue
+                logger.warning("{} died with exit code {}, restarting it", process.name, process.exitcode)
+                process.close()
+                self.__replace_process_queue(index)
+                self._processes[index] = self.__start_process(index)
+
+    def __replace_process_queue(self, index: int) -> None:
+        """
+        The queue of a process that died may have been left corrupted (e.g. killed while reading), the restarted
+         process is passed a new one. Items left in the old queue are dropped.
+        """
+        old_queue: multiprocessing.Queue = self._process_queues[index]
+        self._process_queues[index] = self._context.Queue(maxsize=self._process_queue_size)
+        try:
+            dropped: int = old_queue.qsize()
+        except NotImplementedError:
+            # Not available on macOS
+            dropped = -1
+        # Do not block on flushing items to a pipe nobody is reading anymore
+        old_queue.cancel_join_thread()
+        old_queue.close()
+        if dropped != 0:
+            logger.warning("Dropped {} items queued for the processor process {}",
+                           dropped if dropped > 0 else "an unknown amount of", index)
 
-            data_processor: InProcessMitmDataProcessorManager = InProcessMitmDataProcessorManager(
-                queue_of_task,
-                self._mitm_mapper,
-                self._db_wrapper,
-                self._quest_gen,
-                name="SerialiedMitmDataProcessor-%s" % str(i))
+    async def shutdown(self):
+        self._stopping = True
+        if self._supervisor_task:
+            self._supervisor_task.cancel()
+        # Data left in a durable queue is kept for the next start rather than being worked off
+        if self._mitm_data_queue is not None and not self._mitm_data_queue.durable:
+            await self._mitm_data_queue.join()
+        if self._router_task:
+            self._router_task.cancel()
 
-            data_processor.start()
-            self._worker_threads.append(data_processor)
+        logger.info("Stopping {} MITM data processor processes", len(self._processes))
+        loop = asyncio.get_running_loop()
+        for process_queue in self._process_queues:
+            await loop.run_in_executor(None, process_queue.put, None)
+        for process in self._processes:
+            await loop.run_in_executor(None, process.join, self._shutdown_timeout)
+            if process.is_alive():
+                logger.warning("{} did not stop in time, terminating it", process.name)
+                process.terminate()
+        for process_queue in self._process_queues:
+            process_queue.close()
+        logger.info("Stopped MITM data processor processes")
@@ -1,7 +1,7 @@
 import asyncio
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 import sqlalchemy
 from loguru import logger
@@ -16,8 +16,12 @@ from mapadroid.data_handler.stats.AbstractStatsHandler import \
     AbstractStatsHandler
 from mapadroid.db.DbPogoProtoSubmit import DbPogoProtoSubmit
 from mapadroid.db.DbWrapper import DbWrapper
+from mapadroid.db.ProtoCacheDedup import ProtoCacheDedup
 from mapadroid.db.helper.SettingsDeviceHelper import SettingsDeviceHelper
 from mapadroid.db.model import SettingsDevice
+from mapadroid.mitm_receiver.data_processing.GmoCellFingerprints import \
+    GmoCellFingerprints
+from mapadroid.mitm_receiver.data_queue.MitmDataQueue import MitmDataQueue
 from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
 from mapadroid.utils.gamemechanicutil import determine_current_quest_layer
 from mapadroid.utils.madGlobals import (MadGlobals, MitmReceiverRetry,
@@ -26,11 +30,11 @@ from mapadroid.utils.questGen import QuestGen
 
 
 class SerializedMitmDataProcessor:
-    def __init__(self, data_queue: asyncio.Queue, stats_handler: AbstractStatsHandler,
+    def __init__(self, data_queue: MitmDataQueue, stats_handler: AbstractStatsHandler,
                  mitm_mapper: AbstractMitmMapper, db_wrapper: DbWrapper, quest_gen: QuestGen,
                  account_handler: AbstractAccountHandler,
-                 name=None):
-        self.__queue: asyncio.Queue = data_queue
+                 name=None, cell_fingerprints: Optional[GmoCellFingerprints] = None):
+        self.__queue: MitmDataQueue = data_queue
         self.__db_wrapper: DbWrapper = db_wrapper
         self.__db_submit: DbPogoProtoSubmit = db_wrapper.proto_submit
         self.__stats_handler: AbstractStatsHandler = stats_handler
@@ -38,35 +42,205 @@ class SerializedMitmDataProcessor:
         self.__quest_gen: QuestGen = quest_gen
         self.__name = name
         self.__account_handler: AbstractAccountHandler = account_handler
+        self.__cell_fingerprints: Optional[GmoCellFingerprints] = cell_fingerprints
 
     async def run(self):
         logger.info("Starting serialized MITM data processor")
+        batch_size: int = MadGlobals.application_args.mitmreceiver_batch_size
         # TODO: use event to stop... Remove try/catch...
         with logger.contextualize(identifier=self.__name, name="mitm-processor"):
+            if batch_size > 1:
+                await self.__run_batched(batch_size, MadGlobals.application_args.mitmreceiver_batch_timeout / 1000)
+                return
             while True:
                 try:
                     item = await self.__queue.get()
                     if item is None:
                         logger.info("Received signal to stop MITM data processor")
                         break
-                    start_time = self.get_time_ms()
-                    try:
-                        with logger.contextualize(identifier=item[2], name="mitm-processor"):
-                            await self.process_data(received_timestamp=item[0], data=item[1],
-                                                    origin=item[2])
-                        del item
-                    except (sqlalchemy.exc.IntegrityError, MitmReceiverRetry, sqlalchemy.exc.InternalError) as e:
-                        logger.info("Failed submitting data to DB, rescheduling. {}", e)
-                        await self.__queue.put(item)
-                    except Exception as e:
-                        logger.exception(e)
-                        logger.info("Failed processing data. {}", e)
-                    self.__queue.task_done()
-                    end_time = self.get_time_ms() - start_time
-                    logger.debug("MITM data processor {} finished queue item in {}ms", self.__name, end_time)
+                    await self.__process_item(item)
+                    self.__queue.ack(item)
                 except KeyboardInterrupt:
                     logger.info("Received keyboard interrupt, stopping MITM data processor")
 
+    async def __process_item(self, item: Tuple[int, dict, str]) -> None:
+        start_time = self.get_time_ms()
+        try:
+            with logger.contextualize(identifier=item[2], name="mitm-processor"):
+                await self.process_data(received_timestamp=item[0], data=item[1],
+                                        origin=item[2])
+        except (sqlalchemy.exc.IntegrityError, MitmReceiverRetry, sqlalchemy.exc.InternalError) as e:
+            logger.info("Failed submitting data to DB, rescheduling. {}", e)
+            await self.__queue.put(item)
+        except Exception as e:
+            logger.exception(e)
+            logger.info("Failed processing data. {}", e)
+        end_time = self.get_time_ms() - start_time
+        logger.debug("MITM data processor {} finished queue item in {}ms", self.__name, end_time)
+
+    async def __run_batched(self, batch_size: int, batch_timeout: float) -> None:
+        logger.info("Processing data in batches of up to {} items", batch_size)
+        stop_received: bool = False
+        while not stop_received:
+            try:
+                batch, stop_received = await self.__collect_batch(batch_size, batch_timeout)
+                if batch:
+                    await self.__process_batch(batch)
+                for item in batch:
+                    self.__queue.ack(item)
+            except KeyboardInterrupt:
+                logger.info("Received keyboard interrupt, stopping MITM data processor")
+        logger.info("Received signal to stop MITM data processor")
+
+    async def __collect_batch(self, batch_size: int,
+                              batch_timeout: float) -> Tuple[List[Tuple[int, dict, str]], bool]:
+        """
+        Waits for an item and drains the queue until batch_size items have been collected or batch_timeout seconds
+        have passed.
+
+        Returns: The items taken from the queue and whether the signal to stop has been received
+        """
+        batch: List[Tuple[int, dict, str]] = []
+        item = await self.__queue.get()
+        if item is None:
+            return batch, True
+        batch.append(item)
+        loop = asyncio.get_running_loop()
+        deadline: float = loop.time() + batch_timeout
+        while len(batch) < batch_size:
+            try:
+                if self.__queue.empty():
+                    item = await asyncio.wait_for(self.__queue.get(), max(deadline - loop.time(), 0))
+                else:
+                    item = self.__queue.get_nowait()
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def __process_batch(self, batch: List[Tuple[int, dict, str]]) -> None:
+        start_time = self.get_time_ms()
+        gmo_group: List[Tuple[int, dict, str]] = []
+        origins_in_group: Set[str] = set()
+        for item in batch:
+            data = item[1]
+            if data.get("type", None) == 106 and not data.get("raw", False):
+                gmo_group.append(item)
+                origins_in_group.add(item[2])
+                continue
+            if item[2] in origins_in_group:
+                # Data of a device is processed in the order it has been received
+                await self.__process_gmo_group(gmo_group)
+                gmo_group = []
+                origins_in_group.clear()
+            # Protos without set-based submission are processed one by one
+            await self.__process_item(item)
+        if gmo_group:
+            await self.__process_gmo_group(gmo_group)
+        end_time = self.get_time_ms() - start_time
+        logger.debug("MITM data processor {} finished batch of {} items in {}ms", self.__name, len(batch),
+                     end_time)
+
+    async def __process_gmo_group(self, items: List[Tuple[int, dict, str]]) -> None:
+        """
+        Submits the GMOs passed within a single transaction with the wild mons of all GMOs in one upsert.
+        If the transaction fails, every GMO is processed on its own in order to isolate (and reschedule) failing ones.
+        """
+        start_time = self.get_time_ms()
+        items = [item for item in items if not self.__is_outdated(item[0])]
+        if not items:
+            return
+        try:
+            results: List[Tuple[List[int], List[int], List[int], List[int], int]] = \
+                await self.__submit_gmo_group(items)
+        except Exception as e:
+            logger.info("Failed submitting batch of {} GMOs, processing them one by one. {}", len(items), e)
+            for item in items:
+                await self.__process_item(item)
+            return
+        loop = asyncio.get_running_loop()
+        for item, (wild, nearby_cell, nearby_stop, lure_wild, amount_raids) in zip(items, results):
+            loop.create_task(self.__fire_stats_gmo_submission(item[2], DatetimeWrapper.fromtimestamp(item[0]),
+                                                              wild, nearby_cell, nearby_stop, lure_wild,
+                                                              amount_raids))
+        logger.debug("Done processing batch of {} GMOs in {}ms", len(items), self.get_time_ms() - start_time)
+
+    async def __submit_gmo_group(self, items: List[Tuple[int, dict, str]]) \
+            -> List[Tuple[List[int], List[int], List[int], List[int], int]]:
+        """
+        Returns: Per GMO the wild, nearby cell, nearby stop and lured encounter IDs as well as the amount of raids
+        """
+        gmos: List[Tuple[int, dict]] = []
+        skipped_cells_of_gmos: List[List[dict]] = []
+        fingerprints: Dict[str, bytes] = {}
+        for item in items:
+            gmo, skipped_cells, pending_fingerprints = self.__reduce_gmo(item[1]["payload"])
+            gmos.append((item[0], gmo))
+            skipped_cells_of_gmos.append(skipped_cells)
+            fingerprints.update(pending_fingerprints)
+        dedup: ProtoCacheDedup = await self.__db_submit.get_gmo_cache_dedup(*[gmo for _, gmo in gmos])
+        results: List[Tuple[List[int], List[int], List[int], List[int], int]] = []
+        calc_endminsecs: Dict[int, Optional[str]] = {}
+        async with self.__db_wrapper as session, session:
+            wild_encounter_ids: List[List[int]] = await self.__db_submit.mons_of_gmos(session, gmos, dedup)
+            for (received_timestamp, gmo), wild, skipped_cells in zip(gmos, wild_encounter_ids,
+                                                                      skipped_cells_of_gmos):
+                await self.__db_submit.weather(session, gmo, received_timestamp, dedup)
+                await self.__db_submit.stops(session, gmo, dedup)
+                await self.__db_submit.gyms(session, gmo, received_timestamp, dedup)
+                amount_raids: int = await self.__db_submit.raids(session, gmo, received_timestamp, dedup)
+                calc_endminsecs.update(await self.__db_submit.spawnpoints(session, gmo, received_timestamp))
+                await self.__db_submit.cells(session, gmo, dedup)
+                nearby_cell: List[int] = []
+                nearby_stop: List[int] = []
+                lure_wild: List[int] = []
+                if MadGlobals.application_args.scan_nearby_mons:
+                    nearby_cell, nearby_stop = await self.__db_submit.mons_nearby(session, received_timestamp, gmo,
+                                                                                  dedup)
+                if MadGlobals.application_args.scan_lured_mons:
+                    lure_wild = await self.__db_submit.mon_lure_noiv(session, received_timestamp, gmo, dedup)
+                skipped_wild, skipped_lure_wild, skipped_raids = self.__seen_of_skipped_cells(skipped_cells)
+                results.append((wild + skipped_wild, nearby_cell, nearby_stop, lure_wild + skipped_lure_wild,
+                                amount_raids + skipped_raids))
+            await session.commit()
+        # Only mark the data as processed once it has been committed
+        self.__db_submit.update_spawnpoint_cache(calc_endminsecs)
+        await dedup.flush()
+        if self.__cell_fingerprints:
+            self.__cell_fingerprints.accept(fingerprints)
+        return results
+
+    def __reduce_gmo(self, gmo: dict) -> Tuple[dict, List[dict], Dict[str, bytes]]:
+        """
+        Returns: The GMO stripped off cells and weather unchanged since processed last, the cells skipped and the
+         fingerprints to accept once the GMO has been processed
+        """
+        if not self.__cell_fingerprints:
+            return gmo, [], {}
+        return self.__cell_fingerprints.reduce(gmo)
+
+    @staticmethod
+    def __seen_of_skipped_cells(skipped_cells: List[dict]) -> Tuple[List[int], List[int], int]:
+        # Mons and raids of skipped cells are still seen and thus counted in the stats
+        wild, lure_wild, amount_raids = DbPogoProtoSubmit.seen_of_cells(skipped_cells)
+        if not MadGlobals.application_args.scan_lured_mons:
+            lure_wild = []
+        return wild, lure_wild, amount_raids
+
+    def __is_outdated(self, received_timestamp: int) -> bool:
+        threshold_seconds = MadGlobals.application_args.mitm_ignore_proc_time_thresh
+        if threshold_seconds <= 0:
+            return False
+        minimum_timestamp = time.time() - threshold_seconds
+        if received_timestamp < minimum_timestamp:
+            logger.debug("Data received at {} is older than configured threshold of {}s ({}). Ignoring data.",
+                         DatetimeWrapper.fromtimestamp(received_timestamp), threshold_seconds,
+                         DatetimeWrapper.fromtimestamp(minimum_timestamp))
+            return True
+        return False
+
     async def process_data(self, received_timestamp: int, data, origin):
         data_type = data.get("type", None)
         logger.debug("Processing received data")
@@ -74,16 +248,9 @@ class SerializedMitmDataProcessor:
 
         if data_type and not data.get("raw", False):
             logger.debug4("Received data: {}", data)
-            threshold_seconds = MadGlobals.application_args.mitm_ignore_proc_time_thresh
-
             start_time = self.get_time_ms()
-            if threshold_seconds > 0:
-                minimum_timestamp = (start_time / 1000) - threshold_seconds
-                if received_timestamp < minimum_timestamp:
-                    logger.debug(
-                        "Data received at {} is older than configured threshold of {}s ({}). Ignoring data.",
-                        processed_timestamp, threshold_seconds, DatetimeWrapper.fromtimestamp(minimum_timestamp))
-                    return
+            if self.__is_outdated(received_timestamp):
+                return
 
             # We can use the current session easily...
             if data_type == 106:
@@ -191,25 +358,42 @@ class SerializedMitmDataProcessor:
     async def __process_gmo(self, data, origin, received_date: datetime, received_timestamp: int, start_time):
         logger.debug("Processing GMO. Received at {}", received_date)
         loop = asyncio.get_running_loop()
-        weather_task = loop.create_task(self.__process_weather(data, received_timestamp))
-        stops_task = loop.create_task(self.__process_stops(data))
-        gyms_task = loop.create_task(self.__process_gyms(data, received_timestamp))
-        raids_task = loop.create_task(self.__process_raids(data, received_timestamp))
-        spawnpoints_task = loop.create_task(self.__process_spawnpoints(data, received_timestamp))
-        cells_task = loop.create_task(self.__process_cells(data))
-        mons_task = loop.create_task(self.__process_wild_mons(data, received_timestamp))
+        gmo, skipped_cells, fingerprints = self.__reduce_gmo(data["payload"])
+        skipped_wild, skipped_lure_wild, skipped_raids = self.__seen_of_skipped_cells(skipped_cells)
+        if not gmo.get("cells") and not gmo.get("client_weather"):
+            logger.debug("Skipping GMO as none of its {} cells changed", len(skipped_cells))
+            loop.create_task(self.__fire_stats_gmo_submission(origin, received_date, skipped_wild, [], [],
+                                                              skipped_lure_wild, skipped_raids))
+            return
+        if skipped_cells:
+            logger.debug("Skipping {} unchanged cells of GMO", len(skipped_cells))
+            data = dict(data)
+            data["payload"] = gmo
+        # All cache keys of the GMO are checked at once, the markers are written by every part once it is committed
+        dedup: ProtoCacheDedup = await self.__db_submit.get_gmo_cache_dedup(data["payload"])
+        # Parts of the GMO failing are still processed next time their cells are received
+        failed_parts: List[str] = []
+        weather_task = loop.create_task(self.__process_weather(data, received_timestamp, dedup.scope(), failed_parts))
+        stops_task = loop.create_task(self.__process_stops(data, dedup.scope(), failed_parts))
+        gyms_task = loop.create_task(self.__process_gyms(data, received_timestamp, dedup.scope(), failed_parts))
+        raids_task = loop.create_task(self.__process_raids(data, received_timestamp, dedup.scope(), failed_parts))
+        spawnpoints_task = loop.create_task(self.__process_spawnpoints(data, received_timestamp, failed_parts))
+        cells_task = loop.create_task(self.__process_cells(data, dedup.scope(), failed_parts))
+        mons_task = loop.create_task(self.__process_wild_mons(data, received_timestamp, dedup.scope(), failed_parts))
 
         gmo_loc_start = self.get_time_ms()
         gmo_loc_time = self.get_time_ms() - gmo_loc_start
         lure_encounter_ids: List[int] = []
         lure_no_iv_task = None
         if MadGlobals.application_args.scan_lured_mons:
-            lure_no_iv_task = loop.create_task(self.__process_lure_no_iv(data, received_timestamp))
+            lure_no_iv_task = loop.create_task(self.__process_lure_no_iv(data, received_timestamp, dedup.scope(),
+                                                                         failed_parts))
         lure_processing_time = 0
 
         nearby_task = None
         if MadGlobals.application_args.scan_nearby_mons:
-            nearby_task = loop.create_task(self.__process_nearby_mons(data, received_timestamp))
+            nearby_task = loop.create_task(self.__process_nearby_mons(data, received_timestamp, dedup.scope(),
+                                                                      failed_parts))
         nearby_cell_encounter_ids = []
         nearby_stop_encounter_ids = []
         nearby_mons_time = 0
@@ -225,6 +409,10 @@ class SerializedMitmDataProcessor:
         cells_time = await cells_task
         stops_time = await stops_task
         gyms_time = await gyms_task
+        if self.__cell_fingerprints and not failed_parts:
+            self.__cell_fingerprints.accept(fingerprints)
+        elif failed_parts:
+            logger.debug("Not skipping the cells of the GMO next time as submitting {} failed", failed_parts)
         full_time = self.get_time_ms() - start_time
         logger.debug("Done processing GMO in {}ms (weather={}ms, stops={}ms, gyms={}ms, raids={}ms, " +
                      "spawnpoints={}ms, mons={}ms, "
@@ -234,11 +422,11 @@ class SerializedMitmDataProcessor:
                      spawnpoints_time, wild_mon_processing_time, nearby_mons_time, lure_processing_time,
                      cells_time, gmo_loc_time)
         loop.create_task(self.__fire_stats_gmo_submission(origin, received_date,
-                                                          wild_encounter_ids_in_gmo,
+                                                          wild_encounter_ids_in_gmo + skipped_wild,
                                                           nearby_cell_encounter_ids,
                                                           nearby_stop_encounter_ids,
-                                                          lure_encounter_ids,
-                                                          amount_raids))
+                                                          lure_encounter_ids + skipped_lure_wild,
+                                                          amount_raids + skipped_raids))
 
     async def __fire_stats_gmo_submission(self, worker: str, time_received_raw: datetime,
                                           wild_mon_encounter_ids_in_gmo: List[int],
@@ -263,74 +451,93 @@ class SerializedMitmDataProcessor:
                                                           nearby_stop=stop_encounters)
             await session.commit()
 
-    async def __process_lure_no_iv(self, data, received_timestamp) -> Tuple[List[int], int]:
+    async def __process_lure_no_iv(self, data, received_timestamp,
+                                   dedup: ProtoCacheDedup, failed_parts: List[str]) -> Tuple[List[int], int]:
         lurenoiv_start = self.get_time_ms()
         async with self.__db_wrapper as session, session:
             try:
-                lure_wild = await self.__db_submit.mon_lure_noiv(session, received_timestamp, data["payload"])
+                lure_wild = await self.__db_submit.mon_lure_noiv(session, received_timestamp, data["payload"],
+                                                                 dedup)
                 await session.commit()
+                await self.__flush_markers(dedup)
             except Exception as e:
                 logger.warning("Failed submitting lure no iv: {}", e)
+                failed_parts.append("lure_noiv")
         lure_processing_time = self.get_time_ms() - lurenoiv_start
         return lure_wild, lure_processing_time
 
-    async def __process_nearby_mons(self, data, received_timestamp) -> Tuple[List[int], List[int], int]:
+    async def __process_nearby_mons(self, data, received_timestamp, dedup: ProtoCacheDedup,
+                                    failed_parts: List[str]) -> Tuple[List[int], List[int], int]:
         nearby_mons_time_start = self.get_time_ms()
         cell_encounters: List[int] = []
         stop_encounters: List[int] = []
         async with self.__db_wrapper as session, session:
             try:
                 cell_encounters, stop_encounters = await self.__db_submit.mons_nearby(session, received_timestamp,
-                                                                                      data["payload"])
+                                                                                      data["payload"], dedup)
                 await session.commit()
+                await self.__flush_markers(dedup)
             except Exception as e:
                 logger.warning("Failed submitting nearby mons: {}", e)
+                failed_parts.append("nearby_mons")
         nearby_mons_time = self.get_time_ms() - nearby_mons_time_start
         return cell_encounters, stop_encounters, nearby_mons_time
 
-    async def __process_wild_mons(self, data, received_timestamp) -> Tuple[List[int], int]:
+    async def __process_wild_mons(self, data, received_timestamp,
+                                  dedup: ProtoCacheDedup, failed_parts: List[str]) -> Tuple[List[int], int]:
         mons_time_start = self.get_time_ms()
         encounter_ids_in_gmo: List[int] = []
         async with self.__db_wrapper as session, session:
             try:
                 encounter_ids_in_gmo = await self.__db_submit.mons(session,
                                                                    received_timestamp,
-                                                                   data["payload"])
+                                                                   data["payload"],
+                                                                   dedup)
                 await session.commit()
+                await self.__flush_markers(dedup)
             except Exception as e:
                 logger.warning("Failed submitting wild mons: {}", e)
+                failed_parts.append("mons")
         mons_time = self.get_time_ms() - mons_time_start
         return encounter_ids_in_gmo, mons_time
 
-    async def __process_cells(self, data):
+    async def __process_cells(self, data, dedup: ProtoCacheDedup, failed_parts: List[str]):
         cells_time_start = self.get_time_ms()
         async with self.__db_wrapper as session, session:
             try:
-                await self.__db_submit.cells(session, data["payload"])
+                await self.__db_submit.cells(session, data["payload"], dedup)
                 await session.commit()
+                await self.__flush_markers(dedup)
             except Exception as e:
                 logger.warning("Failed submitting cells: {}", e)
+                failed_parts.append("cells")
                 await session.rollback()
         cells_time = self.get_time_ms() - cells_time_start
         return cells_time
 
-    async def __process_spawnpoints(self, data, received_timestamp: int):
+    async def __process_spawnpoints(self, data, received_timestamp: int, failed_parts: List[str]):
         spawnpoints_time_start = self.get_time_ms()
         async with self.__db_wrapper as session, session:
             try:
-                await self.__db_submit.spawnpoints(session, data["payload"], received_timestamp)
+                calc_endminsecs: Dict[int, Optional[str]] = await self.__db_submit.spawnpoints(
+                    session, data["payload"], received_timestamp)
                 await session.commit()
+                self.__db_submit.update_spawnpoint_cache(calc_endminsecs)
             except Exception as e:
                 logger.warning("Failed submitting spawnpoints: {}", e)
+                failed_parts.append("spawnpoints")
         spawnpoints_time = self.get_time_ms() - spawnpoints_time_start
         return spawnpoints_time
 
-    async def __process_raids(self, data, timestamp: int) -> Tuple[int, int]:
+    async def __process_raids(self, data, timestamp: int, dedup: ProtoCacheDedup,
+                              failed_parts: List[str]) -> Tuple[int, int]:
         """
 
         Args:
             data:
             timestamp:
+            dedup:
+            failed_parts: The name of the part is added if submitting failed
 
         Returns: Tuple of duration taken to submit and amount of raids seen
 
@@ -339,10 +546,12 @@ class SerializedMitmDataProcessor:
         amount_raids: int = 0
         async with self.__db_wrapper as session, session:
             try:
-                amount_raids = await self.__db_submit.raids(session, data["payload"], timestamp)
+                amount_raids = await self.__db_submit.raids(session, data["payload"], timestamp, dedup)
                 await session.commit()
+                await self.__flush_markers(dedup)
             except Exception as e:
                 logger.warning("Failed submitting raids: {}", e)
+                failed_parts.append("raids")
         raids_time = self.get_time_ms() - raids_time_start
         return raids_time, amount_raids
 
@@ -358,41 +567,54 @@ class SerializedMitmDataProcessor:
         routes_time = self.get_time_ms() - routes_time_start
         logger.debug("Processing routes took {}ms", routes_time)
 
-    async def __process_gyms(self, data, received_timestamp: int):
+    async def __process_gyms(self, data, received_timestamp: int, dedup: ProtoCacheDedup, failed_parts: List[str]):
         gyms_time_start = self.get_time_ms()
         # TODO: If return value False, rollback transaction?
         async with self.__db_wrapper as session, session:
             try:
-                await self.__db_submit.gyms(session, data["payload"], received_timestamp)
+                await self.__db_submit.gyms(session, data["payload"], received_timestamp, dedup)
                 await session.commit()
+                await self.__flush_markers(dedup)
             except Exception as e:
                 logger.warning("Failed submitting gyms: {}", e)
+                failed_parts.append("gyms")
         gyms_time = self.get_time_ms() - gyms_time_start
         return gyms_time
 
-    async def __process_stops(self, data):
+    async def __process_stops(self, data, dedup: ProtoCacheDedup, failed_parts: List[str]):
         stops_time_start = self.get_time_ms()
         async with self.__db_wrapper as session, session:
             try:
-                await self.__db_submit.stops(session, data["payload"])
+                await self.__db_submit.stops(session, data["payload"], dedup)
                 await session.commit()
+                await self.__flush_markers(dedup)
             except Exception as e:
                 logger.warning("Failed submitting stops: {}", e)
+                failed_parts.append("stops")
                 logger.exception(e)
         stops_time = self.get_time_ms() - stops_time_start
         return stops_time
 
-    async def __process_weather(self, data, received_timestamp):
+    async def __process_weather(self, data, received_timestamp, dedup: ProtoCacheDedup, failed_parts: List[str]):
         weather_time_start = self.get_time_ms()
         async with self.__db_wrapper as session, session:
             try:
-                await self.__db_submit.weather(session, data["payload"], received_timestamp)
+                await self.__db_submit.weather(session, data["payload"], received_timestamp, dedup)
                 await session.commit()
+                await self.__flush_markers(dedup)
             except Exception as e:
                 logger.warning("Failed submitting weather: {}", e)
+                failed_parts.append("weather")
         weather_time = self.get_time_ms() - weather_time_start
         return weather_time
 
+    @staticmethod
+    async def __flush_markers(dedup: ProtoCacheDedup) -> None:
+        try:
+            await dedup.flush()
+        except Exception as e:
+            logger.warning("Failed writing cache markers: {}", e)
+
     @staticmethod
     def get_time_ms():
         return int(time.time() * 1000)
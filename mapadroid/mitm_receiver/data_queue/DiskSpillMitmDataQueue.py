@@ -0,0 +1,291 @@
+import asyncio
+import os
+import pickle
+import struct
+import time
+from collections import deque
+from typing import BinaryIO, Deque, Dict, List, Optional, Set, Tuple
+
+from mapadroid.mitm_receiver.data_queue.MitmDataQueue import MitmDataQueue
+from mapadroid.utils.logging import LoggerEnums, get_logger
+
+logger = get_logger(LoggerEnums.mitm_receiver)
+
+
+class DiskSpillMitmDataQueue(MitmDataQueue):
+    """
+    Every item put is written through to an append-only log of segment files in path before it is queued. Up to
+     memory_items are kept in memory, any further items are only read back from the log in order once the items in
+     memory have been worked off, so the memory used is bounded while the DB is not keeping up.
+     Items are removed from the log once they have been acknowledged (ack) after being processed. Items not
+     acknowledged (i.e. queued or in process on a crash or on close) are replayed from the log on the next start.
+     Stop signals (None) are never written to disk and are handed out before any data queued.
+     Records are buffered in memory and flushed to the OS once _FLUSH_RECORDS are buffered or _FLUSH_INTERVAL
+     seconds after the first record buffered, a crash of MAD loses the records buffered at most.
+    """
+    durable: bool = True
+
+    _SEGMENT_PREFIX: str = "segment-"
+    _SEGMENT_SUFFIX: str = ".log"
+    _INITIAL_SEGMENT: int = 10 ** 12
+    _RECORD_HEADER = struct.Struct("!I")
+    # Kinds of the records of the log
+    _RECORD_DATA: int = 0
+    _RECORD_ACK: int = 1
+    _FLUSH_RECORDS: int = 100
+    _FLUSH_INTERVAL: float = 0.5
+    _WRITE_BUFFER_SIZE: int = 4 * 1024 * 1024
+
+    def __init__(self, path: str, memory_items: int = 1000, segment_items: int = 1000):
+        self._path: str = path
+        self._memory_items: int = max(1, memory_items)
+        self._segment_items: int = max(1, segment_items)
+        # Segments of the log, oldest first. The last one is written to.
+        self._segments: Deque[int] = deque()
+        # Amount of items not acknowledged yet per segment
+        self._unacknowledged: Dict[int, int] = {}
+        # Segment of every item not acknowledged yet by the sequence of the item
+        self._segment_of_item: Dict[int, int] = {}
+        # Sequences of the items handed out and waiting to be acknowledged by the id of the item
+        self._in_process: Dict[int, List[int]] = {}
+        self._next_sequence: int = 0
+        # Items only in the log, read back once the items in memory have been worked off
+        self._disk_items: int = 0
+        self._last_loaded_sequence: int = -1
+        self._write_file: Optional[BinaryIO] = None
+        self._write_segment_items: int = 0
+        # Records written to the buffer of the file but not flushed yet
+        self._unflushed_records: int = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._read_file: Optional[BinaryIO] = None
+        self._read_segment: Optional[int] = None
+        super().__init__()
+        os.makedirs(self._path, exist_ok=True)
+        self.__load_segments()
+
+    def _init(self, maxsize):
+        super()._init(maxsize)
+        # Sequences of the items in memory, None for items not written to the log
+        self._sequences: Deque[Optional[int]] = deque()
+
+    def qsize(self) -> int:
+        return len(self._queue) + self._disk_items
+
+    def get_disk_items(self) -> int:
+        return self._disk_items
+
+    def _put(self, item):
+        if item is None:
+            self._queue.appendleft(item)
+            self._enqueued_at.appendleft(time.time())
+            self._sequences.appendleft(None)
+            return
+        enqueued_at: float = time.time()
+        try:
+            sequence: int = self.__write_item(enqueued_at, item)
+        except (OSError, pickle.PicklingError) as e:
+            logger.warning("Failed writing MITM data to disk, keeping it in memory only: {}", e)
+            super()._put(item)
+            self._sequences.append(None)
+            return
+        if self._disk_items == 0 and len(self._queue) < self._memory_items:
+            self.__load(sequence, enqueued_at, item)
+        else:
+            self._disk_items += 1
+
+    def flush(self) -> None:
+        """
+        Flushes the records buffered to the OS
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._write_file is not None and self._unflushed_records > 0:
+            try:
+                self._write_file.flush()
+            except OSError as e:
+                logger.warning("Failed flushing MITM data to disk: {}", e)
+        self._unflushed_records = 0
+
+    def _get(self):
+        item = super()._get()
+        sequence: Optional[int] = self._sequences.popleft()
+        if sequence is not None:
+            self._in_process.setdefault(id(item), []).append(sequence)
+        if not self._queue and self._disk_items > 0:
+            self.__refill()
+        return item
+
+    def ack(self, item) -> None:
+        """
+        Removes the item processed from the log
+        """
+        sequences: Optional[List[int]] = self._in_process.get(id(item))
+        if sequences:
+            sequence: int = sequences.pop(0)
+            if not sequences:
+                del self._in_process[id(item)]
+            self.__acknowledge(sequence)
+        self.task_done()
+
+    async def close(self) -> None:
+        """
+        Closes the log. Items not acknowledged are replayed on the next start.
+        """
+        self.flush()
+        for log_file in (self._write_file, self._read_file):
+            if log_file is not None:
+                log_file.close()
+        self._write_file = None
+        self._read_file = None
+        logger.info("{} queued MITM data items are kept in {}", len(self._segment_of_item), self._path)
+
+    def __get_segment_path(self, segment: int) -> str:
+        return os.path.join(self._path, "{}{:020d}{}".format(self._SEGMENT_PREFIX, segment, self._SEGMENT_SUFFIX))
+
+    def __load_segments(self) -> None:
+        segments: List[int] = []
+        for filename in os.listdir(self._path):
+            if filename.startswith(self._SEGMENT_PREFIX) and filename.endswith(self._SEGMENT_SUFFIX):
+                try:
+                    segments.append(int(filename[len(self._SEGMENT_PREFIX):-len(self._SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+        acknowledged: Set[int] = set()
+        for segment in sorted(segments):
+            self._segments.append(segment)
+            self._unacknowledged[segment] = 0
+            with open(self.__get_segment_path(segment), "rb") as segment_file:
+                while (record := self.__read_record(segment_file)) is not None:
+                    kind, sequence = record[0], record[1]
+                    self._next_sequence = max(self._next_sequence, sequence + 1)
+                    if kind == self._RECORD_ACK:
+                        acknowledged.add(sequence)
+                    else:
+                        self._segment_of_item[sequence] = segment
+                        self._unacknowledged[segment] += 1
+        for sequence in acknowledged:
+            segment: Optional[int] = self._segment_of_item.pop(sequence, None)
+            if segment is not None:
+                self._unacknowledged[segment] -= 1
+        self._disk_items = len(self._segment_of_item)
+        # Segments may end with a truncated record, new items are written to a new segment
+        self.__remove_acknowledged_segments(True)
+        if self._disk_items > 0:
+            logger.info("Replaying {} MITM data items queued on disk", self._disk_items)
+            # Replayed items have not been put, register them to be marked done by the processors
+            self._unfinished_tasks += self._disk_items
+            self._finished.clear()
+            self.__refill()
+
+    def __load(self, sequence: int, enqueued_at: float, item) -> None:
+        self._queue.append(item)
+        self._enqueued_at.append(enqueued_at)
+        self._sequences.append(sequence)
+        self._last_loaded_sequence = sequence
+
+    def __refill(self) -> None:
+        # The items to be read back may still be buffered
+        self.flush()
+        while self._disk_items > 0 and len(self._queue) < self._memory_items:
+            if self._read_file is None:
+                if not self.__open_next_read_segment():
+                    break
+            record: Optional[Tuple] = self.__read_record(self._read_file)
+            if record is None:
+                if self._read_segment == self._segments[-1]:
+                    # The segment written to, continue reading at the same position once more is written
+                    break
+                self._read_file.close()
+                self._read_file = None
+                continue
+            kind, sequence = record[0], record[1]
+            if (kind == self._RECORD_ACK or sequence <= self._last_loaded_sequence
+                    or sequence not in self._segment_of_item):
+                # Acknowledged already or written through while the item has been kept in memory
+                continue
+            self._disk_items -= 1
+            self.__load(sequence, record[2], record[3])
+
+    def __open_next_read_segment(self) -> bool:
+        following: List[int] = [segment for segment in self._segments
+                                if self._read_segment is None or segment > self._read_segment]
+        if not following:
+            return False
+        self._read_segment = following[0]
+        self._read_file = open(self.__get_segment_path(self._read_segment), "rb")
+        return True
+
+    def __acknowledge(self, sequence: int) -> None:
+        segment: Optional[int] = self._segment_of_item.pop(sequence, None)
+        if segment is None:
+            return
+        self._unacknowledged[segment] -= 1
+        try:
+            self.__write_record((self._RECORD_ACK, sequence))
+        except OSError as e:
+            logger.warning("Failed acknowledging MITM data on disk, it will be replayed: {}", e)
+        self.__remove_acknowledged_segments(False)
+
+    def __remove_acknowledged_segments(self, include_last: bool) -> None:
+        """
+        Removes the oldest segments as long as all of their items have been acknowledged. Segments are removed in
+         order only for acknowledgements of their items in later segments to not be lost before them.
+        """
+        while self._segments and self._unacknowledged[self._segments[0]] == 0:
+            segment: int = self._segments[0]
+            if segment == self._segments[-1] and (not include_last or self._write_file is not None):
+                return
+            if segment == self._read_segment and self._read_file is not None:
+                self._read_file.close()
+                self._read_file = None
+            self._segments.popleft()
+            del self._unacknowledged[segment]
+            os.remove(self.__get_segment_path(segment))
+
+    def __write_item(self, enqueued_at: float, item) -> int:
+        sequence: int = self._next_sequence
+        self.__write_record((self._RECORD_DATA, sequence, enqueued_at, item))
+        self._next_sequence += 1
+        segment: int = self._segments[-1]
+        self._segment_of_item[sequence] = segment
+        self._unacknowledged[segment] += 1
+        return sequence
+
+    def __write_record(self, record: Tuple) -> None:
+        payload: bytes = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        if self._write_file is None or self._write_segment_items >= self._segment_items:
+            if self._write_file is not None:
+                self.flush()
+                self._write_file.close()
+            segment: int = self._segments[-1] + 1 if self._segments else self._INITIAL_SEGMENT
+            self._write_file = open(self.__get_segment_path(segment), "ab", buffering=self._WRITE_BUFFER_SIZE)
+            self._write_segment_items = 0
+            self._segments.append(segment)
+            self._unacknowledged[segment] = 0
+        self._write_file.write(self._RECORD_HEADER.pack(len(payload)) + payload)
+        self._write_segment_items += 1
+        self._unflushed_records += 1
+        if self._unflushed_records >= self._FLUSH_RECORDS:
+            self.flush()
+        elif self._flush_handle is None:
+            try:
+                self._flush_handle = asyncio.get_running_loop().call_later(self._FLUSH_INTERVAL, self.flush)
+            except RuntimeError:
+                # Not used from within an event loop
+                self.flush()
+
+    def __read_record(self, segment: BinaryIO) -> Optional[Tuple]:
+        """
+        Returns: The next record of the segment or None if the end of the segment or a truncated record was reached
+        """
+        position: int = segment.tell()
+        header: bytes = segment.read(self._RECORD_HEADER.size)
+        if len(header) == self._RECORD_HEADER.size:
+            length, = self._RECORD_HEADER.unpack(header)
+            payload: bytes = segment.read(length)
+            if len(payload) == length:
+                return pickle.loads(payload)
+        # Read again once the record has been written completely
+        segment.seek(position)
+        return None
@@ -0,0 +1,47 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque
+
+
+class MitmDataQueue(asyncio.Queue):
+    """
+    In-memory queue of the MITM data waiting to be processed. Keeps track of the time the items have been enqueued in
+     order to report the age of the oldest item next to the depth of the queue.
+    """
+    # Whether the items queued survive a restart. Items of a queue that is not durable are dropped once too many
+    #  queued up.
+    durable: bool = False
+
+    def _init(self, maxsize):
+        self._queue: Deque = deque()
+        self._enqueued_at: Deque[float] = deque()
+
+    def _put(self, item):
+        self._queue.append(item)
+        self._enqueued_at.append(time.time())
+
+    def _get(self):
+        self._enqueued_at.popleft()
+        return self._queue.popleft()
+
+    def get_oldest_item_age(self) -> float:
+        """
+        Returns: Seconds the oldest item has been waiting in the queue, 0 if the queue is empty
+        """
+        if not self._enqueued_at:
+            return 0.0
+        return max(0.0, time.time() - self._enqueued_at[0])
+
+    def ack(self, item) -> None:
+        """
+        Marks the item taken from the queue as processed (or handed over to be processed elsewhere), replaces
+        task_done for consumers of the queue
+        """
+        self.task_done()
+
+    async def close(self) -> None:
+        """
+        Called once no more data is to be processed. Items left are lost.
+        """
+        pass
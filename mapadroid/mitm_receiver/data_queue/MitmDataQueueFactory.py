@@ -0,0 +1,19 @@
+import os
+
+from mapadroid.mitm_receiver.data_queue.DiskSpillMitmDataQueue import \
+    DiskSpillMitmDataQueue
+from mapadroid.mitm_receiver.data_queue.MitmDataQueue import MitmDataQueue
+from mapadroid.mitm_receiver.data_queue.MitmDataQueueType import \
+    MitmDataQueueType
+
+
+class MitmDataQueueFactory:
+    @staticmethod
+    def get_queue(args) -> MitmDataQueue:
+        """
+        Creates the queue between the MITMReceiver and the data processors as configured (mitmreceiver_queue_type)
+        """
+        if args.mitmreceiver_queue_type == MitmDataQueueType.disk:
+            path: str = args.mitmreceiver_queue_path or os.path.join(args.temp_path, "mitm_data_queue")
+            return DiskSpillMitmDataQueue(path, memory_items=args.mitmreceiver_queue_memory_items)
+        return MitmDataQueue()
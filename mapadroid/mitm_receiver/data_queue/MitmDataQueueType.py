@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class MitmDataQueueType(Enum):
+    memory = 'memory'
+    disk = 'disk'
+
+    def __str__(self):
+        return self.value
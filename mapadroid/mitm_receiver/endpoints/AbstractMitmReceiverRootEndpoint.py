@@ -28,6 +28,9 @@ from mapadroid.mad_apk.utils import convert_to_backend
 from mapadroid.madmin import apiException
 from mapadroid.mapping_manager.AbstractMappingManager import \
     AbstractMappingManager
+from mapadroid.mitm_receiver.data_queue.MitmDataQueue import MitmDataQueue
+from mapadroid.mitm_receiver.MitmDataAdmissionControl import \
+    MitmDataAdmissionControl
 from mapadroid.updater.updater import DeviceUpdater
 from mapadroid.utils.apk_enums import APKArch, APKPackage, APKType
 from mapadroid.utils.authHelper import check_auth, get_auths_for_levl
@@ -187,9 +190,12 @@ class AbstractMitmReceiverRootEndpoint(web.View, ABC):
     def _get_mitmreceiver_startup_time(self) -> int:
         return self.request.app["mitmreceiver_startup_time"]
 
-    def _get_data_queue(self) -> asyncio.Queue:
+    def _get_data_queue(self) -> MitmDataQueue:
         return self.request.app["data_queue"]
 
+    def _get_admission_control(self) -> MitmDataAdmissionControl:
+        return self.request.app["admission_control"]
+
     def _get_storage_obj(self) -> AbstractAPKStorage:
         return self.request.app['storage_obj']
 
@@ -285,14 +291,14 @@ class AbstractMitmReceiverRootEndpoint(web.View, ABC):
         return web.Response(text="", status=200)
 
     async def _add_to_queue(self, data):
-        queue = self._get_data_queue()
+        queue: MitmDataQueue = self._get_data_queue()
         # TODO: Arg setting threshold
         logger.debug2("Queue size: {}", queue.qsize())
-        while queue.qsize() > 200:
-            self._get_data_queue().get_nowait()
-            queue.task_done()
+        # A durable queue spills to disk rather than growing in memory, admission control limits the backlog itself
+        while not queue.durable and not self._get_admission_control().is_enabled() and queue.qsize() > 200:
+            queue.ack(queue.get_nowait())
             logger.warning("Dropped task")
-        await self._get_data_queue().put(data)
+        await queue.put(data)
 
     def _check_mitm_status_auth(self):
         """
@@ -1,16 +1,17 @@
 import asyncio
 import time
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from aiohttp import web
 from loguru import logger
-from orjson import orjson
 
+from mapadroid.data_handler.mitm_data.GmoDigest import GmoDigest
 from mapadroid.db.helper.SettingsDeviceHelper import SettingsDeviceHelper
 from mapadroid.db.helper.TrsVisitedHelper import TrsVisitedHelper
 from mapadroid.db.model import SettingsDevice
 from mapadroid.mitm_receiver.endpoints.AbstractMitmReceiverRootEndpoint import \
     AbstractMitmReceiverRootEndpoint
+from mapadroid.mitm_receiver.MitmProtoParser import MitmProtoParser
 from mapadroid.utils.collections import Location
 from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
 from mapadroid.utils.ProtoIdentifier import ProtoIdentifier
@@ -31,46 +32,44 @@ class ReceiveProtosEndpoint(AbstractMitmReceiverRootEndpoint):
     async def post(self):
         raw_data = await self.request.read()
         loop = asyncio.get_running_loop()
-        data = await loop.run_in_executor(
-            None, self.__process_data_to_json, raw_data)
+        # Parsed from the bytes directly, protos not processed are dropped while parsing already
+        protos, missing_method = await loop.run_in_executor(
+            None, MitmProtoParser.parse, raw_data)
         del raw_data
         origin = self.request.headers.get("origin")
+        self.__data_shed: bool = False
         with logger.contextualize(identifier=origin, name="receive_protos"):
-            logger.debug2("Receiving proto")
+            logger.debug2("Receiving {} protos", len(protos))
             await self._get_mapping_manager().increment_login_tracking_by_origin(origin)
-            logger.debug4("Proto data received {}", data)
-            if isinstance(data, list):
-                # list of protos... we hope so at least....
-                logger.debug2("Receiving list of protos")
-                for proto in data:
-                    await self.__handle_proto_data_dict(origin, proto)
-            elif isinstance(data, dict):
-                logger.debug2("Receiving single proto")
-                # single proto, parse it...
-                await self.__handle_proto_data_dict(origin, data)
-
-            # del data
+            logger.debug4("Proto data received {}", protos)
+            if missing_method:
+                logger.warning("Could not read method ID of {} protos. Stopping processing of those", missing_method)
+            for proto in protos:
+                # Queued right away for the data workers to start processing while the remaining protos are handled
+                queue_item: Optional[Tuple[int, dict, str]] = await self.__handle_proto_data_dict(origin, proto)
+                if queue_item is not None:
+                    await self._add_to_queue(queue_item)
+            del protos
+
+            if self.__data_shed and self._get_admission_control().is_overloaded():
+                return web.Response(status=503,
+                                    headers={"Retry-After": str(self._get_admission_control().retry_after)})
             return web.Response(status=200)
 
-    def __process_data_to_json(self, raw_data):
-        raw_text = raw_data.decode('utf8')
-        data = orjson.loads(raw_text)
-        del raw_text
-        return data
+    async def __handle_proto_data_dict(self, origin: str, data: dict) -> Optional[Tuple[int, dict, str]]:
+        """
+        Args:
+            origin:
+            data: Proto of a method accepted by MitmProtoParser
 
-    async def __handle_proto_data_dict(self, origin: str, data: dict) -> None:
-        proto_type = data.get("type", None)
-        if proto_type is None or proto_type == 0:
-            logger.warning("Could not read method ID. Stopping processing of proto")
-            return
+        Returns: The item to be queued for processing if any
+        """
+        proto_type = data["type"]
         timestamp: int = data.get("timestamp", int(time.time()))
         if self._get_mad_args().mitm_ignore_pre_boot is True and timestamp < self._get_mitmreceiver_startup_time():
             return
 
-        if proto_type not in (106, 102, 101, 104, 4, 156, 145, 1405):
-            # trash protos - ignoring
-            return
-        elif proto_type == 106 and not data["payload"].get("cells", []):
+        if proto_type == 106 and not data["payload"].get("cells", []):
             logger.debug("Ignoring apparently empty GMO")
             return
         elif proto_type == 102 and not data["payload"].get("status", None) == 1:
@@ -102,12 +101,19 @@ class ReceiveProtosEndpoint(AbstractMitmReceiverRootEndpoint):
             await self._handle_fort_search_proto(origin, data["payload"], location_of_data, timestamp)
         quests_held: Optional[List[int]] = data.get("quests_held", None)
         await self._get_mitm_mapper().set_quests_held(origin, quests_held)
+        latest_value: dict = data["payload"]
+        if proto_type == ProtoIdentifier.GMO.value:
+            # Workers only evaluate a fraction of GMOs, the full GMO is queued for processing below
+            latest_value = GmoDigest.digest(latest_value)
         await self._get_mitm_mapper().update_latest(origin, timestamp_received_raw=timestamp,
                                                     timestamp_received_receiver=time_received, key=str(proto_type),
-                                                    value=data["payload"],
+                                                    value=latest_value,
                                                     location=location_of_data)
-        logger.debug2("Placing data received to data_queue")
-        await self._add_to_queue((timestamp, data, origin))
+        if not self._get_admission_control().admit(proto_type, data["payload"]):
+            logger.debug2("Dropping proto {} due to the backlog of data to be processed", proto_type)
+            self.__data_shed = True
+            return
+        return timestamp, data, origin
 
     async def _handle_fort_search_proto(self, origin: str, quest_proto: Dict, location_of_data: Location,
                                         timestamp: int) -> None:
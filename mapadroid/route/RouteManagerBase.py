@@ -22,6 +22,8 @@ from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
 from mapadroid.utils.geo import get_distance_of_two_points_in_meters
 from mapadroid.utils.logging import LoggerEnums, get_logger
 from mapadroid.utils.madGlobals import (PositionType, PrioQueueNoDueEntry,
+                                        RoutecalcJobPriority,
+                                        RoutecalcJobSupersededError,
                                         RoutecalculationTypes,
                                         RoutemanagerShuttingDown)
 from mapadroid.worker.WorkerType import WorkerType
@@ -71,6 +73,8 @@ class RouteManagerBase(ABC):
         self._first_started = False
         self._current_route_round_coords: List[Location] = []
         self._start_calc: asyncio.Event = asyncio.Event()
+        # Incremented per call of calculate_route, only the latest call clears _start_calc
+        self._calc_generation: int = 0
         self._coords_to_be_ignored = set()
         self._overwrite_calculation: bool = False
         self._routepool: Dict[str, RoutePoolEntry] = {}
@@ -199,7 +203,8 @@ class RouteManagerBase(ABC):
         if self._prio_queue:
             await self._prio_queue.start()
 
-    async def calculate_route(self, dynamic: bool, overwrite_persisted_route: bool = False) -> None:
+    async def calculate_route(self, dynamic: bool, overwrite_persisted_route: bool = False,
+                              priority: RoutecalcJobPriority = RoutecalcJobPriority.BACKGROUND) -> None:
         """
         Calculates a new route based off the internal acquisition of coords within the routemanager itself.
 
@@ -207,6 +212,7 @@ class RouteManagerBase(ABC):
             if overwrite_persisted_route is set
         :param overwrite_persisted_route: Whether the calculated route should be persisted in the database
             (True -> persist)
+        :param priority: Priority of the calculation amongst the calculations queued
         """
         # If dynamic, recalc using OR tools in all cases (if possible) and do not persist to DB
         coords: List[Location] = await self._get_coords_fresh(dynamic)
@@ -216,6 +222,9 @@ class RouteManagerBase(ABC):
             # Empty route and no route is to be loaded, return immediately after shutdown
             await self.stop_routemanager()
             raise RoutemanagerShuttingDown("No coords to calculate a route")
+        previous_route: Optional[List[Location]] = self._get_route_to_repair(dynamic)
+        self._calc_generation += 1
+        generation: int = self._calc_generation
         try:
             self._start_calc.set()
             new_route: List[Location] = await RoutecalcUtil.calculate_route(self.db_wrapper,
@@ -228,12 +237,23 @@ class RouteManagerBase(ABC):
                                                                             s2_level=self.S2level,
                                                                             route_name=self.name,
                                                                             overwrite_persisted_route=overwrite_persisted_route,
-                                                                            load_persisted_route=not dynamic and not overwrite_persisted_route)
+                                                                            load_persisted_route=not dynamic and not overwrite_persisted_route,
+                                                                            job_key=self._routecalc.routecalc_id,
+                                                                            priority=priority,
+                                                                            previous_route=previous_route)
+        except RoutecalcJobSupersededError:
+            # The route is updated by the calculation superseding this one
+            return
         except Exception as e:
             logger.exception(e)
             raise e
         finally:
-            self._start_calc.clear()
+            # A calculation superseding this one may still be running
+            if generation == self._calc_generation:
+                self._start_calc.clear()
+        if generation != self._calc_generation:
+            # The route is updated by the calculation requested meanwhile
+            return
         async with self._manager_mutex:
             self._route.clear()
             self._route.extend(new_route)
@@ -326,6 +346,15 @@ class RouteManagerBase(ABC):
         :return:
         """
 
+    def _get_route_to_repair(self, dynamic: bool) -> Optional[List[Location]]:
+        """
+        Route to be updated with the coords fetched on recalculation rather than calculating a new route, if only a
+        few coords changed
+        :param dynamic: Whether the route is calculated dynamically (see calculate_route)
+        :return: None to always calculate a new route
+        """
+        return None
+
     def _should_get_new_coords_after_finishing_route(self) -> bool:
         """
         Whether the route should be updated with coords after finishing a route
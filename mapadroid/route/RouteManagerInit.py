@@ -9,6 +9,7 @@ from mapadroid.geofence.geofenceHelper import GeofenceHelper
 from mapadroid.route.RouteManagerBase import RouteManagerBase
 from mapadroid.route.SubrouteReplacingMixin import SubrouteReplacingMixin
 from mapadroid.utils.collections import Location
+from mapadroid.utils.madGlobals import RoutecalcJobPriority
 from mapadroid.utils.s2Helper import S2Helper
 
 
@@ -53,7 +54,8 @@ class RouteManagerInit(SubrouteReplacingMixin, RouteManagerBase):
         # TODO
         return self._settings.init_mode_rounds > 1
 
-    async def calculate_route(self, dynamic: bool, overwrite_persisted_route: bool = False) -> None:
+    async def calculate_route(self, dynamic: bool, overwrite_persisted_route: bool = False,
+                              priority: RoutecalcJobPriority = RoutecalcJobPriority.BACKGROUND) -> None:
         coords: List[Location] = await self._get_coords_fresh(dynamic)
         if dynamic:
             coords = [coord for coord in coords if coord not in self._coords_to_be_ignored]
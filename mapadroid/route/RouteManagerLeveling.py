@@ -94,7 +94,7 @@ class RouteManagerLeveling(RouteManagerBase):
 
                     if unvisited_stops:
                         logger.info("Recalc a route")
-                        new_route = await self._local_recalc_subroute(unvisited_stops)
+                        new_route = await self._local_recalc_subroute(unvisited_stops, entry.subroute)
                         origin_local_list.clear()
                         for coord in new_route:
                             origin_local_list.append(coord)
@@ -118,7 +118,8 @@ class RouteManagerLeveling(RouteManagerBase):
                     logger.warning("Failed storing last walker positions: {}", e)
                 return routepool
 
-    async def _local_recalc_subroute(self, unvisited_stops: List[Pokestop]) -> List[Location]:
+    async def _local_recalc_subroute(self, unvisited_stops: List[Pokestop],
+                                     previous_subroute: Optional[List[Location]] = None) -> List[Location]:
         coords: List[Location] = []
         for stop in unvisited_stops:
             coords.append(Location(float(stop.latitude), float(stop.longitude)))
@@ -132,7 +133,8 @@ class RouteManagerLeveling(RouteManagerBase):
                                                                         s2_level=self.S2level,
                                                                         route_name=self.name,
                                                                         overwrite_persisted_route=False,
-                                                                        load_persisted_route=False)
+                                                                        load_persisted_route=False,
+                                                                        previous_route=previous_subroute)
         return new_route
 
     async def _any_coords_left_after_finishing_route(self) -> bool:
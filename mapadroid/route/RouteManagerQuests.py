@@ -13,7 +13,7 @@ from mapadroid.route.RouteManagerBase import RouteManagerBase
 from mapadroid.route.SubrouteReplacingMixin import SubrouteReplacingMixin
 from mapadroid.utils.collections import Location
 from mapadroid.utils.geo import get_distance_of_two_points_in_meters
-from mapadroid.utils.madGlobals import QuestLayer
+from mapadroid.utils.madGlobals import QuestLayer, RoutecalcJobPriority
 
 
 class RouteManagerQuests(SubrouteReplacingMixin, RouteManagerBase):
@@ -45,7 +45,8 @@ class RouteManagerQuests(SubrouteReplacingMixin, RouteManagerBase):
             else:
                 return await PokestopHelper.get_locations_in_fence(session, self.geofence_helper)
 
-    async def calculate_route(self, dynamic: bool, overwrite_persisted_route: bool = False) -> None:
+    async def calculate_route(self, dynamic: bool, overwrite_persisted_route: bool = False,
+                              priority: RoutecalcJobPriority = RoutecalcJobPriority.BACKGROUND) -> None:
         async with self.db_wrapper as session, session:
             if dynamic:
                 # also store the latest set in _stoplist
@@ -54,7 +55,7 @@ class RouteManagerQuests(SubrouteReplacingMixin, RouteManagerBase):
                 locations_of_stops: List[Location] = await PokestopHelper.get_locations_in_fence(session,
                                                                                                  self.geofence_helper)
         self._stoplist = locations_of_stops
-        await super().calculate_route(dynamic, overwrite_persisted_route)
+        await super().calculate_route(dynamic, overwrite_persisted_route, priority)
 
     async def _get_stops_without_quests_on_layer(self, session: AsyncSession) -> List[Location]:
         stops = await PokestopHelper.get_stops_with_or_without_quests_exclusive(session, self.geofence_helper,
@@ -123,6 +124,10 @@ class RouteManagerQuests(SubrouteReplacingMixin, RouteManagerBase):
     def _delete_coord_after_fetch(self) -> bool:
         return True
 
+    def _get_route_to_repair(self, dynamic: bool) -> Optional[List[Location]]:
+        # Usually only a few stops were added or got their quest scanned since the last calculation
+        return self._route.copy() if dynamic and self._route else None
+
     async def _quit_route(self):
         logger.info('Shutdown Route')
         if self._is_started.is_set():
@@ -0,0 +1,168 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from mapadroid.route.routecalc.calculate_route_quick import \
+    project_equirectangular
+from mapadroid.utils.collections import Location
+from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import (SUBROUTE_BALANCE_TOLERANCE,
+                                          SUBROUTE_COORD_COST_METERS,
+                                          SUBROUTE_REBALANCE_MAX_SWEEPS)
+
+logger = get_logger(LoggerEnums.routemanager)
+
+
+class SubroutePartitioner:
+    """
+    Cuts a route (treated as a cycle) into contiguous subroutes of about the same cost, i.e. the distance walked plus
+     coord_cost_meters per coord visited. Subroutes of workers already assigned are kept and only the boundaries
+     between subroutes are moved: workers joining split the most costly subroute, subroutes of workers leaving are
+     taken over by the preceding worker and neighbouring subroutes are balanced afterwards.
+    """
+
+    def __init__(self, route: List[Location], coord_cost_meters: float = SUBROUTE_COORD_COST_METERS):
+        self._route: List[Location] = route
+        self._amount: int = len(route)
+        self._positions: Dict[Location, int] = {}
+        for position, location in enumerate(route):
+            self._positions.setdefault(location, position)
+        costs: np.ndarray = np.zeros(self._amount)
+        if self._amount > 1:
+            points: np.ndarray = project_equirectangular([(location.lat, location.lng) for location in route])
+            # Cost of a coord is the way to it from the previous coord plus the time spent at it
+            costs = np.hypot(*(points - np.roll(points, 1, axis=0)).T)
+        costs += coord_cost_meters
+        # Prefix sums of two rounds to look up subroutes wrapping around the end of the route
+        self._prefix: np.ndarray = np.concatenate(([0.0], np.cumsum(np.concatenate((costs, costs)))))
+        self._total: float = float(self._prefix[self._amount])
+
+    def get_cost(self, start: int, end: int) -> float:
+        """
+        Returns: Cost of the subroute from start up to end (exclusive), wrapping around the end of the route. The whole
+         route if start equals end.
+        """
+        offset: int = (end - start) % self._amount or self._amount
+        return float(self._prefix[start + offset] - self._prefix[start])
+
+    def partition(self, origins: List[str], previous_subroutes: Dict[str, List[Location]]) -> Dict[str, int]:
+        """
+        Args:
+            origins: Workers to assign subroutes to, workers without a previous subroute are assigned in that order
+            previous_subroutes: Subroutes assigned before per worker
+
+        Returns: Position in the route each worker's subroute starts at. Every worker is assigned at least one coord
+         (the amount of workers must not exceed the length of the route).
+        """
+        if not origins or len(origins) > self._amount:
+            raise ValueError("Unable to split {} coords among {} workers".format(self._amount, len(origins)))
+        starts: Dict[int, str] = {}
+        for origin in origins:
+            start: Optional[int] = self.__get_previous_start(previous_subroutes.get(origin))
+            if start is not None and start not in starts:
+                starts[start] = origin
+        if not starts:
+            return self.__partition_evenly(origins)
+        ordered: List[List] = [[origin, start] for start, origin in sorted(starts.items())]
+        for origin in origins:
+            if origin not in starts.values():
+                self.__split_most_costly(ordered, origin)
+        self.__balance(ordered)
+        return {origin: start for origin, start in ordered}
+
+    def get_subroutes(self, starts: Dict[str, int]) -> Dict[str, List[Location]]:
+        """
+        Returns: The subroute per worker, from its start up to the start of the following subroute
+        """
+        ordered: List = sorted(starts.items(), key=lambda item: item[1])
+        subroutes: Dict[str, List[Location]] = {}
+        for index, (origin, start) in enumerate(ordered):
+            end: int = ordered[(index + 1) % len(ordered)][1]
+            if end > start:
+                subroutes[origin] = self._route[start:end]
+            else:
+                subroutes[origin] = self._route[start:] + self._route[:end]
+        return subroutes
+
+    def get_costs(self, starts: Dict[str, int]) -> Dict[str, float]:
+        ordered: List = sorted(starts.items(), key=lambda item: item[1])
+        return {origin: self.get_cost(start, ordered[(index + 1) % len(ordered)][1])
+                for index, (origin, start) in enumerate(ordered)}
+
+    def __get_previous_start(self, previous_subroute: Optional[List[Location]]) -> Optional[int]:
+        # Coords of the previous subroute may have been visited and removed from the route meanwhile
+        for location in previous_subroute or []:
+            position: Optional[int] = self._positions.get(location, None)
+            if position is not None:
+                return position
+        return None
+
+    def __partition_evenly(self, origins: List[str]) -> Dict[str, int]:
+        starts: Dict[str, int] = {}
+        previous: int = -1
+        for index, origin in enumerate(origins):
+            start: int = self.__find_closest(self._total * index / len(origins))
+            # Leave at least one coord to each worker
+            start = min(max(start, previous + 1), self._amount - (len(origins) - index))
+            starts[origin] = start
+            previous = start
+        return starts
+
+    def __find_closest(self, target: float) -> int:
+        """
+        Returns: Position in the prefix sums closest to the target cost
+        """
+        position: int = min(int(np.searchsorted(self._prefix, target)), len(self._prefix) - 1)
+        if position > 0 and target - self._prefix[position - 1] < self._prefix[position] - target:
+            position -= 1
+        return position
+
+    def __find_cut(self, start: int, end: int, share: float) -> int:
+        """
+        Returns: Position between start and end (exclusive) splitting the subroute closest to the share of its cost
+        """
+        length: int = (end - start) % self._amount or self._amount
+        cut: int = self.__find_closest(self._prefix[start] + self.get_cost(start, end) * share)
+        offset: int = min(max(cut - start, 1), length - 1)
+        return (start + offset) % self._amount
+
+    def __split_most_costly(self, ordered: List[List], origin: str) -> None:
+        most_costly: int = -1
+        highest_cost: float = -1.0
+        for index, (_, start) in enumerate(ordered):
+            end: int = ordered[(index + 1) % len(ordered)][1]
+            if ((end - start) % self._amount or self._amount) < 2:
+                # A single coord is not split
+                continue
+            cost: float = self.get_cost(start, end)
+            if cost > highest_cost:
+                most_costly, highest_cost = index, cost
+        start: int = ordered[most_costly][1]
+        end: int = ordered[(most_costly + 1) % len(ordered)][1]
+        ordered.insert(most_costly + 1, [origin, self.__find_cut(start, end, 0.5)])
+
+    def __balance(self, ordered: List[List]) -> None:
+        """
+        Moves the boundary between each pair of neighbouring subroutes to split the cost of both equally, until the
+         subroutes are balanced or SUBROUTE_REBALANCE_MAX_SWEEPS sweeps are done
+        """
+        amount: int = len(ordered)
+        if amount < 2:
+            return
+        average: float = self._total / amount
+        for _ in range(SUBROUTE_REBALANCE_MAX_SWEEPS):
+            costs: List[float] = [self.get_cost(start, ordered[(index + 1) % amount][1])
+                                  for index, (_, start) in enumerate(ordered)]
+            if max(costs) <= average * SUBROUTE_BALANCE_TOLERANCE:
+                return
+            moved: bool = False
+            for index in range(amount):
+                start: int = ordered[index][1]
+                following: List = ordered[(index + 1) % amount]
+                end: int = ordered[(index + 2) % amount][1]
+                cut: int = self.__find_cut(start, end, 0.5)
+                if cut != following[1]:
+                    following[1] = cut
+                    moved = True
+            if not moved:
+                return
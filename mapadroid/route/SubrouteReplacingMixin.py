@@ -1,13 +1,9 @@
-import asyncio
-import collections
-import concurrent.futures
-import math
 from abc import ABC
-from operator import itemgetter
 from typing import Collection, Dict, List, Optional
 
 from mapadroid.route.RouteManagerBase import RouteManagerBase
 from mapadroid.route.RoutePoolEntry import RoutePoolEntry
+from mapadroid.route.SubroutePartitioner import SubroutePartitioner
 from mapadroid.utils.collections import Location
 from mapadroid.utils.geo import get_distance_of_two_points_in_meters
 from mapadroid.utils.logging import LoggerEnums, get_logger
@@ -31,74 +27,40 @@ class SubrouteReplacingMixin(RouteManagerBase, ABC):
                                          if location not in self._coords_to_be_ignored]
         logger.info("Calculating routepool for current route of length {} for {} routepool entries",
                     len(coords_to_use), len(routepool))
-        new_subroute_length = math.floor(len(coords_to_use) /
-                                         len(routepool))
-        reduced_routepools = [(origin, routepool[origin].time_added) for origin in
-                              routepool]
-        sorted_routepools = sorted(reduced_routepools, key=itemgetter(1))
-        if new_subroute_length == 0:
+        # we want to order the dict by the time's we added the workers to the areas
+        sorted_routepools: List[str] = sorted(routepool, key=lambda origin: routepool[origin].time_added)
+        if len(coords_to_use) < len(routepool):
             # recursively update the routepool until a single worker handles the leftover coords
-            reduced_routepool_to_process = {origin: routepool[origin] for origin, time_added in sorted_routepools[:-1]}
+            reduced_routepool_to_process = {origin: routepool[origin] for origin in sorted_routepools[:-1]}
             return await self._worker_changed_update_routepools(reduced_routepool_to_process)
 
-        extra_length_workers = len(coords_to_use) % len(routepool)
-        temp_total_round: collections.deque = collections.deque(coords_to_use)
-
-        if extra_length_workers > 0:
-            logger.debug("New subroute length: {}-{}", new_subroute_length, new_subroute_length + 1)
-        else:
-            logger.debug("New subroute length: {}", new_subroute_length)
-
-        # we want to order the dict by the time's we added the workers to the areas
-        # we first need to build a list of tuples with only origin, time_added
         logger.debug("Checking routepools in the following order: {}", sorted_routepools)
-        loop = asyncio.get_running_loop()
-        with concurrent.futures.ProcessPoolExecutor() as pool:
-            routepool = await loop.run_in_executor(pool, SubrouteReplacingMixin._populate_subroutes,
-                                                   extra_length_workers, new_subroute_length, routepool,
-                                                   sorted_routepools,
-                                                   temp_total_round)
+        # Linear in the length of the route, cheaper than passing the routepool to another process and back
+        partitioner: SubroutePartitioner = SubroutePartitioner(coords_to_use)
+        starts: Dict[str, int] = partitioner.partition(
+            sorted_routepools, {origin: entry.subroute for origin, entry in routepool.items()})
+        logger.debug("New subroute costs: {}", {origin: round(cost) for origin, cost
+                                                in partitioner.get_costs(starts).items()})
+        for origin, new_subroute in partitioner.get_subroutes(starts).items():
+            logger.debug("Replacing subroute of {}", origin)
+            SubrouteReplacingMixin._replace_subroute(routepool[origin], new_subroute)
 
         logger.debug("Done updating subroutes")
         return routepool
 
     @staticmethod
-    def _populate_subroutes(extra_length_workers, new_subroute_length, routepool, sorted_routepools,
-                            temp_total_round):
-        i: int = 0
-        for origin, _time_added in sorted_routepools:
-            entry: RoutePoolEntry = routepool[origin]
-            logger.debug("Collecting new subroute for {}", origin)
-            # let's assume a worker has already been removed or added to the dict (keys)...
-
-            new_subroute: List[Location] = []
-            subroute_index: int = 0
-            new_subroute_actual_length = new_subroute_length
-            if i < extra_length_workers:
-                new_subroute_actual_length += 1
-            while len(temp_total_round) > 0 and subroute_index < new_subroute_actual_length:
-                subroute_index += 1
-                new_subroute.append(temp_total_round.popleft())
-
-            i += 1
-            logger.debug("Replacing subroute of {}", origin)
-            entry.subroute = new_subroute
-            # Set the queue for the new subroute accordingly
-            # Search for the closest spot within old queue and only start from there
-            closest_to_old_queue: Optional[Location] = SubrouteReplacingMixin._find_closest_location(
-                next(iter(entry.queue)) if entry.queue else None,
-                new_subroute)
-            entry.queue.clear()
-            if not closest_to_old_queue:
-                [entry.queue.append(i) for i in new_subroute]
-            else:
-                found: bool = False
-                for loc in new_subroute:
-                    if loc == closest_to_old_queue:
-                        found = True
-                    if found:
-                        entry.queue.append(loc)
-        return routepool
+    def _replace_subroute(entry: RoutePoolEntry, new_subroute: List[Location]) -> None:
+        entry.subroute = new_subroute
+        # Set the queue for the new subroute accordingly
+        # Search for the closest spot within old queue and only start from there
+        closest_to_old_queue: Optional[Location] = SubrouteReplacingMixin._find_closest_location(
+            next(iter(entry.queue)) if entry.queue else None,
+            new_subroute)
+        entry.queue.clear()
+        if not closest_to_old_queue:
+            entry.queue.extend(new_subroute)
+        else:
+            entry.queue.extend(new_subroute[new_subroute.index(closest_to_old_queue):])
 
     @staticmethod
     def _find_closest_location(location: Optional[Location], route: Collection[Location]) -> Optional[Location]:
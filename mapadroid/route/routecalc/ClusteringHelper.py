@@ -1,8 +1,9 @@
-from typing import Tuple, List
+from typing import Dict, List, Set, Tuple
 
 import s2sphere
 from loguru import logger
 
+from mapadroid.route.routecalc.RelationsIndex import RelationsIndex
 from mapadroid.utils.collections import Relation, Location
 from mapadroid.utils.geo import (get_distance_of_two_points_in_meters,
                                  get_middle_of_coord_list)
@@ -18,41 +19,29 @@ class ClusteringHelper:
         self.useS2 = use_s2
         self.S2level = s2_level
 
-    def _get_relations_in_range_within_time(self, queue: List[Tuple[int, Location]], max_radius):
+    def _get_relations_in_range_within_time(self, queue: List[Tuple[int, Location]], max_radius,
+                                            index: RelationsIndex):
         relations = {}
         for event in queue:
-            for other_event in queue:
-                if event[1].lat == other_event[1].lat and event[1].lng == other_event[1].lng and \
-                        event not in relations.keys():
-                    relations[event] = []
-                distance = get_distance_of_two_points_in_meters(event[1].lat, event[1].lng,
-                                                                other_event[1].lat, other_event[1].lng)
+            if index.add_event(event):
+                relations[event] = []
+        for event, relations_of_event in relations.items():
+            # avoid duplicates, the first event in the queue at a location is related to
+            locations_present: Set[Location] = set()
+            for other_event in index.get_events_near(event[1], max_radius * 2):
                 # we will always build relations from the event at hand subtracted by the event inspected
                 timedelta = event[0] - other_event[0]
-                if 0 <= distance <= max_radius * 2 and 0 <= timedelta <= self.max_timedelta_seconds:
-                    if event not in relations.keys():
-                        relations[event] = []
-                    # avoid duplicates
-                    already_present = False
-                    for relation in relations[event]:
-                        if relation[0][1].lat == other_event[1].lat and \
-                                relation[0][1].lng == other_event[1].lng:
-                            already_present = True
-                    if not already_present:
-                        relations[event].append(
-                            Relation(other_event, distance, timedelta))
+                if not 0 <= timedelta <= self.max_timedelta_seconds or other_event[1] in locations_present:
+                    continue
+                distance = get_distance_of_two_points_in_meters(event[1].lat, event[1].lng,
+                                                                other_event[1].lat, other_event[1].lng)
+                if 0 <= distance <= max_radius * 2:
+                    locations_present.add(other_event[1])
+                    relation: Relation = Relation(other_event, distance, timedelta)
+                    relations_of_event.append(relation)
+                    index.add_relation(event, relation)
         return relations
 
-    @staticmethod
-    def _get_most_west_amongst_relations(relations):
-        selected = list(relations.keys())[0]
-        for event in relations.keys():
-            if event[1].lng < selected[1].lng:
-                selected = event
-            elif event[1].lng == selected[1].lng and event[1].lat > selected[1].lat:
-                selected = event
-        return selected
-
     def _get_farthest_in_relation(self, to_be_inspected):
         # retrieve the relation farthest within the given timedelta, do not bother about maximizing the timedelta
         # if a coord is not within the given timedeltas, it will simply remain in the original set anyway ;)
@@ -67,14 +56,20 @@ class ClusteringHelper:
         return farthest.other_event, distance
 
     def _get_count_and_coords_in_circle_within_timedelta(self, middle, relations, earliest_timestamp,
-                                                         latest_timestamp, max_radius):
+                                                         latest_timestamp, max_radius, index: RelationsIndex):
         inside_circle = []
         highest_timedelta = 0
         if self.useS2:
             region = s2sphere.CellUnion(
                 S2Helper.get_s2cells_from_circle(middle.lat, middle.lng, self.max_radius, self.S2level))
+            # The cells covering the circle may exceed its radius
+            candidates = relations
+        else:
+            # Events out of range do not change the circle
+            candidates = [event for event in index.get_events_near(middle, max_radius, with_clustered=True)
+                          if event in relations]
 
-        for event_relations in relations:
+        for event_relations in candidates:
             # exclude previously clustered events...
             if len(event_relations) == 4 and event_relations[3]:
                 inside_circle.append(event_relations)
@@ -125,7 +120,7 @@ class ClusteringHelper:
                 latest = item[0]
         return latest
 
-    def _get_circle(self, event, to_be_inspected, relations, max_radius):
+    def _get_circle(self, event, to_be_inspected, relations, max_radius, index: RelationsIndex):
         if len(to_be_inspected) == 0:
             return event, [event]
         elif len(to_be_inspected) == 1:
@@ -161,7 +156,7 @@ class ClusteringHelper:
         count_inside, events_in_circle, highest_timedelta, latest_timestamp = \
             self._get_count_and_coords_in_circle_within_timedelta(middle, relations,
                                                                   earliest_timestamp, latest_timestamp,
-                                                                  max_radius)
+                                                                  max_radius, index)
         middle_event = (latest_timestamp, middle_event[1],
                         highest_timedelta, middle_event[3])
         if count_inside <= self.max_count_per_circle and count_inside == len(to_be_inspected):
@@ -169,41 +164,42 @@ class ClusteringHelper:
         elif count_inside > self.max_count_per_circle:
             to_be_inspected = [
                 to_keep for to_keep in to_be_inspected if not to_keep.other_event == farthest_away]
-            return self._get_circle(event, to_be_inspected, relations, distance_to_farthest)
+            return self._get_circle(event, to_be_inspected, relations, distance_to_farthest, index)
         else:
             return middle_event, events_in_circle
 
     @staticmethod
-    def _remove_coords_from_relations(relations, events_to_be_removed):
-        for source_event, relations_to_source in list(relations.items()):
-            # iterate relations, remove anything matching events_to_be_removed
-            for event in events_to_be_removed:
-                if event == source_event:
-                    relations.pop(source_event)
-                    break
-                # iterate through the entire distance relations as well...
-                for relation in relations_to_source:
-                    if relation.other_event[1] == event[1]:
-                        relations[source_event].remove(relation)
+    def _remove_coords_from_relations(relations: Dict, events_to_be_removed, index: RelationsIndex):
+        for event in events_to_be_removed:
+            relations.pop(event, None)
+        # only the relations of events related to the locations removed need to be inspected
+        for location in {event[1] for event in events_to_be_removed}:
+            for source_event in index.pop_events_referencing(location):
+                relations_to_source = relations.get(source_event, None)
+                if relations_to_source:
+                    # modified in place as the relations may be inspected still
+                    relations_to_source[:] = [relation for relation in relations_to_source
+                                              if relation.other_event[1] != location]
         return relations
 
-    def _sum_up_relations(self, relations) -> List[Tuple[int, Location]]:
+    def _sum_up_relations(self, relations, index: RelationsIndex) -> List[Tuple[int, Location]]:
         final_set: List[Tuple[int, Location]] = []
 
         while len(relations) > 0:
-            west_next = self._get_most_west_amongst_relations(relations)
+            west_next = index.get_most_west(relations)
             try:
                 middle_event, events_to_be_removed = self._get_circle(west_next, relations[west_next], relations,
-                                                                      self.max_radius)
+                                                                      self.max_radius, index)
                 final_set.append((middle_event[0], middle_event[1]))
                 relations = self._remove_coords_from_relations(
-                    relations, events_to_be_removed)
+                    relations, events_to_be_removed, index)
             except Exception as e:
                 logger.exception(e)
         return final_set
 
     def get_clustered(self, queue: List[Tuple[int, Location]]) -> List[Tuple[int, Location]]:
+        index: RelationsIndex = RelationsIndex(self.max_radius * 2)
         relations = self._get_relations_in_range_within_time(
-            queue, max_radius=self.max_radius)
-        summed_up = self._sum_up_relations(relations)
+            queue, max_radius=self.max_radius, index=index)
+        summed_up = self._sum_up_relations(relations, index)
         return summed_up
@@ -0,0 +1,91 @@
+import heapq
+import math
+from typing import Dict, List, Tuple
+
+from mapadroid.utils.collections import Location, Relation
+
+# Same radius as get_distance_of_two_points_in_meters
+EARTH_RADIUS_METERS: float = 6373000.0
+# Cells are enlarged slightly to not miss events at the edge due to rounding
+CELL_MARGIN: float = 1 + 1e-6
+
+
+class RelationsIndex:
+    """
+    Indexes the events of a clustering run. Events are placed on a grid of cubes of points on the unit sphere to find
+     the events close to a location by inspecting the neighbouring cells only. The straight-line distance of two points
+     of the unit sphere grows with the distance on the surface, so the grid does not distort towards the poles.
+     Additionally keeps track of the events referencing a location in their relations and the order events were added
+     in (results are returned in that order as the clustering depends on it).
+    """
+
+    def __init__(self, cell_size_meters: float):
+        self._cell_size: float = RelationsIndex.__chord(cell_size_meters) * CELL_MARGIN + 1e-12
+        self._cells: Dict[Tuple[int, int, int], List[Tuple[int, Tuple]]] = {}
+        self._positions: Dict[Tuple, int] = {}
+        # Events previously clustered (middle events) are considered in range of any circle
+        self._clustered: List[Tuple[int, Tuple]] = []
+        self._referenced_by: Dict[Location, List[Tuple]] = {}
+        self._most_west: List[Tuple[float, float, int, Tuple]] = []
+
+    @staticmethod
+    def __chord(distance_meters: float) -> float:
+        return 2 * math.sin(min(max(distance_meters, 0) / (2 * EARTH_RADIUS_METERS), math.pi / 2))
+
+    def __cell_of(self, location: Location) -> Tuple[int, int, int]:
+        lat: float = math.radians(location.lat)
+        lng: float = math.radians(location.lng)
+        return (math.floor(math.cos(lat) * math.cos(lng) / self._cell_size),
+                math.floor(math.cos(lat) * math.sin(lng) / self._cell_size),
+                math.floor(math.sin(lat) / self._cell_size))
+
+    def add_event(self, event: Tuple) -> bool:
+        """
+        Returns: False if the event has been added already
+        """
+        if event in self._positions:
+            return False
+        position: int = len(self._positions)
+        self._positions[event] = position
+        self._cells.setdefault(self.__cell_of(event[1]), []).append((position, event))
+        if len(event) == 4 and event[3]:
+            self._clustered.append((position, event))
+        heapq.heappush(self._most_west, (event[1].lng, -event[1].lat, position, event))
+        return True
+
+    def get_events_near(self, location: Location, radius_meters: float, with_clustered: bool = False) -> List[Tuple]:
+        """
+        Returns: The events within the radius of the location and possibly some more close to it, in the order the
+         events were added. Events previously clustered are included regardless of their distance if requested.
+        """
+        span: int = math.ceil(RelationsIndex.__chord(radius_meters) * CELL_MARGIN / self._cell_size)
+        if (2 * span + 1) ** 3 >= len(self._cells):
+            cells = self._cells.values()
+        else:
+            cell_x, cell_y, cell_z = self.__cell_of(location)
+            cells = [self._cells[cell] for cell in
+                     ((cell_x + dx, cell_y + dy, cell_z + dz) for dx in range(-span, span + 1)
+                      for dy in range(-span, span + 1) for dz in range(-span, span + 1))
+                     if cell in self._cells]
+        events: List[Tuple[int, Tuple]] = [entry for cell in cells for entry in cell]
+        if with_clustered:
+            events.extend(self._clustered)
+        return [event for _, event in sorted(set(events), key=lambda entry: entry[0])]
+
+    def add_relation(self, source_event: Tuple, relation: Relation) -> None:
+        self._referenced_by.setdefault(relation.other_event[1], []).append(source_event)
+
+    def pop_events_referencing(self, location: Location) -> List[Tuple]:
+        """
+        Returns: The events that had a relation to the location added, the location is forgotten
+        """
+        return self._referenced_by.pop(location, [])
+
+    def get_most_west(self, relations: Dict[Tuple, List[Relation]]) -> Tuple:
+        """
+        Returns: The event of the relations farthest west, the northern one if multiple are as far west and the one
+         added first if multiple are at the same location
+        """
+        while self._most_west[0][3] not in relations:
+            heapq.heappop(self._most_west)
+        return self._most_west[0][3]
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+from mapadroid.utils.collections import Location
+from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import ROUTECALC_CACHE_VERSION
+from mapadroid.utils.madGlobals import MadGlobals
+
+logger = get_logger(LoggerEnums.routecalc)
+
+
+class RoutecalcCache:
+    """
+    Routes calculated before, stored in a directory by the hash of the input of the calculation (the coordinates
+     regardless of their order and the settings of the calculation). Areas of the same geofence and settings share
+     their routes. The routes used least recently are removed once more than max_entries are stored.
+    """
+    __shared: Optional[RoutecalcCache] = None
+    _SUFFIX: str = ".json"
+
+    def __init__(self, path: str, max_entries: int):
+        self._path: str = path
+        self._max_entries: int = max(1, max_entries)
+        os.makedirs(self._path, exist_ok=True)
+
+    @staticmethod
+    def get_shared() -> Optional[RoutecalcCache]:
+        """
+        Returns: The cache as configured (routecalc_cache_path, routecalc_cache_entries), None if disabled
+        """
+        args = MadGlobals.application_args
+        if args is None or args.routecalc_cache_entries <= 0:
+            return None
+        if RoutecalcCache.__shared is None:
+            path: str = args.routecalc_cache_path or os.path.join(args.temp_path, "routecalc_cache")
+            try:
+                RoutecalcCache.__shared = RoutecalcCache(path, args.routecalc_cache_entries)
+            except OSError as e:
+                logger.warning("Unable to create the routecalc cache in {}: {}", path, e)
+                return None
+        return RoutecalcCache.__shared
+
+    @staticmethod
+    def get_key(coords: List[Location], algorithm: str, max_radius, max_coords_within_radius, use_s2: bool,
+                s2_level: int, time_budget: float = 0) -> str:
+        """
+        Args:
+            coords: Coordinates to be routed, the order does not matter
+            algorithm: Name of the algorithm effectively calculating the tour
+            max_radius:
+            max_coords_within_radius:
+            use_s2:
+            s2_level: Only considered if use_s2 is set
+            time_budget: Seconds spent improving the route
+
+        Returns: Hash identifying the input of a route calculation
+        """
+        normalized: Dict = {
+            "version": ROUTECALC_CACHE_VERSION,
+            "algorithm": algorithm,
+            "max_radius": max_radius,
+            "max_coords_within_radius": max_coords_within_radius,
+            "use_s2": bool(use_s2),
+            "s2_level": s2_level if use_s2 else None,
+            "time_budget": float(time_budget),
+            "coords": sorted((float(coord.lat), float(coord.lng)) for coord in coords)
+        }
+        return hashlib.sha256(json.dumps(normalized, separators=(",", ":")).encode()).hexdigest()
+
+    def __file_of(self, key: str) -> str:
+        return os.path.join(self._path, key + RoutecalcCache._SUFFIX)
+
+    def get(self, key: str) -> Optional[List[Location]]:
+        """
+        Returns: The route cached for the key, None if there is none
+        """
+        filename: str = self.__file_of(key)
+        try:
+            with open(filename, "r") as cache_file:
+                route: List[Location] = [Location(float(lat), float(lng)) for lat, lng in json.load(cache_file)]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Discarding unreadable route cached in {}: {}", filename, e)
+            self.__remove(filename)
+            return None
+        try:
+            # Mark as used recently
+            os.utime(filename)
+        except OSError:
+            pass
+        return route
+
+    def put(self, key: str, route: List[Location]) -> None:
+        filename: str = self.__file_of(key)
+        temp_filename: str = "{}.{}.tmp".format(filename, os.getpid())
+        try:
+            with open(temp_filename, "w") as cache_file:
+                json.dump([(coord.lat, coord.lng) for coord in route], cache_file, separators=(",", ":"))
+            # Replacing is atomic, concurrent readers never see a partial route
+            os.replace(temp_filename, filename)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Failed caching route in {}: {}", filename, e)
+            self.__remove(temp_filename)
+            return
+        self.__evict()
+
+    def __evict(self) -> None:
+        try:
+            with os.scandir(self._path) as entries:
+                cached = [(entry.stat().st_mtime, entry.path) for entry in entries
+                          if entry.name.endswith(RoutecalcCache._SUFFIX)]
+        except OSError as e:
+            logger.warning("Failed listing routes cached: {}", e)
+            return
+        if len(cached) <= self._max_entries:
+            return
+        cached.sort()
+        for _, filename in cached[:len(cached) - self._max_entries]:
+            self.__remove(filename)
+
+    @staticmethod
+    def __remove(filename: str) -> None:
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
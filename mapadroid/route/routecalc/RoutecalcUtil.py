@@ -1,27 +1,65 @@
-import asyncio
-import concurrent.futures
 from timeit import default_timer as timer
-from typing import List, Optional, Tuple
+from typing import Dict, Hashable, List, Optional, Tuple
 
 from loguru import logger
 
 from mapadroid.db.DbWrapper import DbWrapper
 from mapadroid.db.helper import SettingsRoutecalcHelper
 from mapadroid.db.model import SettingsRoutecalc
-from mapadroid.route.routecalc.calculate_route_all import route_calc_all
+from mapadroid.route.routecalc.calculate_route_all import (
+    get_effective_algorithm, get_time_budget, route_calc_all)
+from mapadroid.route.routecalc.calculate_route_repair import (
+    get_change_ratio, route_repair_impl)
 from mapadroid.route.routecalc.ClusteringHelper import ClusteringHelper
+from mapadroid.route.routecalc.RoutecalcCache import RoutecalcCache
+from mapadroid.route.routecalc.RoutecalcWorkerPool import RoutecalcWorkerPool
 from mapadroid.utils.collections import Location
 from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
-from mapadroid.utils.madGlobals import RoutecalculationTypes
+from mapadroid.utils.madGlobals import (MadGlobals, RoutecalcJobPriority,
+                                        RoutecalcJobSupersededError,
+                                        RoutecalculationTypes)
 
 
 class RoutecalcUtil:
+    # Latest calculation requested per job_key, calculations requested before are superseded
+    _latest_calculations: Dict[Hashable, object] = {}
+
     @staticmethod
     async def calculate_route(db_wrapper: DbWrapper, routecalc_id: int, coords: List[Location], max_radius,
                               max_coords_within_radius,
                               load_persisted_route, algorithm: RoutecalculationTypes,
                               use_s2, s2_level, route_name,
-                              overwrite_persisted_route: bool = False) -> List[Location]:
+                              overwrite_persisted_route: bool = False,
+                              job_key: Optional[Hashable] = None,
+                              priority: RoutecalcJobPriority = RoutecalcJobPriority.BACKGROUND,
+                              previous_route: Optional[List[Location]] = None) -> List[Location]:
+        """
+        Calculates the route in the routecalc workers of the process. recalc_status of the routecalc is set while the
+         calculation is queued or running. Routes calculated before for the same coords and settings are taken from
+         the RoutecalcCache instead. If a previous route is passed and the coords changed by no more than
+         routecalc_repair_max_change, the previous route is repaired rather than calculating a new one.
+
+        Raises: RoutecalcJobSupersededError if another calculation of the same job_key has been requested meanwhile
+         (including one taken from the RoutecalcCache). The recalc_status is left to the calculation superseding.
+        """
+        calculation: object = object()
+        if job_key is not None:
+            RoutecalcUtil._latest_calculations[job_key] = calculation
+        try:
+            return await RoutecalcUtil._calculate_route(db_wrapper, routecalc_id, coords, max_radius,
+                                                        max_coords_within_radius, load_persisted_route, algorithm,
+                                                        use_s2, s2_level, route_name, overwrite_persisted_route,
+                                                        job_key, priority, previous_route, calculation)
+        finally:
+            if job_key is not None and RoutecalcUtil._latest_calculations.get(job_key, None) is calculation:
+                del RoutecalcUtil._latest_calculations[job_key]
+
+    @staticmethod
+    async def _calculate_route(db_wrapper: DbWrapper, routecalc_id: int, coords: List[Location], max_radius,
+                               max_coords_within_radius, load_persisted_route, algorithm: RoutecalculationTypes,
+                               use_s2, s2_level, route_name, overwrite_persisted_route: bool,
+                               job_key: Optional[Hashable], priority: RoutecalcJobPriority,
+                               previous_route: Optional[List[Location]], calculation: object) -> List[Location]:
         async with db_wrapper as session, session:
             routecalc_entry: Optional[SettingsRoutecalc] = await SettingsRoutecalcHelper.get(session, routecalc_id)
             if load_persisted_route and routecalc_entry:
@@ -39,7 +77,25 @@ class RoutecalcUtil:
                 routecalc_entry.routecalc_id = routecalc_id
                 routecalc_entry.instance_id = db_wrapper.get_instance_id()
 
-            routecalc_entry.recalc_status = 1
+            cache: Optional[RoutecalcCache] = RoutecalcCache.get_shared() if coords else None
+            cache_key: Optional[str] = None
+            cached_route: Optional[List[Location]] = None
+            if cache:
+                cache_key = RoutecalcCache.get_key(coords, get_effective_algorithm(algorithm).name, max_radius,
+                                                   max_coords_within_radius, use_s2, s2_level, get_time_budget())
+                cached_route = cache.get(cache_key)
+            if cached_route is not None:
+                logger.info("Using route calculated before for {} ({} coords)", route_name, len(cached_route))
+                if job_key is not None:
+                    # Calculations requested before would overwrite the route with their result once done
+                    RoutecalcWorkerPool.get_shared().supersede(job_key)
+                if overwrite_persisted_route:
+                    await RoutecalcUtil._write_route_to_db_entry(routecalc_entry, cached_route)
+                    routecalc_entry.last_updated = DatetimeWrapper.now()
+                # Set by a calculation superseded
+                routecalc_entry.recalc_status = 0
+            else:
+                routecalc_entry.recalc_status = 1
             # Commit to make the recalc_status visible to others
             session.add(routecalc_entry)
 
@@ -48,28 +104,66 @@ class RoutecalcUtil:
             except Exception as e:
                 logger.exception(e)
                 await session.rollback()
+            if cached_route is not None:
+                return cached_route
 
+        try:
+            calculated_route, repaired = await RoutecalcUtil._calculate(coords, max_radius, max_coords_within_radius,
+                                                                        algorithm, use_s2, s2_level, route_name,
+                                                                        job_key, priority, previous_route,
+                                                                        calculation)
+            # Superseded between the jobs of the calculation
+            RoutecalcUtil._raise_if_superseded(job_key, calculation)
+        except RoutecalcJobSupersededError:
+            logger.info("Calculation of route {} has been superseded", route_name)
+            raise
+        except Exception:
+            await RoutecalcUtil._finish_recalc(db_wrapper, routecalc_id, None)
+            raise
+        if cache and not repaired:
+            # Repaired routes depend on the previous route as well
+            cache.put(cache_key, calculated_route)
+        await RoutecalcUtil._finish_recalc(db_wrapper, routecalc_id,
+                                           calculated_route if overwrite_persisted_route else None)
+        return calculated_route
+
+    @staticmethod
+    async def _calculate(coords: List[Location], max_radius, max_coords_within_radius,
+                         algorithm: RoutecalculationTypes, use_s2, s2_level, route_name,
+                         job_key: Optional[Hashable], priority: RoutecalcJobPriority,
+                         previous_route: Optional[List[Location]],
+                         calculation: object) -> Tuple[List[Location], bool]:
+        """
+        Returns: The route and whether it has been repaired rather than calculated from scratch
+        """
         calculated_route: List[Location] = []
         if use_s2:
             logger.debug("Using S2 method for calculation with S2 level: {}", s2_level)
 
         if len(coords) > 0 and max_radius and max_radius >= 1 and max_coords_within_radius:
             logger.info("Calculating route for {}", route_name)
-            loop = asyncio.get_running_loop()
-            with concurrent.futures.ProcessPoolExecutor() as pool:
-                calculated_route = await loop.run_in_executor(
-                    pool, RoutecalcUtil.get_less_coords, coords, max_radius, max_coords_within_radius, use_s2,
-                    s2_level)
+            RoutecalcUtil._raise_if_superseded(job_key, calculation)
+            calculated_route = await RoutecalcWorkerPool.get_shared().run(
+                RoutecalcUtil.get_less_coords, coords, max_radius, max_coords_within_radius, use_s2, s2_level,
+                key=job_key, priority=priority)
 
             logger.debug("Coords summed up to {} coords", len(calculated_route))
         logger.debug("Got {} coordinates", len(calculated_route))
         if len(calculated_route) < 3:
             logger.debug("less than 3 coordinates... not gonna take a shortest route on that")
+        elif previous_route and RoutecalcUtil._is_repairable(previous_route, calculated_route, route_name):
+            start = timer()
+            RoutecalcUtil._raise_if_superseded(job_key, calculation)
+            calculated_route = await RoutecalcWorkerPool.get_shared().run(
+                route_repair_impl, previous_route, calculated_route, route_name, key=job_key, priority=priority)
+            logger.info("Repaired route for {} in {:.2f} seconds", route_name, timer() - start)
+            return calculated_route, True
         else:
             logger.info("Calculating a short route through all those coords. Might take a while")
             start = timer()
-
-            sol_best = await route_calc_all(calculated_route, route_name, algorithm)
+            RoutecalcUtil._raise_if_superseded(job_key, calculation)
+            sol_best = await route_calc_all(calculated_route, route_name, algorithm, job_key=job_key,
+                                            priority=priority)
             end = timer()
 
             calc_dur = (end - start) / 60
@@ -83,10 +177,36 @@ class RoutecalcUtil:
             calculated_route = []
             for i in range(len(sol_best)):
                 calculated_route.append(calculated_route_old[int(sol_best[i])])
+        return calculated_route, False
+
+    @staticmethod
+    def _raise_if_superseded(job_key: Optional[Hashable], calculation: object) -> None:
+        """
+        Calculations superseded while not having a job in the RoutecalcWorkerPool must not submit further jobs
+         superseding the jobs of the latest calculation
+        """
+        if job_key is not None and RoutecalcUtil._latest_calculations.get(job_key, None) is not calculation:
+            raise RoutecalcJobSupersededError(job_key)
+
+    @staticmethod
+    def _is_repairable(previous_route: List[Location], coords: List[Location], route_name) -> bool:
+        max_change: float = 0.0
+        if MadGlobals.application_args is not None:
+            max_change = MadGlobals.application_args.routecalc_repair_max_change
+        if max_change <= 0:
+            return False
+        change_ratio: float = get_change_ratio(previous_route, coords)
+        if change_ratio > max_change:
+            logger.info("Coords of {} changed by {:.0%}, calculating a new route", route_name, change_ratio)
+            return False
+        return True
+
+    @staticmethod
+    async def _finish_recalc(db_wrapper: DbWrapper, routecalc_id: int, route_to_persist: Optional[List[Location]]):
         async with db_wrapper as session, session:
             routecalc_entry: Optional[SettingsRoutecalc] = await SettingsRoutecalcHelper.get(session, routecalc_id)
-            if overwrite_persisted_route:
-                await RoutecalcUtil._write_route_to_db_entry(routecalc_entry, calculated_route)
+            if route_to_persist is not None:
+                await RoutecalcUtil._write_route_to_db_entry(routecalc_entry, route_to_persist)
                 routecalc_entry.last_updated = DatetimeWrapper.now()
             routecalc_entry.recalc_status = 0
 
@@ -96,7 +216,6 @@ class RoutecalcUtil:
             except Exception as e:
                 logger.exception(e)
                 await session.rollback()
-        return calculated_route
 
     @staticmethod
     async def _write_route_to_db_entry(routecalc_entry: SettingsRoutecalc,
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+from asyncio import Task
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from mapadroid.utils.logging import LoggerEnums, get_logger, init_logging
+from mapadroid.utils.madConstants import ROUTECALC_DEFAULT_MAX_WORKERS
+from mapadroid.utils.madGlobals import (MadGlobals, RoutecalcJobPriority,
+                                        RoutecalcJobSupersededError)
+
+logger = get_logger(LoggerEnums.routecalc)
+
+
+def _init_worker(application_args) -> None:
+    if application_args is not None:
+        MadGlobals.application_args = application_args
+        init_logging(application_args, print_info=False)
+
+
+@dataclass
+class RoutecalcJob:
+    method: Callable
+    args: Tuple
+    priority: RoutecalcJobPriority
+    key: Optional[Hashable]
+    future: asyncio.Future = field(repr=False)
+
+
+class RoutecalcWorkerPool:
+    """
+    Long-lived pool of processes calculating routes shared by all routemanagers of the process rather than spawning
+     processes per calculation. Jobs are queued by priority (interactive before background, first in first out
+     otherwise) and at most size jobs run at once. Submitting a job of the same key as a job queued or running
+     supersedes the latter, the caller of the job superseded gets RoutecalcJobSupersededError.
+    """
+    __shared: Optional[RoutecalcWorkerPool] = None
+
+    def __init__(self, size: int):
+        self._size: int = max(1, size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._dispatchers: List[Task] = []
+        self._sequence = itertools.count()
+        # Latest job submitted per key
+        self._jobs_of_keys: Dict[Hashable, RoutecalcJob] = {}
+        self._running: int = 0
+
+    @staticmethod
+    def get_shared() -> RoutecalcWorkerPool:
+        """
+        Returns: The pool of the process, sized according to routecalc_workers
+        """
+        if RoutecalcWorkerPool.__shared is None:
+            size: int = 0
+            if MadGlobals.application_args is not None:
+                size = MadGlobals.application_args.routecalc_workers
+            if not size:
+                size = min(ROUTECALC_DEFAULT_MAX_WORKERS, os.cpu_count() or 1)
+            RoutecalcWorkerPool.__shared = RoutecalcWorkerPool(size)
+        return RoutecalcWorkerPool.__shared
+
+    @staticmethod
+    def shutdown_shared() -> None:
+        if RoutecalcWorkerPool.__shared is not None:
+            RoutecalcWorkerPool.__shared.shutdown()
+            RoutecalcWorkerPool.__shared = None
+
+    def __start(self) -> None:
+        if self._dispatchers:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._executor = self.__create_executor()
+        loop = asyncio.get_running_loop()
+        self._dispatchers = [loop.create_task(self.__dispatch()) for _ in range(self._size)]
+        logger.info("Started {} routecalc workers", self._size)
+
+    def __create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self._size, initializer=_init_worker,
+                                   initargs=(MadGlobals.application_args,))
+
+    def shutdown(self) -> None:
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()
+        self._dispatchers = []
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        while self._queue and not self._queue.empty():
+            _, _, job = self._queue.get_nowait()
+            job.future.cancel()
+        self._jobs_of_keys.clear()
+
+    def get_amount_queued(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def run(self, method: Callable, *args, key: Optional[Hashable] = None,
+                  priority: RoutecalcJobPriority = RoutecalcJobPriority.BACKGROUND) -> Any:
+        """
+        Runs the method in one of the processes of the pool. The method and the arguments need to be picklable.
+
+        Args:
+            method: Method to run
+            *args: Arguments passed to the method
+            key: Key identifying the route calculated. Jobs of the same key queued or running are superseded.
+            priority: Jobs of a lower priority value are run first
+
+        Returns: The value returned by the method
+        Raises: RoutecalcJobSupersededError if a job of the same key has been submitted meanwhile
+        """
+        self.__start()
+        job: RoutecalcJob = RoutecalcJob(method, args, priority, key, asyncio.get_running_loop().create_future())
+        if key is not None:
+            self.supersede(key)
+            self._jobs_of_keys[key] = job
+        self._queue.put_nowait((priority, next(self._sequence), job))
+        logger.debug("Queued routecalc job of {} with priority {}, {} jobs queued, {} running",
+                     key, priority.name, self._queue.qsize(), self._running)
+        try:
+            # Callers being cancelled cancel the job
+            return await job.future
+        finally:
+            if key is not None and self._jobs_of_keys.get(key, None) is job:
+                del self._jobs_of_keys[key]
+
+    def supersede(self, key: Hashable) -> None:
+        """
+        Supersedes the job of the key queued or running if any, e.g. once the route has been obtained otherwise. The
+         caller of the job gets RoutecalcJobSupersededError.
+        """
+        superseded: Optional[RoutecalcJob] = self._jobs_of_keys.pop(key, None)
+        if superseded and not superseded.future.done():
+            logger.info("Superseding routecalc job of {}", key)
+            superseded.future.set_exception(RoutecalcJobSupersededError(key))
+
+    async def __dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job = await self._queue.get()
+            if job.future.done():
+                # Cancelled or superseded while queued
+                continue
+            self._running += 1
+            executor: ProcessPoolExecutor = self._executor
+            try:
+                result = await loop.run_in_executor(executor, job.method, *job.args)
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except BrokenProcessPool as e:
+                if self._executor is executor:
+                    logger.warning("Routecalc worker died, restarting the routecalc workers")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = self.__create_executor()
+                if not job.future.done():
+                    job.future.set_exception(e)
+            except Exception as e:
+                if not job.future.done():
+                    # The traceback would reference the frame of the dispatcher, callers clearing the frames of
+                    # tracebacks (e.g. unittest's assertRaises) would finalize it. The traceback of the worker is
+                    # kept as the cause of the exception.
+                    job.future.set_exception(e.with_traceback(None))
+            else:
+                # The result of a job superseded is discarded
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self._running -= 1
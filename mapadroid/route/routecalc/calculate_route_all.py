@@ -1,18 +1,24 @@
-import asyncio
-import math
 import platform
-from concurrent.futures import ProcessPoolExecutor
-from typing import List
+import time
+from typing import Hashable, List, Optional
 
 import numpy as np
 
-from mapadroid.route.routecalc.calculate_route_quick import route_calc_impl
+from mapadroid.route.routecalc.calculate_route_improve import improve_route
+from mapadroid.route.routecalc.calculate_route_quick import (
+    project_equirectangular, route_calc_impl)
+from mapadroid.route.routecalc.RoutecalcWorkerPool import RoutecalcWorkerPool
 from mapadroid.utils.collections import Location
-from mapadroid.utils.logging import LoggerEnums, get_logger, init_logging
-from mapadroid.utils.madGlobals import MadGlobals, RoutecalculationTypes
+from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import ROUTECALC_ORTOOLS_MAX_MATRIX_COORDS
+from mapadroid.utils.madGlobals import (MadGlobals, RoutecalcJobPriority,
+                                        RoutecalculationTypes)
 
 logger = get_logger(LoggerEnums.routecalc)
 
+# Rows of the distance matrix computed at once
+DISTANCE_MATRIX_CHUNK: int = 512
+
 
 def is_or_tools_available() -> bool:
     or_tools_available: bool = False
@@ -30,35 +36,33 @@ def is_or_tools_available() -> bool:
     return or_tools_available
 
 
-def create_data_model(less_coordinates):
-    """Stores the data for the problem."""
-
-    data = {'locations': []}
+def get_effective_algorithm(algorithm: RoutecalculationTypes) -> RoutecalculationTypes:
+    """Returns the algorithm route_calc_all calculates the tour with."""
+    if is_or_tools_available() and algorithm.OR_TOOLS:
+        return RoutecalculationTypes.OR_TOOLS
+    return RoutecalculationTypes.TSP_QUICK
 
-    # ortools requires x,y data to be integers
-    # we will scale lat,lng to large numbers so that rounding won't adversely affect the path calculation
-    for coord in less_coordinates:
-        data['locations'].append((int(float(coord[0]) * 1e9), int(float(coord[1]) * 1e9)))
 
-    data['num_vehicles'] = 1  # calculate as if only one walker on route
-    data['depot'] = 0  # route will start at the first lat,lng
-    return data
+def get_time_budget() -> float:
+    """Returns the seconds to spend improving a route as configured (routecalc_time_budget)."""
+    if MadGlobals.application_args is None:
+        return 0.0
+    return max(0.0, MadGlobals.application_args.routecalc_time_budget)
 
 
-def compute_euclidean_distance_matrix(locations):
-    """Creates callback to return distance between points."""
-    distances = {}
-    for from_counter, from_node in enumerate(locations):
-        distances[from_counter] = {}
-        for to_counter, to_node in enumerate(locations):
-            if from_counter == to_counter:
-                distances[from_counter][to_counter] = 0
-            else:
-                # Euclidean distance
-                distances[from_counter][to_counter] = (int(
-                    math.hypot((from_node[0] - to_node[0]),
-                               (from_node[1] - to_node[1]))))
-    return distances
+def create_distance_matrix(less_coordinates) -> np.ndarray:
+    """
+    Distances between the coordinates in meters. OR-Tools requires integer costs, meters are precise enough for
+    routes while int32 keeps the matrix small.
+    """
+    points = project_equirectangular(less_coordinates)
+    distance_matrix = np.empty((len(points), len(points)), dtype=np.int32)
+    # Row by row blocks to not hold the float distances of all pairs at once
+    for start in range(0, len(points), DISTANCE_MATRIX_CHUNK):
+        chunk = points[start:start + DISTANCE_MATRIX_CHUNK]
+        distance_matrix[start:start + len(chunk)] = np.rint(
+            np.hypot(chunk[:, None, 0] - points[None, :, 0], chunk[:, None, 1] - points[None, :, 1]))
+    return distance_matrix
 
 
 def format_solution(manager, routing, solution):
@@ -72,37 +76,43 @@ def format_solution(manager, routing, solution):
     return route_through_nodes
 
 
-def _run_in_process_executor(method, less_coordinates, route_name):
-    # Utility method to init logging in process executor...
-    init_logging(MadGlobals.application_args, print_info=False)
+def _run_in_process_executor(method, less_coordinates, route_name, time_budget: float = 0):
+    # Logging is set up by the initializer of the routecalc workers
     try:
-        return method(less_coordinates, route_name)
+        return method(less_coordinates, route_name, time_budget)
     except Exception as e:
         logger.critical("Failed calculating route: {}", e)
         logger.exception(e)
 
 
-def route_calc_ortools(less_coordinates, route_name):
+def route_calc_quick(less_coordinates, route_name, time_budget: float = 0):
+    path = route_calc_impl(less_coordinates, route_name)
+    return improve_route(less_coordinates, path, time_budget, route_name)
+
+
+def route_calc_ortools(less_coordinates, route_name, time_budget: float = 0):
     from ortools.constraint_solver import pywrapcp, routing_enums_pb2
-    data = create_data_model(less_coordinates)
 
-    # Create the routing index manager.
-    manager = pywrapcp.RoutingIndexManager(len(data['locations']),
-                                           data['num_vehicles'], data['depot'])
+    # Create the routing index manager, calculate as if only one walker on route starting at the first lat,lng
+    manager = pywrapcp.RoutingIndexManager(len(less_coordinates), 1, 0)
 
     # Create Routing Model.
     routing = pywrapcp.RoutingModel(manager)
 
-    distance_matrix = compute_euclidean_distance_matrix(data['locations'])
+    distance_matrix = create_distance_matrix(less_coordinates)
+    if hasattr(routing, "RegisterTransitMatrix") and len(less_coordinates) <= ROUTECALC_ORTOOLS_MAX_MATRIX_COORDS:
+        # Costs are looked up by the solver without calling back into Python
+        transit_callback_index = routing.RegisterTransitMatrix(distance_matrix.tolist())
+    else:
+        if len(less_coordinates) > ROUTECALC_ORTOOLS_MAX_MATRIX_COORDS:
+            logger.info("Looking up the distances of the {} coords of route {} by callback to keep the memory "
+                        "used low, OR-Tools will take longer", len(less_coordinates), route_name)
 
-    def distance_callback(from_index, to_index):
-        """Returns the distance between the two nodes."""
-        # Convert from routing variable Index to distance matrix NodeIndex.
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        return distance_matrix[from_node][to_node]
+        def distance_callback(from_index, to_index):
+            """Returns the distance between the two nodes."""
+            return int(distance_matrix[manager.IndexToNode(from_index), manager.IndexToNode(to_index)])
 
-    transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+        transit_callback_index = routing.RegisterTransitCallback(distance_callback)
 
     # Define cost of each arc.
     routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
@@ -113,27 +123,45 @@ def route_calc_ortools(less_coordinates, route_name):
 
     # Solve the problem.
     logger.debug("OR-Tools routecalc starting for route: {}", route_name)
+    start = time.monotonic()
     solution = routing.SolveWithParameters(search_parameters)
+    if not solution:
+        logger.warning("OR-Tools found no solution for route {}, using MAD quick routecalc", route_name)
+        return route_calc_quick(less_coordinates, route_name, time_budget)
+    logger.info("OR-Tools found {}m long solution for route {} in {:.2f}s", solution.ObjectiveValue(), route_name,
+                time.monotonic() - start)
+    if time_budget > 0:
+        # Guided local search keeps improving the solution until the time budget is used up
+        search_parameters.local_search_metaheuristic = (
+            routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH)
+        search_parameters.time_limit.FromMilliseconds(int(time_budget * 1000))
+        improved_solution = routing.SolveFromAssignmentWithParameters(solution, search_parameters)
+        if improved_solution:
+            logger.info("OR-Tools improved solution for route {} from {}m to {}m in {:.2f}s", route_name,
+                        solution.ObjectiveValue(), improved_solution.ObjectiveValue(), time.monotonic() - start)
+            solution = improved_solution
     logger.debug("OR-Tools routecalc finished for route: {}", route_name)
 
     return format_solution(manager, routing, solution)
 
 
-async def route_calc_all(coords: List[Location], route_name, algorithm: RoutecalculationTypes):
+async def route_calc_all(coords: List[Location], route_name, algorithm: RoutecalculationTypes,
+                         job_key: Optional[Hashable] = None,
+                         priority: RoutecalcJobPriority = RoutecalcJobPriority.BACKGROUND):
     # check to see if we can use OR-Tools to perform our routecalc
     coords_for_calc = np.zeros(shape=(len(coords), 2))
     for i in range(len(coords)):
         coords_for_calc[i][0] = coords[i].lat
         coords_for_calc[i][1] = coords[i].lng
-    loop = asyncio.get_running_loop()
-    with ProcessPoolExecutor() as executor:
-        if is_or_tools_available() and algorithm.OR_TOOLS:
-            logger.debug("Using OR-Tools for routecalc")
-            sol_best = await loop.run_in_executor(
-                executor, _run_in_process_executor, route_calc_ortools, coords_for_calc, route_name)
-        else:
-            logger.debug("Using MAD quick routecalc")
-            sol_best = await loop.run_in_executor(
-                executor, _run_in_process_executor, route_calc_impl, coords_for_calc, route_name)
+    worker_pool: RoutecalcWorkerPool = RoutecalcWorkerPool.get_shared()
+    time_budget: float = get_time_budget()
+    if get_effective_algorithm(algorithm) == RoutecalculationTypes.OR_TOOLS:
+        logger.debug("Using OR-Tools for routecalc")
+        sol_best = await worker_pool.run(_run_in_process_executor, route_calc_ortools, coords_for_calc, route_name,
+                                         time_budget, key=job_key, priority=priority)
+    else:
+        logger.debug("Using MAD quick routecalc")
+        sol_best = await worker_pool.run(_run_in_process_executor, route_calc_quick, coords_for_calc, route_name,
+                                         time_budget, key=job_key, priority=priority)
     logger.debug("Solution has {} coordinates", len(sol_best))
     return sol_best
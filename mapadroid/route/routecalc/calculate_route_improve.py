@@ -0,0 +1,153 @@
+import math
+import time
+from typing import List
+
+import numpy as np
+
+from mapadroid.route.routecalc.calculate_route_quick import \
+    project_equirectangular
+from mapadroid.route.routecalc.calculate_route_repair import get_cycle_length
+from mapadroid.utils.logging import LoggerEnums, get_logger
+
+logger = get_logger(LoggerEnums.routecalc)
+
+# Amount of nearest coords considered as new neighbours of a coord by the moves
+NEIGHBOURS: int = 8
+# Longest segment of the route moved elsewhere by Or-opt moves
+OR_OPT_MAX_SEGMENT: int = 3
+# Rows of the distance matrix computed at once to find the nearest neighbours
+NEIGHBOURS_CHUNK: int = 512
+MIN_GAIN_METERS: float = 1e-6
+
+
+def improve_route(coords, path: List[int], time_budget: float, route_name) -> List[int]:
+    """
+    Shortens the route by 2-opt moves (reversing a part of the route) and Or-opt moves (moving up to
+     OR_OPT_MAX_SEGMENT coords elsewhere) between coords close to each other until no move shortens the route any
+     further or the time budget is used up. The route is treated as a cycle.
+
+    Args:
+        coords: Array-like of [lat, lng] pairs
+        path: Indexes of the coords in the order to visit
+        time_budget: Seconds to spend at most
+        route_name: Name of the route to log
+
+    Returns: Indexes of the coords in the order to visit, starting at the first index of the path passed
+    """
+    amount: int = len(path)
+    if amount < OR_OPT_MAX_SEGMENT + 3 or time_budget <= 0:
+        return list(path)
+    start: float = time.monotonic()
+    deadline: float = start + time_budget
+    points: np.ndarray = project_equirectangular(coords)
+    tour: np.ndarray = np.asarray(path, dtype=np.int64)
+    length_before: float = get_cycle_length(points, tour)
+    improver = _TourImprover(points, tour)
+    moves: int = 0
+    improved: bool = True
+    while improved and time.monotonic() < deadline:
+        improved = False
+        for position in range(amount):
+            if position % 64 == 0 and time.monotonic() >= deadline:
+                break
+            if improver.two_opt(position) or improver.or_opt(position):
+                improved = True
+                moves += 1
+    tour = improver.tour
+    first: int = int(improver.positions[path[0]])
+    tour = np.concatenate((tour[first:], tour[:first]))
+    with logger.contextualize(origin=route_name):
+        logger.info("Improved route from {:.0f}m to {:.0f}m by {} moves in {:.2f}s", length_before,
+                    get_cycle_length(points, tour), moves, time.monotonic() - start)
+    return tour.tolist()
+
+
+def get_nearest_neighbours(points: np.ndarray, amount: int) -> np.ndarray:
+    """
+    Returns: Indexes of the amount nearest other points per point, the nearest first
+    """
+    amount = min(amount, len(points) - 1)
+    neighbours: np.ndarray = np.empty((len(points), amount), dtype=np.int64)
+    for chunk_start in range(0, len(points), NEIGHBOURS_CHUNK):
+        chunk: np.ndarray = points[chunk_start:chunk_start + NEIGHBOURS_CHUNK]
+        distances: np.ndarray = np.hypot(chunk[:, None, 0] - points[None, :, 0], chunk[:, None, 1] - points[None, :, 1])
+        distances[np.arange(len(chunk)), np.arange(chunk_start, chunk_start + len(chunk))] = np.inf
+        nearest: np.ndarray = np.argpartition(distances, amount - 1, axis=1)[:, :amount]
+        order: np.ndarray = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1)
+        neighbours[chunk_start:chunk_start + len(chunk)] = np.take_along_axis(nearest, order, axis=1)
+    return neighbours
+
+
+class _TourImprover:
+    """
+    Applies the first move shortening the tour found at a position. Moves only connect coords to their nearest
+     neighbours which keeps the amount of moves evaluated linear in the length of the tour.
+    """
+
+    def __init__(self, points: np.ndarray, tour: np.ndarray):
+        self.tour: np.ndarray = tour
+        self.positions: np.ndarray = np.empty(len(tour), dtype=np.int64)
+        self.positions[tour] = np.arange(len(tour))
+        self._amount: int = len(tour)
+        self._x: List[float] = points[:, 0].tolist()
+        self._y: List[float] = points[:, 1].tolist()
+        self._neighbours: List[List[int]] = get_nearest_neighbours(points, NEIGHBOURS).tolist()
+
+    def _distance(self, first: int, second: int) -> float:
+        return math.hypot(self._x[first] - self._x[second], self._y[first] - self._y[second])
+
+    def _at(self, position: int) -> int:
+        return int(self.tour[position % self._amount])
+
+    def two_opt(self, position: int) -> bool:
+        """
+        Replaces the edge starting at the position and another edge by edges to the nearest neighbours of its ends
+        """
+        start: int = self._at(position)
+        end: int = self._at(position + 1)
+        current: float = self._distance(start, end)
+        for neighbour in self._neighbours[start]:
+            gain_first: float = current - self._distance(start, neighbour)
+            if gain_first <= 0:
+                # Neighbours are sorted by distance, no further one can shorten the tour
+                break
+            other: int = int(self.positions[neighbour])
+            following: int = self._at(other + 1)
+            if neighbour == end or following == start:
+                continue
+            if gain_first + self._distance(neighbour, following) - self._distance(end, following) > MIN_GAIN_METERS:
+                low, high = min(position, other), max(position, other)
+                self.tour[low + 1:high + 1] = self.tour[low + 1:high + 1][::-1].copy()
+                self.positions[self.tour[low + 1:high + 1]] = np.arange(low + 1, high + 1)
+                return True
+        return False
+
+    def or_opt(self, position: int) -> bool:
+        """
+        Moves the segment starting at the position next to one of the nearest neighbours of its ends
+        """
+        for length in range(1, OR_OPT_MAX_SEGMENT + 1):
+            segment: List[int] = [self._at(position + offset) for offset in range(length)]
+            previous: int = self._at(position - 1)
+            following: int = self._at(position + length)
+            removal_gain: float = (self._distance(previous, segment[0]) + self._distance(segment[-1], following)
+                                   - self._distance(previous, following))
+            if removal_gain <= MIN_GAIN_METERS:
+                continue
+            for neighbour in self._neighbours[segment[0]] + self._neighbours[segment[-1]]:
+                if neighbour in segment or neighbour == previous:
+                    continue
+                after: int = self._at(int(self.positions[neighbour]) + 1)
+                base: float = removal_gain + self._distance(neighbour, after)
+                forward: float = base - self._distance(neighbour, segment[0]) - self._distance(segment[-1], after)
+                backward: float = base - self._distance(neighbour, segment[-1]) - self._distance(segment[0], after)
+                if max(forward, backward) > MIN_GAIN_METERS:
+                    self.__move(position, length, neighbour, segment if forward >= backward else segment[::-1])
+                    return True
+        return False
+
+    def __move(self, position: int, length: int, after: int, segment: List[int]) -> None:
+        remaining: np.ndarray = np.delete(self.tour, [(position + offset) % self._amount for offset in range(length)])
+        insert_at: int = int(np.flatnonzero(remaining == after)[0]) + 1
+        self.tour = np.concatenate((remaining[:insert_at], np.asarray(segment, dtype=np.int64), remaining[insert_at:]))
+        self.positions[self.tour] = np.arange(self._amount)
@@ -1,206 +1,169 @@
+from typing import List, Tuple
+
+import numpy as np
+
 from mapadroid.utils.logging import LoggerEnums, get_logger
 
 logger = get_logger(LoggerEnums.routecalc)
 
+EARTH_RADIUS_METERS: float = 6371000.0
 
-def route_calc_impl(coords, route_name):
-    with logger.contextualize(origin=route_name):
-        less_coords_array = []
-        for i in range(len(coords)):
-            less_coords_array.append([coords[i][0].item(), coords[i][1].item()])
 
-        length, path = tsp(less_coords_array)
-        logger.info("Found {} long solution: ", length)
+def route_calc_impl(coords, route_name) -> List[int]:
+    """
+    Approximates the shortest route through the coordinates passed (Christofides like: minimum spanning tree, greedy
+     matching of odd vertexes, eulerian tour with shortcuts).
+
+    Args:
+        coords: Array-like of [lat, lng] pairs
+        route_name: Name of the route to log
 
+    Returns: Indexes of the coordinates in the order to visit, starting at the first coordinate
+    """
+    with logger.contextualize(origin=route_name):
+        length, path = tsp(project_equirectangular(coords))
+        logger.info("Found {:.0f}m long solution", length)
     return path
 
 
-def tsp(data):
-    logger.info("building the graph for a route of {}", len(data))
-    # build a graph
-    graph_data = build_graph(data)
+def project_equirectangular(coords) -> np.ndarray:
+    """
+    Projects [lat, lng] pairs onto a plane (in meters) around the mean latitude of the coordinates. Precise enough for
+     the distances within a route unlike euclidean distances of raw degrees which are stretched along the latitude.
+    """
+    coords = np.radians(np.asarray(coords, dtype=np.float64).reshape(-1, 2))
+    if not len(coords):
+        return coords
+    mean_lat: float = float(np.mean(coords[:, 0]))
+    return np.column_stack((coords[:, 1] * np.cos(mean_lat), coords[:, 0])) * EARTH_RADIUS_METERS
 
-    # build a minimum spanning tree
-    logger.info("Building a min span tree..")
-    min_span_tree = minimum_spanning_tree(graph_data)
 
-    # find odd vertexes
-    logger.info("Finding odd vertexes...")
-    odd_vertexes = find_odd_vertexes(min_span_tree)
+def tsp(points: np.ndarray) -> Tuple[float, List[int]]:
+    amount: int = len(points)
+    if amount <= 2:
+        return get_length(points, np.arange(amount)), list(range(amount))
 
-    # add minimum weight matching edges to MST
-    logger.info("Adding minimum weight matching edges to MST...")
-    minimum_weight_matching(min_span_tree, graph_data, odd_vertexes)
+    logger.info("Building a min span tree for a route of {}", amount)
+    mst_from, mst_to = minimum_spanning_tree(points)
 
-    # find an eulerian tour
-    logger.info("Finding and Eulerian tour...")
-    eulerian_tour = find_eulerian_tour(min_span_tree)
-
-    current = eulerian_tour[0]
-    path = [current]
-    visited = [False] * len(eulerian_tour)
-    visited[current] = True
-
-    length = 0
+    logger.info("Finding odd vertexes...")
+    odd_vertexes = find_odd_vertexes(mst_from, mst_to, amount)
 
-    logger.info("Visiting each node in our eulerian tour and making a route")
-    for node in eulerian_tour[1:]:
-        if not visited[node]:
-            path.append(node)
-            visited[node] = True
+    logger.info("Adding minimum weight matching edges to MST...")
+    matched_from, matched_to = minimum_weight_matching(points, odd_vertexes)
 
-            length += graph_data[current][node]
-            current = node
+    logger.info("Finding an eulerian tour...")
+    eulerian_tour = find_eulerian_tour(np.concatenate((mst_from, matched_from)),
+                                       np.concatenate((mst_to, matched_to)), amount)
 
+    # Skip vertexes visited already, keeping the order of the first visits
+    _, first_visits = np.unique(eulerian_tour, return_index=True)
+    path: np.ndarray = eulerian_tour[np.sort(first_visits)]
     logger.info("Done making a route!")
-    return length, path
-
-
-def get_length(x1, y1, x2, y2):
-    return ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** (1 / 2)
-
-
-def build_graph(data):
-    graph = {}
-    for this in range(len(data)):
-        for another_point in range(len(data)):
-            if this != another_point:
-                if this not in graph:
-                    graph[this] = {}
-
-                graph[this][another_point] = get_length(data[this][0], data[this][1], data[another_point][0],
-                                                        data[another_point][1])
-
-    return graph
-
-
-class UnionFind:
-    def __init__(self):
-        self.weights = {}
-        self.parents = {}
-
-    def __getitem__(self, obj):
-        if obj not in self.parents:
-            self.parents[obj] = obj
-            self.weights[obj] = 1
-            return obj
-
-        # find path of objects leading to the root
-        path = [obj]
-        root = self.parents[obj]
-        while root != path[-1]:
-            path.append(root)
-            root = self.parents[root]
-
-        # compress the path and return
-        for ancestor in path:
-            self.parents[ancestor] = root
-        return root
-
-    def __iter__(self):
-        return iter(self.parents)
-
-    def union(self, *objects):
-        roots = [self[x] for x in objects]
-        heaviest = max([(self.weights[r], r) for r in roots])[1]
-        for root in roots:
-            if root != heaviest:
-                self.weights[heaviest] += self.weights[root]
-                self.parents[root] = heaviest
-
-
-def minimum_spanning_tree(graph):
-    tree = []
-    subtrees = UnionFind()
-    for W, u, v in sorted((graph[u][v], u, v) for u in graph for v in graph[u]):  # noqa: VNE001 N806
-        if subtrees[u] != subtrees[v]:
-            tree.append((u, v, W))
-            subtrees.union(u, v)
-
-    return tree
-
-
-def find_odd_vertexes(min_span_tree):
-    tmp_g = {}
-    vertexes = []
-    for edge in min_span_tree:
-        if edge[0] not in tmp_g:
-            tmp_g[edge[0]] = 0
-
-        if edge[1] not in tmp_g:
-            tmp_g[edge[1]] = 0
-
-        tmp_g[edge[0]] += 1
-        tmp_g[edge[1]] += 1
-
-    for vertex in tmp_g:
-        if tmp_g[vertex] % 2 == 1:
-            vertexes.append(vertex)
-
-    return vertexes
-
-
-def minimum_weight_matching(min_span_tree, graph, odd_vert):
-    import random
-    random.shuffle(odd_vert)
-
-    while odd_vert:
-        vertex = odd_vert.pop()
-        length = float("inf")
-        index = 1
-        closest = 0
-        for index in odd_vert:
-            if vertex != index and graph[vertex][index] < length:
-                length = graph[vertex][index]
-                closest = index
-
-        min_span_tree.append((vertex, closest, length))
-        odd_vert.remove(closest)
-
-
-def find_eulerian_tour(matched_min_span_tree):
-    # find neigbours
-    neighbours = {}
-    for edge in matched_min_span_tree:
-        if edge[0] not in neighbours:
-            neighbours[edge[0]] = []
-
-        if edge[1] not in neighbours:
-            neighbours[edge[1]] = []
-
-        neighbours[edge[0]].append(edge[1])
-        neighbours[edge[1]].append(edge[0])
-
-    # finds the hamiltonian circuit
-    start_vertex = matched_min_span_tree[0][0]
-    ep = [neighbours[start_vertex][0]]
-
-    while len(matched_min_span_tree) > 0:
-        stop_ind = None
-        for ind, v in enumerate(ep):  # noqa: VNE001
-            if len(neighbours[v]) > 0:
-                stop_ind = ind
-                break
-
-        while len(neighbours[v]) > 0:
-            w = neighbours[v][0]  # noqa: VNE001
-
-            remove_edge_from_matched_mst(matched_min_span_tree, v, w)
-
-            del neighbours[v][(neighbours[v].index(w))]
-            del neighbours[w][(neighbours[w].index(v))]
-
-            stop_ind += 1
-            ep.insert(stop_ind, w)
-
-            v = w  # noqa: VNE001
-
-    return ep
-
-
-def remove_edge_from_matched_mst(matched_mst, v1, v2):
-    for i, item in enumerate(matched_mst):
-        if (item[0] == v2 and item[1] == v1) or (item[0] == v1 and item[1] == v2):
-            del matched_mst[i]
-
-    return matched_mst
+    return get_length(points, path), path.tolist()
+
+
+def get_length(points: np.ndarray, path: np.ndarray) -> float:
+    """
+    Returns: Length of the path through the points (not returning to the start)
+    """
+    if len(path) < 2:
+        return 0.0
+    ordered: np.ndarray = points[path]
+    return float(np.hypot(*(ordered[1:] - ordered[:-1]).T).sum())
+
+
+def distances_to(points: np.ndarray, index: int) -> np.ndarray:
+    return np.hypot(points[:, 0] - points[index, 0], points[:, 1] - points[index, 1])
+
+
+def minimum_spanning_tree(points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Prim's algorithm on the complete graph of the points. The distances are calculated one row at a time rather than
+     keeping the whole matrix in memory.
+
+    Returns: Vertexes the edges of the tree start and end at
+    """
+    amount: int = len(points)
+    in_tree: np.ndarray = np.zeros(amount, dtype=bool)
+    # Distance of every vertex to the tree and the vertex of the tree it is closest to
+    distance_to_tree: np.ndarray = np.full(amount, np.inf)
+    closest_in_tree: np.ndarray = np.zeros(amount, dtype=np.int64)
+    edges_from: np.ndarray = np.empty(amount - 1, dtype=np.int64)
+    edges_to: np.ndarray = np.empty(amount - 1, dtype=np.int64)
+
+    current: int = 0
+    in_tree[current] = True
+    for edge in range(amount - 1):
+        distances: np.ndarray = distances_to(points, current)
+        closer: np.ndarray = (distances < distance_to_tree) & ~in_tree
+        distance_to_tree[closer] = distances[closer]
+        closest_in_tree[closer] = current
+        current = int(np.argmin(distance_to_tree))
+        in_tree[current] = True
+        distance_to_tree[current] = np.inf
+        edges_from[edge] = closest_in_tree[current]
+        edges_to[edge] = current
+    return edges_from, edges_to
+
+
+def find_odd_vertexes(edges_from: np.ndarray, edges_to: np.ndarray, amount: int) -> np.ndarray:
+    degrees: np.ndarray = np.bincount(edges_from, minlength=amount) + np.bincount(edges_to, minlength=amount)
+    return np.flatnonzero(degrees % 2 == 1)
+
+
+def minimum_weight_matching(points: np.ndarray, odd_vertexes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Greedily pairs every odd vertex with the closest odd vertex not paired yet.
+
+    Returns: Vertexes the edges of the matching start and end at
+    """
+    odd_points: np.ndarray = points[odd_vertexes]
+    unmatched: np.ndarray = np.ones(len(odd_vertexes), dtype=bool)
+    matched_from: List[int] = []
+    matched_to: List[int] = []
+    for vertex in range(len(odd_vertexes) - 1, -1, -1):
+        if not unmatched[vertex]:
+            continue
+        unmatched[vertex] = False
+        distances: np.ndarray = distances_to(odd_points, vertex)
+        distances[~unmatched] = np.inf
+        closest: int = int(np.argmin(distances))
+        unmatched[closest] = False
+        matched_from.append(vertex)
+        matched_to.append(closest)
+    return odd_vertexes[matched_from], odd_vertexes[matched_to]
+
+
+def find_eulerian_tour(edges_from: np.ndarray, edges_to: np.ndarray, amount: int, start: int = 0) -> np.ndarray:
+    """
+    Hierholzer's algorithm on adjacency arrays of the multigraph of the edges passed (every vertex being of even
+     degree).
+
+    Returns: Vertexes in the order of the tour, the first vertex being repeated at the end
+    """
+    # Incident edges of vertex v are at neighbours[offsets[v]:offsets[v + 1]] (edge_ids respectively)
+    endpoints: np.ndarray = np.concatenate((edges_from, edges_to))
+    order: np.ndarray = np.argsort(endpoints, kind="stable")
+    offsets: List[int] = np.concatenate(([0], np.cumsum(np.bincount(endpoints, minlength=amount)))).tolist()
+    neighbours: List[int] = np.concatenate((edges_to, edges_from))[order].tolist()
+    edge_ids: List[int] = (order % len(edges_from)).tolist()
+
+    used: List[bool] = [False] * len(edges_from)
+    next_incident: List[int] = offsets[:-1]
+    stack: List[int] = [start]
+    tour: List[int] = []
+    while stack:
+        vertex: int = stack[-1]
+        incident: int = next_incident[vertex]
+        end: int = offsets[vertex + 1]
+        while incident < end and used[edge_ids[incident]]:
+            incident += 1
+        next_incident[vertex] = incident
+        if incident == end:
+            tour.append(stack.pop())
+        else:
+            used[edge_ids[incident]] = True
+            stack.append(neighbours[incident])
+    tour.reverse()
+    return np.asarray(tour, dtype=np.int64)
@@ -0,0 +1,140 @@
+from typing import Dict, List, Set
+
+import numpy as np
+
+from mapadroid.route.routecalc.calculate_route_quick import \
+    project_equirectangular
+from mapadroid.utils.collections import Location
+from mapadroid.utils.logging import LoggerEnums, get_logger
+
+logger = get_logger(LoggerEnums.routecalc)
+
+# Amount of positions around changes of the route considered for 2-opt moves
+TWO_OPT_WINDOW: int = 12
+# Passes of 2-opt moves around the changes at most
+TWO_OPT_MAX_PASSES: int = 5
+
+
+def get_change_ratio(previous_route: List[Location], coords: List[Location]) -> float:
+    """
+    Returns: Amount of coords added and removed in relation to the amount of coords of the new route
+    """
+    previous: Set[Location] = set(previous_route)
+    current: Set[Location] = set(coords)
+    return len(previous ^ current) / max(len(current), 1)
+
+
+def route_repair_impl(previous_route: List[Location], coords: List[Location], route_name) -> List[Location]:
+    """
+    Updates the previous route to visit the coords given instead of calculating a new route from scratch. Coords no
+     longer present are removed, new coords are inserted where they lengthen the route the least (cheapest insertion)
+     and the surroundings of the changes are shortened by 2-opt moves. The route is treated as a cycle.
+
+    Args:
+        previous_route: Route to be repaired
+        coords: Coords to visit, the order does not matter
+        route_name: Name of the route to log
+
+    Returns: The coords in the order to visit, starting at the first coord of the previous route still present
+    """
+    wanted: Dict[Location, None] = dict.fromkeys(coords)
+    kept: List[Location] = [coord for coord in dict.fromkeys(previous_route) if coord in wanted]
+    kept_set: Set[Location] = set(kept)
+    added: List[Location] = [coord for coord in wanted if coord not in kept_set]
+    locations: List[Location] = kept + added
+    if len(locations) < 4:
+        return locations
+    points: np.ndarray = project_equirectangular([(coord.lat, coord.lng) for coord in locations])
+
+    tour: List[int] = list(range(len(kept)))
+    # Neighbours of removed coords and the coords inserted
+    changed: Set[int] = set()
+    wanted_previous: List[bool] = [coord in wanted for coord in previous_route]
+    for position, is_wanted in enumerate(wanted_previous):
+        if not is_wanted:
+            for neighbour in (position - 1, (position + 1) % len(previous_route)):
+                if wanted_previous[neighbour]:
+                    changed.add(neighbour)
+    if changed:
+        index_of_kept: Dict[Location, int] = {coord: index for index, coord in enumerate(kept)}
+        changed = {index_of_kept[previous_route[position]] for position in changed}
+
+    with logger.contextualize(origin=route_name):
+        for new_index in range(len(kept), len(locations)):
+            _insert_cheapest(points, tour, new_index)
+            changed.add(new_index)
+        improvement: float = _two_opt_around(points, tour, changed)
+        logger.info("Repaired route: {} coords removed, {} added, 2-opt shortened it by {:.0f}m",
+                    len(set(previous_route) - kept_set), len(added), improvement)
+    start: int = tour.index(0)
+    return [locations[index] for index in tour[start:] + tour[:start]]
+
+
+def get_cycle_length(points: np.ndarray, tour: List[int]) -> float:
+    """
+    Returns: Length of the tour through the points returning to the start
+    """
+    if len(tour) < 2:
+        return 0.0
+    ordered: np.ndarray = points[np.asarray(tour)]
+    return float(np.hypot(*(np.roll(ordered, -1, axis=0) - ordered).T).sum())
+
+
+def _insert_cheapest(points: np.ndarray, tour: List[int], new_index: int) -> None:
+    if len(tour) < 2:
+        tour.append(new_index)
+        return
+    ordered: np.ndarray = points[np.asarray(tour)]
+    following: np.ndarray = np.roll(ordered, -1, axis=0)
+    point: np.ndarray = points[new_index]
+    costs: np.ndarray = (np.hypot(*(ordered - point).T) + np.hypot(*(following - point).T)
+                         - np.hypot(*(following - ordered).T))
+    tour.insert(int(np.argmin(costs)) + 1, new_index)
+
+
+def _two_opt_around(points: np.ndarray, tour: List[int], changed: Set[int]) -> float:
+    """
+    Reverses segments of the tour within TWO_OPT_WINDOW positions of the changed points while that shortens the
+     tour, applying the best move of a window at a time. Each pass is bounded by the amount of changes rather than the
+     length of the tour.
+
+    Returns: The amount the tour has been shortened by
+    """
+    amount: int = len(tour)
+    window: int = min(TWO_OPT_WINDOW, (amount - 2) // 2)
+    if window < 1 or not changed:
+        return 0.0
+    positions: Dict[int, int] = {index: position for position, index in enumerate(tour)}
+    # Moves reversing tour[i + 1..j] of the window, i.e. replacing the edges (i, i + 1) and (j, j + 1)
+    first_edges, second_edges = np.triu_indices(2 * window + 1, k=2)
+    improvement: float = 0.0
+    for _ in range(TWO_OPT_MAX_PASSES):
+        improved: bool = False
+        for index in changed:
+            for _ in range(2 * window):
+                start: int = positions[index] - window
+                pts: np.ndarray = points[[tour[position % amount] for position in range(start, start + 2 * window + 2)]]
+                edges: np.ndarray = np.hypot(*(pts[1:] - pts[:-1]).T)
+                deltas: np.ndarray = (np.hypot(*(pts[first_edges] - pts[second_edges]).T)
+                                      + np.hypot(*(pts[first_edges + 1] - pts[second_edges + 1]).T)
+                                      - edges[first_edges] - edges[second_edges])
+                best: int = int(np.argmin(deltas))
+                if deltas[best] >= -1e-6:
+                    break
+                _reverse(tour, positions, start + int(first_edges[best]) + 1, start + int(second_edges[best]))
+                improvement -= float(deltas[best])
+                improved = True
+        if not improved:
+            break
+    return improvement
+
+
+def _reverse(tour: List[int], positions: Dict[int, int], start: int, end: int) -> None:
+    amount: int = len(tour)
+    while start < end:
+        first, second = start % amount, end % amount
+        tour[first], tour[second] = tour[second], tour[first]
+        positions[tour[first]] = first
+        positions[tour[second]] = second
+        start += 1
+        end -= 1
@@ -0,0 +1,42 @@
+import bisect
+import hashlib
+from typing import Dict, Generic, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class ConsistentHashRing(Generic[T]):
+    """
+    Maps keys onto nodes such that adding or removing a node only moves the keys of that node. Every node is placed
+     on the ring multiple times (virtual nodes) to spread the keys evenly. The hash does not depend on the process
+     (unlike hash()), so all processes map a key onto the same node.
+    """
+
+    def __init__(self, nodes: Dict[str, T], virtual_nodes: int = 160):
+        """
+        Args:
+            nodes: Nodes by name. The position of a node on the ring only depends on its name.
+            virtual_nodes: Amount of positions of every node on the ring
+        """
+        if not nodes:
+            raise ValueError("At least one node is required")
+        self._nodes: Dict[str, T] = dict(nodes)
+        ring: List = sorted((self.__hash("{}#{}".format(name, replica)), name)
+                            for name in self._nodes for replica in range(virtual_nodes))
+        self._positions: List[int] = [position for position, _ in ring]
+        self._names: List[str] = [name for _, name in ring]
+
+    @staticmethod
+    def __hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    def get_name(self, key: str) -> str:
+        index: int = bisect.bisect(self._positions, self.__hash(key))
+        return self._names[index % len(self._names)]
+
+    def get_node(self, key: str) -> T:
+        return self._nodes[self.get_name(key)]
+
+    @property
+    def nodes(self) -> Sequence[T]:
+        return list(self._nodes.values())
@@ -0,0 +1,101 @@
+import asyncio
+import functools
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from cachetools import TTLCache
+
+
+@dataclass
+class SingleFlightStats:
+    # Requests passed on to the backend
+    requests: int = 0
+    # Requests served by the result of a request to the backend still in flight
+    coalesced: int = 0
+    # Requests served by the result cached
+    hits: int = 0
+
+
+class SingleFlight:
+    """
+    Merges concurrent identical requests into a single request to the backend and optionally caches the result for a
+     short time. Failing requests are not cached, the exception is raised to all callers waiting for the result.
+     Callers being cancelled do not cancel the request.
+     Stats are kept per name across all instances of that name.
+    """
+    __stats: Dict[str, SingleFlightStats] = {}
+
+    def __init__(self, name: str, ttl: float = 0, maxsize: int = 10000):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._results: Optional[TTLCache] = TTLCache(maxsize=maxsize, ttl=ttl) if ttl > 0 else None
+        self._stats: SingleFlightStats = SingleFlight.__stats.setdefault(name, SingleFlightStats())
+
+    async def get(self, key: Hashable, request: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Args:
+            key: Key identifying the request
+            request: Requests the value from the backend unless a request of the same key is in flight or cached
+
+        Returns: The result of the request
+        """
+        if self._results is not None and key in self._results:
+            self._stats.hits += 1
+            return self._results[key]
+        in_flight: Optional[asyncio.Future] = self._in_flight.get(key, None)
+        if in_flight is not None:
+            self._stats.coalesced += 1
+            return await asyncio.shield(in_flight)
+
+        self._stats.requests += 1
+        # Run in a task of its own for callers being cancelled (including the first one) to not cancel the request
+        #  of the others waiting
+        task: asyncio.Future = asyncio.ensure_future(request())
+        self._in_flight[key] = task
+        task.add_done_callback(functools.partial(self.__request_done, key))
+        return await asyncio.shield(task)
+
+    def __request_done(self, key: Hashable, task: asyncio.Future) -> None:
+        # Called before the callers waiting are resumed
+        if self._in_flight.get(key, None) is task:
+            del self._in_flight[key]
+        # Retrieving the exception as nobody may be waiting for the result anymore
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self._results is not None:
+            self._results[key] = task.result()
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Drops the result cached of the key passed, all results cached if no key is passed
+        """
+        if self._results is None:
+            return
+        elif key is None:
+            self._results.clear()
+        else:
+            self._results.pop(key, None)
+
+    @staticmethod
+    def get_stats() -> Dict[str, SingleFlightStats]:
+        return dict(SingleFlight.__stats)
+
+
+def single_flight(ttl: float = 0, maxsize: int = 10000):
+    """
+    Decorates async methods to merge concurrent calls of the same instance with the same arguments into a single call
+     and to cache the result for ttl seconds (not at all by default). Unlike aiocache, results are kept per instance.
+    """
+    def decorator(method):
+        name: str = method.__qualname__
+        attribute: str = "_single_flight_{}".format(method.__name__)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            flight: Optional[SingleFlight] = self.__dict__.get(attribute, None)
+            if flight is None:
+                flight = SingleFlight(name, ttl=ttl, maxsize=maxsize)
+                setattr(self, attribute, flight)
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            return await flight.get(key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -8,6 +8,7 @@ import psutil
 from mapadroid.db.helper.TrsUsageHelper import TrsUsageHelper
 from mapadroid.utils.logging import LoggerEnums, get_logger
 from mapadroid.utils.madGlobals import MadGlobals, terminate_mad
+from mapadroid.utils.SingleFlight import SingleFlight
 
 logger = get_logger(LoggerEnums.system)
 
@@ -21,6 +22,8 @@ async def get_system_infos(db_wrapper):
         tracemalloc.start(5)
     while not terminate_mad.is_set():
         logger.debug('Starting internal Cleanup')
+        for name, stats in SingleFlight.get_stats().items():
+            logger.debug("{}: {} requests, {} coalesced, {} cached", name, stats.requests, stats.coalesced, stats.hits)
         loop = asyncio.get_running_loop()
         cpu_usage, mem_usage, unixnow = await loop.run_in_executor(
             None, __run_system_stats, process_running)
@@ -1,6 +1,8 @@
 TIMESTAMP_NEVER = 0
 WALK_AFTER_TELEPORT_SPEED = 11
 FALLBACK_MITM_WAIT_TIMEOUT = 30
+# Seconds a worker waits for a notification of data received before checking its state again
+MITM_DATA_NOTIFICATION_WAIT = 5
 # Distance in meters that are to be allowed to consider a GMO as within a valid range
 # Some modes calculate with extremely strict distances (0.0001m for example), thus not allowing
 # direct use of routemanager radius as a distance (which would allow long distances for raid scans as well)
@@ -13,6 +15,19 @@ SECONDS_BEFORE_ARRIVAL_OF_WALK_BUFFER = 10
 STOP_SPIN_DISTANCE = 80
 
 # Parameters of routemanagers
+# Amount of processes calculating routes unless configured by routecalc_workers (bounded by the amount of CPUs)
+ROUTECALC_DEFAULT_MAX_WORKERS = 4
+# Part of the keys of routes cached, to be increased whenever the routes calculated for the same input change
+ROUTECALC_CACHE_VERSION = 2
+# Routes of up to this amount of coords have their distance matrix passed to OR-Tools as Python lists (n^2 Python ints),
+#  larger routes look up the distances in the compact numpy matrix by a callback instead
+ROUTECALC_ORTOOLS_MAX_MATRIX_COORDS = 2000
+# Walking distance equivalent to the time spent at a coord when balancing subroutes of workers
+SUBROUTE_COORD_COST_METERS = 100
+# Subroutes costing at most this factor of the average are considered balanced
+SUBROUTE_BALANCE_TOLERANCE = 1.05
+# Sweeps moving the boundaries between subroutes at most per update of the routepool
+SUBROUTE_REBALANCE_MAX_SWEEPS = 50
 
 
 # Redis caching time.
@@ -25,3 +40,19 @@ REDIS_CACHETIME_CELLS = 60
 REDIS_CACHETIME_WEATHER = 900
 REDIS_CACHETIME_POKESTOP_DATA = 900
 REDIS_CACHETIME_ROUTE = 900
+
+# In-process caches of the MITM data processing
+SPAWNPOINT_CACHE_SIZE = 200000
+SPAWNPOINT_CACHE_TIME = 600
+WEATHER_CACHE_SIZE = 50000
+# Weather is cached for a short time only to pick up weather written by other processes, entries always expire at
+#  the top of the hour when the weather changes
+WEATHER_CACHE_TIME = 60
+S2_CELL_ID_CACHE_SIZE = 200000
+GMO_CELL_FINGERPRINT_CACHE_SIZE = 100000
+
+# Stats buffered by StatsHandler clients are sent every interval (seconds) or once the amount of buffered stats is
+#  reached. Stats exceeding the maximum buffered are dropped while the StatsHandler cannot keep up or is unreachable.
+STATS_CLIENT_FLUSH_INTERVAL = 0.5
+STATS_CLIENT_FLUSH_SIZE = 500
+STATS_CLIENT_MAX_BUFFERED = 20000
@@ -66,6 +66,13 @@ class RoutemanagerShuttingDown(Exception):
     pass
 
 
+class RoutecalcJobSupersededError(Exception):
+    """
+    Exception indicating a newer calculation of the same route has been requested
+    """
+    pass
+
+
 class ScreenshotType(Enum):
     JPEG = 0
     PNG = 1
@@ -83,6 +90,12 @@ class RoutecalculationTypes(Enum):
     OR_TOOLS = 1
 
 
+class RoutecalcJobPriority(IntEnum):
+    # Recalculations requested by users
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
 class MonSeenTypes(IntEnum):
     wild = 0
     encounter = 1
@@ -14,5 +14,8 @@ async def report_queue_size(__db_wrapper, __queueObject):
     while not terminate_mad.is_set():
         __cache: Redis = await __db_wrapper.get_cache()
         __value = __queueObject.qsize()
-        await __cache.set(__cache_key, __value, ex=__sleep_time*2)
+        await __cache.set(__cache_key, __value, ex=__sleep_time * 2)
+        if hasattr(__queueObject, "get_oldest_item_age"):
+            await __cache.set("{}_age".format(__cache_key), int(__queueObject.get_oldest_item_age()),
+                              ex=__sleep_time * 2)
         await asyncio.sleep(__sleep_time)
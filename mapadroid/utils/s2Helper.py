@@ -1,5 +1,6 @@
 import math
 import multiprocessing
+from functools import lru_cache
 from typing import List
 
 import gpxdata
@@ -10,13 +11,16 @@ from mapadroid.utils.collections import Location
 from mapadroid.utils.geo import (get_distance_of_two_points_in_meters,
                                  get_middle_of_coord_list)
 from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import S2_CELL_ID_CACHE_SIZE
 
 logger = get_logger(LoggerEnums.utils)
 
 
 class S2Helper:
     @staticmethod
+    @lru_cache(maxsize=S2_CELL_ID_CACHE_SIZE)
     def lat_lng_to_cell_id(lat, lng, level=10):
+        # Memoized as this is called for the same (static) locations of gyms/stops with every GMO
         # Getting the cell id of a location
         # is as easy as finding the CellId and
         # traversing up the parents to the desired level.
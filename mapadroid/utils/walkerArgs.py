@@ -7,6 +7,8 @@ import configargparse
 
 import mapadroid
 from mapadroid.data_handler.mitm_data.MitmMapperType import MitmMapperType
+from mapadroid.mitm_receiver.data_queue.MitmDataQueueType import \
+    MitmDataQueueType
 
 
 def memoize(function):
@@ -88,6 +90,43 @@ def parse_args():
                         help='Port to listen on for proto data (MITM data). Default: 8000')
     parser.add_argument('-mrdw', '--mitmreceiver_data_workers', type=int, default=2,
                         help='Amount of workers to work off the data that queues up. Default: 2')
+    parser.add_argument('-mrdp', '--mitmreceiver_data_processes', type=int, default=0,
+                        help='Amount of processes to work off the data that queues up. Every process runs '
+                             'mitmreceiver_data_workers workers, data of a device is always handled by the same '
+                             'process. Requires mitmmapper_type grpc or redis. Default: 0 (data is processed within '
+                             'the MITMReceiver process)')
+    parser.add_argument('-mrqt', '--mitmreceiver_queue_type', type=MitmDataQueueType,
+                        choices=list(MitmDataQueueType), default=MitmDataQueueType.memory,
+                        help='Queue holding the data received until it is processed. memory: data is dropped once '
+                             'too much queued up and lost on restart. disk: data is written to disk and replayed '
+                             'after a restart or crash until it has been processed. Default: memory')
+    parser.add_argument('-mrqp', '--mitmreceiver_queue_path', default=None,
+                        help='Directory of the disk queue, needs to be unique per MITMReceiver. '
+                             'Default: <temp_path>/mitm_data_queue')
+    parser.add_argument('-mrqm', '--mitmreceiver_queue_memory_items', type=int, default=1000,
+                        help='Amount of items the disk queue holds in memory, further items are read back from '
+                             'disk. Default: 1000')
+    parser.add_argument('-mrmqs', '--mitmreceiver_max_queue_size', type=int, default=0,
+                        help='Amount of items queued for processing at which GMOs of cells queued recently and GMOs '
+                             'only containing nearby mons are dropped. Starting at twice the amount, all data but '
+                             'encounters and fort searches is dropped and devices are answered with 503. '
+                             'Default: 0 (off, the oldest data is dropped once more than 200 items are queued in '
+                             'memory)')
+    parser.add_argument('-mrmqa', '--mitmreceiver_max_queue_age', type=int, default=0,
+                        help='Age (in seconds) of the oldest item queued for processing at which data is dropped as '
+                             'described for mitmreceiver_max_queue_size. Default: 0 (off)')
+    parser.add_argument('-mrra', '--mitmreceiver_retry_after', type=int, default=5,
+                        help='Seconds devices are asked to wait before sending data again while data is dropped. '
+                             'Default: 5')
+    parser.add_argument('-mrbs', '--mitmreceiver_batch_size', type=int, default=0,
+                        help='Amount of queued items a data worker takes at once to process GMOs of the batch within a '
+                             'single transaction. Default: 0 (off, every item is processed on its own)')
+    parser.add_argument('-mrbt', '--mitmreceiver_batch_timeout', type=int, default=50,
+                        help='Maximum time (in milliseconds) a data worker waits for further items to fill a batch. '
+                             'Default: 50')
+    parser.add_argument('-mrcft', '--mitmreceiver_cell_fingerprint_time', type=int, default=0,
+                        help='Seconds cells of GMOs are skipped for as long as their content (forts, mons, weather) '
+                             'does not change. Default: 0 (process every cell received)')
     parser.add_argument('-miptt', '--mitm_ignore_proc_time_thresh', type=int, default=0,
                         help='Ignore MITM data having a timestamp too far in the past.'
                              'Specify in seconds. Default: 0 (off)')
@@ -132,6 +171,11 @@ def parse_args():
     parser.add_argument('-mitmcomp', '--mitmmapper_compression', type=bool,
                         action=argparse.BooleanOptionalAction,
                         help='Enable compression of data of the MitmMapper gRPC communication. Default: False')
+    # MitmMapper Redis
+    parser.add_argument('-mitmshards', '--mitmmapper_redis_shards', required=False, default=None, type=str,
+                        help='Comma separated URLs of Redis instances to spread the data of workers of the Redis '
+                             'MitmMapper across (e.g. redis://host1:6379/0,redis://host2:6379/0). The cache '
+                             '(cache_host etc.) is used if none are specified. Default: None')
 
     # StatsHandler gRPC
     parser.add_argument('-statship', '--statshandler_ip', required=False, default="127.0.0.1", type=str,
@@ -178,6 +222,22 @@ def parse_args():
                              'it is not set at all. Some environments apparently require limitation to 1')
     parser.add_argument('-or', '--only_routes', action='store_true', default=False,
                         help='Only calculate routes, then exit the program. No scanning.')
+    parser.add_argument('-rcw', '--routecalc_workers', type=int, default=0,
+                        help='Amount of processes calculating routes at once. Default: 0 (amount of CPUs, at most 4)')
+    parser.add_argument('-rccp', '--routecalc_cache_path', default=None,
+                        help='Directory of the routes calculated before, shared by areas of the same coordinates and '
+                             'settings. Default: <temp_path>/routecalc_cache')
+    parser.add_argument('-rcce', '--routecalc_cache_entries', type=int, default=1000,
+                        help='Amount of routes cached, the ones used least recently are removed. 0 disables the '
+                             'cache. Default: 1000')
+    parser.add_argument('-rctb', '--routecalc_time_budget', type=float, default=0,
+                        help='Seconds to spend per route on shortening it after calculating it (guided local search '
+                             'with OR-Tools, 2-opt and Or-opt moves otherwise). Longer calculations, shorter walks. '
+                             'Default: 0 (disabled)')
+    parser.add_argument('-rcrm', '--routecalc_repair_max_change', type=float, default=0.2,
+                        help='Share of coords added or removed up to which quest and leveling routes are repaired '
+                             '(removing and inserting coords) rather than calculated anew. 0 disables repairing. '
+                             'Default: 0.2')
     parser.add_argument('-cm', '--config_mode', action='store_true', default=False,
                         help='Run in ConfigMode')
     parser.add_argument('-nm', '--scan_nearby_mons', action='store_true', default=False,
@@ -409,7 +469,8 @@ def parse_args():
     parser.add_argument('-eemd', '--enable_early_maintenance_detection', action='store_true', default=False,
                         help='Enable early maintenance screen detection - could be inaccurate, but will save on login time')
     parser.add_argument('-rrqk', '--redis_report_queue_key', default=None,
-                        help='Redis key used to store reported value')
+                        help='Redis key used to store reported value. The age of the oldest item queued (in '
+                             'seconds) is stored using the key suffixed by _age')
     parser.add_argument('-rrqi', '--redis_report_queue_interval', default=30, type=int,
                         help='Report queue size from mitmreciver to redis every every N seconds (Default: 30)')
 
@@ -34,7 +34,8 @@ from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
 from mapadroid.utils.geo import get_distance_of_two_points_in_meters
 from mapadroid.utils.madConstants import (
     FALLBACK_MITM_WAIT_TIMEOUT, MINIMUM_DISTANCE_ALLOWANCE_FOR_GMO,
-    SECONDS_BEFORE_ARRIVAL_OF_WALK_BUFFER, TIMESTAMP_NEVER)
+    MITM_DATA_NOTIFICATION_WAIT, SECONDS_BEFORE_ARRIVAL_OF_WALK_BUFFER,
+    TIMESTAMP_NEVER)
 from mapadroid.utils.madGlobals import (FortSearchResultTypes,
                                         InternalStopWorkerException,
                                         MadGlobals, PositionType,
@@ -172,6 +173,7 @@ class AbstractMitmBaseStrategy(AbstractWorkerStrategy, ABC):
                 and (int(timestamp + timeout) >= int(time.time()) or timeout == 0):
             # Not checking the timestamp against the proto awaited in here since custom handling may be adequate.
             # E.g. Questscan may yield errors like clicking mons instead of stops - which we need to detect as well
+            requested_at: float = time.time()
             data, latest, type_of_data_returned = await self._request_data(data, key, proto_to_wait_for, timestamp,
                                                                            type_of_data_returned)
 
@@ -184,7 +186,7 @@ class AbstractMitmBaseStrategy(AbstractWorkerStrategy, ABC):
             elif latest:
                 last_time_received = latest.timestamp_of_data_retrieval
                 break
-            await asyncio.sleep(MadGlobals.application_args.wait_for_data_sleep_duration)
+            await self._wait_for_next_data(key, requested_at, timestamp, timeout)
 
         if proto_to_wait_for in [ProtoIdentifier.GMO, ProtoIdentifier.ENCOUNTER]:
             if type_of_data_returned != ReceivedType.UNDEFINED:
@@ -207,6 +209,17 @@ class AbstractMitmBaseStrategy(AbstractWorkerStrategy, ABC):
         # await self.worker_stats()
         return type_of_data_returned, data, last_time_received
 
+    async def _wait_for_next_data(self, key: str, requested_at: float, timestamp: int, timeout: int) -> None:
+        """
+        Waits for the MitmMapper to notify about data of the key received since requested_at. If the MitmMapper is not
+         able to notify, the worker sleeps for the configured interval to poll again.
+        """
+        wait_time: float = MITM_DATA_NOTIFICATION_WAIT
+        if timeout != 0:
+            wait_time = max(0.1, min(wait_time, timestamp + timeout - time.time()))
+        if not await self._mitm_mapper.wait_for_data(self._worker_state.origin, key, requested_at, wait_time):
+            await asyncio.sleep(MadGlobals.application_args.wait_for_data_sleep_duration)
+
     async def _request_data(self, data, key, proto_to_wait_for, timestamp, type_of_data_returned):
         latest_location: Optional[Location] = await self._mitm_mapper.get_last_known_location(
             self._worker_state.origin)
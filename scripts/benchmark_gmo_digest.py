@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the size and deserialization of the digest of GMOs stored as latest data for the workers compared to the
+full GMOs received.
+
+    python3 scripts/benchmark_gmo_digest.py --cells 1,21,100
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+from orjson import orjson
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mapadroid.data_handler.mitm_data.GmoDigest import GmoDigest  # noqa: E402
+
+
+def gmo(amount_cells: int) -> dict:
+    return {"cells": [{"id": 5000 + cell, "current_timestamp": 1650000000000,
+                       "forts": [{"id": "fort%s.16" % fort, "type": fort % 2, "latitude": 50.1 + fort / 1000,
+                                  "longitude": 8.6, "last_modified_timestamp_ms": 1650000000000, "enabled": True,
+                                  "visited": fort == 3, "cooldown_complete_ms": 0,
+                                  "image_url": "http://lh3.googleusercontent.com/%s" % ("x" * 60),
+                                  "pokestop_display": {"incident_expiration_ms": 0},
+                                  "gym_details": {"has_raid": False, "guard_pokemon_id": 25}}
+                                 for fort in range(10)],
+                       "wild_pokemon": [{"encounter_id": -123456789 - mon, "spawnpoint_id": "47C0A5A1",
+                                         "latitude": 50.1, "longitude": 8.6, "time_till_hidden": 1200,
+                                         "last_modified_timestamp_ms": 1650000000000,
+                                         "pokemon_data": {"id": mon, "cp": 10, "move1": 1, "move2": 2,
+                                                          "display": {"form_value": 0, "costume_value": 0,
+                                                                      "gender_value": 1,
+                                                                      "weather_boosted_value": 3}}}
+                                        for mon in range(6)],
+                       "nearby_pokemon": [{"encounter_id": 42, "pokedex_number": 1, "distance_in_meters": 100,
+                                           "fort_id": "fort1.16", "display": {"form_value": 0}}],
+                       "catchable_pokemon": [], "spawn_points": [{"latitude": 50.1, "longitude": 8.6}]}
+                      for cell in range(amount_cells)],
+            "client_weather": [{"s2_cell_id": 5000, "gameplay_weather": {"gameplay_condition": 3}}],
+            "time_of_day_value": 1}
+
+
+def measure_loads(data: bytes, runs: int) -> float:
+    durations: List[float] = []
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        orjson.loads(data)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cells", default="1,21,100", help="Comma separated amounts of cells per GMO")
+    parser.add_argument("--runs", default=10, type=int, help="Runs per GMO, the fastest one is reported")
+    args = parser.parse_args()
+
+    print("{:>8} {:>10} {:>10} {:>12} {:>12}".format("cells", "full KB", "digest KB", "full", "digest"))
+    for amount_cells in [int(amount) for amount in args.cells.split(",")]:
+        full: bytes = orjson.dumps(gmo(amount_cells))
+        digest: bytes = orjson.dumps(GmoDigest.digest(gmo(amount_cells)))
+        print("{:>8} {:>10.1f} {:>10.1f} {:>10.3f}ms {:>10.3f}ms".format(
+            amount_cells, len(full) / 1024, len(digest) / 1024, measure_loads(full, args.runs) * 1000,
+            measure_loads(digest, args.runs) * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmarks transporting latest data of the MITM mapper via gRPC as a Struct compared to serialized JSON on GMOs of
+different sizes (serializing, parsing and converting back to a dict).
+
+    python3 scripts/benchmark_mitm_mapper_transport.py --cells 1,21,100
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List
+
+from google.protobuf import json_format
+from orjson import orjson
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mapadroid.grpc.compiled.mitm_mapper.mitm_mapper_pb2 import \
+    LatestMitmDataEntryUpdateRequest  # noqa: E402
+
+
+def gmo(amount_cells: int) -> dict:
+    return {"cells": [{"id": 5000 + cell, "current_timestamp": 1650000000000,
+                       "forts": [{"id": "fort%s.16" % fort, "type": fort % 2, "latitude": 50.1 + fort / 1000,
+                                  "longitude": 8.6, "last_modified_timestamp_ms": 1650000000000, "enabled": True,
+                                  "gym_details": {"has_raid": False, "guard_pokemon_id": 25}}
+                                 for fort in range(10)],
+                       "wild_pokemon": [{"encounter_id": 123456789 + mon, "spawnpoint_id": "47C0A5A1",
+                                         "latitude": 50.1, "longitude": 8.6, "time_till_hidden": 1200,
+                                         "pokemon_data": {"id": mon, "display": {"form_value": 0,
+                                                                                 "weather_boosted_value": 0}}}
+                                        for mon in range(6)]}
+                      for cell in range(amount_cells)],
+            "client_weather": [], "time_of_day_value": 1}
+
+
+def struct_transport(data: dict) -> dict:
+    request = LatestMitmDataEntryUpdateRequest()
+    request.data.some_dictionary.update(data)
+    received = LatestMitmDataEntryUpdateRequest.FromString(request.SerializeToString())
+    return json_format.MessageToDict(received.data.some_dictionary)
+
+
+def serialized_transport(data: dict) -> dict:
+    request = LatestMitmDataEntryUpdateRequest()
+    request.data.serialized_data = orjson.dumps(data)
+    received = LatestMitmDataEntryUpdateRequest.FromString(request.SerializeToString())
+    return orjson.loads(received.data.serialized_data)
+
+
+def measure(transport: Callable[[dict], dict], data: dict, runs: int) -> float:
+    durations: List[float] = []
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        transport(data)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cells", default="1,21,100", help="Comma separated amounts of cells per GMO")
+    parser.add_argument("--runs", default=10, type=int, help="Runs per GMO, the fastest one is reported")
+    args = parser.parse_args()
+
+    print("{:>8} {:>8} {:>12} {:>12}".format("cells", "KB", "struct", "serialized"))
+    for amount_cells in [int(amount) for amount in args.cells.split(",")]:
+        data: dict = gmo(amount_cells)
+        if serialized_transport(data) != data:
+            print("{:>8} serialized transport changed the data".format(amount_cells))
+            continue
+        struct_time: float = measure(struct_transport, data, args.runs)
+        serialized_time: float = measure(serialized_transport, data, args.runs)
+        print("{:>8} {:>8.0f} {:>10.2f}ms {:>10.2f}ms".format(amount_cells, len(orjson.dumps(data)) / 1024,
+                                                             struct_time * 1000, serialized_time * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmarks parsing the bodies of protos sent by devices compared to the previous parsing (decoding the body to a
+str first) on a body shaped like recorded device payloads.
+
+    python3 scripts/benchmark_mitm_proto_parser.py --protos 300,3000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from orjson import orjson
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mapadroid.mitm_receiver.MitmProtoParser import MitmProtoParser  # noqa: E402
+
+
+def recorded_body(amount: int) -> bytes:
+    """
+    Body shaped like the lists of protos sent by devices: GMOs, encounters and plenty of protos not processed
+    """
+    protos: List[dict] = []
+    for index in range(amount):
+        if index % 3 == 0:
+            cells = [{"id": 5000 + cell, "current_timestamp": 1650000000000,
+                      "forts": [{"id": "fort%s.16" % fort, "type": fort % 2, "latitude": 50.1 + fort / 1000,
+                                 "longitude": 8.6, "last_modified_timestamp_ms": 1650000000000, "enabled": True,
+                                 "image_url": "http://lh3.googleusercontent.com/%s" % ("x" * 60)}
+                                for fort in range(8)],
+                      "wild_pokemon": [{"encounter_id": -123456789 - mon, "spawnpoint_id": "47C0A5A1",
+                                        "latitude": 50.1, "longitude": 8.6, "time_till_hidden": 1200,
+                                        "pokemon_data": {"id": mon, "display": {"form_value": 0, "costume_value": 0,
+                                                                                "gender_value": 1,
+                                                                                "weather_boosted_value": 0}}}
+                                       for mon in range(5)]}
+                     for cell in range(21)]
+            protos.append({"type": 106, "timestamp": 1650000000 + index, "lat": 50.1, "lng": 8.6,
+                           "payload": {"cells": cells, "client_weather": []}})
+        elif index % 3 == 1:
+            protos.append({"type": 102, "timestamp": 1650000000 + index, "payload": {"status": 1, "ü": "ä" * 10}})
+        else:
+            # e.g. player data, settings and inventory deltas of methods not processed
+            protos.append({"type": 2 + index % 7 * 100, "timestamp": 1650000000 + index,
+                           "payload": {"settings": ["é" * 200 for _ in range(100)]}})
+    return orjson.dumps(protos)
+
+
+def parse_previously(raw_data: bytes) -> List[dict]:
+    # Parsing as done by ReceiveProtosEndpoint before, filtered the way protos were handled afterwards
+    raw_text = raw_data.decode('utf8')
+    data = orjson.loads(raw_text)
+    del raw_text
+    return [proto for proto in data if proto.get("type", None) in MitmProtoParser.ACCEPTED_PROTOS]
+
+
+def measure(parse: Callable, raw_data: bytes, runs: int) -> Tuple[float, int]:
+    durations: List[float] = []
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        parse(raw_data)
+        durations.append(time.perf_counter() - start)
+    tracemalloc.start()
+    parse(raw_data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(durations), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--protos", default="300,3000", help="Comma separated amounts of protos per body")
+    parser.add_argument("--runs", default=5, type=int, help="Runs per body, the fastest one is reported")
+    args = parser.parse_args()
+
+    print("{:>8} {:>8} {:>23} {:>23}".format("protos", "MB", "previously", "now"))
+    for amount in [int(amount) for amount in args.protos.split(",")]:
+        raw_data: bytes = recorded_body(amount)
+        if parse_previously(raw_data) != MitmProtoParser.parse(raw_data)[0]:
+            print("{:>8} parsed protos differ".format(amount))
+            continue
+        results: List[str] = []
+        for parse in (parse_previously, lambda data: MitmProtoParser.parse(data)[0]):
+            duration, peak = measure(parse, raw_data, args.runs)
+            results.append("{:8.1f}ms {:6.1f} MB peak".format(duration * 1000, peak / 2 ** 20))
+        print("{:>8} {:>8.1f} {:>23} {:>23}".format(amount, len(raw_data) / 2 ** 20, *results))
+
+
+if __name__ == "__main__":
+    main()
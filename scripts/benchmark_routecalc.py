@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the quick route calculation on random coordinates.
+
+    python3 scripts/benchmark_routecalc.py --sizes 1000,5000,10000 --baseline 61e8ce2
+
+Passing --baseline compares with the calculate_route_quick of the git revision given (e.g. the pure Python
+implementation) for routes of up to --baseline-max-size coordinates.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import types
+from typing import Callable, List, Optional
+
+import numpy as np
+from loguru import logger
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mapadroid.route.routecalc.calculate_route_quick import (  # noqa: E402
+    get_length, project_equirectangular, route_calc_impl)
+
+MODULE_PATH: str = "mapadroid/route/routecalc/calculate_route_quick.py"
+
+
+def load_baseline(revision: str) -> Callable:
+    source: str = subprocess.check_output(["git", "show", "{}:{}".format(revision, MODULE_PATH)],
+                                          cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    module = types.ModuleType("calculate_route_quick_baseline")
+    exec(compile(source, MODULE_PATH, "exec"), module.__dict__)
+    return module.route_calc_impl
+
+
+def measure(route_calc: Callable, coords: np.ndarray) -> str:
+    start: float = time.perf_counter()
+    path: List[int] = route_calc(coords, "benchmark")
+    duration: float = time.perf_counter() - start
+    if sorted(path) != list(range(len(coords))):
+        return "invalid route"
+    length: float = get_length(project_equirectangular(coords), np.asarray(path))
+    return "{:8.2f}s {:10.0f}m".format(duration, length)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,5000,10000", help="Comma separated amounts of coordinates")
+    parser.add_argument("--baseline", default=None, help="Git revision to compare with")
+    parser.add_argument("--baseline-max-size", default=2000, type=int,
+                        help="Largest route to calculate with the baseline")
+    parser.add_argument("--seed", default=0, type=int)
+    args = parser.parse_args()
+    logger.remove()
+
+    baseline: Optional[Callable] = load_baseline(args.baseline) if args.baseline else None
+    rng = np.random.default_rng(args.seed)
+    print("{:>8} {:>21} {:>21}".format("coords", "current", "baseline" if baseline else ""))
+    for size in [int(size) for size in args.sizes.split(",")]:
+        # Roughly the extent of a city
+        coords: np.ndarray = np.column_stack((rng.uniform(52.4, 52.6, size), rng.uniform(13.2, 13.6, size)))
+        current: str = measure(route_calc_impl, coords)
+        compared: str = ""
+        if baseline and size <= args.baseline_max_size:
+            compared = measure(baseline, coords)
+        elif baseline:
+            compared = "skipped"
+        print("{:>8} {:>21} {:>21}".format(size, current, compared))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Load test of the RedisMitmMapper spreading the data of simulated devices across Redis shards. Verifies the latest
+data of every device afterwards and the devices being spread across all shards. Keys of the simulated devices are
+deleted from the shards at the end.
+
+    python3 scripts/loadtest_redis_mitm_mapper.py --shards redis://127.0.0.1:6379/15,redis://127.0.0.1:6380/15
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+from loguru import logger
+from redis import asyncio as aioredis
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mapadroid.data_handler.mitm_data.RedisMitmMapper import \
+    RedisMitmMapper  # noqa: E402
+from mapadroid.utils.collections import Location  # noqa: E402
+from mapadroid.utils.ProtoIdentifier import ProtoIdentifier  # noqa: E402
+
+WORKER_PREFIX: str = "loadtest_device"
+# Calls to the MITM mapper per round of a device
+OPERATIONS_PER_ROUND: int = 6
+
+
+async def simulate_device(mitm_mapper: RedisMitmMapper, device: int, rounds: int) -> None:
+    worker: str = "{}{}".format(WORKER_PREFIX, device)
+    for round_of_device in range(rounds):
+        location: Location = Location(50 + device / 1000, 8 + round_of_device / 1000)
+        gmo = {"cells": [{"id": device * 100 + cell} for cell in range(round_of_device, round_of_device + 9)]}
+        timestamp: float = time.time()
+        await mitm_mapper.update_latest(worker, str(ProtoIdentifier.GMO.value), gmo,
+                                        timestamp_received_raw=timestamp,
+                                        timestamp_received_receiver=timestamp, location=location)
+        await mitm_mapper.set_level(worker, 30 + round_of_device)
+        await mitm_mapper.set_quests_held(worker, [round_of_device])
+        await mitm_mapper.request_latest(worker, str(ProtoIdentifier.GMO.value))
+        await mitm_mapper.get_last_possibly_moved(worker)
+        await mitm_mapper.get_last_known_location(worker)
+
+
+async def verify_device(mitm_mapper: RedisMitmMapper, device: int, rounds: int) -> List[str]:
+    worker: str = "{}{}".format(WORKER_PREFIX, device)
+    errors: List[str] = []
+    latest = await mitm_mapper.request_latest(worker, str(ProtoIdentifier.GMO.value))
+    if not latest or latest.data["cells"][0]["id"] != device * 100 + rounds - 1:
+        errors.append("latest GMO")
+    if await mitm_mapper.get_last_known_location(worker) != Location(50 + device / 1000, 8 + (rounds - 1) / 1000):
+        errors.append("last known location")
+    if not await mitm_mapper.get_injection_status(worker):
+        errors.append("injection status")
+    if await mitm_mapper.get_quests_held(worker) != [rounds - 1]:
+        errors.append("quests held")
+    return ["{}: {}".format(worker, error) for error in errors]
+
+
+async def run(shard_urls: List[str], devices: int, rounds: int) -> int:
+    # The cache of the DbWrapper is not used with shards configured
+    mitm_mapper: RedisMitmMapper = RedisMitmMapper(None, shard_urls)
+    await mitm_mapper.start()
+    errors: List[str] = []
+    try:
+        start: float = time.perf_counter()
+        await asyncio.gather(*[simulate_device(mitm_mapper, device, rounds) for device in range(devices)])
+        duration: float = time.perf_counter() - start
+        print("{} devices, {} shards: {:.0f} operations per second".format(
+            devices, len(shard_urls), devices * rounds * OPERATIONS_PER_ROUND / duration))
+        for device in range(devices):
+            errors.extend(await verify_device(mitm_mapper, device, rounds))
+    finally:
+        await mitm_mapper.shutdown()
+
+    # Every worker is stored on exactly one of the shards, all shards being used
+    workers_per_shard: List[int] = []
+    for url in shard_urls:
+        shard = aioredis.Redis.from_url(url)
+        workers_per_shard.append(len([key async for key in shard.scan_iter(
+            match="{}{}*".format(RedisMitmMapper.QUESTS_HELD_KEY.format(""), WORKER_PREFIX))]))
+        keys = [key async for key in shard.scan_iter(match="*{}*".format(WORKER_PREFIX))]
+        if keys:
+            await shard.delete(*keys)
+        await shard.close()
+    print("Devices per shard: {}".format(", ".join(str(workers) for workers in workers_per_shard)))
+    if sum(workers_per_shard) != devices or not all(workers_per_shard):
+        errors.append("devices not spread across all shards")
+    for error in errors:
+        print("Unexpected {}".format(error))
+    return 1 if errors else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", required=True, help="Comma separated URLs of the Redis instances")
+    parser.add_argument("--devices", default=300, type=int, help="Amount of devices simulated")
+    parser.add_argument("--rounds", default=20, type=int, help="Rounds of data sent per device")
+    args = parser.parse_args()
+    logger.remove()
+
+    shard_urls: List[str] = [url for url in args.shards.split(",") if url]
+    sys.exit(asyncio.run(run(shard_urls, args.devices, args.rounds)))
+
+
+if __name__ == "__main__":
+    main()
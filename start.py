@@ -26,8 +26,12 @@ from mapadroid.mad_apk import get_storage_obj
 from mapadroid.madmin.madmin import MADmin
 from mapadroid.mapping_manager.MappingManager import MappingManager
 from mapadroid.mapping_manager.MappingManagerServer import MappingManagerServer
+from mapadroid.mitm_receiver.data_processing.AbstractMitmDataProcessingManager import \
+    AbstractMitmDataProcessingManager
 from mapadroid.mitm_receiver.data_processing.InProcessMitmDataProcessorManager import \
     InProcessMitmDataProcessorManager
+from mapadroid.mitm_receiver.data_processing.ProcessMitmDataProcessingManager import \
+    ProcessMitmDataProcessingManager
 from mapadroid.mitm_receiver.MITMReceiver import MITMReceiver
 from mapadroid.ocr.pogoWindows import PogoWindows
 from mapadroid.plugins.pluginBase import PluginCollection
@@ -130,8 +134,18 @@ async def start():
     stats_handler: StatsHandlerServer = StatsHandlerServer(db_wrapper)
     await stats_handler.start()
 
-    mitm_data_processor_manager = InProcessMitmDataProcessorManager(mitm_mapper, stats_handler, db_wrapper, quest_gen,
-                                                                    account_handler=account_handler)
+    mitm_data_processor_manager: AbstractMitmDataProcessingManager
+    use_data_processes: bool = MadGlobals.application_args.mitmreceiver_data_processes > 0
+    if use_data_processes and MadGlobals.application_args.mitmmapper_type == MitmMapperType.standalone:
+        # The standalone MitmMapper only lives within this process and cannot be reached by other processes
+        logger.warning("mitmreceiver_data_processes requires mitmmapper_type grpc or redis, processing MITM data "
+                       "within the MAD process")
+        use_data_processes = False
+    if use_data_processes:
+        mitm_data_processor_manager = ProcessMitmDataProcessingManager()
+    else:
+        mitm_data_processor_manager = InProcessMitmDataProcessorManager(mitm_mapper, stats_handler, db_wrapper,
+                                                                        quest_gen, account_handler=account_handler)
     await mitm_data_processor_manager.launch_processors()
 
     mitm_receiver = MITMReceiver(mitm_mapper, mapping_manager, db_wrapper,
@@ -217,8 +231,12 @@ async def start():
                 await mitm_receiver.shutdown()
                 await mitm_receiver_task.shutdown()
                 logger.debug("MITMReceiver joined")
-            # if mitm_data_processor_manager is not None:
-            #       await mitm_data_processor_manager.shutdown()
+            if isinstance(mitm_data_processor_manager, ProcessMitmDataProcessingManager):
+                await mitm_data_processor_manager.shutdown()
+            await mitm_data_processor_manager.get_queue().close()
+            if isinstance(mitm_mapper, RedisMitmMapper):
+                # Closes the connections to the shards of the workers
+                await mitm_mapper.shutdown()
             if webhook_task:
                 logger.info("Stopping webhook task")
                 webhook_task.cancel()
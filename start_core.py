@@ -219,6 +219,11 @@ async def start():
             #    storage_manager.shutdown()
             if event_task:
                 event_task.cancel()
+            if stats_handler:
+                await stats_handler.shutdown()
+            if isinstance(mitm_mapper, RedisMitmMapper):
+                # Closes the connections to the shards of the workers
+                await mitm_mapper.shutdown()
             if db_exec is not None:
                 logger.debug("Calling db_pool_manager shutdown")
                 cache: Redis = await db_wrapper.get_cache()
@@ -24,8 +24,12 @@ from mapadroid.mapping_manager.AbstractMappingManager import \
     AbstractMappingManager
 from mapadroid.mapping_manager.MappingManagerClientConnector import \
     MappingManagerClientConnector
+from mapadroid.mitm_receiver.data_processing.AbstractMitmDataProcessingManager import \
+    AbstractMitmDataProcessingManager
 from mapadroid.mitm_receiver.data_processing.InProcessMitmDataProcessorManager import \
     InProcessMitmDataProcessorManager
+from mapadroid.mitm_receiver.data_processing.ProcessMitmDataProcessingManager import \
+    ProcessMitmDataProcessingManager
 from mapadroid.mitm_receiver.MITMReceiver import MITMReceiver
 from mapadroid.utils.EnvironmentUtil import setup_loggers, setup_runtime
 from mapadroid.utils.logging import LoggerEnums, get_logger, init_logging
@@ -86,8 +90,12 @@ async def start():
     await quest_gen.setup()
     account_handler: AbstractAccountHandler = await setup_account_handler(db_wrapper)
 
-    mitm_data_processor_manager = InProcessMitmDataProcessorManager(mitm_mapper, stats_handler, db_wrapper, quest_gen,
-                                                                    account_handler=account_handler)
+    mitm_data_processor_manager: AbstractMitmDataProcessingManager
+    if MadGlobals.application_args.mitmreceiver_data_processes > 0:
+        mitm_data_processor_manager = ProcessMitmDataProcessingManager()
+    else:
+        mitm_data_processor_manager = InProcessMitmDataProcessorManager(mitm_mapper, stats_handler, db_wrapper,
+                                                                        quest_gen, account_handler=account_handler)
     await mitm_data_processor_manager.launch_processors()
 
     mapping_manager_connector = MappingManagerClientConnector()
@@ -122,6 +130,10 @@ async def start():
         await mitm_receiver_task.shutdown()
         await mitm_receiver.shutdown()
         await storage_elem.shutdown()
+        if isinstance(mitm_data_processor_manager, ProcessMitmDataProcessingManager):
+            await mitm_data_processor_manager.shutdown()
+        await mitm_data_processor_manager.get_queue().close()
+        await stats_handler.shutdown()
         try:
             logger.success("Stop called")
             terminate_mad.set()
@@ -132,6 +144,9 @@ async def start():
                 t_reporting.cancel()
             if mitm_mapper_connector:
                 await mitm_mapper_connector.close()
+            if isinstance(mitm_mapper, RedisMitmMapper):
+                # Closes the connections to the shards of the workers
+                await mitm_mapper.shutdown()
             if db_exec is not None:
                 logger.debug("Calling db_pool_manager shutdown")
                 cache: Redis = await db_wrapper.get_cache()
@@ -0,0 +1,129 @@
+import asyncio
+import time
+import unittest
+from typing import Dict
+
+import grpc
+
+from mapadroid.data_handler.grpc.MitmMapperClient import MitmMapperClient
+from mapadroid.data_handler.grpc.MitmMapperServer import MitmMapperServer
+from mapadroid.grpc.compiled.mitm_mapper.mitm_mapper_pb2 import (
+    LatestMitmDataEntryResponse, LatestMitmDataEntryUpdateRequest)
+from mapadroid.grpc.compiled.shared.Ack_pb2 import Ack
+from mapadroid.grpc.stubs.mitm_mapper.mitm_mapper_pb2_grpc import (
+    MitmMapperServicer, add_MitmMapperServicer_to_server)
+
+
+def gmo(amount_cells: int = 21) -> dict:
+    return {"cells": [{"id": 5000 + cell, "current_timestamp": 1650000000000,
+                       "forts": [{"id": "fort%s.16" % fort, "type": fort % 2, "latitude": 50.1 + fort / 1000,
+                                  "longitude": 8.6, "last_modified_timestamp_ms": 1650000000000, "enabled": True,
+                                  "gym_details": {"has_raid": False, "guard_pokemon_id": 25}}
+                                 for fort in range(10)],
+                       "wild_pokemon": [{"encounter_id": 123456789 + mon, "spawnpoint_id": "47C0A5A1",
+                                         "latitude": 50.1, "longitude": 8.6, "time_till_hidden": 1200,
+                                         "pokemon_data": {"id": mon, "display": {"form_value": 0,
+                                                                                 "weather_boosted_value": 0}}}
+                                        for mon in range(6)]}
+                      for cell in range(amount_cells)],
+            "client_weather": [], "time_of_day_value": 1}
+
+
+class SerializedServicer(MitmMapperServicer):
+    def __init__(self):
+        self.latest: Dict[str, LatestMitmDataEntryUpdateRequest] = {}
+
+    async def UpdateLatestSerialized(self, request, context):
+        self.latest[request.key] = request
+        return Ack()
+
+    async def RequestLatestSerialized(self, request, context):
+        response = LatestMitmDataEntryResponse()
+        if request.key in self.latest:
+            response.entry.CopyFrom(self.latest[request.key].data)
+        return response
+
+
+class StructServicer(MitmMapperServicer):
+    """
+    Server not knowing the serialized RPCs yet
+    """
+    def __init__(self):
+        self.latest: Dict[str, LatestMitmDataEntryUpdateRequest] = {}
+
+    async def UpdateLatest(self, request, context):
+        self.latest[request.key] = request
+        return Ack()
+
+    async def RequestLatest(self, request, context):
+        response = LatestMitmDataEntryResponse()
+        if request.key in self.latest:
+            response.entry.CopyFrom(self.latest[request.key].data)
+        return response
+
+
+class TestMitmMapperClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self) -> None:
+        await self.channel.close()
+        await self.server.stop(0)
+
+    async def start(self, servicer: MitmMapperServicer) -> MitmMapperClient:
+        self.server = grpc.aio.server()
+        add_MitmMapperServicer_to_server(servicer, self.server)
+        port = self.server.add_insecure_port("127.0.0.1:0")
+        await self.server.start()
+        self.channel = grpc.aio.insecure_channel("127.0.0.1:%s" % port)
+        return MitmMapperClient(self.channel)
+
+    async def test_serialized_transport(self):
+        servicer = SerializedServicer()
+        client = await self.start(servicer)
+        data = gmo(2)
+        await client.update_latest("origin", "106", data, timestamp_received_raw=1650000000)
+        self.assertEqual("serialized_data", servicer.latest["106"].data.WhichOneof("data"))
+        latest = await client.request_latest("origin", "106")
+        # Unlike with the Struct transport, ints are kept as such
+        self.assertEqual(data, latest.data)
+        self.assertEqual(1650000000, latest.timestamp_received)
+        self.assertIsNone(await client.request_latest("origin", "102"))
+
+    async def test_falls_back_to_struct_transport(self):
+        servicer = StructServicer()
+        client = await self.start(servicer)
+        await client.update_latest("origin", "106", gmo(2))
+        self.assertEqual("some_dictionary", servicer.latest["106"].data.WhichOneof("data"))
+        latest = await client.request_latest("origin", "106")
+        self.assertEqual(5000.0, latest.data["cells"][0]["id"])
+        await client.update_latest("origin", "4", [1, 2])
+        self.assertEqual([1.0, 2.0], (await client.request_latest("origin", "4")).data)
+        # Not able to notify either, the worker polls
+        self.assertFalse(await client.wait_for_data("origin", "106", time.time(), 1))
+        await asyncio.sleep(0.1)
+        self.assertFalse(await client.wait_for_data("origin", "106", time.time(), 1))
+
+    async def test_notifies_about_latest_data(self):
+        server = MitmMapperServer()
+        client = await self.start(server)
+        # Subscribing happens in the background, meanwhile the worker polls
+        self.assertFalse(await client.wait_for_data("origin", "106", time.time(), 1))
+        for _ in range(50):
+            if await client.wait_for_data("origin", "106", time.time(), 0.01):
+                break
+            await asyncio.sleep(0.01)
+        since = time.time()
+        waiting = asyncio.create_task(client.wait_for_data("origin", "106", since, 5))
+        await asyncio.sleep(0.05)
+        await client.update_latest("other_origin", "106", gmo(1))
+        await client.update_latest("origin", "102", {})
+        await asyncio.sleep(0.05)
+        self.assertFalse(waiting.done())
+        await client.update_latest("origin", "106", gmo(1))
+        start = time.time()
+        self.assertTrue(await asyncio.wait_for(waiting, 1))
+        self.assertLess(time.time() - start, 1)
+        # Data received after since already
+        self.assertTrue(await asyncio.wait_for(client.wait_for_data("origin", "106", since, 5), 0.5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import unittest
+from typing import List
+
+import grpc
+
+from mapadroid.data_handler.grpc.StatsHandlerClient import StatsHandlerClient
+from mapadroid.grpc.compiled.shared.Ack_pb2 import Ack
+from mapadroid.grpc.compiled.stats_handler.stats_handler_pb2 import Stats
+from mapadroid.grpc.stubs.stats_handler.stats_handler_pb2_grpc import (
+    StatsHandlerServicer, add_StatsHandlerServicer_to_server)
+from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
+from mapadroid.utils.madConstants import (STATS_CLIENT_FLUSH_SIZE,
+                                          STATS_CLIENT_MAX_BUFFERED)
+from mapadroid.utils.madGlobals import MonSeenTypes
+
+
+class BatchServicer(StatsHandlerServicer):
+    def __init__(self):
+        self.calls: int = 0
+        self.received: List[Stats] = []
+
+    async def StatsCollectBatch(self, request, context):
+        self.calls += 1
+        self.received.extend(request.stats)
+        return Ack()
+
+
+class UnaryServicer(StatsHandlerServicer):
+    """
+    Server not knowing batches of stats yet
+    """
+    def __init__(self):
+        self.calls: int = 0
+        self.received: List[Stats] = []
+
+    async def StatsCollect(self, request, context):
+        self.calls += 1
+        self.received.append(request)
+        return Ack()
+
+
+class TestStatsHandlerClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self) -> None:
+        await self.client.shutdown()
+        await self.channel.close()
+        if self.server:
+            await self.server.stop(0)
+
+    async def start(self, servicer: StatsHandlerServicer) -> StatsHandlerClient:
+        self.server = grpc.aio.server()
+        add_StatsHandlerServicer_to_server(servicer, self.server)
+        port = self.server.add_insecure_port("127.0.0.1:0")
+        await self.server.start()
+        self.channel = grpc.aio.insecure_channel("127.0.0.1:%s" % port)
+        self.client = StatsHandlerClient(self.channel)
+        return self.client
+
+    async def collect_gmo_stats(self, client: StatsHandlerClient, worker: str, timestamp: int) -> None:
+        time_scanned = DatetimeWrapper.fromtimestamp(timestamp)
+        await client.stats_collect_wild_mon(worker, [timestamp, timestamp + 1], time_scanned)
+        await client.stats_collect_seen_type([timestamp + 2], MonSeenTypes.nearby_cell, time_scanned)
+        await client.stats_collect_seen_type([timestamp + 3], MonSeenTypes.lure_wild, time_scanned)
+        await client.stats_collect_raid(worker, time_scanned, 2)
+
+    async def test_merges_stats_of_worker(self):
+        servicer = BatchServicer()
+        client = await self.start(servicer)
+        for worker in ("worker1", "worker2"):
+            await self.collect_gmo_stats(client, worker, 1650000000)
+            await self.collect_gmo_stats(client, worker, 1650000000)
+            await client.stats_collect_quest(worker, DatetimeWrapper.fromtimestamp(1650000000))
+            await client.stats_collect_quest(worker, DatetimeWrapper.fromtimestamp(1650000000))
+        await client.flush()
+        self.assertEqual(1, servicer.calls)
+        # Wild mons and raids per worker, seen types per type, quests are not merged
+        self.assertEqual(2 * 2 + 2 + 2 * 2, len(servicer.received))
+        wild_mons = [request for request in servicer.received if request.HasField("wild_mons")]
+        self.assertEqual({"worker1", "worker2"}, {request.worker.name for request in wild_mons})
+        self.assertEqual([1650000000, 1650000001] * 2, list(wild_mons[0].wild_mons.encounter_ids))
+        self.assertEqual([4, 4], [request.raid.amount for request in servicer.received if request.HasField("raid")])
+        seen_types = [request for request in servicer.received if request.HasField("seen_type")]
+        self.assertEqual([1650000002] * 4, list(seen_types[0].seen_type.encounter_ids))
+        self.assertEqual(MonSeenTypes.nearby_cell.value, seen_types[0].seen_type.type_of_detection)
+        await client.flush()
+        self.assertEqual(1, servicer.calls)
+
+    async def test_flushes_periodically_and_by_size(self):
+        servicer = BatchServicer()
+        client = await self.start(servicer)
+        await client.start()
+        await self.collect_gmo_stats(client, "worker", 1650000000)
+        await asyncio.sleep(1)
+        self.assertEqual(1, servicer.calls)
+        for timestamp in range(1650000000, 1650000000 + STATS_CLIENT_FLUSH_SIZE):
+            await client.stats_collect_quest("worker", DatetimeWrapper.fromtimestamp(timestamp))
+        await asyncio.sleep(0.1)
+        self.assertEqual(2, servicer.calls)
+        self.assertEqual(4 + STATS_CLIENT_FLUSH_SIZE, len(servicer.received))
+
+    async def test_falls_back_to_unary_calls(self):
+        servicer = UnaryServicer()
+        client = await self.start(servicer)
+        await self.collect_gmo_stats(client, "worker", 1650000000)
+        await client.flush()
+        self.assertEqual(4, servicer.calls)
+        await self.collect_gmo_stats(client, "worker", 1650000001)
+        await client.flush()
+        self.assertEqual(8, servicer.calls)
+
+    async def test_drops_stats_while_unreachable(self):
+        servicer = BatchServicer()
+        client = await self.start(servicer)
+        await self.server.stop(0)
+        self.server = None
+        for timestamp in range(1650000000, 1650000000 + STATS_CLIENT_MAX_BUFFERED + 10):
+            await client.stats_collect_quest("worker", DatetimeWrapper.fromtimestamp(timestamp))
+        self.assertEqual(STATS_CLIENT_MAX_BUFFERED, len(client._buffered))
+        await client.flush()
+        self.assertEqual(0, len(client._buffered))
+        self.assertEqual(0, servicer.calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
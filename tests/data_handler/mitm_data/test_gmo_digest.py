@@ -0,0 +1,61 @@
+import unittest
+
+from orjson import orjson
+
+from mapadroid.data_handler.mitm_data.GmoDigest import GmoDigest
+
+
+def gmo(amount_cells: int = 21) -> dict:
+    return {"cells": [{"id": 5000 + cell, "current_timestamp": 1650000000000,
+                       "forts": [{"id": "fort%s.16" % fort, "type": fort % 2, "latitude": 50.1 + fort / 1000,
+                                  "longitude": 8.6, "last_modified_timestamp_ms": 1650000000000, "enabled": True,
+                                  "visited": fort == 3, "cooldown_complete_ms": 0,
+                                  "image_url": "http://lh3.googleusercontent.com/%s" % ("x" * 60),
+                                  "pokestop_display": {"incident_expiration_ms": 0},
+                                  "gym_details": {"has_raid": False, "guard_pokemon_id": 25}}
+                                 for fort in range(10)],
+                       "wild_pokemon": [{"encounter_id": -123456789 - mon, "spawnpoint_id": "47C0A5A1",
+                                         "latitude": 50.1, "longitude": 8.6, "time_till_hidden": 1200,
+                                         "last_modified_timestamp_ms": 1650000000000,
+                                         "pokemon_data": {"id": mon, "cp": 10, "move1": 1, "move2": 2,
+                                                          "display": {"form_value": 0, "costume_value": 0,
+                                                                      "gender_value": 1,
+                                                                      "weather_boosted_value": 3}}}
+                                        for mon in range(6)],
+                       "nearby_pokemon": [{"encounter_id": 42, "pokedex_number": 1, "distance_in_meters": 100,
+                                           "fort_id": "fort1.16", "display": {"form_value": 0}}],
+                       "catchable_pokemon": [], "spawn_points": [{"latitude": 50.1, "longitude": 8.6}]}
+                      for cell in range(amount_cells)],
+            "client_weather": [{"s2_cell_id": 5000, "gameplay_weather": {"gameplay_condition": 3}}],
+            "time_of_day_value": 1}
+
+
+class TestGmoDigest(unittest.TestCase):
+    def test_keeps_values_evaluated_by_workers(self):
+        full = gmo(1)
+        digest = GmoDigest.digest(full)
+        self.assertEqual(["cells"], list(digest.keys()))
+        cell = digest["cells"][0]
+        self.assertEqual({"id", "forts", "wild_pokemon", "nearby_pokemon"}, set(cell.keys()))
+        self.assertEqual({"id": "fort3.16", "type": 1, "latitude": 50.103, "longitude": 8.6, "enabled": True,
+                          "visited": True, "cooldown_complete_ms": 0}, cell["forts"][3])
+        self.assertEqual({"encounter_id": -123456790, "spawnpoint_id": "47C0A5A1", "latitude": 50.1,
+                          "longitude": 8.6, "pokemon_data": {"id": 1, "display": {"weather_boosted_value": 3}}},
+                         cell["wild_pokemon"][1])
+        self.assertEqual([{"encounter_id": 42}], cell["nearby_pokemon"])
+        # The GMO itself is still processed as received
+        self.assertEqual(gmo(1), full)
+
+    def test_missing_values(self):
+        self.assertEqual({"cells": []}, GmoDigest.digest({}))
+        self.assertEqual({"cells": [{"id": 1}, {"id": 2, "forts": [{}], "wild_pokemon": [{"latitude": 1.0}]}]},
+                         GmoDigest.digest({"cells": [{"id": 1}, {"id": 2, "forts": [{"sponsor": 1}],
+                                                                 "wild_pokemon": [{"latitude": 1.0}]}]}))
+
+    def test_size(self):
+        # Workers deserialize the digest on every check of the latest GMO
+        self.assertLess(len(orjson.dumps(GmoDigest.digest(gmo()))) * 2, len(orjson.dumps(gmo())))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import asyncio
+import time
+import unittest
+
+from mapadroid.data_handler.mitm_data.MitmDataNotifier import MitmDataNotifier
+
+
+class TestMitmDataNotifier(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.notifier = MitmDataNotifier()
+
+    async def test_wakes_matching_waiters(self):
+        since = time.time()
+        gmo_waiters = [asyncio.create_task(self.notifier.wait("origin", "106", since, 5)) for _ in range(2)]
+        encounter_waiter = asyncio.create_task(self.notifier.wait("origin", "102", since, 0.2))
+        await asyncio.sleep(0.01)
+        self.notifier.notify("other_origin", "106")
+        self.notifier.notify("origin", 106)
+        self.assertEqual([True, True], await asyncio.wait_for(asyncio.gather(*gmo_waiters), 1))
+        self.assertFalse(await encounter_waiter)
+
+    async def test_notified_before_waiting(self):
+        since = time.time()
+        self.notifier.notify("origin", "106")
+        self.assertTrue(await asyncio.wait_for(self.notifier.wait("origin", "106", since, 5), 1))
+        self.assertFalse(await self.notifier.wait("origin", "106", time.time() + 1, 0.01))
+
+    async def test_subscribers(self):
+        subscriber = self.notifier.subscribe()
+        self.notifier.notify("origin", "106")
+        self.assertEqual(("origin", "106"), subscriber.get_nowait())
+        self.notifier.unsubscribe(subscriber)
+        self.notifier.notify("origin", "106")
+        self.assertTrue(subscriber.empty())
+
+    async def test_drops_subscribers_not_keeping_up(self):
+        subscriber = self.notifier.subscribe()
+        for _ in range(MitmDataNotifier._MAX_QUEUED_NOTIFICATIONS + 1):
+            self.notifier.notify("origin", "106")
+        self.assertFalse(self.notifier.is_subscribed(subscriber))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import os
+import unittest
+from typing import Dict, List, Optional, Union
+
+from redis import asyncio as aioredis
+from redis.exceptions import DataError
+
+from mapadroid.data_handler.mitm_data.RedisMitmMapper import RedisMitmMapper
+from mapadroid.utils.collections import Location
+
+# Redis instance to run the tests against if reachable, the keys of WORKER are deleted afterwards
+REDIS_URL: str = os.environ.get("MAD_TEST_REDIS_URL", "redis://127.0.0.1:6379/15")
+WORKER: str = "test_redis_mitm_mapper"
+
+
+def encode(value: Union[bytes, str, int, float]) -> bytes:
+    # Values are passed to Redis the way redis-py encodes them
+    if isinstance(value, bytes):
+        return value
+    elif isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise DataError("Invalid input of type {}".format(type(value)))
+    return str(value).encode()
+
+
+class FakeUpdateLatestScript:
+    """
+    Evaluates RedisMitmMapper._UPDATE_LATEST_SCRIPT on the keys and args passed the way Redis would (every arg being
+     a string within the script)
+    """
+    def __init__(self, cache: "FakeRedis"):
+        self.cache: FakeRedis = cache
+
+    async def __call__(self, keys: List[str], args: List) -> int:
+        if len(keys) != 6 or len(args) != 8:
+            raise ValueError("Script called with {} keys and {} args".format(len(keys), len(args)))
+        argv: List[bytes] = [encode(arg) for arg in args]
+        stored_timestamp: Optional[bytes] = await self.cache.get(keys[1])
+        stored: int = 0
+        if not stored_timestamp or float(stored_timestamp) <= float(argv[1]):
+            await self.cache.set(keys[0], argv[0])
+            await self.cache.set(keys[1], argv[1])
+            await self.cache.publish(argv[2], argv[3])
+            stored = 1
+        if argv[4] == b"1":
+            if argv[5] != b"":
+                if await self.cache.get(keys[2]) != argv[5]:
+                    await self.cache.set(keys[2], argv[5])
+                    await self.cache.set(keys[3], argv[6])
+                if argv[7] != b"":
+                    await self.cache.set(keys[4], argv[7])
+            await self.cache.set(keys[5], 1)
+        return stored
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values: Dict[str, bytes] = {}
+        self.published: List[bytes] = []
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.values.get(key, None)
+
+    async def set(self, key: str, value) -> None:
+        self.values[key] = encode(value)
+
+    async def publish(self, channel: bytes, message: bytes) -> None:
+        self.published.append(message)
+
+    def register_script(self, script: str) -> FakeUpdateLatestScript:
+        if script != RedisMitmMapper._UPDATE_LATEST_SCRIPT:
+            raise ValueError("Unknown script")
+        return FakeUpdateLatestScript(self)
+
+
+class FakeDbWrapper:
+    def __init__(self, cache: FakeRedis):
+        self.cache: FakeRedis = cache
+
+    async def get_cache(self) -> FakeRedis:
+        return self.cache
+
+
+class RedisMitmMapperTestMixin:
+    mitm_mapper: RedisMitmMapper
+
+    async def test_update_and_request_latest(self):
+        location = Location(50.1, 8.6)
+        gmo = {"cells": [{"id": 2}, {"id": 1}]}
+        await self.mitm_mapper.update_latest(WORKER, "106", gmo, timestamp_received_raw=100,
+                                             timestamp_received_receiver=110, location=location)
+        latest = await self.mitm_mapper.request_latest(WORKER, "106")
+        self.assertEqual(gmo, latest.data)
+        self.assertEqual(location, latest.location)
+        self.assertEqual((100, 110), (latest.timestamp_received, latest.timestamp_of_data_retrieval))
+        self.assertEqual(100, await self.mitm_mapper.get_last_possibly_moved(WORKER))
+        self.assertEqual(location, await self.mitm_mapper.get_last_known_location(WORKER))
+        self.assertTrue(await self.mitm_mapper.get_injection_status(WORKER))
+        self.assertIsNotNone(await self.mitm_mapper.request_latest(WORKER, "106", timestamp_earliest=109))
+        self.assertIsNone(await self.mitm_mapper.request_latest(WORKER, "106", timestamp_earliest=110))
+        self.assertIsNone(await self.mitm_mapper.request_latest(WORKER, "102"))
+
+    async def test_keeps_newer_data(self):
+        await self.mitm_mapper.update_latest(WORKER, "106", {"cells": [{"id": 1}]}, timestamp_received_raw=200,
+                                             timestamp_received_receiver=200)
+        await self.mitm_mapper.update_latest(WORKER, "106", {"cells": [{"id": 1}], "older": True},
+                                             timestamp_received_raw=150, timestamp_received_receiver=150)
+        self.assertEqual({"cells": [{"id": 1}]}, (await self.mitm_mapper.request_latest(WORKER, "106")).data)
+        await self.mitm_mapper.update_latest(WORKER, "106", {"cells": [{"id": 1}], "newer": True},
+                                             timestamp_received_raw=200, timestamp_received_receiver=200)
+        self.assertTrue((await self.mitm_mapper.request_latest(WORKER, "106")).data["newer"])
+
+    async def test_last_possibly_moved_on_changed_cells(self):
+        await self.mitm_mapper.update_latest(WORKER, "106", {"cells": [{"id": 1}, {"id": 2}]},
+                                             timestamp_received_raw=100, timestamp_received_receiver=100)
+        # The cells are compared regardless of their order
+        await self.mitm_mapper.update_latest(WORKER, "106", {"cells": [{"id": 2}, {"id": 1}]},
+                                             timestamp_received_raw=200, timestamp_received_receiver=200)
+        self.assertEqual(100, await self.mitm_mapper.get_last_possibly_moved(WORKER))
+        await self.mitm_mapper.update_latest(WORKER, "106", {"cells": [{"id": 3}]},
+                                             timestamp_received_raw=300, timestamp_received_receiver=300)
+        self.assertEqual(300, await self.mitm_mapper.get_last_possibly_moved(WORKER))
+
+    async def test_other_protos_do_not_update_the_state_of_the_worker(self):
+        await self.mitm_mapper.update_latest(WORKER, "102", {"status": 1}, timestamp_received_raw=100,
+                                             timestamp_received_receiver=100, location=Location(50.1, 8.6))
+        self.assertEqual({"status": 1}, (await self.mitm_mapper.request_latest(WORKER, "102")).data)
+        self.assertFalse(await self.mitm_mapper.get_injection_status(WORKER))
+        self.assertIsNone(await self.mitm_mapper.get_last_known_location(WORKER))
+        self.assertEqual(0, await self.mitm_mapper.get_last_possibly_moved(WORKER))
+
+
+class TestRedisMitmMapperScriptContract(RedisMitmMapperTestMixin, unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.cache = FakeRedis()
+        self.mitm_mapper = RedisMitmMapper(FakeDbWrapper(self.cache), [])
+        await self.mitm_mapper.start()
+
+    async def asyncTearDown(self) -> None:
+        await self.mitm_mapper.shutdown()
+
+    async def test_publishes_stored_data(self):
+        await self.mitm_mapper.update_latest(WORKER, "106", {"cells": [{"id": 1}]}, timestamp_received_raw=200,
+                                             timestamp_received_receiver=200)
+        await self.mitm_mapper.update_latest(WORKER, "106", {"cells": [{"id": 1}]}, timestamp_received_raw=100,
+                                             timestamp_received_receiver=100)
+        self.assertEqual([b'["test_redis_mitm_mapper","106"]'], self.cache.published)
+
+
+class TestRedisMitmMapper(RedisMitmMapperTestMixin, unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.mitm_mapper = RedisMitmMapper(None, [REDIS_URL])
+        try:
+            await self.mitm_mapper.start()
+        except (ConnectionError, OSError, aioredis.RedisError) as e:
+            await self.mitm_mapper.shutdown()
+            self.skipTest("Redis at {} is not reachable: {}".format(REDIS_URL, e))
+        await self.delete_keys()
+
+    async def asyncTearDown(self) -> None:
+        await self.delete_keys()
+        await self.mitm_mapper.shutdown()
+
+    async def delete_keys(self) -> None:
+        cache = aioredis.Redis.from_url(REDIS_URL)
+        keys = [key async for key in cache.scan_iter(match="*{}*".format(WORKER))]
+        if keys:
+            await cache.delete(*keys)
+        await cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
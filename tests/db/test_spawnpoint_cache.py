@@ -0,0 +1,21 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from mapadroid.db.SpawnpointCache import SpawnpointCache
+
+
+class TestSpawnpointCache(unittest.IsolatedAsyncioTestCase):
+    async def test_serves_despawn_times_committed(self):
+        cache = SpawnpointCache()
+        spawns = [SimpleNamespace(spawnpoint="1", calc_endminsec="10:00")]
+        with mock.patch("mapadroid.db.SpawnpointCache.TrsSpawnHelper.get_all",
+                        mock.AsyncMock(return_value=spawns)) as get_all:
+            self.assertEqual({1: "10:00", 2: None}, await cache.get_calc_endminsecs(None, [1, 2]))
+            cache.update({2: "20:00", 3: None})
+            self.assertEqual({1: "10:00", 2: "20:00", 3: None}, await cache.get_calc_endminsecs(None, [1, 2, 3]))
+            self.assertEqual(1, get_all.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
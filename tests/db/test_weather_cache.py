@@ -0,0 +1,26 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from mapadroid.db.WeatherCache import WeatherCache
+
+
+class TestWeatherCache(unittest.IsolatedAsyncioTestCase):
+    async def test_expires_at_top_of_hour(self):
+        cache = WeatherCache()
+        weathers = [SimpleNamespace(s2_cell_id="1", gameplay_weather=3)]
+        with mock.patch("mapadroid.db.WeatherCache.WeatherHelper.get_by_cell_ids",
+                        mock.AsyncMock(return_value=weathers)) as get_by_cell_ids, \
+                mock.patch("mapadroid.db.WeatherCache.time.time", return_value=3600 * 10 + 3590):
+            self.assertEqual({1: 3, 2: 0}, await cache.get_gameplay_weathers(None, [1, 2]))
+            cache.update(2, 4)
+            self.assertEqual({1: 3, 2: 4}, await cache.get_gameplay_weathers(None, [1, 2]))
+            self.assertEqual(1, get_by_cell_ids.call_count)
+            get_by_cell_ids.return_value = [SimpleNamespace(s2_cell_id="1", gameplay_weather=5)]
+            with mock.patch("mapadroid.db.WeatherCache.time.time", return_value=3600 * 11 + 5):
+                self.assertEqual({1: 5, 2: 0}, await cache.get_gameplay_weathers(None, [1, 2]))
+            self.assertEqual(2, get_by_cell_ids.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import unittest
+from typing import Dict, List, Optional, Set
+
+import grpc
+
+from mapadroid.db.model import SettingsAuth
+from mapadroid.mapping_manager.AbstractMappingManager import \
+    AbstractMappingManager
+from mapadroid.mapping_manager.MappingManagerClient import MappingManagerClient
+from mapadroid.mapping_manager.MappingManagerServer import MappingManagerServer
+from mapadroid.grpc.stubs.mapping_manager.mapping_manager_pb2_grpc import (
+    MappingManagerServicer, add_MappingManagerServicer_to_server)
+
+
+class FakeMappingManager(AbstractMappingManager):
+    def __init__(self):
+        self.requested: int = 0
+        self.auth_level: int = 1
+        self.version: int = 0
+        self.updated: asyncio.Event = asyncio.Event()
+
+    def update(self) -> None:
+        self.auth_level += 1
+        self.version += 1
+        updated, self.updated = self.updated, asyncio.Event()
+        updated.set()
+
+    async def wait_for_mappings_update(self, version: Optional[int]) -> int:
+        while version == self.version:
+            await self.updated.wait()
+        return self.version
+
+    async def get_auths(self) -> Optional[Dict[str, SettingsAuth]]:
+        self.requested += 1
+        auth: SettingsAuth = SettingsAuth()
+        auth.username = "user"
+        auth.password = "password"
+        auth.auth_level = self.auth_level
+        return {"user": auth}
+
+    async def get_all_loaded_origins(self) -> Set[str]:
+        self.requested += 1
+        return {"origin"}
+
+    async def get_safe_items(self, origin: str) -> List[int]:
+        self.requested += 1
+        return [1, 2]
+
+    async def routemanager_of_origin_is_levelmode(self, origin: str) -> bool:
+        return False
+
+    async def routemanager_get_quest_layer_to_scan_of_origin(self, origin: str) -> Optional[int]:
+        return None
+
+    async def increment_login_tracking_by_origin(self, origin: str) -> bool:
+        return True
+
+
+class ServerWithoutUpdates(MappingManagerServicer):
+    """
+    Server not knowing the updates of the mappings yet
+    """
+    def __init__(self, mapping_manager: FakeMappingManager):
+        self.server = MappingManagerServer(mapping_manager)
+
+    async def GetAllowedAuthenticationCredentials(self, request, context):
+        return await self.server.GetAllowedAuthenticationCredentials(request, context)
+
+
+class TestMappingManagerClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self) -> None:
+        await self.channel.close()
+        await self.server.stop(0)
+
+    async def start(self, servicer: MappingManagerServicer) -> MappingManagerClient:
+        self.server = grpc.aio.server()
+        add_MappingManagerServicer_to_server(servicer, self.server)
+        port = self.server.add_insecure_port("127.0.0.1:0")
+        await self.server.start()
+        self.channel = grpc.aio.insecure_channel("127.0.0.1:%s" % port)
+        return MappingManagerClient(self.channel)
+
+    async def test_caches_until_mappings_are_updated(self):
+        mapping_manager = FakeMappingManager()
+        client = await self.start(MappingManagerServer(mapping_manager))
+        self.assertEqual(0, await asyncio.wait_for(client.wait_for_mappings_update(None), 1))
+        for _ in range(3):
+            self.assertEqual(1, (await client.get_auths())["user"].auth_level)
+            self.assertEqual({"origin"}, await client.get_all_loaded_origins())
+            self.assertEqual([1, 2], await client.get_safe_items("origin"))
+        self.assertEqual(3, mapping_manager.requested)
+
+        mapping_manager.update()
+        self.assertEqual(1, await asyncio.wait_for(client.wait_for_mappings_update(0), 1))
+        self.assertEqual(2, (await client.get_auths())["user"].auth_level)
+        self.assertEqual(2, (await client.get_auths())["user"].auth_level)
+        self.assertEqual(4, mapping_manager.requested)
+
+    async def test_falls_back_to_ttl(self):
+        mapping_manager = FakeMappingManager()
+        client = await self.start(ServerWithoutUpdates(mapping_manager))
+        client._FALLBACK_CACHE_TTL = 0.2
+        self.assertEqual(1, (await client.get_auths())["user"].auth_level)
+        await asyncio.sleep(0.05)
+        self.assertFalse(client._updates_supported)
+        mapping_manager.update()
+        self.assertEqual(1, (await client.get_auths())["user"].auth_level)
+        await asyncio.sleep(0.2)
+        self.assertEqual(2, (await client.get_auths())["user"].auth_level)
+        self.assertEqual(2, mapping_manager.requested)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from mapadroid.mitm_receiver.data_processing.GmoCellFingerprints import \
+    GmoCellFingerprints
+
+
+def cell(cell_id: int, time_till_hidden: int = 1000, stop_modified: int = 1) -> dict:
+    return {"id": cell_id,
+            "forts": [{"id": "stop%s" % cell_id, "type": 1, "last_modified_timestamp_ms": stop_modified}],
+            "wild_pokemon": [{"encounter_id": cell_id, "time_till_hidden": time_till_hidden,
+                              "pokemon_data": {"id": 1}}],
+            "nearby_pokemon": [{"encounter_id": -cell_id, "id": 1, "distance_in_meters": time_till_hidden}]}
+
+
+def gmo(*cells: dict, weather: int = 1) -> dict:
+    return {"cells": list(cells), "time_of_day_value": 1,
+            "client_weather": [{"cell_id": 1, "gameplay_weather": {"gameplay_condition": weather}}]}
+
+
+class TestGmoCellFingerprints(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fingerprints = GmoCellFingerprints(ttl=60)
+
+    def test_skips_accepted_cells_only(self):
+        reduced, skipped, pending = self.fingerprints.reduce(gmo(cell(1), cell(2)))
+        self.assertEqual(2, len(reduced["cells"]))
+        self.assertEqual([], skipped)
+        # Not accepted (e.g. still being processed) yet
+        self.assertEqual(2, len(self.fingerprints.reduce(gmo(cell(1), cell(2)))[0]["cells"]))
+
+        self.fingerprints.accept(pending)
+        reduced, skipped, _ = self.fingerprints.reduce(gmo(cell(1, time_till_hidden=500), cell(2, stop_modified=2),
+                                                           weather=2))
+        self.assertEqual([2], [changed["id"] for changed in reduced["cells"]])
+        self.assertEqual([1], [unchanged["id"] for unchanged in skipped])
+        self.assertEqual(1, len(reduced["client_weather"]))
+        self.assertEqual(1, reduced["time_of_day_value"])
+
+    def test_time_till_hidden_becoming_valid_changes_cell(self):
+        self.fingerprints.accept(self.fingerprints.reduce(gmo(cell(1, time_till_hidden=-1)))[2])
+        self.assertEqual(1, len(self.fingerprints.reduce(gmo(cell(1, time_till_hidden=-1)))[1]))
+        # The despawn time of the spawnpoint is learned from the time till hidden once it is valid
+        reduced, skipped, _ = self.fingerprints.reduce(gmo(cell(1, time_till_hidden=80000)))
+        self.assertEqual([1], [changed["id"] for changed in reduced["cells"]])
+        self.assertEqual([], skipped)
+
+    def test_unchanged_gmo(self):
+        payload = gmo(cell(1))
+        self.fingerprints.accept(self.fingerprints.reduce(payload)[2])
+        reduced, skipped, pending = self.fingerprints.reduce(gmo(cell(1)))
+        self.assertEqual([], reduced["cells"])
+        self.assertEqual([], reduced["client_weather"])
+        self.assertEqual(1, len(skipped))
+        self.assertEqual({}, pending)
+        # The payload passed is never altered
+        self.assertEqual(1, len(payload["cells"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
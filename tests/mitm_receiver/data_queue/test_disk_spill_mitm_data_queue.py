@@ -0,0 +1,116 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from mapadroid.mitm_receiver.data_queue.DiskSpillMitmDataQueue import \
+    DiskSpillMitmDataQueue
+
+
+class TestDiskSpillMitmDataQueue(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.path = self._tmp_dir.name
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
+
+    async def _drain(self, queue: DiskSpillMitmDataQueue) -> list:
+        items = []
+        while not queue.empty():
+            items.append(await queue.get())
+            queue.ack(items[-1])
+        return items
+
+    async def test_spills_in_order(self):
+        queue = DiskSpillMitmDataQueue(self.path, memory_items=3, segment_items=2)
+        for i in range(10):
+            await queue.put((i, {"type": 106}, "origin"))
+        self.assertEqual(10, queue.qsize())
+        self.assertEqual(7, queue.get_disk_items())
+        self.assertEqual(list(range(10)), [item[0] for item in await self._drain(queue)])
+        self.assertEqual(0, queue.qsize())
+        # Acknowledged segments are removed, only the one written to is left
+        self.assertLessEqual(len(os.listdir(self.path)), 1)
+
+    async def test_replays_after_close(self):
+        queue = DiskSpillMitmDataQueue(self.path, memory_items=3, segment_items=2)
+        for i in range(8):
+            await queue.put((i, {}, "origin"))
+        queue.ack(await queue.get())
+        # Taken but not acknowledged, e.g. still being processed
+        self.assertEqual(1, (await queue.get())[0])
+        await queue.close()
+
+        replayed = DiskSpillMitmDataQueue(self.path, memory_items=3, segment_items=2)
+        self.assertEqual(7, replayed.qsize())
+        self.assertGreaterEqual(replayed.get_oldest_item_age(), 0.0)
+        await replayed.put((8, {}, "origin"))
+        self.assertEqual(list(range(1, 9)), [item[0] for item in await self._drain(replayed)])
+        # Replayed items are registered as unfinished and marked done by the consumer
+        await replayed.join()
+
+    async def test_replays_after_crash(self):
+        queue = DiskSpillMitmDataQueue(self.path, memory_items=3, segment_items=2)
+        for i in range(6):
+            await queue.put((i, {}, "origin"))
+        await queue.get()
+        # Acknowledged out of order
+        queue.ack(await queue.get())
+        # Not closed, items held in memory are on disk nonetheless once flushed
+        queue.flush()
+        replayed = DiskSpillMitmDataQueue(self.path, memory_items=3, segment_items=2)
+        self.assertEqual([0, 2, 3, 4, 5], [item[0] for item in await self._drain(replayed)])
+
+    def _get_size_on_disk(self) -> int:
+        return sum(os.path.getsize(os.path.join(self.path, filename)) for filename in os.listdir(self.path))
+
+    async def test_flushes_in_batches(self):
+        queue = DiskSpillMitmDataQueue(self.path, memory_items=1)
+        for i in range(DiskSpillMitmDataQueue._FLUSH_RECORDS - 1):
+            await queue.put((i, {}, "origin"))
+        self.assertEqual(0, self._get_size_on_disk())
+        await queue.put((DiskSpillMitmDataQueue._FLUSH_RECORDS - 1, {}, "origin"))
+        flushed: int = self._get_size_on_disk()
+        self.assertGreater(flushed, 0)
+        # Flushed after the interval otherwise
+        await queue.put((DiskSpillMitmDataQueue._FLUSH_RECORDS, {}, "origin"))
+        self.assertEqual(flushed, self._get_size_on_disk())
+        await asyncio.sleep(DiskSpillMitmDataQueue._FLUSH_INTERVAL * 2)
+        self.assertGreater(self._get_size_on_disk(), flushed)
+        await queue.close()
+        replayed = DiskSpillMitmDataQueue(self.path, memory_items=1)
+        self.assertEqual(list(range(DiskSpillMitmDataQueue._FLUSH_RECORDS + 1)),
+                         [item[0] for item in await self._drain(replayed)])
+
+    async def test_stop_signal_first_and_not_persisted(self):
+        queue = DiskSpillMitmDataQueue(self.path, memory_items=2)
+        for i in range(4):
+            await queue.put((i, {}, "origin"))
+        await queue.put(None)
+        self.assertIsNone(await queue.get())
+        await queue.close()
+
+        replayed = DiskSpillMitmDataQueue(self.path, memory_items=2)
+        self.assertEqual(list(range(4)), [item[0] for item in await self._drain(replayed)])
+
+    async def test_ignores_truncated_record(self):
+        queue = DiskSpillMitmDataQueue(self.path, memory_items=1)
+        for i in range(3):
+            await queue.put((i, {}, "origin"))
+        queue.flush()
+        segment = os.path.join(self.path, sorted(os.listdir(self.path))[-1])
+        with open(segment, "ab") as segment_file:
+            segment_file.write(b"\x00\x00\x01")
+
+        replayed = DiskSpillMitmDataQueue(self.path, memory_items=1)
+        self.assertEqual(3, replayed.qsize())
+        self.assertEqual([0, 1, 2], [item[0] for item in await self._drain(replayed)])
+        await replayed.put((3, {}, "origin"))
+        self.assertEqual([3], [item[0] for item in await self._drain(replayed)])
+        # Everything has been acknowledged, the truncated segment is removed as well
+        self.assertEqual(0, DiskSpillMitmDataQueue(self.path, memory_items=1).qsize())
+
+
+if __name__ == '__main__':
+    unittest.main()
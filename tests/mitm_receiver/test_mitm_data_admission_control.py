@@ -0,0 +1,52 @@
+import unittest
+
+from mapadroid.mitm_receiver.data_queue.MitmDataQueue import MitmDataQueue
+from mapadroid.mitm_receiver.MitmDataAdmissionControl import \
+    MitmDataAdmissionControl
+
+
+def gmo(*cell_ids: int, nearby_only: bool = False) -> dict:
+    cells = []
+    for cell_id in cell_ids:
+        cell = {"id": cell_id, "nearby_pokemon": [{"pokedex_number": 1}]}
+        if not nearby_only:
+            cell["wild_pokemon"] = [{"encounter_id": cell_id}]
+        cells.append(cell)
+    return {"cells": cells}
+
+
+class TestMitmDataAdmissionControl(unittest.TestCase):
+    def setUp(self) -> None:
+        self.queue = MitmDataQueue()
+        self.admission_control = MitmDataAdmissionControl(self.queue, max_queue_size=10)
+
+    def fill_queue(self, amount: int) -> None:
+        for i in range(amount):
+            self.queue.put_nowait((i, {}, "origin"))
+
+    def test_disabled_admits_everything(self):
+        admission_control = MitmDataAdmissionControl(self.queue)
+        self.fill_queue(100)
+        self.assertTrue(admission_control.admit(106, gmo(1, nearby_only=True)))
+        self.assertFalse(admission_control.is_overloaded())
+
+    def test_sheds_duplicate_and_nearby_only_gmos(self):
+        self.assertTrue(self.admission_control.admit(106, gmo(1, 2)))
+        self.fill_queue(10)
+        self.assertFalse(self.admission_control.admit(106, gmo(2, 1)))
+        self.assertFalse(self.admission_control.admit(106, gmo(3, nearby_only=True)))
+        self.assertTrue(self.admission_control.admit(106, gmo(3)))
+        self.assertTrue(self.admission_control.admit(104, {}))
+        self.assertFalse(self.admission_control.is_overloaded())
+
+    def test_overloaded_keeps_priority_protos(self):
+        self.fill_queue(20)
+        self.assertTrue(self.admission_control.is_overloaded())
+        self.assertFalse(self.admission_control.admit(106, gmo(4)))
+        self.assertFalse(self.admission_control.admit(104, {}))
+        self.assertTrue(self.admission_control.admit(102, {}))
+        self.assertTrue(self.admission_control.admit(101, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from orjson import orjson
+
+from mapadroid.mitm_receiver.MitmProtoParser import MitmProtoParser
+
+
+class TestMitmProtoParser(unittest.TestCase):
+    def test_filters_methods(self):
+        body = orjson.dumps([{"type": 106, "payload": {}}, {"type": 2, "payload": {}}, {"payload": {}},
+                             {"type": 0}, "garbage", {"type": 102, "payload": {}}])
+        protos, missing_method = MitmProtoParser.parse(body)
+        self.assertEqual([106, 102], [proto["type"] for proto in protos])
+        self.assertEqual(2, missing_method)
+
+    def test_single_proto(self):
+        self.assertEqual([{"type": 4, "payload": {}}], MitmProtoParser.parse(b'{"type": 4, "payload": {}}')[0])
+        self.assertEqual(([], 0), MitmProtoParser.parse(b'"garbage"'))
+
+    def test_parses_utf8_bytes(self):
+        body = '[{"type": 102, "payload": {"status": 1, "ü": "ä"}}, {"type": 2, "payload": {"é": 1}}]'
+        protos, missing_method = MitmProtoParser.parse(body.encode("utf8"))
+        self.assertEqual([{"type": 102, "payload": {"status": 1, "ü": "ä"}}], protos)
+        self.assertEqual(0, missing_method)
+
+
+if __name__ == '__main__':
+    unittest.main()
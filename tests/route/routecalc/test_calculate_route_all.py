@@ -0,0 +1,42 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from mapadroid.route.routecalc.calculate_route_all import (
+    is_or_tools_available, route_calc_ortools)
+from mapadroid.route.routecalc.calculate_route_quick import \
+    project_equirectangular
+from mapadroid.route.routecalc.calculate_route_repair import get_cycle_length
+
+
+@unittest.skipUnless(is_or_tools_available(), "OR-Tools is not installed")
+class TestRouteCalcOrTools(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.coords = np.column_stack((rng.uniform(52.4, 52.6, 60), rng.uniform(13.2, 13.6, 60)))
+        self.points = project_equirectangular(self.coords)
+
+    def assert_route(self, path):
+        self.assertEqual(list(range(len(self.coords))), sorted(path))
+        self.assertEqual(0, path[0])
+
+    def test_transit_matrix(self):
+        self.assert_route(route_calc_ortools(self.coords, "test"))
+
+    def test_improves_within_time_budget(self):
+        path = route_calc_ortools(self.coords, "test")
+        improved = route_calc_ortools(self.coords, "test", 1)
+        self.assert_route(improved)
+        self.assertLessEqual(get_cycle_length(self.points, improved), get_cycle_length(self.points, path))
+
+    def test_callback_above_matrix_limit(self):
+        with mock.patch("mapadroid.route.routecalc.calculate_route_all.ROUTECALC_ORTOOLS_MAX_MATRIX_COORDS", 10):
+            path = route_calc_ortools(self.coords, "test")
+        self.assert_route(path)
+        self.assertEqual(get_cycle_length(self.points, route_calc_ortools(self.coords, "test")),
+                         get_cycle_length(self.points, path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from mapadroid.route.routecalc.calculate_route_all import \
+    create_distance_matrix
+from mapadroid.route.routecalc.calculate_route_improve import (
+    get_nearest_neighbours, improve_route)
+from mapadroid.route.routecalc.calculate_route_quick import (
+    project_equirectangular, route_calc_impl)
+from mapadroid.route.routecalc.calculate_route_repair import get_cycle_length
+
+
+class TestCalculateRouteImprove(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.coords = np.column_stack((rng.uniform(52.4, 52.6, 400), rng.uniform(13.2, 13.6, 400)))
+        self.points = project_equirectangular(self.coords)
+
+    def test_improves_route(self):
+        path = route_calc_impl(self.coords, "test")
+        improved = improve_route(self.coords, path, 10, "test")
+        self.assertEqual(list(range(400)), sorted(improved))
+        self.assertEqual(path[0], improved[0])
+        self.assertLess(get_cycle_length(self.points, improved), get_cycle_length(self.points, path) * 0.95)
+
+    def test_untangles_square(self):
+        square = np.array([[52.5, 13.4], [52.5, 13.42], [52.51, 13.42], [52.51, 13.4], [52.5, 13.41],
+                           [52.51, 13.41]])
+        # Zigzag between the long sides
+        improved = improve_route(square, [0, 5, 4, 2, 1, 3], 10, "test")
+        points = project_equirectangular(square)
+        # Along the perimeter
+        self.assertAlmostEqual(get_cycle_length(points, [0, 4, 1, 2, 5, 3]), get_cycle_length(points, improved))
+
+    def test_no_budget_keeps_route(self):
+        path = list(reversed(range(400)))
+        self.assertEqual(path, improve_route(self.coords, path, 0, "test"))
+
+    def test_nearest_neighbours(self):
+        neighbours = get_nearest_neighbours(self.points, 5)
+        for index in (0, 123, 399):
+            distances = np.hypot(*(self.points - self.points[index]).T)
+            distances[index] = np.inf
+            self.assertEqual(np.argsort(distances)[:5].tolist(), neighbours[index].tolist())
+
+    def test_distance_matrix_in_meters(self):
+        matrix = create_distance_matrix(self.coords)
+        self.assertEqual(np.int32, matrix.dtype)
+        self.assertEqual(0, matrix[7, 7])
+        self.assertAlmostEqual(np.hypot(*(self.points[3] - self.points[250])), matrix[3, 250], delta=0.5)
+        np.testing.assert_array_equal(matrix, matrix.T)
+
+
+if __name__ == '__main__':
+    unittest.main()
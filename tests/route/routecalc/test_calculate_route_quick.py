@@ -0,0 +1,71 @@
+import itertools
+import unittest
+
+import numpy as np
+
+from mapadroid.route.routecalc.calculate_route_quick import (
+    find_eulerian_tour, get_length, minimum_spanning_tree,
+    project_equirectangular, route_calc_impl)
+
+
+class TestCalculateRouteQuick(unittest.TestCase):
+    def test_visits_every_coordinate_once(self):
+        rng = np.random.default_rng(0)
+        for amount in (0, 1, 2, 3, 4, 5, 50, 333):
+            coords = np.column_stack((rng.uniform(52.4, 52.6, amount), rng.uniform(13.2, 13.6, amount)))
+            route = route_calc_impl(coords, "test")
+            self.assertEqual(list(range(amount)), sorted(route))
+            if amount:
+                self.assertEqual(0, route[0])
+
+    def test_duplicate_coordinates(self):
+        coords = np.array([[52.5, 13.4]] * 5 + [[52.51, 13.4]] * 3)
+        self.assertEqual(list(range(8)), sorted(route_calc_impl(coords, "test")))
+
+    def test_projection(self):
+        # 0.01 degrees of latitude are about 1112m, of longitude about 679m at 52.5 degrees latitude
+        points = project_equirectangular([[52.5, 13.4], [52.51, 13.4], [52.5, 13.41]])
+        self.assertAlmostEqual(1112, np.hypot(*(points[1] - points[0])), delta=1)
+        self.assertAlmostEqual(677, np.hypot(*(points[2] - points[0])), delta=2)
+
+    def test_minimum_spanning_tree(self):
+        rng = np.random.default_rng(1)
+        points = rng.uniform(0, 1000, (40, 2))
+        edges_from, edges_to = minimum_spanning_tree(points)
+        self.assertEqual(39, len(edges_from))
+        # Kruskal on the complete graph for comparison
+        parents = list(range(40))
+
+        def find(vertex):
+            while parents[vertex] != vertex:
+                vertex = parents[vertex]
+            return vertex
+        expected_weight = 0
+        for weight, first, second in sorted((np.hypot(*(points[first] - points[second])), first, second)
+                                            for first, second in itertools.combinations(range(40), 2)):
+            if find(first) != find(second):
+                parents[find(first)] = find(second)
+                expected_weight += weight
+        weight = sum(np.hypot(*(points[first] - points[second])) for first, second in zip(edges_from, edges_to))
+        self.assertAlmostEqual(expected_weight, weight)
+
+    def test_eulerian_tour_uses_every_edge(self):
+        # Two triangles sharing vertex 0 plus a double edge
+        edges_from = np.array([0, 1, 2, 0, 3, 4, 4, 5])
+        edges_to = np.array([1, 2, 0, 3, 4, 0, 5, 4])
+        tour = find_eulerian_tour(edges_from, edges_to, 6)
+        self.assertEqual(len(edges_from) + 1, len(tour))
+        self.assertEqual((0, 0), (tour[0], tour[-1]))
+        walked = sorted(tuple(sorted(edge)) for edge in zip(tour[:-1], tour[1:]))
+        self.assertEqual(sorted(tuple(sorted(edge)) for edge in zip(edges_from, edges_to)), walked)
+
+    def test_route_on_grid_is_short(self):
+        # The optimal route through a 10x10 grid of 100m spacing is 99 * 100m long
+        coords = np.array([[52.5 + row * 0.0009, 13.4 + column * 0.00148] for row in range(10) for column in range(10)])
+        points = project_equirectangular(coords)
+        length = get_length(points, np.asarray(route_calc_impl(coords, "test")))
+        self.assertLess(length, 99 * 100 * 1.3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from mapadroid.route.routecalc.calculate_route_quick import (
+    project_equirectangular, route_calc_impl)
+from mapadroid.route.routecalc.calculate_route_repair import (
+    get_change_ratio, get_cycle_length, route_repair_impl)
+from mapadroid.utils.collections import Location
+
+
+def get_length(route):
+    return get_cycle_length(project_equirectangular([(coord.lat, coord.lng) for coord in route]),
+                            list(range(len(route))))
+
+
+class TestCalculateRouteRepair(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        coords = np.column_stack((rng.uniform(52.4, 52.6, 600), rng.uniform(13.2, 13.6, 600)))
+        self.route = [Location(*coords[index]) for index in route_calc_impl(coords, "test")]
+        self.new_coords = [Location(*coord) for coord in
+                           np.column_stack((rng.uniform(52.4, 52.6, 30), rng.uniform(13.2, 13.6, 30)))]
+
+    def test_unchanged_route_is_kept(self):
+        self.assertEqual(self.route, route_repair_impl(self.route, list(reversed(self.route)), "test"))
+
+    def test_visits_every_coord_once(self):
+        coords = self.route[::3] + self.route[1::3] + self.new_coords
+        repaired = route_repair_impl(self.route, coords, "test")
+        self.assertEqual(len(coords), len(repaired))
+        self.assertEqual(set(coords), set(repaired))
+        self.assertEqual(self.route[0], repaired[0])
+
+    def test_inserted_between_neighbours(self):
+        route = [Location(52.5, 13.4), Location(52.5, 13.41), Location(52.51, 13.41), Location(52.51, 13.4)]
+        between = Location(52.5, 13.405)
+        repaired = route_repair_impl(route, route + [between], "test")
+        self.assertEqual([route[0], between] + route[1:], repaired)
+
+    def test_repair_is_about_as_short_as_new_route(self):
+        coords = [coord for position, coord in enumerate(self.route) if position % 20] + self.new_coords
+        repaired = route_repair_impl(self.route, coords, "test")
+        points = np.array([(coord.lat, coord.lng) for coord in coords])
+        calculated = [coords[index] for index in route_calc_impl(points, "test")]
+        self.assertLess(get_length(repaired), get_length(calculated) * 1.1)
+
+    def test_two_opt_untangles_around_removal(self):
+        corners = [Location(52.5, 13.4), Location(52.5, 13.42), Location(52.52, 13.42), Location(52.52, 13.4),
+                   Location(52.51, 13.43)]
+        # Without the last corner the route crosses itself
+        route = [corners[0], corners[2], corners[4], corners[1], corners[3]]
+        self.assertEqual(corners[:4], route_repair_impl(route, corners[:4], "test"))
+
+    def test_change_ratio(self):
+        self.assertEqual(0, get_change_ratio(self.route, list(reversed(self.route))))
+        coords = self.route[:-10] + self.new_coords[:20]
+        self.assertAlmostEqual(30 / 610, get_change_ratio(self.route, coords))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import time
+import unittest
+
+from mapadroid.route.routecalc.RoutecalcCache import RoutecalcCache
+from mapadroid.utils.collections import Location
+
+COORDS = [Location(52.5, 13.4), Location(52.51, 13.41), Location(52.52, 13.39)]
+
+
+class TestRoutecalcCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = RoutecalcCache(self.directory.name, 2)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_key_ignores_order_of_coords(self):
+        key = RoutecalcCache.get_key(COORDS, "OR_TOOLS", 70, 4, False, 15)
+        self.assertEqual(key, RoutecalcCache.get_key(list(reversed(COORDS)), "OR_TOOLS", 70, 4, False, 15))
+        # The S2 level only matters if S2 is used
+        self.assertEqual(key, RoutecalcCache.get_key(COORDS, "OR_TOOLS", 70, 4, False, 17))
+
+    def test_key_depends_on_settings(self):
+        key = RoutecalcCache.get_key(COORDS, "OR_TOOLS", 70, 4, False, 15)
+        self.assertNotEqual(key, RoutecalcCache.get_key(COORDS, "TSP_QUICK", 70, 4, False, 15))
+        self.assertNotEqual(key, RoutecalcCache.get_key(COORDS, "OR_TOOLS", 71, 4, False, 15))
+        self.assertNotEqual(key, RoutecalcCache.get_key(COORDS, "OR_TOOLS", 70, 5, False, 15))
+        self.assertNotEqual(key, RoutecalcCache.get_key(COORDS, "OR_TOOLS", 70, 4, True, 15))
+        self.assertNotEqual(key, RoutecalcCache.get_key(COORDS[:2], "OR_TOOLS", 70, 4, False, 15))
+        self.assertNotEqual(key, RoutecalcCache.get_key(COORDS, "OR_TOOLS", 70, 4, False, 15, 10))
+
+    def test_put_and_get(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.put("a", COORDS)
+        self.assertEqual(COORDS, self.cache.get("a"))
+        # Shared by any cache of the same directory
+        self.assertEqual(COORDS, RoutecalcCache(self.directory.name, 2).get("a"))
+
+    def test_least_recently_used_are_evicted(self):
+        self.cache.put("a", COORDS)
+        self.cache.put("b", COORDS)
+        past = time.time() - 60
+        os.utime(os.path.join(self.directory.name, "a.json"), (past, past))
+        os.utime(os.path.join(self.directory.name, "b.json"), (past - 60, past - 60))
+        self.cache.get("b")
+        self.cache.put("c", COORDS)
+        self.assertIsNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+    def test_unreadable_entries_are_discarded(self):
+        with open(os.path.join(self.directory.name, "a.json"), "w") as cache_file:
+            cache_file.write("[[52.5,")
+        self.assertIsNone(self.cache.get("a"))
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, "a.json")))
+
+
+if __name__ == '__main__':
+    unittest.main()
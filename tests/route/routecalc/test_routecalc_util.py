@@ -0,0 +1,115 @@
+import asyncio
+import functools
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from typing import List
+from unittest import mock
+
+from mapadroid.route.routecalc.RoutecalcCache import RoutecalcCache
+from mapadroid.route.routecalc.RoutecalcUtil import RoutecalcUtil
+from mapadroid.route.routecalc.RoutecalcWorkerPool import RoutecalcWorkerPool
+from mapadroid.utils.collections import Location
+from mapadroid.utils.madGlobals import (RoutecalcJobSupersededError,
+                                        RoutecalculationTypes)
+
+COORDS = [Location(52.5, 13.4), Location(52.51, 13.41), Location(52.52, 13.39), Location(52.53, 13.38)]
+# Upper bound of waiting for jobs, only reached if the test fails
+TIMEOUT: float = 10
+
+
+def get_less_coords_at_gate(gate_path: str, coords: List[Location], *args) -> List[Location]:
+    """
+    Clusters once gate_path exists, the gate_path is created with a suffix once started
+    """
+    open(gate_path + ".started", "w").close()
+    deadline: float = time.time() + TIMEOUT
+    while not os.path.exists(gate_path):
+        if time.time() > deadline:
+            raise TimeoutError(gate_path)
+        time.sleep(0.01)
+    return coords
+
+
+class FakeSession:
+    def __init__(self):
+        self.commits: int = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def add(self, instance) -> None:
+        pass
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        pass
+
+
+class FakeDbWrapper:
+    def __init__(self):
+        self.session: FakeSession = FakeSession()
+
+    async def __aenter__(self) -> FakeSession:
+        return self.session
+
+    async def __aexit__(self, *args):
+        return False
+
+    def get_instance_id(self) -> int:
+        return 1
+
+
+class TestRoutecalcUtil(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.gate_path: str = os.path.join(self.directory.name, "gate")
+        self.cache = RoutecalcCache(os.path.join(self.directory.name, "cache"), 10)
+        self.routecalc_entry = SimpleNamespace(routecalc_id=1, routefile=None, recalc_status=0, last_updated=None)
+        self.db_wrapper = FakeDbWrapper()
+
+    async def asyncTearDown(self) -> None:
+        open(self.gate_path, "w").close()
+        RoutecalcWorkerPool.shutdown_shared()
+        self.directory.cleanup()
+
+    async def calculate(self, max_radius: int, job_key: int) -> List[Location]:
+        return await RoutecalcUtil.calculate_route(self.db_wrapper, 1, COORDS, max_radius, 2,
+                                                   load_persisted_route=False,
+                                                   algorithm=RoutecalculationTypes.OR_TOOLS, use_s2=False,
+                                                   s2_level=15, route_name="test", job_key=job_key)
+
+    async def test_cache_hit_supersedes_calculation_queued(self):
+        cached_route = list(reversed(COORDS))
+        with mock.patch.object(RoutecalcCache, "get_shared", return_value=self.cache), \
+                mock.patch("mapadroid.route.routecalc.RoutecalcUtil.SettingsRoutecalcHelper.get",
+                           mock.AsyncMock(return_value=self.routecalc_entry)), \
+                mock.patch.object(RoutecalcUtil, "get_less_coords",
+                                  functools.partial(get_less_coords_at_gate, self.gate_path)):
+            self.cache.put(RoutecalcCache.get_key(COORDS, "TSP_QUICK", 200, 2, False, 15), cached_route)
+            calculating = asyncio.create_task(self.calculate(100, 1))
+            other_key = asyncio.create_task(self.calculate(100, 2))
+            deadline: float = time.time() + TIMEOUT
+            while not os.path.exists(self.gate_path + ".started"):
+                self.assertLess(time.time(), deadline)
+                await asyncio.sleep(0.01)
+            self.assertEqual(1, self.routecalc_entry.recalc_status)
+
+            self.assertEqual(cached_route, await self.calculate(200, 1))
+            with self.assertRaises(RoutecalcJobSupersededError):
+                await calculating
+            # Reset as the calculation setting it has been superseded
+            self.assertEqual(0, self.routecalc_entry.recalc_status)
+            open(self.gate_path, "w").close()
+            self.assertEqual(len(COORDS), len(await other_key))
+
+
+if __name__ == '__main__':
+    unittest.main()
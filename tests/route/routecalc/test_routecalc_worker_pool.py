@@ -0,0 +1,146 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from typing import List, Optional, Tuple
+
+from mapadroid.route.routecalc.RoutecalcWorkerPool import RoutecalcWorkerPool
+from mapadroid.utils.madGlobals import (RoutecalcJobPriority,
+                                        RoutecalcJobSupersededError)
+
+# Upper bound of waiting for jobs or the test, only reached if the test fails
+TIMEOUT: float = 10
+
+
+def calculate(name: str, log_path: Optional[str] = None, gate_path: Optional[str] = None) -> Tuple[str, int]:
+    """
+    Logs the start and end of the job to log_path and blocks until gate_path exists
+    """
+    if log_path:
+        with open(log_path, "a") as log:
+            log.write("start {}\n".format(name))
+    deadline: float = time.time() + TIMEOUT
+    while gate_path and not os.path.exists(gate_path):
+        if time.time() > deadline:
+            raise TimeoutError(gate_path)
+        time.sleep(0.01)
+    if log_path:
+        with open(log_path, "a") as log:
+            log.write("end {}\n".format(name))
+    return name, os.getpid()
+
+
+def fail(name: str) -> None:
+    raise ValueError(name)
+
+
+class TestRoutecalcWorkerPool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_path: str = os.path.join(self.directory.name, "log")
+        self.gate_path: str = os.path.join(self.directory.name, "gate")
+
+    async def asyncTearDown(self) -> None:
+        self.pool.shutdown()
+        self.directory.cleanup()
+
+    def get_log(self) -> List[str]:
+        if not os.path.exists(self.log_path):
+            return []
+        with open(self.log_path) as log:
+            return log.read().splitlines()
+
+    def get_started(self) -> List[str]:
+        return [line.split(" ", 1)[1] for line in self.get_log() if line.startswith("start ")]
+
+    async def wait_for_start(self, name: str) -> None:
+        deadline: float = time.time() + TIMEOUT
+        while name not in self.get_started():
+            self.assertLess(time.time(), deadline, "{} has not been started".format(name))
+            await asyncio.sleep(0.01)
+
+    def open_gate(self) -> None:
+        open(self.gate_path, "w").close()
+
+    async def test_processes_are_reused_and_bounded(self):
+        self.pool = RoutecalcWorkerPool(2)
+        jobs = [asyncio.create_task(self.pool.run(calculate, str(job), self.log_path, self.gate_path))
+                for job in range(6)]
+        await self.wait_for_start("0")
+        await self.wait_for_start("1")
+        self.open_gate()
+        results = await asyncio.gather(*jobs)
+        self.assertLessEqual(len({pid for _, pid in results}), 2)
+        self.assertNotIn(os.getpid(), {pid for _, pid in results})
+        # At most two jobs run at once
+        running, most_running = 0, 0
+        for line in self.get_log():
+            running += 1 if line.startswith("start ") else -1
+            most_running = max(most_running, running)
+        self.assertEqual(2, most_running)
+
+    async def test_interactive_jobs_run_first(self):
+        self.pool = RoutecalcWorkerPool(1)
+        blocking = asyncio.create_task(self.pool.run(calculate, "blocking", self.log_path, self.gate_path))
+        await self.wait_for_start("blocking")
+        background = [asyncio.create_task(self.pool.run(calculate, "background{}".format(job), self.log_path))
+                      for job in range(3)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(self.pool.run(calculate, "interactive", self.log_path,
+                                                        priority=RoutecalcJobPriority.INTERACTIVE))
+        await asyncio.sleep(0)
+        self.open_gate()
+        await asyncio.gather(blocking, interactive, *background)
+        self.assertEqual(["blocking", "interactive", "background0", "background1", "background2"],
+                         self.get_started())
+
+    async def test_supersedes_jobs_of_same_key(self):
+        self.pool = RoutecalcWorkerPool(1)
+        running = asyncio.create_task(self.pool.run(calculate, "running", self.log_path, self.gate_path, key=1))
+        other_route = asyncio.create_task(self.pool.run(calculate, "other route", key=2))
+        await self.wait_for_start("running")
+        queued = asyncio.create_task(self.pool.run(calculate, "queued", self.log_path, key=1))
+        await asyncio.sleep(0)
+        latest = asyncio.create_task(self.pool.run(calculate, "latest", key=1))
+        with self.assertRaises(RoutecalcJobSupersededError):
+            await running
+        with self.assertRaises(RoutecalcJobSupersededError):
+            await queued
+        self.open_gate()
+        self.assertEqual("latest", (await latest)[0])
+        self.assertEqual("other route", (await other_route)[0])
+        self.assertNotIn("queued", self.get_started())
+
+    async def test_supersede_without_submitting(self):
+        self.pool = RoutecalcWorkerPool(1)
+        running = asyncio.create_task(self.pool.run(calculate, "running", self.log_path, self.gate_path, key=1))
+        await self.wait_for_start("running")
+        self.pool.supersede(1)
+        self.pool.supersede(2)
+        with self.assertRaises(RoutecalcJobSupersededError):
+            await running
+        self.open_gate()
+        self.assertEqual("next", (await self.pool.run(calculate, "next", key=1))[0])
+
+    async def test_cancelled_jobs_are_skipped(self):
+        self.pool = RoutecalcWorkerPool(1)
+        blocking = asyncio.create_task(self.pool.run(calculate, "blocking", self.log_path, self.gate_path))
+        await self.wait_for_start("blocking")
+        cancelled = asyncio.create_task(self.pool.run(calculate, "cancelled", self.log_path))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        self.open_gate()
+        await blocking
+        self.assertEqual("next", (await self.pool.run(calculate, "next", self.log_path))[0])
+        self.assertEqual(["blocking", "next"], self.get_started())
+
+    async def test_exceptions_reach_caller(self):
+        self.pool = RoutecalcWorkerPool(1)
+        with self.assertRaises(ValueError):
+            await self.pool.run(fail, "failing")
+        self.assertEqual("next", (await self.pool.run(calculate, "next"))[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
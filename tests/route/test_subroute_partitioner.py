@@ -0,0 +1,129 @@
+import unittest
+from typing import Dict, List
+
+import numpy as np
+
+from mapadroid.route.routecalc.calculate_route_quick import route_calc_impl
+from mapadroid.route.SubroutePartitioner import SubroutePartitioner
+from mapadroid.utils.collections import Location
+
+# Meters walked per second by a worker in the simulation
+SPEED = 10
+
+
+def get_equal_count_subroutes(route: List[Location], origins: List[str]) -> Dict[str, List[Location]]:
+    # Subroutes of the same amount of coords as assigned before the partitioner
+    length, extra = divmod(len(route), len(origins))
+    subroutes: Dict[str, List[Location]] = {}
+    position: int = 0
+    for index, origin in enumerate(origins):
+        end: int = position + length + (1 if index < extra else 0)
+        subroutes[origin] = route[position:end]
+        position = end
+    return subroutes
+
+
+def get_costs(partitioner: SubroutePartitioner, route: List[Location],
+              subroutes: Dict[str, List[Location]]) -> List[float]:
+    positions = {location: position for position, location in enumerate(route)}
+    return [partitioner.get_cost(positions[subroute[0]], (positions[subroute[-1]] + 1) % len(route))
+            for subroute in subroutes.values()]
+
+
+def get_reassigned(before: Dict[str, List[Location]], after: Dict[str, List[Location]]) -> int:
+    # Coords of workers staying assigned that are now visited by another worker
+    owners = {location: origin for origin, subroute in after.items() for location in subroute}
+    return sum(1 for origin, subroute in before.items() if origin in after
+               for location in subroute if owners[location] != origin)
+
+
+class TestSubroutePartitioner(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        # A dense city center and sparse outskirts, subroutes of the same amount of coords differ a lot in length
+        coords = np.vstack((np.column_stack((rng.normal(52.5, 0.003, 450), rng.normal(13.4, 0.005, 450))),
+                            np.column_stack((rng.uniform(52.4, 52.6, 150), rng.uniform(13.2, 13.6, 150)))))
+        self.route = [Location(*coords[index]) for index in route_calc_impl(coords, "test")]
+        self.partitioner = SubroutePartitioner(self.route)
+
+    def assert_covers_route(self, subroutes: Dict[str, List[Location]]):
+        visited = [location for subroute in subroutes.values() for location in subroute]
+        self.assertEqual(len(self.route), len(visited))
+        self.assertEqual(set(self.route), set(visited))
+        self.assertTrue(all(subroutes.values()))
+
+    def assert_balanced(self, subroutes: Dict[str, List[Location]], tolerance: float):
+        costs = get_costs(self.partitioner, self.route, subroutes)
+        self.assertLess(max(costs), np.mean(costs) * tolerance)
+
+    def test_partitions_evenly_by_cost(self):
+        starts = self.partitioner.partition(["a", "b", "c", "d"], {})
+        self.assertEqual(0, starts["a"])
+        self.assertEqual(sorted(starts.values()), [starts[origin] for origin in "abcd"])
+        subroutes = self.partitioner.get_subroutes(starts)
+        self.assert_covers_route(subroutes)
+        self.assert_balanced(subroutes, 1.05)
+        self.assertAlmostEqual(self.partitioner.get_cost(0, 0), sum(self.partitioner.get_costs(starts).values()))
+
+    def test_balanced_subroutes_are_kept(self):
+        starts = self.partitioner.partition(["a", "b", "c"], {})
+        subroutes = self.partitioner.get_subroutes(starts)
+        self.assertEqual(starts, self.partitioner.partition(["a", "b", "c"], subroutes))
+
+    def test_subroutes_wrap_around_the_end_of_the_route(self):
+        subroutes = self.partitioner.get_subroutes({"a": 590, "b": 10})
+        self.assertEqual(self.route[590:] + self.route[:10], subroutes["a"])
+        self.assertEqual(self.route[10:590], subroutes["b"])
+        self.assertAlmostEqual(self.partitioner.get_cost(0, 0),
+                               self.partitioner.get_cost(590, 10) + self.partitioner.get_cost(10, 590))
+
+    def test_visited_coords_are_skipped(self):
+        subroutes = self.partitioner.get_subroutes(self.partitioner.partition(["a", "b"], {}))
+        partitioner = SubroutePartitioner(self.route[5:])
+        starts = partitioner.partition(["a", "b"], {"a": subroutes["a"][:3], "b": subroutes["b"]})
+        # Neither worker is considered new, no subroute is split
+        self.assertIn(partitioner.get_subroutes(starts)["b"][0], subroutes["b"][:20])
+        self.assertEqual(len(self.route) - 5, sum(len(subroute) for subroute in
+                                                  partitioner.get_subroutes(starts).values()))
+
+    def test_every_worker_is_assigned_a_coord(self):
+        route = self.route[:3]
+        starts = SubroutePartitioner(route).partition(["a", "b", "c"], {"a": route})
+        self.assertEqual([0, 1, 2], sorted(starts.values()))
+        with self.assertRaises(ValueError):
+            SubroutePartitioner(route).partition(["a", "b", "c", "d"], {})
+        with self.assertRaises(ValueError):
+            SubroutePartitioner(route).partition([], {})
+
+    def test_simulate_churn_of_workers(self):
+        rng = np.random.default_rng(1)
+        origins: List[str] = ["worker{}".format(index) for index in range(4)]
+        subroutes = self.partitioner.get_subroutes(self.partitioner.partition(origins, {}))
+        added: int = len(origins)
+        reassigned, reassigned_fresh = 0, 0
+        round_times, round_times_equal_count = [], []
+        for _ in range(40):
+            if len(origins) > 2 and (len(origins) >= 12 or rng.random() < 0.5):
+                origins.remove(origins[rng.integers(len(origins))])
+            else:
+                origins.append("worker{}".format(added))
+                added += 1
+            updated = self.partitioner.get_subroutes(self.partitioner.partition(origins, subroutes))
+            self.assert_covers_route(updated)
+            self.assertEqual(set(origins), set(updated))
+            self.assert_balanced(updated, 1.1)
+            reassigned += get_reassigned(subroutes, updated)
+            fresh = self.partitioner.get_subroutes(self.partitioner.partition(origins, {}))
+            reassigned_fresh += get_reassigned(subroutes, fresh)
+            # A round is completed once the worker with the most costly subroute is done
+            round_times.append(max(get_costs(self.partitioner, self.route, updated)) / SPEED)
+            equal_count = get_equal_count_subroutes(self.route, origins)
+            round_times_equal_count.append(max(get_costs(self.partitioner, self.route, equal_count)) / SPEED)
+            subroutes = updated
+        # Moving boundaries keeps most coords with the worker visiting them before
+        self.assertLess(reassigned, reassigned_fresh * 0.5)
+        self.assertLess(np.mean(round_times), np.mean(round_times_equal_count) * 0.75)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from collections import Counter
+
+from mapadroid.utils.ConsistentHashRing import ConsistentHashRing
+
+
+class TestConsistentHashRing(unittest.TestCase):
+    workers = ["worker{}".format(i) for i in range(2000)]
+
+    def test_spreads_keys_evenly(self):
+        ring: ConsistentHashRing[int] = ConsistentHashRing({"redis{}".format(i): i for i in range(4)})
+        amounts = Counter(ring.get_node(worker) for worker in self.workers)
+        self.assertEqual({0, 1, 2, 3}, set(amounts))
+        for amount in amounts.values():
+            self.assertLess(abs(amount - len(self.workers) / 4), len(self.workers) / 4 * 0.25)
+
+    def test_stable_across_instances(self):
+        first = ConsistentHashRing({"a": 1, "b": 2, "c": 3})
+        second = ConsistentHashRing({"c": 3, "b": 2, "a": 1})
+        self.assertEqual([first.get_name(worker) for worker in self.workers],
+                         [second.get_name(worker) for worker in self.workers])
+
+    def test_adding_node_only_moves_keys_to_it(self):
+        before = ConsistentHashRing({"a": 1, "b": 2, "c": 3})
+        after = ConsistentHashRing({"a": 1, "b": 2, "c": 3, "d": 4})
+        moved = [worker for worker in self.workers if before.get_name(worker) != after.get_name(worker)]
+        self.assertEqual({"d"}, {after.get_name(worker) for worker in moved})
+        self.assertLess(len(moved), len(self.workers) / 3)
+
+    def test_requires_nodes(self):
+        with self.assertRaises(ValueError):
+            ConsistentHashRing({})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import asyncio
+import unittest
+
+from mapadroid.utils.SingleFlight import SingleFlight, single_flight
+
+
+class Backend:
+    def __init__(self):
+        self.requested: int = 0
+
+    @single_flight()
+    async def get_level(self, worker: str) -> int:
+        self.requested += 1
+        await asyncio.sleep(0.05)
+        if worker == "broken":
+            raise ValueError(worker)
+        return len(worker)
+
+    @single_flight(ttl=0.1)
+    async def get_quests_held(self, worker: str) -> str:
+        self.requested += 1
+        return worker
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_merges_concurrent_requests(self):
+        backend = Backend()
+        stats = SingleFlight.get_stats()["Backend.get_level"]
+        requests, coalesced = stats.requests, stats.coalesced
+        results = await asyncio.gather(*[backend.get_level(worker) for worker in ("a", "bb", "a", "a", "bb")])
+        self.assertEqual([1, 2, 1, 1, 2], results)
+        self.assertEqual(2, backend.requested)
+        self.assertEqual((requests + 2, coalesced + 3), (stats.requests, stats.coalesced))
+        # Not cached
+        await backend.get_level("a")
+        self.assertEqual(3, backend.requested)
+
+    async def test_per_instance(self):
+        first, second = Backend(), Backend()
+        await asyncio.gather(first.get_level("a"), second.get_level("a"))
+        self.assertEqual((1, 1), (first.requested, second.requested))
+
+    async def test_exceptions_reach_all_callers(self):
+        backend = Backend()
+        results = await asyncio.gather(backend.get_level("broken"), backend.get_level("broken"),
+                                       return_exceptions=True)
+        self.assertEqual([ValueError, ValueError], [type(result) for result in results])
+        self.assertEqual(1, backend.requested)
+        with self.assertRaises(ValueError):
+            await backend.get_level("broken")
+        self.assertEqual(2, backend.requested)
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        backend = Backend()
+        first = asyncio.create_task(backend.get_level("a"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(backend.get_level("a"))
+        await asyncio.sleep(0)
+        second.cancel()
+        self.assertEqual(1, await first)
+        with self.assertRaises(asyncio.CancelledError):
+            await second
+
+    async def test_cancelled_first_caller_does_not_cancel_others(self):
+        backend = Backend()
+        first = asyncio.create_task(backend.get_level("a"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(backend.get_level("a"))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(1, await second)
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        self.assertEqual(1, backend.requested)
+
+    async def test_ttl(self):
+        backend = Backend()
+        self.assertEqual("a", await backend.get_quests_held("a"))
+        self.assertEqual("a", await backend.get_quests_held(worker="a"))
+        self.assertEqual("a", await backend.get_quests_held("a"))
+        self.assertEqual(2, backend.requested)
+        await asyncio.sleep(0.15)
+        await backend.get_quests_held("a")
+        self.assertEqual(3, backend.requested)
+
+    async def test_invalidate(self):
+        flight = SingleFlight("test", ttl=10)
+        self.assertEqual(1, await flight.get("key", lambda: asyncio.sleep(0, 1)))
+        self.assertEqual(1, await flight.get("key", lambda: asyncio.sleep(0, 2)))
+        flight.invalidate("key")
+        self.assertEqual(2, await flight.get("key", lambda: asyncio.sleep(0, 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()